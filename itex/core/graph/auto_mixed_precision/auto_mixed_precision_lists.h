@@ -229,6 +229,8 @@ class AutoMixedPrecisionLists {
       "ITEXGeluGrad",
       "ITEXLayerNorm",
       "ITEXLayerNormGrad",
+      "ItexRmsNorm",
+      "ItexRmsNormGrad",
       "LayerNorm",
       "LayerNormGrad",
       "LeakyRelu",
@@ -238,6 +240,7 @@ class AutoMixedPrecisionLists {
       "LogSoftmax",
       "Mul",
       "Prod",
+      "QKRotaryPositionalEmbedding",
       "RealDiv",
       "Reciprocal",
       "Selu",
@@ -17,6 +17,8 @@ limitations under the License.
 
 #include <cstring>
 
+#include "itex/core/utils/thread_pool_backend.h"
+
 namespace itex {
 namespace {
 ConfigProto& Configs() {
@@ -25,7 +27,24 @@ ConfigProto& Configs() {
 }
 }  // namespace
 
-void itex_set_config(const ConfigProto& config) { Configs() = config; }
+void itex_set_config(const ConfigProto& config) {
+  Configs() = config;
+  // Options left DEFAULT fall back to the environment, so the backend of a
+  // previous config doesn't leak into this one.
+  const RuntimeOptions& runtime_options = config.runtime_options();
+  ThreadPoolBackend backend = ReadThreadPoolBackendFromEnv();
+  if (runtime_options.hybrid_threadpool() == ON) {
+    backend = ThreadPoolBackend::kHybrid;
+  } else if (runtime_options.omp_threadpool() == ON) {
+    backend = ThreadPoolBackend::kOpenMP;
+  } else if (runtime_options.omp_threadpool() == OFF) {
+    backend = ThreadPoolBackend::kEigen;
+  } else if (runtime_options.hybrid_threadpool() == OFF &&
+             backend == ThreadPoolBackend::kHybrid) {
+    backend = ThreadPoolBackend::kOpenMP;
+  }
+  SetThreadPoolBackend(backend);
+}
 
 ConfigProto itex_get_config() { return Configs(); }
 
@@ -0,0 +1,182 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include "itex/core/graph/optimized_graph_cache.h"
+
+#include <algorithm>
+#include <cstdlib>
+#include <iterator>
+#include <string>
+#include <vector>
+
+#include "absl/strings/str_join.h"
+#include "itex/core/graph/config_util.h"
+#include "itex/core/utils/cpu_info.h"
+#include "itex/core/utils/env.h"
+#include "itex/core/utils/env_var.h"
+#include "itex/core/utils/errors.h"
+#include "itex/core/utils/fingerprint.h"
+#include "itex/core/utils/logging.h"
+#include "itex/core/utils/path.h"
+#include "itex/core/utils/proto_serialization.h"
+#include "itex/core/utils/strcat.h"
+#include "itex/core/version.h"
+
+namespace itex {
+namespace graph {
+
+namespace {
+// Bump it if the layout of cache key or file is changed.
+constexpr int kGraphCacheFormatVersion = 2;
+
+// Environment variables read by the passes which change the optimized graph
+// but aren't part of `OptimizerConfigFlags` or the ITEX config.
+constexpr const char* kGraphCacheEnvVars[] = {
+    "ITEX_AUTO_MIXED_PRECISION_DATA_TYPE",
+    "ITEX_AUTO_MIXED_PRECISION_UNSAFE_FORCE_ALL",
+    "ITEX_AUTO_MIXED_PRECISION_ALLOWLIST_ADD",
+    "ITEX_AUTO_MIXED_PRECISION_ALLOWLIST_REMOVE",
+    "ITEX_AUTO_MIXED_PRECISION_INFERLIST_ADD",
+    "ITEX_AUTO_MIXED_PRECISION_INFERLIST_REMOVE",
+    "ITEX_AUTO_MIXED_PRECISION_CLEARLIST_ADD",
+    "ITEX_AUTO_MIXED_PRECISION_CLEARLIST_REMOVE",
+    "ITEX_AUTO_MIXED_PRECISION_DENYLIST_ADD",
+    "ITEX_AUTO_MIXED_PRECISION_DENYLIST_REMOVE",
+    "ITEX_OMP_THREADPOOL",
+};
+
+// oneDNN Graph ops, whose `partition_id` refers to a partition kept in the
+// memory of the process which ran the oneDNN Graph pass.
+constexpr const char* kOneDnnGraphOps[] = {
+    "OneDnnGraph",
+    "OneDnnGraphCPU",
+    "_OneDnnGraph",
+    "_OneDnnGraphCPU",
+};
+
+bool IsOneDnnGraphOp(const std::string& op) {
+  return std::find(std::begin(kOneDnnGraphOps), std::end(kOneDnnGraphOps),
+                   op) != std::end(kOneDnnGraphOps);
+}
+
+std::string GetGraphCachePath(const std::string& key) {
+  return io::JoinPath(GetGraphCacheDir(), strings::StrCat(key, ".pb"));
+}
+}  // namespace
+
+const std::string& GetGraphCacheDir() {
+  static const std::string cache_dir = [] {
+    std::string dir;
+    ITEX_CHECK_OK(ReadStringFromEnvVar("ITEX_GRAPH_CACHE_DIR", "", &dir));
+    if (dir.empty()) return dir;
+
+    Status status = Env::Default()->RecursivelyCreateDir(dir);
+    if (!status.ok()) {
+      ITEX_LOG(WARNING) << "Failed to create graph cache directory " << dir
+                        << ", graph cache is disabled: " << status;
+      return std::string();
+    }
+    ITEX_VLOG(1) << "Optimized graphs are cached in " << dir;
+    return dir;
+  }();
+  return cache_dir;
+}
+
+std::string GetGraphCacheKey(const char* device_name, const GrapplerItem& item,
+                             const GraphDef& graph_def,
+                             const OptimizerConfigFlags& config) {
+  std::string data;
+  if (!SerializeToStringDeterministic(graph_def, &data)) return std::string();
+
+  std::vector<std::string> fetch(item.fetch.begin(), item.fetch.end());
+  std::sort(fetch.begin(), fetch.end());
+  auto preserve_set = item.NodesToPreserve();
+  std::vector<std::string> preserve(preserve_set.begin(), preserve_set.end());
+  std::sort(preserve.begin(), preserve.end());
+
+  std::string config_proto;
+  if (!SerializeToStringDeterministic(itex_get_config(), &config_proto))
+    return std::string();
+
+  strings::StrAppend(
+      &data, "|version:", kGraphCacheFormatVersion, "|device:", device_name,
+      "|fetch:", absl::StrJoin(fetch, ","),
+      "|preserve:", absl::StrJoin(preserve, ","), "|config:", config_proto);
+  strings::StrAppend(
+      &data, "|flags:", config.enable_sharding, config.enable_onednn_graph,
+      config.enable_onednn_graph_all_type,
+      config.enable_onednn_graph_compiler_backend,
+      config.enable_onednn_graph_dnnl_backend,
+      config.enable_tf_constant_folding, config.enable_optimize_aggressive,
+      config.enable_remapper, config.enable_auto_mixed_precision,
+      config.enable_layout_opt, config.enable_test_mode,
+      config.remapper_run_pass);
+  // Remapper skips FP16 nodes on CPU without native FP16 support.
+  strings::StrAppend(&data, "|cpu_fp16:", port::HasCpuFP16Support());
+  for (const char* name : kGraphCacheEnvVars) {
+    const char* value = std::getenv(name);
+    strings::StrAppend(&data, "|", name, value ? "=" : "", value ? value : "");
+  }
+  // Passes of another ITEX build may optimize the graph differently.
+  const itex_version_t* itex_version = GetITEXVersion();
+  strings::StrAppend(&data, "|itex:", itex_version->major, ".",
+                     itex_version->minor, ".", itex_version->patch, "@",
+                     itex_version->hash);
+
+  Fprint128 fingerprint = Fingerprint128(data);
+  return strings::StrCat(strings::Hex(fingerprint.high64, strings::kZeroPad16),
+                         strings::Hex(fingerprint.low64, strings::kZeroPad16));
+}
+
+Status LookupOptimizedGraph(const std::string& key, GraphDef* optimized_graph) {
+  const std::string path = GetGraphCachePath(key);
+  Env* env = Env::Default();
+  if (!env->FileExists(path).ok()) {
+    return errors::NotFound("Optimized graph is not cached: ", path);
+  }
+  TF_RETURN_IF_ERROR(ReadBinaryProto(env, path, optimized_graph));
+  if (!IsGraphCacheable(*optimized_graph)) {
+    return errors::FailedPrecondition(
+        "Cached graph has oneDNN Graph partitions: ", path);
+  }
+  return Status::OK();
+}
+
+bool IsGraphCacheable(const GraphDef& optimized_graph) {
+  for (const NodeDef& node : optimized_graph.node()) {
+    if (IsOneDnnGraphOp(node.op())) return false;
+  }
+  for (const FunctionDef& function : optimized_graph.library().function()) {
+    for (const NodeDef& node : function.node_def()) {
+      if (IsOneDnnGraphOp(node.op())) return false;
+    }
+  }
+  return true;
+}
+
+Status SaveOptimizedGraph(const std::string& key,
+                          const GraphDef& optimized_graph) {
+  const std::string path = GetGraphCachePath(key);
+  Env* env = Env::Default();
+  const std::string tmp_path = strings::StrCat(
+      path, ".tmp.", env->GetProcessId(), ".", env->NowMicros());
+  TF_RETURN_IF_ERROR(WriteBinaryProto(env, tmp_path, optimized_graph));
+  Status status = env->RenameFile(tmp_path, path);
+  if (!status.ok()) env->DeleteFile(tmp_path).IgnoreError();
+  return status;
+}
+
+}  // namespace graph
+}  // namespace itex
@@ -0,0 +1,64 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#ifndef ITEX_CORE_GRAPH_OPTIMIZED_GRAPH_CACHE_H_
+#define ITEX_CORE_GRAPH_OPTIMIZED_GRAPH_CACHE_H_
+
+#include <string>
+
+#include "itex/core/graph/optimizer_config.h"
+#include "itex/core/graph/utils/grappler_item.h"
+#include "itex/core/utils/status.h"
+#include "protos/graph.pb.h"
+
+namespace itex {
+namespace graph {
+
+// Persistent cache of the graphs optimized by ITEX graph optimizer. It's
+// disabled by default and enabled by setting `ITEX_GRAPH_CACHE_DIR` to a
+// directory, which can be shared by processes running the same model, e.g.
+// serving replicas. Each optimized graph is saved as a binary GraphDef named
+// by the fingerprint of everything that may change the optimization result,
+// including the ITEX version and the environment variables read by the passes.
+
+// Returns the cache directory, or an empty string if the cache is disabled.
+const std::string& GetGraphCacheDir();
+
+inline bool IsGraphCacheEnabled() { return !GetGraphCacheDir().empty(); }
+
+// Fingerprint of the input graph, fetch nodes, nodes to preserve, target
+// device, optimizer configurations, the environment variables changing the
+// optimization and the ITEX version.
+std::string GetGraphCacheKey(const char* device_name, const GrapplerItem& item,
+                             const GraphDef& graph_def,
+                             const OptimizerConfigFlags& config);
+
+// Whether `optimized_graph` can be reused by another process. oneDNN Graph
+// ops refer to partitions compiled in the memory of the current process, so
+// graphs with them are never cached.
+bool IsGraphCacheable(const GraphDef& optimized_graph);
+
+// Loads the optimized graph of `key`. Returns `NotFound` if it's not cached.
+Status LookupOptimizedGraph(const std::string& key, GraphDef* optimized_graph);
+
+// Saves the optimized graph of `key`. The file is written to a temporary file
+// then renamed, so concurrent readers never see a partial graph.
+Status SaveOptimizedGraph(const std::string& key,
+                          const GraphDef& optimized_graph);
+
+}  // namespace graph
+}  // namespace itex
+
+#endif  // ITEX_CORE_GRAPH_OPTIMIZED_GRAPH_CACHE_H_
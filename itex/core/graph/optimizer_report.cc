@@ -0,0 +1,220 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include "itex/core/graph/optimizer_report.h"
+
+#include <algorithm>
+#include <atomic>
+#include <map>
+#include <string>
+#include <unordered_map>
+#include <unordered_set>
+#include <utility>
+#include <vector>
+
+#include "itex/core/utils/env.h"
+#include "itex/core/utils/env_time.h"
+#include "itex/core/utils/env_var.h"
+#include "itex/core/utils/logging.h"
+#include "itex/core/utils/path.h"
+#include "itex/core/utils/strcat.h"
+
+namespace itex {
+namespace graph {
+
+namespace {
+
+// Elementwise ops which a contraction can take as post-op, directly or
+// through a remapper fusion.
+const std::unordered_set<string>& PostOpTypes() {
+  static const auto* const kPostOpTypes = new std::unordered_set<string>{
+      "Add",       "AddN",      "AddV2",     "BiasAdd",   "Cast",
+      "Elu",       "Erf",       "Gelu",      "ITEXGelu",  "LeakyRelu",
+      "Maximum",   "Minimum",   "Mul",       "Relu",      "Relu6",
+      "Sigmoid",   "Softplus",  "Sqrt",      "Square",    "Sub",
+      "Swish",     "Tanh",      "_ITEXGelu", "_ITEXSwish"};
+  return *kPostOpTypes;
+}
+
+// Same ops as HaveComputeIntensiveNode(), fused or not.
+bool IsContraction(const string& op) {
+  return op.find("MatMul") != string::npos ||
+         op.find("Conv") != string::npos || op.find("Einsum") != string::npos;
+}
+
+struct UnfusedOp {
+  string op;
+  string input_op;
+  int count = 0;
+  string example;
+};
+
+std::vector<UnfusedOp> FindUnfusedOps(const GraphDef& graph) {
+  std::unordered_map<string, const NodeDef*> nodes;
+  for (const NodeDef& node : graph.node()) nodes.emplace(node.name(), &node);
+
+  std::map<std::pair<string, string>, UnfusedOp> unfused;
+  for (const NodeDef& node : graph.node()) {
+    if (PostOpTypes().count(node.op()) == 0) continue;
+    for (const string& input : node.input()) {
+      if (IsControlInput(input)) break;
+      auto it = nodes.find(NodeName(input));
+      if (it == nodes.end() || !IsContraction(it->second->op())) continue;
+
+      UnfusedOp& entry = unfused[{node.op(), it->second->op()}];
+      if (entry.count++ == 0) {
+        entry.op = node.op();
+        entry.input_op = it->second->op();
+        entry.example = node.name();
+      }
+      break;
+    }
+  }
+
+  std::vector<UnfusedOp> sorted;
+  for (auto& item : unfused) sorted.push_back(std::move(item.second));
+  std::stable_sort(sorted.begin(), sorted.end(),
+                   [](const UnfusedOp& lhs, const UnfusedOp& rhs) {
+                     return lhs.count > rhs.count;
+                   });
+  return sorted;
+}
+
+string JsonString(const string& value) {
+  string result = "\"";
+  for (char c : value) {
+    switch (c) {
+      case '"':
+        result += "\\\"";
+        break;
+      case '\\':
+        result += "\\\\";
+        break;
+      case '\n':
+        result += "\\n";
+        break;
+      default:
+        if (static_cast<unsigned char>(c) < 0x20) {
+          static const char kHex[] = "0123456789abcdef";
+          result += "\\u00";
+          result += kHex[(c >> 4) & 0xf];
+          result += kHex[c & 0xf];
+        } else {
+          result += c;
+        }
+    }
+  }
+  result += "\"";
+  return result;
+}
+
+}  // namespace
+
+const std::string& GetGraphReportDir() {
+  static const std::string report_dir = [] {
+    std::string dir;
+    ITEX_CHECK_OK(ReadStringFromEnvVar("ITEX_GRAPH_REPORT_DIR", "", &dir));
+    if (dir.empty()) return dir;
+
+    Status status = Env::Default()->RecursivelyCreateDir(dir);
+    if (!status.ok()) {
+      ITEX_LOG(WARNING) << "Failed to create graph report directory " << dir
+                        << ", graph report is disabled: " << status;
+      return std::string();
+    }
+    ITEX_VLOG(1) << "Graph optimization reports are written to " << dir;
+    return dir;
+  }();
+  return report_dir;
+}
+
+OptimizerReport::OptimizerReport(const char* device_name,
+                                 const GraphDef& graph)
+    : device_name_(device_name),
+      nodes_before_(graph.node_size()),
+      last_num_nodes_(graph.node_size()),
+      start_ns_(EnvTime::NowNanos()),
+      last_ns_(start_ns_) {}
+
+void OptimizerReport::RecordPass(const string& name, const GraphDef& graph) {
+  const uint64 now_ns = EnvTime::NowNanos();
+  passes_.push_back(
+      {name, now_ns - last_ns_, last_num_nodes_, graph.node_size()});
+  last_ns_ = now_ns;
+  last_num_nodes_ = graph.node_size();
+}
+
+Status OptimizerReport::Write(const GraphDef& optimized_graph,
+                              string* path) const {
+  string json = strings::StrCat(
+      "{\n  \"device\": ", JsonString(device_name_),
+      ",\n  \"cache_hit\": ", cache_hit_ ? "true" : "false",
+      ",\n  \"total_time_us\": ", (EnvTime::NowNanos() - start_ns_) / 1000,
+      ",\n  \"nodes_before\": ", nodes_before_,
+      ",\n  \"nodes_after\": ", optimized_graph.node_size(),
+      ",\n  \"passes\": [");
+  for (size_t i = 0; i < passes_.size(); ++i) {
+    const Pass& pass = passes_[i];
+    strings::StrAppend(&json, i == 0 ? "\n" : ",\n", "    {\"name\": ",
+                       JsonString(pass.name),
+                       ", \"time_us\": ", pass.elapsed_ns / 1000,
+                       ", \"nodes_before\": ", pass.nodes_before,
+                       ", \"nodes_after\": ", pass.nodes_after, "}");
+  }
+  strings::StrAppend(&json, passes_.empty() ? "" : "\n  ",
+                     "],\n  \"fusions\": [");
+
+  // The most frequent fusion first.
+  std::vector<std::pair<string, FusionStats>> fusions(fusion_stats_.begin(),
+                                                      fusion_stats_.end());
+  std::stable_sort(fusions.begin(), fusions.end(),
+                   [](const std::pair<string, FusionStats>& lhs,
+                      const std::pair<string, FusionStats>& rhs) {
+                     return lhs.second.hits > rhs.second.hits;
+                   });
+  for (size_t i = 0; i < fusions.size(); ++i) {
+    const FusionStats& stats = fusions[i].second;
+    strings::StrAppend(&json, i == 0 ? "\n" : ",\n", "    {\"name\": ",
+                       JsonString(fusions[i].first),
+                       ", \"calls\": ", stats.calls, ", \"hits\": ", stats.hits,
+                       ", \"time_us\": ", stats.elapsed_ns / 1000, "}");
+  }
+  strings::StrAppend(&json, fusions.empty() ? "" : "\n  ",
+                     "],\n  \"unfused_ops\": [");
+
+  const std::vector<UnfusedOp> unfused_ops = FindUnfusedOps(optimized_graph);
+  for (size_t i = 0; i < unfused_ops.size(); ++i) {
+    const UnfusedOp& unfused = unfused_ops[i];
+    strings::StrAppend(&json, i == 0 ? "\n" : ",\n", "    {\"op\": ",
+                       JsonString(unfused.op),
+                       ", \"input_op\": ", JsonString(unfused.input_op),
+                       ", \"count\": ", unfused.count,
+                       ", \"example\": ", JsonString(unfused.example), "}");
+  }
+  strings::StrAppend(&json, unfused_ops.empty() ? "" : "\n  ", "]\n}\n");
+
+  // Graphs are optimized concurrently by the inter-op threads.
+  static std::atomic<int64> num_reports{0};
+  Env* env = Env::Default();
+  *path = io::JoinPath(
+      GetGraphReportDir(),
+      strings::StrCat("itex_graph_report_", env->GetProcessId(), "_",
+                      num_reports.fetch_add(1, std::memory_order_relaxed),
+                      ".json"));
+  return WriteStringToFile(env, *path, json);
+}
+
+}  // namespace graph
+}  // namespace itex
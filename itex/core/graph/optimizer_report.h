@@ -0,0 +1,97 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#ifndef ITEX_CORE_GRAPH_OPTIMIZER_REPORT_H_
+#define ITEX_CORE_GRAPH_OPTIMIZER_REPORT_H_
+
+#include <map>
+#include <string>
+#include <vector>
+
+#include "itex/core/graph/utils/utils.h"
+#include "itex/core/utils/status.h"
+#include "itex/core/utils/types.h"
+#include "protos/graph.pb.h"
+
+namespace itex {
+namespace graph {
+
+// Structured report of ITEX graph optimization, to track optimization
+// regressions across model versions. It's disabled by default and enabled by
+// setting `ITEX_GRAPH_REPORT_DIR` to a directory. One JSON file is written for
+// each graph optimized by the process:
+//
+//   {
+//     "device": "CPU",
+//     "cache_hit": false,
+//     "total_time_us": 51234,
+//     "nodes_before": 1234,
+//     "nodes_after": 456,
+//     "passes": [{"name": "generic_layout", "time_us": 812,
+//                 "nodes_before": 1234, "nodes_after": 1234}, ...],
+//     "fusions": [{"name": "ContractionWithBias", "calls": 96, "hits": 48,
+//                  "time_us": 210}, ...],
+//     "unfused_ops": [{"op": "AddV2", "input_op": "_ITEXFusedMatMul",
+//                      "count": 12, "example": "dense/add"}, ...]
+//   }
+//
+// `fusions` sums the remapper passes. `unfused_ops` lists elementwise ops of
+// the optimized graph which still consume the output of a contraction, i.e.
+// post-ops no fusion has absorbed, grouped by both ops.
+
+// Returns the report directory, or an empty string if the report is disabled.
+const std::string& GetGraphReportDir();
+
+inline bool IsGraphReportEnabled() { return !GetGraphReportDir().empty(); }
+
+class OptimizerReport {
+ public:
+  OptimizerReport(const char* device_name, const GraphDef& graph);
+
+  std::map<string, FusionStats>* fusion_stats() { return &fusion_stats_; }
+
+  // Records a pass which produced `graph`. Its time is measured from the
+  // previous pass, or the creation of the report for the first one.
+  void RecordPass(const string& name, const GraphDef& graph);
+
+  // The optimized graph was loaded from the graph cache.
+  void SetCacheHit() { cache_hit_ = true; }
+
+  // Writes the report of `optimized_graph` to a new file in the report
+  // directory and returns its path.
+  Status Write(const GraphDef& optimized_graph, string* path) const;
+
+ private:
+  struct Pass {
+    string name;
+    uint64 elapsed_ns;
+    int nodes_before;
+    int nodes_after;
+  };
+
+  string device_name_;
+  int nodes_before_;
+  int last_num_nodes_;
+  bool cache_hit_ = false;
+  uint64 start_ns_;
+  uint64 last_ns_;
+  std::vector<Pass> passes_;
+  std::map<string, FusionStats> fusion_stats_;
+};
+
+}  // namespace graph
+}  // namespace itex
+
+#endif  // ITEX_CORE_GRAPH_OPTIMIZER_REPORT_H_
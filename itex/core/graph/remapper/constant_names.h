@@ -44,6 +44,7 @@ constexpr char kConv3D[] = "Conv3D";
 constexpr char kConv3DBackpropFilter[] = "Conv3DBackpropFilter";
 constexpr char kConv3DBackpropFilterV2[] = "Conv3DBackpropFilterV2";
 constexpr char kDequantize[] = "Dequantize";
+constexpr char kExpandDims[] = "ExpandDims";
 constexpr char kFill[] = "Fill";
 constexpr char kFusedBatchNormV3[] = "FusedBatchNormV3";
 constexpr char kGelu[] = "ITEXGelu";
@@ -52,6 +53,8 @@ constexpr char kMatMul[] = "MatMul";
 constexpr char kMean[] = "Mean";
 constexpr char kMish[] = "_ITEXMish";
 constexpr char kMul[] = "Mul";
+constexpr char kNeg[] = "Neg";
+constexpr char kPack[] = "Pack";
 constexpr char kPad[] = "Pad";
 constexpr char kQuantizeV2[] = "QuantizeV2";
 constexpr char kReadVariableOp[] = "ReadVariableOp";
@@ -72,6 +75,8 @@ constexpr char kSplitV[] = "SplitV";
 constexpr char kSqrt[] = "Sqrt";
 constexpr char kSquare[] = "Square";
 constexpr char kSquaredDifference[] = "SquaredDifference";
+constexpr char kSqueeze[] = "Squeeze";
+constexpr char kStridedSlice[] = "StridedSlice";
 constexpr char kSub[] = "Sub";
 constexpr char kSwish[] = "_ITEXSwish";
 constexpr char kTanh[] = "Tanh";
@@ -138,6 +143,8 @@ constexpr char kQuantizeV2WithQuantizedConv2D[] =
 constexpr char kFusedQuantizedConv2DWithDequantize[] =
     "_ITEXQuantizedConv2DWithDequantize";
 constexpr char kFusedQuantizedConv2DWithCast[] = "_ITEXQuantizedConv2DWithCast";
+constexpr char kRmsNorm[] = "ItexRmsNorm";
+constexpr char kQKRotaryPositionalEmbedding[] = "QKRotaryPositionalEmbedding";
 
 // TODO(itex): This op may be duplicated, remove it in future if possible.
 constexpr char kPadConv3d[] = "_ITEXConv3D";
@@ -20,8 +20,10 @@ limitations under the License.
 #include <utility>
 #include <vector>
 
+#include "itex/core/graph/remapper/user_defined_fusion.h"
 #include "itex/core/graph/utils/pattern_utils.h"
 #include "itex/core/graph/utils/utils.h"
+#include "itex/core/utils/env_time.h"
 
 namespace itex {
 namespace graph {
@@ -124,15 +126,21 @@ std::vector<OpInfo_TensorProperties> GetOutputProperties(RemapperContext* ctx,
   return properties;
 }
 
-Status LaunchPatternMatcher(RemapperContext* ctx, int index,
+// Tries `fusions` in order and applies the first matched one.
+static Status LaunchFusions(RemapperContext* ctx, int index,
+                            const std::vector<Fusion*>& fusions,
                             std::vector<bool>* invalidated,
-                            std::vector<bool>* deleted, bool is_full) {
-  auto* node = ctx->graph_view.GetNode(index)->node();
-
-  for (auto const& fusion : FusionMgr::GetInstance().GetFusions(node->op())) {
+                            std::vector<bool>* deleted, bool is_full,
+                            bool* matched) {
+  for (auto const& fusion : fusions) {
     if (!is_full && !fusion->IsPartial()) continue;
     ITEX_VLOG(3) << "Start to run fusion pass: " << fusion->Name();
+    uint64 start_ns = ctx->stats.IsEnabled() ? EnvTime::NowNanos() : 0;
     auto properties = fusion->Check(ctx, index);
+    if (ctx->stats.IsEnabled()) {
+      ctx->stats.Record(fusion->Name(), !properties.Empty(),
+                        EnvTime::NowNanos() - start_ns);
+    }
     if (!properties.Empty()) {
       Status status = fusion->Update(ctx, properties);
 
@@ -146,6 +154,7 @@ Status LaunchPatternMatcher(RemapperContext* ctx, int index,
       }
 
       ITEX_VLOG(3) << "Succeed to match fusion pass: " << fusion->Name();
+      *matched = true;
       return status;
     }
     ITEX_VLOG(3) << "Failed to match fusion pass: " << fusion->Name();
@@ -153,5 +162,25 @@ Status LaunchPatternMatcher(RemapperContext* ctx, int index,
 
   return Status::OK();
 }
+
+Status LaunchPatternMatcher(RemapperContext* ctx, int index,
+                            std::vector<bool>* invalidated,
+                            std::vector<bool>* deleted, bool is_full) {
+  auto* node = ctx->graph_view.GetNode(index)->node();
+  bool matched = false;
+
+  // User-defined fusions first, so they can take over a subgraph which a
+  // built-in fusion would match.
+  if (ctx->user_fusions != nullptr) {
+    TF_RETURN_IF_ERROR(
+        LaunchFusions(ctx, index, ctx->user_fusions->GetFusions(node->op()),
+                      invalidated, deleted, is_full, &matched));
+    if (matched) return Status::OK();
+  }
+
+  return LaunchFusions(ctx, index,
+                       FusionMgr::GetInstance().GetFusions(node->op()),
+                       invalidated, deleted, is_full, &matched);
+}
 }  // namespace graph
 }  // namespace itex
@@ -17,10 +17,13 @@ limitations under the License.
 
 #include "itex/core/graph/remapper/remapper.h"
 
+#include <algorithm>
+#include <bitset>
 #include <map>
 #include <queue>
 #include <set>
 #include <string>
+#include <unordered_map>
 #include <unordered_set>
 #include <utility>
 #include <vector>
@@ -28,6 +31,7 @@ limitations under the License.
 #include "itex/core/graph/optimizer_config.h"
 #include "itex/core/graph/remapper/constant_names.h"
 #include "itex/core/graph/remapper/fusion.h"
+#include "itex/core/graph/remapper/user_defined_fusion.h"
 #include "itex/core/graph/utils/graph_common_utils.h"
 #include "itex/core/graph/utils/graph_properties.h"
 #include "itex/core/graph/utils/graph_view.h"
@@ -35,6 +39,7 @@ limitations under the License.
 #include "itex/core/graph/utils/op_types.h"
 #include "itex/core/graph/utils/pattern_utils.h"
 #include "itex/core/graph/utils/symbolic_shapes.h"
+#include "itex/core/utils/env_time.h"
 #include "itex/core/utils/op_kernel.h"
 
 namespace itex {
@@ -65,6 +70,44 @@ void RemoveAllRegularFanin(RemapperContext* ctx, int node_idx) {
   TF_ABORT_IF_ERROR(mutation->Apply());
 }
 
+RemapperStats::RemapperStats() : enabled_(ITEX_VLOG_IS_ON(2)) {}
+
+void RemapperStats::Record(const string& fusion, bool matched,
+                           uint64 elapsed_ns) {
+  FusionStats& entry = entries_[fusion];
+  entry.calls++;
+  if (matched) entry.hits++;
+  entry.elapsed_ns += elapsed_ns;
+}
+
+void RemapperStats::Log() const {
+  if (!enabled_ || entries_.empty()) return;
+
+  std::vector<std::pair<string, FusionStats>> sorted(entries_.begin(),
+                                                     entries_.end());
+  std::sort(sorted.begin(), sorted.end(),
+            [](const std::pair<string, FusionStats>& lhs,
+               const std::pair<string, FusionStats>& rhs) {
+              return lhs.second.elapsed_ns > rhs.second.elapsed_ns;
+            });
+
+  for (const auto& item : sorted) {
+    ITEX_VLOG(2) << "RemapperPass: fusion " << item.first
+                 << " calls: " << item.second.calls
+                 << ", hits: " << item.second.hits
+                 << ", time: " << item.second.elapsed_ns / 1000 << " us";
+  }
+}
+
+void RemapperStats::MergeInto(std::map<string, FusionStats>* stats) const {
+  for (const auto& item : entries_) {
+    FusionStats& total = (*stats)[item.first];
+    total.calls += item.second.calls;
+    total.hits += item.second.hits;
+    total.elapsed_ns += item.second.elapsed_ns;
+  }
+}
+
 TensorShape GetTensorShapeFromConstant(const NodeDef* node_def) {
   return TensorShape(node_def->attr().at("value").tensor().tensor_shape());
 }
@@ -6857,6 +6900,196 @@ Status AddDilatedContractionNode(RemapperContext* ctx,
   return Status::OK();
 }
 
+// Fusions implemented by a Find*/Add* function pair in `RunRemapper`, in the
+// order they are tried.
+enum class LegacyFusion : int {
+  kAddV2,
+  kDropout,
+  kGelu,
+  kMulWithMaximum,
+  kMatmulReshapeBiasadd,
+  kDilatedContraction,
+  kSum,
+  kContractionWithReshapeAndBiasAddGrad,
+  kKerasDenseLayerFwd,
+  kContractionWithBiasAndActivationAdd,
+  kResNeXtGroupConv2DBlock,
+  kContractionWithBiasAndAddActivation,
+  kContractionWithBiasAddAndAdd,
+  kContractionWithBias,
+  kContractionWithBiasAddGrad,
+  kConvContractionWithBiasAddGrad,
+  kContractionWithBiasAndActivation,
+  kConv2DWithBatchNormAndAddV2AndActivation,
+  kConv2DWithBatchNormAndActivation,
+  kConv2DWithBatchNorm,
+  kFusedBatchNormEx,
+  kFusedBatchNormGradEx,
+  kPadWithTransposeConv,
+  kPadWithContractionFwdBwd,
+  kPadWithContraction,
+  kConvBackpropInputWithSlice,
+  kFusedTrainingOp,
+  kContractionWithMul,
+  kDequantizeWithShape,
+  kDequantizeWithReshape,
+  kQuantizeV2WithQuantizedConv2D,
+  kQuantizedConv2DWithDequantize,
+  kQuantizedConv2DWithCast,
+  kFusedAddN,
+  kAddV2WithSoftmax,
+  kBf16ContractionWithCastFp32,
+  kRandomWithComparisonAndCast,
+  kBf16ContractionGradWithCastFp32,
+  kComparisonWithCast,
+  kConstWithCast,
+  kFusedBinary,
+  kStridedSliceGrad,
+  kConv2DBackpropInputWithSliceLLGA,
+  kPadConvFwdBwd,
+  kNumFusions
+};
+
+constexpr int kNumLegacyFusions = static_cast<int>(LegacyFusion::kNumFusions);
+
+struct LegacyFusionInfo {
+  const char* name;
+  // Returns true if a node of this op can be the root of the pattern. It's
+  // called with a node which only has op set, so it must not check any attr.
+  bool (*is_root)(const NodeDef& node);
+};
+
+// `IsAdd()` reads attr `T` of Add, so use the superset of it as root check.
+bool IsAddOrAddV2(const NodeDef& node) {
+  return node.op() == "Add" || IsAddV2(node);
+}
+
+const LegacyFusionInfo kLegacyFusionInfos[kNumLegacyFusions] = {
+    {"AddV2", IsAddN},
+    {"Dropout", IsSelect},
+    {"Gelu", IsMul},
+    {"MulWithMaximum", IsMaximum},
+    {"MatmulReshapeBiasadd", IsReshape},
+    {"DilatedContraction", IsBatchToSpaceND},
+    {"Sum", IsSum},
+    {"ContractionWithReshapeAndBiasAddGrad", IsBiasAddGrad},
+    {"KerasDenseLayerFwd", IsReshape},
+    {"ContractionWithBiasAndActivationAdd", IsAddOrAddV2},
+    {"ResNeXtGroupConv2DBlock", IsConcatV2},
+    {"ContractionWithBiasAndAddActivation", IsSupportedActivation},
+    {"ContractionWithBiasAddAndAdd",
+     [](const NodeDef& node) { return IsAddN(node) || IsAddOrAddV2(node); }},
+    {"ContractionWithBias",
+     [](const NodeDef& node) { return IsBiasAdd(node) || IsAddOrAddV2(node); }},
+    {"ContractionWithBiasAddGrad", IsBiasAddGrad},
+    {"ConvContractionWithBiasAddGrad", IsBiasAddGrad},
+    {"ContractionWithBiasAndActivation", IsSupportedActivation},
+    {"Conv2DWithBatchNormAndAddV2AndActivation", IsSupportedActivation},
+    {"Conv2DWithBatchNormAndActivation", IsSupportedActivation},
+    {"Conv2DWithBatchNorm",
+     [](const NodeDef& node) {
+       return IsFusedBatchNorm(node) || IsITEXFusedBatchNorm(node);
+     }},
+    {"FusedBatchNormEx", IsRelu},
+    {"FusedBatchNormGradEx", IsFusedBatchNormGrad},
+    {"PadWithTransposeConv", IsTranspose},
+    {"PadWithContractionFwdBwd",
+     [](const NodeDef& node) {
+       return IsConv2D(node) || IsConv3D(node) || node.op() == kFusedConv2D ||
+              node.op() == kFusedConv3D;
+     }},
+    {"PadWithContraction",
+     [](const NodeDef& node) {
+       return IsConv2D(node) || IsConv3D(node) || node.op() == kFusedConv2D ||
+              node.op() == kFusedConv3D || IsDepthwiseConv2dNative(node);
+     }},
+    {"ConvBackpropInputWithSlice", IsSlice},
+    {"FusedTrainingOp",
+     [](const NodeDef& node) {
+       return IsApplyMomentum(node) || IsResourceApplyMomentum(node) ||
+              IsApplyAdam(node) || IsResourceApplyAdam(node) ||
+              IsApplyAdamWithWeightDecay(node) ||
+              IsResourceApplyAdamWithWeightDecay(node);
+     }},
+    {"ContractionWithMul", IsAnyMul},
+    {"DequantizeWithShape", IsShape},
+    {"DequantizeWithReshape", IsReshape},
+    {"QuantizeV2WithQuantizedConv2D",
+     IsQuantizedConv2DWithBiasAndReluAndRequantize},
+    {"QuantizedConv2DWithDequantize", IsDequantize},
+    {"QuantizedConv2DWithCast", IsCast},
+    {"FusedAddN",
+     [](const NodeDef& node) { return IsAddN(node) || IsAddV2(node); }},
+    {"AddV2WithSoftmax", IsSoftmax},
+    {"Bf16ContractionWithCastFp32", IsCast},
+    {"RandomWithComparisonAndCast", IsCast},
+    {"Bf16ContractionGradWithCastFp32", IsCast},
+    {"ComparisonWithCast", IsCast},
+    {"ConstWithCast", IsCast},
+    {"FusedBinary",
+     [](const NodeDef& node) {
+       return IsAddOrAddV2(node) || IsMul(node) || IsSub(node);
+     }},
+    {"StridedSliceGrad", IsStridedSliceGrad},
+    {"Conv2DBackpropInputWithSliceLLGA", IsSlice},
+    {"PadConvFwdBwd", IsConv2DBackpropFilter},
+};
+
+// Indexes the legacy fusions by the op of root node, so that each node only
+// runs the Find* functions which can possibly match it. The index of an op is
+// built when the op is first seen.
+class LegacyFusionDispatcher {
+ public:
+  explicit LegacyFusionDispatcher(RemapperContext* ctx) : ctx_(ctx) {}
+
+  // Runs `find` only if `fusion` may match the node at `node_index`, and
+  // returns whether the pattern is found.
+  template <typename FindFunc>
+  bool Find(LegacyFusion fusion, int node_index, FindFunc&& find) {
+    const int id = static_cast<int>(fusion);
+    const NodeDef* node_def = ctx_->graph_view.GetNode(node_index)->node();
+    if (!GetCandidates(node_def->op()).test(id)) return false;
+
+    if (!ctx_->stats.IsEnabled()) return find();
+
+    uint64 start_ns = EnvTime::NowNanos();
+    bool found = find();
+    ctx_->stats.Record(kLegacyFusionInfos[id].name, found,
+                       EnvTime::NowNanos() - start_ns);
+    return found;
+  }
+
+ private:
+  typedef std::bitset<kNumLegacyFusions> Candidates;
+
+  const Candidates& GetCandidates(const string& op) {
+    // Consecutive lookups almost always come from the same node.
+    if (last_candidates_ != nullptr && op == last_op_) return *last_candidates_;
+
+    auto it = candidates_.find(op);
+    if (it == candidates_.end()) {
+      NodeDef probe;
+      probe.set_op(op);
+      Candidates candidates;
+      for (int i = 0; i < kNumLegacyFusions; ++i) {
+        candidates.set(i, kLegacyFusionInfos[i].is_root(probe));
+      }
+      it = candidates_.emplace(op, candidates).first;
+      ITEX_VLOG(3) << "Remapper: " << candidates.count()
+                   << " legacy fusion(s) may match root op " << op;
+    }
+
+    last_op_ = op;
+    last_candidates_ = &it->second;
+    return *last_candidates_;
+  }
+
+  RemapperContext* ctx_;
+  std::unordered_map<string, Candidates> candidates_;
+  string last_op_;
+  const Candidates* last_candidates_ = nullptr;
+};
+
 }  // namespace
 
 // `is_full` is true by default. It will be set as false if this pass runs
@@ -6874,6 +7107,8 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
   Status status;
   GraphDef multable_graph_def = graph_def;
   RemapperContext ctx(item, &multable_graph_def, &status, level);
+  if (opt_ctx->fusion_stats != nullptr) ctx.stats.Enable();
+  if (is_full) ctx.user_fusions = GetUserDefinedFusions();
   // TODO(itex): Currently some fusions will be disabled when LayoutOPT is off,
   //       remove this dependency once all plain fusions are supported.
   bool is_layout_opt = GetOptimizerConfigFlags().enable_layout_opt;
@@ -6905,6 +7140,8 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
   // Infer statically first and only once.
   ctx.GetGraphProperties();
 
+  LegacyFusionDispatcher dispatcher(&ctx);
+
   bool is_visited = false;
   string last_op;
   for (int i = num_nodes - 1; i >= 0;) {
@@ -6966,7 +7203,8 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
     {
       // Use AddV2 for AddN when N=2
       int AddN_index;
-      if (FindAddV2(ctx, i, &AddN_index)) {
+      if (dispatcher.Find(LegacyFusion::kAddV2, i,
+                          [&] { return FindAddV2(ctx, i, &AddN_index); })) {
         TF_ABORT_IF_ERROR(ReplaceAddN(&ctx, AddN_index, &invalidated_nodes,
                                       &nodes_to_delete));
         continue;
@@ -6974,7 +7212,8 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
 
       // Remap TF2.11 dropout select to TF2.10 cast+mul.
       Dropout dropout;
-      if (FindDropout(ctx, i, &dropout)) {
+      if (dispatcher.Find(LegacyFusion::kDropout, i,
+                          [&] { return FindDropout(ctx, i, &dropout); })) {
         TF_ABORT_IF_ERROR(
             AddDropout(&ctx, dropout, &invalidated_nodes, &nodes_to_delete));
         continue;
@@ -6985,8 +7224,10 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
       std::set<int> remove_node_indices;
       bool is_gelu_approximate = false;
       if (level == RemapperLevel::BASIC &&
-          FindGelu(&ctx, i, &matched_nodes_map, &remove_node_indices,
-                   &is_gelu_approximate)) {
+          dispatcher.Find(LegacyFusion::kGelu, i, [&] {
+            return FindGelu(&ctx, i, &matched_nodes_map, &remove_node_indices,
+                            &is_gelu_approximate);
+          })) {
         TF_ABORT_IF_ERROR(AddGelu(&ctx, &matched_nodes_map,
                                   &remove_node_indices, &invalidated_nodes,
                                   &nodes_to_delete, is_gelu_approximate));
@@ -6996,14 +7237,18 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
       // Remap Mul+Max into the LeakyRelu.
       MulWithMaximum mul_with_maximum;
       if (level == RemapperLevel::BASIC &&
-          FindMulWithMaximum(ctx, i, &mul_with_maximum)) {
+          dispatcher.Find(LegacyFusion::kMulWithMaximum, i, [&] {
+            return FindMulWithMaximum(ctx, i, &mul_with_maximum);
+          })) {
         TF_ABORT_IF_ERROR(AddMulWithMaximumNode(
             &ctx, mul_with_maximum, &invalidated_nodes, &nodes_to_delete));
         continue;
       }
 
       MatmulReshapeBiasadd matmul_reshape_biasadd;
-      if (FindMatmulReshapeBiasadd(ctx, i, &matmul_reshape_biasadd)) {
+      if (dispatcher.Find(LegacyFusion::kMatmulReshapeBiasadd, i, [&] {
+            return FindMatmulReshapeBiasadd(ctx, i, &matmul_reshape_biasadd);
+          })) {
         TF_ABORT_IF_ERROR(AddMatmulReshapeBiasadd(&ctx, matmul_reshape_biasadd,
                                                   &invalidated_nodes,
                                                   &nodes_to_delete));
@@ -7011,7 +7256,9 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
       }
 
       DilatedContraction dilated_contraction;
-      if (FindDilatedContraction(ctx, i, &dilated_contraction)) {
+      if (dispatcher.Find(LegacyFusion::kDilatedContraction, i, [&] {
+            return FindDilatedContraction(ctx, i, &dilated_contraction);
+          })) {
         TF_ABORT_IF_ERROR(AddDilatedContractionNode(
             &ctx, dilated_contraction, &invalidated_nodes, &nodes_to_delete));
         continue;
@@ -7019,7 +7266,8 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
 
       // Optimize the Sum if it can be replaced to BiasAddGrad or removed.
       ReplaceableSum sum;
-      if (FindSum(ctx, i, &sum)) {
+      if (dispatcher.Find(LegacyFusion::kSum, i,
+                          [&] { return FindSum(ctx, i, &sum); })) {
         TF_ABORT_IF_ERROR(
             AddSum(&ctx, sum, &invalidated_nodes, &nodes_to_delete));
         continue;
@@ -7029,8 +7277,11 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
       // Conv2DBackpropFilter) can be fused with BiasAddGrad in the later remap
       // stage.
       ContractionWithReshapeAndBiasAddGrad contraction_reshape_bias_grad;
-      if (FindContractionWithReshapeAndBiasAddGrad(
-              ctx, i, &contraction_reshape_bias_grad)) {
+      if (dispatcher.Find(LegacyFusion::kContractionWithReshapeAndBiasAddGrad,
+                          i, [&] {
+                            return FindContractionWithReshapeAndBiasAddGrad(
+                                ctx, i, &contraction_reshape_bias_grad);
+                          })) {
         TF_ABORT_IF_ERROR(AddContractionWithReshapeAndBiasAddGrad(
             &ctx, contraction_reshape_bias_grad, &invalidated_nodes,
             &nodes_to_delete));
@@ -7039,7 +7290,9 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
 
       // keras Dense layer fwd
       KerasDenseLayerFwd keras_dense_layer_fwd;
-      if (FindKerasDenseLayerFwd(ctx, i, &keras_dense_layer_fwd)) {
+      if (dispatcher.Find(LegacyFusion::kKerasDenseLayerFwd, i, [&] {
+            return FindKerasDenseLayerFwd(ctx, i, &keras_dense_layer_fwd);
+          })) {
         if (keras_dense_layer_fwd.reshape_0_ == kMissingIndex) {
           TF_ABORT_IF_ERROR(AddKerasDenseLayerFwd(&ctx, keras_dense_layer_fwd,
                                                   &invalidated_nodes,
@@ -7065,8 +7318,11 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
     if (is_full) {
       // Remap Conv2D+BiasAdd+Activation+Add into the _ITEXFusedConv2D.
       ContractionWithBiasAndActivationAdd contract_with_bias_and_activation_add;
-      if (FindContractionWithBiasAndActivationAdd(
-              ctx, i, &contract_with_bias_and_activation_add)) {
+      if (dispatcher.Find(LegacyFusion::kContractionWithBiasAndActivationAdd, i,
+                          [&] {
+                            return FindContractionWithBiasAndActivationAdd(
+                                ctx, i, &contract_with_bias_and_activation_add);
+                          })) {
         TF_ABORT_IF_ERROR(
             AddFusedContractionNode(&ctx, contract_with_bias_and_activation_add,
                                     &invalidated_nodes, &nodes_to_delete));
@@ -7074,7 +7330,9 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
       }
 
       GroupConv2DBlock group_conv;
-      if (FindResNeXtGroupConv2DBlock(ctx, i, &group_conv)) {
+      if (dispatcher.Find(LegacyFusion::kResNeXtGroupConv2DBlock, i, [&] {
+            return FindResNeXtGroupConv2DBlock(ctx, i, &group_conv);
+          })) {
         TF_ABORT_IF_ERROR(AddGroupConv2DNode(
             &ctx, group_conv, &invalidated_nodes, &nodes_to_delete));
         continue;
@@ -7082,8 +7340,11 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
 
       // Remap Conv2D+BiasAdd+Add+Activation into the _ITEXFusedConv2D.
       ContractionWithBiasAndAddActivation contract_with_bias_and_add_activation;
-      if (FindContractionWithBiasAndAddActivation(
-              ctx, i, &contract_with_bias_and_add_activation)) {
+      if (dispatcher.Find(LegacyFusion::kContractionWithBiasAndAddActivation, i,
+                          [&] {
+                            return FindContractionWithBiasAndAddActivation(
+                                ctx, i, &contract_with_bias_and_add_activation);
+                          })) {
         TF_ABORT_IF_ERROR(
             AddFusedContractionNode(&ctx, contract_with_bias_and_add_activation,
                                     &invalidated_nodes, &nodes_to_delete));
@@ -7092,8 +7353,10 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
 
       // Remap Conv2D+BiasAdd+Add into the _ITEXFusedConv2D.
       ContractionWithBiasAddAndAdd contract_with_bias_and_add;
-      if (FindContractionWithBiasAddAndAdd(ctx, i,
-                                           &contract_with_bias_and_add)) {
+      if (dispatcher.Find(LegacyFusion::kContractionWithBiasAddAndAdd, i, [&] {
+            return FindContractionWithBiasAddAndAdd(
+                ctx, i, &contract_with_bias_and_add);
+          })) {
         TF_ABORT_IF_ERROR(
             AddFusedContractionNode(&ctx, contract_with_bias_and_add,
                                     &invalidated_nodes, &nodes_to_delete));
@@ -7103,7 +7366,9 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
       // Remap {Conv2D,DepthwiseConv2D,Conv3D,MatMul}+BiasAdd into the
       // _ITEXFused{Conv2D,DepthwiseConv2dNative,Conv3D,MatMul}
       ContractionWithBiasAdd contract_with_bias;
-      if (FindContractionWithBias(ctx, i, &contract_with_bias)) {
+      if (dispatcher.Find(LegacyFusion::kContractionWithBias, i, [&] {
+            return FindContractionWithBias(ctx, i, &contract_with_bias);
+          })) {
         TF_ABORT_IF_ERROR(AddFusedContractionNode(
             &ctx, contract_with_bias, &invalidated_nodes, &nodes_to_delete));
         continue;
@@ -7111,7 +7376,10 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
 
       // Remap MatMul+BiasAddGrad into the _fusedMatMulGrad
       ContractionWithBiasAddGrad contract_with_bias_grad;
-      if (FindContractionWithBiasAddGrad(ctx, i, &contract_with_bias_grad)) {
+      if (dispatcher.Find(LegacyFusion::kContractionWithBiasAddGrad, i, [&] {
+            return FindContractionWithBiasAddGrad(ctx, i,
+                                                  &contract_with_bias_grad);
+          })) {
         TF_ABORT_IF_ERROR(
             AddFusedContractionGradNode(&ctx, contract_with_bias_grad,
                                         &invalidated_nodes, &nodes_to_delete));
@@ -7121,8 +7389,11 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
       // Remap {Conv2DBackpropFilter,Conv3DBackpropFilter}+BiasAddGrad into
       // FusedContractionBackpropFiler.
       ContractionWithBiasAddGrad conv_contract_with_bias_grad;
-      if (FindConvContractionWithBiasAddGrad(ctx, i,
-                                             &conv_contract_with_bias_grad)) {
+      if (dispatcher.Find(LegacyFusion::kConvContractionWithBiasAddGrad, i,
+                          [&] {
+                            return FindConvContractionWithBiasAddGrad(
+                                ctx, i, &conv_contract_with_bias_grad);
+                          })) {
         TF_ABORT_IF_ERROR(
             AddFusedContractionGradNode(&ctx, conv_contract_with_bias_grad,
                                         &invalidated_nodes, &nodes_to_delete));
@@ -7131,8 +7402,11 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
       // Remap {Conv2D,Conv3D,MatMul}+BiasAdd+Activation into
       // _ITEXFused{Conv2D,Conv3D,MatMul}.
       ContractionWithBiasAddAndActivation contract_with_bias_and_activation;
-      if (FindContractionWithBiasAndActivation(
-              ctx, i, &contract_with_bias_and_activation)) {
+      if (dispatcher.Find(LegacyFusion::kContractionWithBiasAndActivation, i,
+                          [&] {
+                            return FindContractionWithBiasAndActivation(
+                                ctx, i, &contract_with_bias_and_activation);
+                          })) {
         TF_ABORT_IF_ERROR(
             AddFusedContractionNode(&ctx, contract_with_bias_and_activation,
                                     &invalidated_nodes, &nodes_to_delete));
@@ -7145,8 +7419,11 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
       // Remap Conv2D+FusedBatchNorm+AddV2+Activation into the _FusedConv2D;
       ContractionWithBatchNormAndAddV2AndActivation
           contract_with_batch_norm_and_addv2_and_activation;
-      if (FindConv2DWithBatchNormAndAddV2AndActivation(
-              ctx, i, &contract_with_batch_norm_and_addv2_and_activation)) {
+      if (dispatcher.Find(
+              LegacyFusion::kConv2DWithBatchNormAndAddV2AndActivation, i, [&] {
+                return FindConv2DWithBatchNormAndAddV2AndActivation(
+                    ctx, i, &contract_with_batch_norm_and_addv2_and_activation);
+              })) {
         TF_RETURN_IF_ERROR(AddFusedConv2DNode(
             &ctx, contract_with_batch_norm_and_addv2_and_activation,
             &invalidated_nodes, &nodes_to_delete));
@@ -7156,8 +7433,11 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
       // Remap Conv2D+FusedBatchNorm+Activation into the _FusedConv2D;
       ContractionWithBatchNormAndActivation
           contract_with_batch_norm_and_activation;
-      if (FindConv2DWithBatchNormAndActivation(
-              ctx, i, &contract_with_batch_norm_and_activation)) {
+      if (dispatcher.Find(
+              LegacyFusion::kConv2DWithBatchNormAndActivation, i, [&] {
+                return FindConv2DWithBatchNormAndActivation(
+                    ctx, i, &contract_with_batch_norm_and_activation);
+              })) {
         TF_RETURN_IF_ERROR(
             AddFusedConv2DNode(&ctx, contract_with_batch_norm_and_activation,
                                &invalidated_nodes, &nodes_to_delete));
@@ -7166,7 +7446,9 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
 
       // Remap Conv2D+FusedBatchNorm into the _FusedConv2D;
       ContractionWithBatchNorm contract_with_batch_norm;
-      if (FindConv2DWithBatchNorm(ctx, i, &contract_with_batch_norm)) {
+      if (dispatcher.Find(LegacyFusion::kConv2DWithBatchNorm, i, [&] {
+            return FindConv2DWithBatchNorm(ctx, i, &contract_with_batch_norm);
+          })) {
         TF_RETURN_IF_ERROR(AddFusedConv2DNode(&ctx, contract_with_batch_norm,
                                               &invalidated_nodes,
                                               &nodes_to_delete));
@@ -7175,14 +7457,18 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
       // Remap FusedBatchNorm+<SideInput>+<Activation> into the
       // _FusedBatchNormEx.
       FusedBatchNormEx fused_batch_norm_ex;
-      if (FindFusedBatchNormEx(ctx, i, &fused_batch_norm_ex)) {
+      if (dispatcher.Find(LegacyFusion::kFusedBatchNormEx, i, [&] {
+            return FindFusedBatchNormEx(ctx, i, &fused_batch_norm_ex);
+          })) {
         TF_ABORT_IF_ERROR(AddFusedBatchNormExNode(
             &ctx, fused_batch_norm_ex, &invalidated_nodes, &nodes_to_delete));
         continue;
       }
 
       FusedBatchNormGradEx fused_batch_norm_grad_ex;
-      if (FindFusedBatchNormGradEx(ctx, i, &fused_batch_norm_grad_ex)) {
+      if (dispatcher.Find(LegacyFusion::kFusedBatchNormGradEx, i, [&] {
+            return FindFusedBatchNormGradEx(ctx, i, &fused_batch_norm_grad_ex);
+          })) {
         TF_ABORT_IF_ERROR(
             AddFusedBatchNormGradExNode(&ctx, fused_batch_norm_grad_ex,
                                         &invalidated_nodes, &nodes_to_delete));
@@ -7190,7 +7476,9 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
       }
 
       PadWithTransposeConv pad_with_transpose_conv;
-      if (FindPadWithTransposeConv(ctx, i, &pad_with_transpose_conv)) {
+      if (dispatcher.Find(LegacyFusion::kPadWithTransposeConv, i, [&] {
+            return FindPadWithTransposeConv(ctx, i, &pad_with_transpose_conv);
+          })) {
         TF_ABORT_IF_ERROR(AddPadWithTransposeConv(&ctx, pad_with_transpose_conv,
                                                   &invalidated_nodes,
                                                   &nodes_to_delete));
@@ -7198,7 +7486,10 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
       }
 
       PadWithContractionFwdBwd pad_with_contract_fwd_bwd;
-      if (FindPadWithContractionFwdBwd(ctx, i, &pad_with_contract_fwd_bwd)) {
+      if (dispatcher.Find(LegacyFusion::kPadWithContractionFwdBwd, i, [&] {
+            return FindPadWithContractionFwdBwd(ctx, i,
+                                                &pad_with_contract_fwd_bwd);
+          })) {
         TF_ABORT_IF_ERROR(
             AddPadWithContractionFwdBwd(&ctx, pad_with_contract_fwd_bwd,
                                         &invalidated_nodes, &nodes_to_delete));
@@ -7207,14 +7498,18 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
 
       // Remap Pad+{Conv2D, _ITEXFusedConv2D} into the _FusedPadConv2D.
       PadWithContraction pad_with_contract;
-      if (FindPadWithContraction(ctx, i, &pad_with_contract)) {
+      if (dispatcher.Find(LegacyFusion::kPadWithContraction, i, [&] {
+            return FindPadWithContraction(ctx, i, &pad_with_contract);
+          })) {
         TF_ABORT_IF_ERROR(AddPadWithContraction(
             &ctx, pad_with_contract, &invalidated_nodes, &nodes_to_delete));
         continue;
       }
 
       ConvBackpropInputWithSlice conv_with_slice;
-      if (FindConvBackpropInputWithSlice(ctx, i, &conv_with_slice)) {
+      if (dispatcher.Find(LegacyFusion::kConvBackpropInputWithSlice, i, [&] {
+            return FindConvBackpropInputWithSlice(ctx, i, &conv_with_slice);
+          })) {
         TF_ABORT_IF_ERROR(AddConvBackpropInputWithSliceNode(
             &ctx, conv_with_slice, &invalidated_nodes, &nodes_to_delete));
         continue;
@@ -7223,7 +7518,9 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
       // Remap Mul + AddN + TrainingOp into the _FusedTrainingOp.
       FusedTrainingOp fused_training_op;
       if (level == RemapperLevel::BASIC &&
-          FindFusedTrainingOp(ctx, i, &fused_training_op)) {
+          dispatcher.Find(LegacyFusion::kFusedTrainingOp, i, [&] {
+            return FindFusedTrainingOp(ctx, i, &fused_training_op);
+          })) {
         TF_ABORT_IF_ERROR(AddFusedTrainingNode(
             &ctx, fused_training_op, &invalidated_nodes, &nodes_to_delete));
         continue;
@@ -7231,7 +7528,9 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
 
       // Remap BatchMatMul+Mul into the _FusedBatchMatMul.
       ContractionWithMul contract_with_mul;
-      if (FindContractionWithMul(ctx, i, &contract_with_mul)) {
+      if (dispatcher.Find(LegacyFusion::kContractionWithMul, i, [&] {
+            return FindContractionWithMul(ctx, i, &contract_with_mul);
+          })) {
         TF_ABORT_IF_ERROR(AddFusedContractionNode(
             &ctx, contract_with_mul, &invalidated_nodes, &nodes_to_delete));
         continue;
@@ -7240,7 +7539,9 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
       // delete dequantize node if it finds dequantize_with_shape pattern
       DequantizeWithShape dequantize_with_shape;
       if (level == RemapperLevel::BASIC &&
-          FindDequantizeWithShape(ctx, i, &dequantize_with_shape)) {
+          dispatcher.Find(LegacyFusion::kDequantizeWithShape, i, [&] {
+            return FindDequantizeWithShape(ctx, i, &dequantize_with_shape);
+          })) {
         TF_ABORT_IF_ERROR(AddFusedDequantizeWithShape(
             &ctx, dequantize_with_shape, &invalidated_nodes, &nodes_to_delete));
         continue;
@@ -7249,7 +7550,9 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
       // delete dequantize node if it finds dequantize_with_reshape pattern
       DequantizeWithReshape dequantize_with_reshape;
       if (is_layout_opt && level == RemapperLevel::BASIC &&
-          FindDequantizeWithReshape(ctx, i, &dequantize_with_reshape)) {
+          dispatcher.Find(LegacyFusion::kDequantizeWithReshape, i, [&] {
+            return FindDequantizeWithReshape(ctx, i, &dequantize_with_reshape);
+          })) {
         TF_ABORT_IF_ERROR(AddFusedDequantizeWithReshape(
             &ctx, dequantize_with_reshape, &invalidated_nodes,
             &nodes_to_delete));
@@ -7259,8 +7562,11 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
       // Remap QuantizeV2+QuantizedConv2D into the
       // _ITEXQuantizeV2WithQuantizedConv2D
       QuantizeV2WithQuantizedConv2D quantizev2_with_quantizedconv;
-      if (is_layout_opt && FindQuantizeV2WithQuantizedConv2D(
-                               ctx, i, &quantizev2_with_quantizedconv)) {
+      if (is_layout_opt &&
+          dispatcher.Find(LegacyFusion::kQuantizeV2WithQuantizedConv2D, i, [&] {
+            return FindQuantizeV2WithQuantizedConv2D(
+                ctx, i, &quantizev2_with_quantizedconv);
+          })) {
         TF_ABORT_IF_ERROR(AddQuantizeV2WithQuantizedConv2DNode(
             &ctx, quantizev2_with_quantizedconv, &invalidated_nodes,
             &nodes_to_delete));
@@ -7268,8 +7574,12 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
       }
 
       QuantizedConv2DWithDequantize conv2d_with_dequantize;
-      if (is_layout_opt && (FindQuantizedConv2DWithDequantize(
-                               ctx, i, &conv2d_with_dequantize))) {
+      if (is_layout_opt &&
+          (dispatcher.Find(LegacyFusion::kQuantizedConv2DWithDequantize, i,
+                           [&] {
+                             return FindQuantizedConv2DWithDequantize(
+                                 ctx, i, &conv2d_with_dequantize);
+                           }))) {
         TF_ABORT_IF_ERROR(AddQuantizedConv2DWithDequantizeNode(
             &ctx, conv2d_with_dequantize, &invalidated_nodes,
             &nodes_to_delete));
@@ -7278,7 +7588,9 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
 
       QuantizedConv2DWithCast conv2d_with_cast;
       if (is_layout_opt &&
-          (FindQuantizedConv2DWithCast(ctx, i, &conv2d_with_cast))) {
+          (dispatcher.Find(LegacyFusion::kQuantizedConv2DWithCast, i, [&] {
+            return FindQuantizedConv2DWithCast(ctx, i, &conv2d_with_cast);
+          }))) {
         TF_ABORT_IF_ERROR(AddQuantizedConv2DWithCastNode(
             &ctx, conv2d_with_cast, &invalidated_nodes, &nodes_to_delete));
         continue;
@@ -7286,7 +7598,9 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
 
       // Remap L2loss+AddN into the _FusedAddN
       FusedAddN fused_addn;
-      if (level == RemapperLevel::BASIC && FindFusedAddN(ctx, i, &fused_addn)) {
+      if (level == RemapperLevel::BASIC &&
+          dispatcher.Find(LegacyFusion::kFusedAddN, i,
+                          [&] { return FindFusedAddN(ctx, i, &fused_addn); })) {
         TF_ABORT_IF_ERROR(AddFusedAddN(&ctx, fused_addn, &invalidated_nodes,
                                        &nodes_to_delete));
         continue;
@@ -7294,7 +7608,9 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
 
       AddV2WithSoftmax fused_addv2_with_softmax;
       if (level == RemapperLevel::BASIC &&
-          FindAddV2WithSoftmax(ctx, i, &fused_addv2_with_softmax)) {
+          dispatcher.Find(LegacyFusion::kAddV2WithSoftmax, i, [&] {
+            return FindAddV2WithSoftmax(ctx, i, &fused_addv2_with_softmax);
+          })) {
         TF_ABORT_IF_ERROR(
             AddFusedAddV2WithSoftmaxNode(&ctx, fused_addv2_with_softmax,
                                          &invalidated_nodes, &nodes_to_delete));
@@ -7303,7 +7619,10 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
 
       // Remap Bf16(Fused)Matmul+CastFp32 into the _ITEX(Fused)AccMatMul.
       Bf16ContractionWithCastFp32 contraction_with_cast;
-      if (FindBf16ContractionWithCastFp32(ctx, i, &contraction_with_cast)) {
+      if (dispatcher.Find(LegacyFusion::kBf16ContractionWithCastFp32, i, [&] {
+            return FindBf16ContractionWithCastFp32(ctx, i,
+                                                   &contraction_with_cast);
+          })) {
         TF_ABORT_IF_ERROR(AddBf16ContractionWithCastFp32Node(
             &ctx, contraction_with_cast, &invalidated_nodes, &nodes_to_delete));
         continue;
@@ -7312,8 +7631,10 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
       // Remap Random Comparison+Cast into the RandomWithComparisonAndCast.
       RandomWithComparisonAndCast random_with_compare_and_cast;
       if (level == RemapperLevel::BASIC &&
-          FindRandomWithComparisonAndCast(ctx, i,
-                                          &random_with_compare_and_cast)) {
+          dispatcher.Find(LegacyFusion::kRandomWithComparisonAndCast, i, [&] {
+            return FindRandomWithComparisonAndCast(
+                ctx, i, &random_with_compare_and_cast);
+          })) {
         TF_ABORT_IF_ERROR(AddRandomWithComparisonAndCastNode(
             &ctx, random_with_compare_and_cast, &invalidated_nodes,
             &nodes_to_delete));
@@ -7322,8 +7643,11 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
 
       // Remap Bf16FusedMatmulGrad+CastFp32 into the _ITEXFusedAccMatMulGrad.
       Bf16ContractionGradWithCastFp32 contraction_grad_with_cast;
-      if (FindBf16ContractionGradWithCastFp32(ctx, i,
-                                              &contraction_grad_with_cast)) {
+      if (dispatcher.Find(LegacyFusion::kBf16ContractionGradWithCastFp32, i,
+                          [&] {
+                            return FindBf16ContractionGradWithCastFp32(
+                                ctx, i, &contraction_grad_with_cast);
+                          })) {
         TF_ABORT_IF_ERROR(AddFusedContractionGradWithCastNode(
             &ctx, contraction_grad_with_cast, &invalidated_nodes,
             &nodes_to_delete));
@@ -7333,7 +7657,9 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
       // Remap Comparison+Cast into the ComparisonWithCast.
       ComparisonWithCast comparison_with_cast;
       if (level == RemapperLevel::BASIC &&
-          FindComparisonWithCast(ctx, i, &comparison_with_cast)) {
+          dispatcher.Find(LegacyFusion::kComparisonWithCast, i, [&] {
+            return FindComparisonWithCast(ctx, i, &comparison_with_cast);
+          })) {
         TF_ABORT_IF_ERROR(AddComparisonWithCastNode(
             &ctx, comparison_with_cast, &invalidated_nodes, &nodes_to_delete));
         continue;
@@ -7343,7 +7669,9 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
       // of Cast which were produced by auto mixed precision.
       ConstWithCast const_with_cast;
       if (level == RemapperLevel::BASIC &&
-          FindConstWithCast(ctx, i, &const_with_cast)) {
+          dispatcher.Find(LegacyFusion::kConstWithCast, i, [&] {
+            return FindConstWithCast(ctx, i, &const_with_cast);
+          })) {
         TF_ABORT_IF_ERROR(AddConstWithCastNode(
             &ctx, const_with_cast, &invalidated_nodes, &nodes_to_delete));
         continue;
@@ -7354,14 +7682,18 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
       // fusions.
       FusedBinary seq_binary;
       if (level != RemapperLevel::BASIC &&
-          FindFusedBinary(ctx, i, &seq_binary)) {
+          dispatcher.Find(LegacyFusion::kFusedBinary, i, [&] {
+            return FindFusedBinary(ctx, i, &seq_binary);
+          })) {
         TF_ABORT_IF_ERROR(AddFusedBinaryNode(
             &ctx, seq_binary, &invalidated_nodes, &nodes_to_delete));
       }
 
       // Remap StridedSliceGrad to Pad when the stride of it is 1.
       StridedSliceGrad strided_slice_grad;
-      if (FindStridedSliceGrad(ctx, i, &strided_slice_grad)) {
+      if (dispatcher.Find(LegacyFusion::kStridedSliceGrad, i, [&] {
+            return FindStridedSliceGrad(ctx, i, &strided_slice_grad);
+          })) {
         TF_ABORT_IF_ERROR(AddStridedSliceGrad(
             &ctx, strided_slice_grad, &invalidated_nodes, &nodes_to_delete));
         continue;
@@ -7378,14 +7710,20 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
       }
 
       ConvBackpropInputWithSlice conv_with_slice;
-      if (FindConv2DBackpropInputWithSliceLLGA(ctx, i, &conv_with_slice)) {
+      if (dispatcher.Find(LegacyFusion::kConv2DBackpropInputWithSliceLLGA, i,
+                          [&] {
+                            return FindConv2DBackpropInputWithSliceLLGA(
+                                ctx, i, &conv_with_slice);
+                          })) {
         TF_ABORT_IF_ERROR(AddConv2DBackpropInputWithSliceNodeLLGA(
             &ctx, conv_with_slice, &invalidated_nodes, &nodes_to_delete));
         continue;
       }
 
       PadConvFwdBwd pad_conv_fwd_bwd;
-      if (FindPadConvFwdBwd(ctx, i, &pad_conv_fwd_bwd)) {
+      if (dispatcher.Find(LegacyFusion::kPadConvFwdBwd, i, [&] {
+            return FindPadConvFwdBwd(ctx, i, &pad_conv_fwd_bwd);
+          })) {
         TF_ABORT_IF_ERROR(AddPadConvFwdBwd(
             &ctx, pad_conv_fwd_bwd, &invalidated_nodes, &nodes_to_delete));
         continue;
@@ -7402,6 +7740,11 @@ Status RunRemapper(OptimizerContext* opt_ctx, const GrapplerItem& item,
   }
   TF_ABORT_IF_ERROR(mutation->Apply());
 
+  ctx.stats.Log();
+  if (opt_ctx->fusion_stats != nullptr) {
+    ctx.stats.MergeInto(opt_ctx->fusion_stats);
+  }
+
   *optimized_graph = std::move(multable_graph_def);
   return Status::OK();
 }
@@ -19,8 +19,10 @@ limitations under the License.
 #define ITEX_CORE_GRAPH_REMAPPER_REMAPPER_H_
 
 #include <map>
+#include <memory>
 #include <set>
 #include <string>
+#include <unordered_map>
 #include <unordered_set>
 #include <vector>
 
@@ -41,6 +43,31 @@ namespace graph {
  */
 enum RemapperLevel : int { BASIC = 0, ADVANCED };
 
+class UserDefinedFusions;
+
+// Per-fusion profile of one remapper pass. It's only collected when
+// ITEX_VERBOSE >= 2 or a graph optimization report is written, since timing
+// every matcher call is not free.
+class RemapperStats {
+ public:
+  RemapperStats();
+
+  inline bool IsEnabled() const { return enabled_; }
+  inline void Enable() { enabled_ = true; }
+
+  void Record(const string& fusion, bool matched, uint64 elapsed_ns);
+
+  // Log the profile, the most expensive fusion first.
+  void Log() const;
+
+  // Adds the profile to `stats`, which may hold the ones of previous passes.
+  void MergeInto(std::map<string, FusionStats>* stats) const;
+
+ private:
+  bool enabled_;
+  std::unordered_map<string, FusionStats> entries_;
+};
+
 struct RemapperContext {
   explicit RemapperContext(const GrapplerItem& item, GraphDef* g_def,
                            Status* status, RemapperLevel level)
@@ -55,6 +82,10 @@ struct RemapperContext {
   GraphProperties graph_properties;
   bool inferred_graph_properties;
   RemapperLevel remap_level;
+  RemapperStats stats;
+  // Fusions registered from Python, tried before the built-in ones in the
+  // full remapper. Null if there is none.
+  std::shared_ptr<const UserDefinedFusions> user_fusions;
 
   GraphProperties& GetGraphProperties() {
     if (!inferred_graph_properties) {
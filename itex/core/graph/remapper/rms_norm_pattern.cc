@@ -0,0 +1,402 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include "itex/core/graph/remapper/constant_names.h"
+#include "itex/core/graph/remapper/fusion.h"
+#include "itex/core/graph/remapper/remapper.h"
+#include "itex/core/graph/utils/pattern_utils.h"
+#include "itex/core/graph/utils/symbolic_shapes.h"
+#include "itex/core/graph/utils/utils.h"
+#include "itex/core/utils/op_kernel.h"
+
+namespace itex {
+namespace graph {
+
+// The GPU kernel of ItexRmsNorm supports up to 8192 columns.
+constexpr int64 kMaxRmsNormGpuCols = 8192;
+
+// RMSNorm of HF/Keras models, y = x * rsqrt(mean(x^2, -1) + epsilon) * gamma,
+// fused to ItexRmsNorm. The subclasses match the subgraph in the input type
+// and the variants computing it in float with Casts around:
+/*
+        input
+        |    \
+        |   Square
+        |     |
+        |    Mean
+        |     |
+        |   AddV2(epsilon)          input  gamma
+        |     |                       |   /
+        |   Rsqrt          =>     ItexRmsNorm
+         \   /
+          Mul   gamma
+            \   /
+             Mul
+*/
+// Labels shared by the patterns: "input", "square", "axes", "mean",
+// "epsilon", "gamma" and "output", the last node. Each pattern adds aliases
+// of "input_consumer", the node reading "input", and "gamma_mul", the Mul by
+// gamma.
+class RmsNormFusionBase : public Fusion {
+ public:
+  RmsNormFusionBase() : Fusion() { is_partial_ = true; }
+
+  ~RmsNormFusionBase() {}
+
+  MatchedProperties Check(RemapperContext* ctx,
+                          const int node_index) const override {
+    auto& graph_view = ctx->graph_view;
+    MatchedProperties ret =
+        FillProperties(&graph_view, graph_view.GetNode(node_index), pattern_);
+    if (ret.Empty()) return ret;
+    AddAliases(&ret);
+
+    // The tensor normalized, which is the input of Square.
+    const NodeDef* square = ret.GetNode(&graph_view, "square");
+    std::vector<OpInfo_TensorProperties> props;
+    if (!ctx->GetGraphProperties()
+             .GetInputProperties(square->name(), &props)
+             .ok() ||
+        props.empty()) {
+      return ret.ToEmpty();
+    }
+    const TensorShapeProto& shape = props[0].shape();
+    const int rank = Rank(shape);
+    if (rank < 1) return ret.ToEmpty();
+    const int64 cols = shape.dim(rank - 1).size();
+
+    bool is_ok = CheckDataTypes(ctx, ret) && CheckMean(ctx, ret, rank) &&
+                 CheckEpsilon(ctx, ret) && CheckGamma(ctx, ret, cols);
+    if (is_ok && NodeIsOnGpu(ret.GetNode(&graph_view, "output"))) {
+      is_ok = cols > 0 && cols <= kMaxRmsNormGpuCols;
+    }
+
+    if (!is_ok) return ret.ToEmpty();
+    return ret;
+  }
+
+  Status Update(RemapperContext* ctx,
+                const MatchedProperties& properties) const override {
+    auto& graph_view = ctx->graph_view;
+    const NodeDef* output = properties.GetNode(&graph_view, "output");
+    const NodeDef* input = properties.GetNode(&graph_view, "input");
+    const NodeDef* gamma_mul = properties.GetNode(&graph_view, "gamma_mul");
+    const NodeDef* epsilon = properties.GetNode(&graph_view, "epsilon");
+    const DataType dtype = InputDataType(ctx, properties);
+
+    utils::Mutation* mutation = graph_view.GetMutationBuilder();
+    Status status;
+
+    // ItexRmsNorm takes gamma in float.
+    string gamma_tensor =
+        FindInput(*gamma_mul, properties.GetNode(&graph_view, "gamma"));
+    if (GetDataTypeFromAttr(*gamma_mul, "T") != DT_FLOAT) {
+      NodeDef cast;
+      cast.set_name(output->name() + "/gamma_cast");
+      cast.set_op(kCast);
+      cast.set_device(output->device());
+      cast.add_input(gamma_tensor);
+      auto* attr = cast.mutable_attr();
+      SetAttrValue(GetDataTypeFromAttr(*gamma_mul, "T"), &(*attr)["SrcT"]);
+      SetAttrValue(DT_FLOAT, &(*attr)["DstT"]);
+      SetAttrValue(false, &(*attr)["Truncate"]);
+      gamma_tensor = cast.name();
+      mutation->AddNode(std::move(cast), &status);
+      TF_RETURN_IF_ERROR(status);
+    }
+
+    NodeDef fused_node;
+    fused_node.set_name(output->name());
+    fused_node.set_op(kRmsNorm);
+    fused_node.set_device(output->device());
+    fused_node.add_input(FindInput(
+        *properties.GetNode(&graph_view, "input_consumer"), input));
+    fused_node.add_input(gamma_tensor);
+    // The offset is not used without centering, but it must have the shape
+    // of gamma.
+    fused_node.add_input(gamma_tensor);
+
+    auto* attr = fused_node.mutable_attr();
+    SetAttrValue(dtype, &(*attr)["T"]);
+    SetAttrValue(DT_FLOAT, &(*attr)["U"]);
+    SetAttrValue(GetEpsilon(*epsilon), &(*attr)["epsilon"]);
+    SetAttrValue(true, &(*attr)["use_scale"]);
+    SetAttrValue(false, &(*attr)["use_center"]);
+
+    mutation->AddNode(std::move(fused_node), &status);
+    TF_RETURN_IF_ERROR(status);
+    TF_RETURN_IF_ERROR(mutation->Apply());
+    return Status::OK();
+  }
+
+ protected:
+  virtual void AddAliases(MatchedProperties* properties) const = 0;
+
+  // Returns the data type of "input" and "output", checking the ones of the
+  // other nodes in the pattern.
+  virtual DataType InputDataType(RemapperContext* ctx,
+                                 const MatchedProperties& properties) const = 0;
+
+  virtual bool CheckDataTypes(RemapperContext* ctx,
+                              const MatchedProperties& properties) const = 0;
+
+  static bool IsSupportedDataType(DataType dtype) {
+    return dtype == DT_FLOAT || dtype == DT_BFLOAT16 || dtype == DT_HALF;
+  }
+
+  // Returns the input of `node` read from `producer`.
+  static string FindInput(const NodeDef& node, const NodeDef* producer) {
+    for (const string& input : node.input()) {
+      if (NodeName(input) == producer->name()) return input;
+    }
+    return producer->name();
+  }
+
+ private:
+  // Mean over the last dim with keep_dims.
+  bool CheckMean(RemapperContext* ctx, const MatchedProperties& properties,
+                 int rank) const {
+    const NodeDef* mean = properties.GetNode(&ctx->graph_view, "mean");
+    const NodeDef* axes = properties.GetNode(&ctx->graph_view, "axes");
+    bool keep_dims = false;
+    if (!TryGetNodeAttr(*mean, "keep_dims", &keep_dims) || !keep_dims) {
+      return false;
+    }
+
+    Tensor axes_tensor;
+    if (!axes_tensor.FromProto(axes->attr().at("value").tensor()) ||
+        axes_tensor.NumElements() != 1) {
+      return false;
+    }
+    int64 axis;
+    if (axes_tensor.dtype() == DT_INT32) {
+      axis = axes_tensor.flat<int32>()(0);
+    } else if (axes_tensor.dtype() == DT_INT64) {
+      axis = axes_tensor.flat<int64>()(0);
+    } else {
+      return false;
+    }
+    return axis == -1 || axis == rank - 1;
+  }
+
+  bool CheckEpsilon(RemapperContext* ctx,
+                    const MatchedProperties& properties) const {
+    const NodeDef* epsilon = properties.GetNode(&ctx->graph_view, "epsilon");
+    Tensor epsilon_tensor;
+    return epsilon_tensor.FromProto(epsilon->attr().at("value").tensor()) &&
+           epsilon_tensor.NumElements() == 1 &&
+           IsSupportedDataType(epsilon_tensor.dtype());
+  }
+
+  // Gamma is a vector of the last dim, so the Mul doesn't broadcast the
+  // output to another shape.
+  bool CheckGamma(RemapperContext* ctx, const MatchedProperties& properties,
+                  int64 cols) const {
+    const NodeDef* gamma_mul =
+        properties.GetNode(&ctx->graph_view, "gamma_mul");
+    std::vector<OpInfo_TensorProperties> props;
+    if (!ctx->GetGraphProperties()
+             .GetInputProperties(gamma_mul->name(), &props)
+             .ok() ||
+        props.size() != 2) {
+      return false;
+    }
+
+    const NodeDef* gamma = properties.GetNode(&ctx->graph_view, "gamma");
+    const int index =
+        NodeName(gamma_mul->input(0)) == gamma->name() ? 0 : 1;
+    const TensorShapeProto& shape = props[index].shape();
+    return Rank(shape) == 1 && shape.dim(0).size() > 0 &&
+           (cols < 0 || shape.dim(0).size() == cols);
+  }
+
+  static float GetEpsilon(const NodeDef& epsilon) {
+    Tensor epsilon_tensor;
+    epsilon_tensor.FromProto(epsilon.attr().at("value").tensor());
+    if (epsilon_tensor.dtype() == DT_BFLOAT16) {
+      return static_cast<float>(epsilon_tensor.flat<Eigen::bfloat16>()(0));
+    } else if (epsilon_tensor.dtype() == DT_HALF) {
+      return static_cast<float>(epsilon_tensor.flat<Eigen::half>()(0));
+    }
+    return epsilon_tensor.flat<float>()(0);
+  }
+};
+
+// The RMSNorm subgraph in the input type.
+class RmsNormFusion : public RmsNormFusionBase {
+ public:
+  RmsNormFusion() : RmsNormFusionBase() {
+    using utils::NodeStatus;
+    using utils::OpTypePattern;
+    OpTypePattern input = {kAny, "input", NodeStatus::kRemain};
+    OpTypePattern square = {kSquare, "square", NodeStatus::kRemove};
+    OpTypePattern axes = {kConst, "axes", NodeStatus::kRemain};
+    OpTypePattern mean = {kMean, "mean", NodeStatus::kRemove};
+    OpTypePattern epsilon = {kConst, "epsilon", NodeStatus::kRemain};
+    OpTypePattern add_epsilon = {kAddV2, "add_epsilon", NodeStatus::kRemove};
+    OpTypePattern rsqrt = {kRsqrt, "rsqrt", NodeStatus::kRemove};
+    OpTypePattern normalized = {kMul, "normalized", NodeStatus::kRemove};
+    OpTypePattern gamma = {kAny, "gamma", NodeStatus::kRemain};
+    OpTypePattern output = {kMul, "output", NodeStatus::kReplace};
+
+    square.AddInput(input);
+    mean.AddInput(square).AddInput(axes);
+    add_epsilon.AddInput(mean).AddInput(epsilon);
+    rsqrt.AddInput(add_epsilon);
+    normalized.AddInput(input).AddInput(rsqrt);
+    output.AddInput(normalized).AddInput(gamma);
+
+    pattern_ = InternalPattern(std::move(output));
+  }
+
+  ~RmsNormFusion() {}
+
+  std::string Name() override { return "rmsnorm"; }
+
+ protected:
+  void AddAliases(MatchedProperties* properties) const override {
+    properties->map["input_consumer"] = properties->map.at("square");
+    properties->map["gamma_mul"] = properties->map.at("output");
+  }
+
+  DataType InputDataType(RemapperContext* ctx,
+                         const MatchedProperties& properties) const override {
+    return GetDataTypeFromAttr(*properties.GetNode(&ctx->graph_view, "output"),
+                               "T");
+  }
+
+  bool CheckDataTypes(RemapperContext* ctx,
+                      const MatchedProperties& properties) const override {
+    const NodeDef* square = properties.GetNode(&ctx->graph_view, "square");
+    const NodeDef* output = properties.GetNode(&ctx->graph_view, "output");
+    return IsSupportedDataType(GetDataTypeFromAttr(*square, "T")) &&
+           HaveSameDataType(square, output);
+  }
+};
+
+// The bf16/fp16 variants computing in float: the input is cast to float, and
+// the normalized value is cast back before or after the Mul by gamma.
+class RmsNormWithCastFusionBase : public RmsNormFusionBase {
+ public:
+  RmsNormWithCastFusionBase() : RmsNormFusionBase() {}
+
+  ~RmsNormWithCastFusionBase() {}
+
+ protected:
+  void AddAliases(MatchedProperties* properties) const override {
+    properties->map["input_consumer"] = properties->map.at("cast_input");
+  }
+
+  DataType InputDataType(RemapperContext* ctx,
+                         const MatchedProperties& properties) const override {
+    return GetDataTypeFromAttr(
+        *properties.GetNode(&ctx->graph_view, "cast_input"), "SrcT");
+  }
+
+  bool CheckDataTypes(RemapperContext* ctx,
+                      const MatchedProperties& properties) const override {
+    auto* graph_view = &ctx->graph_view;
+    const NodeDef* cast_input = properties.GetNode(graph_view, "cast_input");
+    const NodeDef* cast_output = properties.GetNode(graph_view, "cast_output");
+    const DataType dtype = GetDataTypeFromAttr(*cast_input, "SrcT");
+    return (dtype == DT_BFLOAT16 || dtype == DT_HALF) &&
+           GetDataTypeFromAttr(*cast_input, "DstT") == DT_FLOAT &&
+           GetDataTypeFromAttr(*cast_output, "SrcT") == DT_FLOAT &&
+           GetDataTypeFromAttr(*cast_output, "DstT") == dtype;
+  }
+
+  // The float subgraph from the Cast of "input" to the normalized value.
+  static utils::OpTypePattern NormalizedPattern() {
+    using utils::NodeStatus;
+    using utils::OpTypePattern;
+    OpTypePattern input = {kAny, "input", NodeStatus::kRemain};
+    OpTypePattern cast_input = {kCast, "cast_input", NodeStatus::kRemove};
+    OpTypePattern square = {kSquare, "square", NodeStatus::kRemove};
+    OpTypePattern axes = {kConst, "axes", NodeStatus::kRemain};
+    OpTypePattern mean = {kMean, "mean", NodeStatus::kRemove};
+    OpTypePattern epsilon = {kConst, "epsilon", NodeStatus::kRemain};
+    OpTypePattern add_epsilon = {kAddV2, "add_epsilon", NodeStatus::kRemove};
+    OpTypePattern rsqrt = {kRsqrt, "rsqrt", NodeStatus::kRemove};
+    OpTypePattern normalized = {kMul, "normalized", NodeStatus::kRemove};
+
+    cast_input.AddInput(input);
+    square.AddInput(cast_input);
+    mean.AddInput(square).AddInput(axes);
+    add_epsilon.AddInput(mean).AddInput(epsilon);
+    rsqrt.AddInput(add_epsilon);
+    normalized.AddInput(cast_input).AddInput(rsqrt);
+    return normalized;
+  }
+};
+
+// Cast(normalized) * gamma, with gamma in the input type.
+class RmsNormWithCastFusion : public RmsNormWithCastFusionBase {
+ public:
+  RmsNormWithCastFusion() : RmsNormWithCastFusionBase() {
+    using utils::NodeStatus;
+    using utils::OpTypePattern;
+    OpTypePattern cast_output = {kCast, "cast_output", NodeStatus::kRemove};
+    OpTypePattern gamma = {kAny, "gamma", NodeStatus::kRemain};
+    OpTypePattern output = {kMul, "output", NodeStatus::kReplace};
+
+    cast_output.AddInput(NormalizedPattern());
+    output.AddInput(cast_output).AddInput(gamma);
+
+    pattern_ = InternalPattern(std::move(output));
+  }
+
+  ~RmsNormWithCastFusion() {}
+
+  std::string Name() override { return "rmsnorm-with-cast"; }
+
+ protected:
+  void AddAliases(MatchedProperties* properties) const override {
+    RmsNormWithCastFusionBase::AddAliases(properties);
+    properties->map["gamma_mul"] = properties->map.at("output");
+  }
+};
+
+// Cast(normalized * gamma), with gamma in float.
+class RmsNormWithCastAfterScaleFusion : public RmsNormWithCastFusionBase {
+ public:
+  RmsNormWithCastAfterScaleFusion() : RmsNormWithCastFusionBase() {
+    using utils::NodeStatus;
+    using utils::OpTypePattern;
+    OpTypePattern gamma = {kAny, "gamma", NodeStatus::kRemain};
+    OpTypePattern gamma_mul = {kMul, "gamma_mul", NodeStatus::kRemove};
+    OpTypePattern output = {kCast, "output", NodeStatus::kReplace};
+
+    gamma_mul.AddInput(NormalizedPattern()).AddInput(gamma);
+    output.AddInput(gamma_mul);
+
+    pattern_ = InternalPattern(std::move(output));
+  }
+
+  ~RmsNormWithCastAfterScaleFusion() {}
+
+  std::string Name() override { return "rmsnorm-with-cast-after-scale"; }
+
+ protected:
+  void AddAliases(MatchedProperties* properties) const override {
+    RmsNormWithCastFusionBase::AddAliases(properties);
+    properties->map["cast_output"] = properties->map.at("output");
+  }
+};
+
+REGISTER_FUSION(RmsNormFusion)
+REGISTER_FUSION(RmsNormWithCastFusion)
+REGISTER_FUSION(RmsNormWithCastAfterScaleFusion)
+}  // namespace graph
+}  // namespace itex
@@ -0,0 +1,295 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include <vector>
+
+#include "itex/core/graph/remapper/constant_names.h"
+#include "itex/core/graph/remapper/fusion.h"
+#include "itex/core/graph/remapper/remapper.h"
+#include "itex/core/graph/utils/pattern_utils.h"
+#include "itex/core/graph/utils/symbolic_shapes.h"
+#include "itex/core/graph/utils/utils.h"
+#include "itex/core/utils/op_kernel.h"
+
+namespace itex {
+namespace graph {
+
+// Rotary position embedding of GPT-J/LLaMA-style models, the
+// `apply_rotary_pos_emb` of itex/python/ops/rotary_embedding.py:
+//   input * cos + rotate_every_two(input) * sin
+// where input is [batch, length, num_heads, rotary_dim] and sin and cos are
+// [batch or 1, length, 1, rotary_dim].
+/*
+                input
+          /       |       \
+         |  StridedSlice  StridedSlice
+         |     (1::2)       (::2)
+         |        |         |
+         |       Neg        |
+         |          \      /                   input  sin  cos
+         |            Pack                       |    |    /
+         |              |          =>   QKRotaryPositionalEmbedding
+    cos  |           Reshape                    (query = key = input)
+      \  |              |   sin
+       Mul              Mul
+          \            /
+              AddV2
+*/
+// QKRotaryPositionalEmbedding rotates a query and a key together, the
+// subgraph rotates one tensor, so it is passed as both and only the first
+// output is used.
+class RotaryEmbeddingFusion : public Fusion {
+ public:
+  RotaryEmbeddingFusion() : Fusion() {
+    is_partial_ = true;
+
+    using utils::NodeStatus;
+    using utils::OpTypePattern;
+    OpTypePattern input = {kAny, "input", NodeStatus::kRemain};
+    OpTypePattern odd_begin = {kConst, "odd_begin", NodeStatus::kRemain};
+    OpTypePattern odd_end = {kConst, "odd_end", NodeStatus::kRemain};
+    OpTypePattern odd_strides = {kConst, "odd_strides", NodeStatus::kRemain};
+    OpTypePattern odd = {kStridedSlice, "odd", NodeStatus::kRemove};
+    OpTypePattern neg = {kNeg, "neg", NodeStatus::kRemove};
+    OpTypePattern even_begin = {kConst, "even_begin", NodeStatus::kRemain};
+    OpTypePattern even_end = {kConst, "even_end", NodeStatus::kRemain};
+    OpTypePattern even_strides = {kConst, "even_strides", NodeStatus::kRemain};
+    OpTypePattern even = {kStridedSlice, "even", NodeStatus::kRemove};
+    OpTypePattern pack = {kPack, "pack", NodeStatus::kRemove};
+    OpTypePattern shape = {kAny, "shape", NodeStatus::kRemain};
+    OpTypePattern rotated = {kReshape, "rotated", NodeStatus::kRemove};
+    OpTypePattern sin = {kAny, "sin", NodeStatus::kRemain};
+    OpTypePattern rotated_sin = {kMul, "rotated_sin", NodeStatus::kRemove};
+    OpTypePattern cos = {kAny, "cos", NodeStatus::kRemain};
+    OpTypePattern input_cos = {kMul, "input_cos", NodeStatus::kRemove};
+    OpTypePattern output = {kAddV2, "output", NodeStatus::kReplace};
+
+    odd.AddInput(input).AddInput(odd_begin).AddInput(odd_end).AddInput(
+        odd_strides);
+    neg.AddInput(odd);
+    even.AddInput(input).AddInput(even_begin).AddInput(even_end).AddInput(
+        even_strides);
+    pack.AddInput(neg).AddInput(even);
+    rotated.AddInput(pack).AddInput(shape);
+    rotated_sin.AddInput(rotated).AddInput(sin);
+    input_cos.AddInput(input).AddInput(cos);
+    output.AddInput(input_cos).AddInput(rotated_sin);
+
+    pattern_ = InternalPattern(std::move(output));
+  }
+
+  ~RotaryEmbeddingFusion() {}
+
+  std::string Name() override { return "rotary-embedding"; }
+
+  MatchedProperties Check(RemapperContext* ctx,
+                          const int node_index) const override {
+    auto& graph_view = ctx->graph_view;
+    MatchedProperties ret =
+        FillProperties(&graph_view, graph_view.GetNode(node_index), pattern_);
+    if (ret.Empty()) return ret;
+
+    const NodeDef* output = ret.GetNode(&graph_view, "output");
+    const DataType dtype = GetDataTypeFromAttr(*output, "T");
+    if (dtype != DT_FLOAT && dtype != DT_BFLOAT16 && dtype != DT_HALF) {
+      return ret.ToEmpty();
+    }
+
+    // The kernel needs the number of heads and the head size statically.
+    TensorShapeProto input_shape;
+    if (!GetInputShape(ctx, ret, "odd", "input", &input_shape) ||
+        Rank(input_shape) != 4) {
+      return ret.ToEmpty();
+    }
+    const int64 num_heads = input_shape.dim(2).size();
+    const int64 rotary_dim = input_shape.dim(3).size();
+    if (num_heads <= 0 || rotary_dim <= 0 || rotary_dim % 2 != 0) {
+      return ret.ToEmpty();
+    }
+
+    bool is_ok = CheckSlice(ctx, ret, "odd", /*start=*/1) &&
+                 CheckSlice(ctx, ret, "even", /*start=*/0) &&
+                 CheckPack(ctx, ret) &&
+                 CheckSinCos(ctx, ret, "rotated_sin", "sin", input_shape) &&
+                 CheckSinCos(ctx, ret, "input_cos", "cos", input_shape);
+
+    // The rotated tensor and the output have the shape of the input, so none
+    // of the Muls broadcasts it.
+    if (is_ok) {
+      auto rotated_props = GetOutputProperties(ctx, ret.map.at("rotated"));
+      auto output_props = GetOutputProperties(ctx, node_index);
+      is_ok = !rotated_props.empty() && !output_props.empty() &&
+              ShapesSymbolicallyEqual(rotated_props[0].shape(), input_shape) &&
+              ShapesSymbolicallyEqual(output_props[0].shape(), input_shape);
+    }
+
+    if (!is_ok) return ret.ToEmpty();
+    return ret;
+  }
+
+  Status Update(RemapperContext* ctx,
+                const MatchedProperties& properties) const override {
+    auto& graph_view = ctx->graph_view;
+    const NodeDef* output = properties.GetNode(&graph_view, "output");
+    const NodeDef* input_cos = properties.GetNode(&graph_view, "input_cos");
+    const NodeDef* rotated_sin =
+        properties.GetNode(&graph_view, "rotated_sin");
+
+    TensorShapeProto input_shape;
+    GetInputShape(ctx, properties, "odd", "input", &input_shape);
+    const string input =
+        FindInput(*input_cos, properties.GetNode(&graph_view, "input"));
+
+    NodeDef fused_node;
+    fused_node.set_name(output->name());
+    fused_node.set_op(kQKRotaryPositionalEmbedding);
+    fused_node.set_device(output->device());
+    fused_node.add_input(input);  // query
+    fused_node.add_input(input);  // key
+    fused_node.add_input(
+        FindInput(*rotated_sin, properties.GetNode(&graph_view, "sin")));
+    fused_node.add_input(
+        FindInput(*input_cos, properties.GetNode(&graph_view, "cos")));
+
+    auto* attr = fused_node.mutable_attr();
+    SetAttrValue(GetDataTypeFromAttr(*output, "T"), &(*attr)["T"]);
+    SetAttrValue(input_shape.dim(3).size(), &(*attr)["rotary_dim"]);
+    SetAttrValue(input_shape.dim(2).size(), &(*attr)["num_attention_heads"]);
+    SetAttrValue(input_shape.dim(3).size(), &(*attr)["head_dim"]);
+
+    utils::Mutation* mutation = graph_view.GetMutationBuilder();
+    Status status;
+    mutation->AddNode(std::move(fused_node), &status);
+    TF_RETURN_IF_ERROR(status);
+    TF_RETURN_IF_ERROR(mutation->Apply());
+    return Status::OK();
+  }
+
+ private:
+  // Returns the input of `node` read from `producer`.
+  static string FindInput(const NodeDef& node, const NodeDef* producer) {
+    for (const string& input : node.input()) {
+      if (NodeName(input) == producer->name()) return input;
+    }
+    return producer->name();
+  }
+
+  // Gets the shape of the input of `node_label` read from `producer_label`.
+  static bool GetInputShape(RemapperContext* ctx,
+                            const MatchedProperties& properties,
+                            const char* node_label, const char* producer_label,
+                            TensorShapeProto* shape) {
+    const NodeDef* node = properties.GetNode(&ctx->graph_view, node_label);
+    const NodeDef* producer =
+        properties.GetNode(&ctx->graph_view, producer_label);
+    std::vector<OpInfo_TensorProperties> props;
+    if (!ctx->GetGraphProperties()
+             .GetInputProperties(node->name(), &props)
+             .ok()) {
+      return false;
+    }
+    for (int i = 0; i < node->input_size() && i < props.size(); ++i) {
+      if (NodeName(node->input(i)) == producer->name()) {
+        *shape = props[i].shape();
+        return true;
+      }
+    }
+    return false;
+  }
+
+  static bool GetIntValues(const NodeDef& node, std::vector<int64>* values) {
+    Tensor tensor;
+    if (!tensor.FromProto(node.attr().at("value").tensor())) return false;
+    values->clear();
+    for (int64 i = 0; i < tensor.NumElements(); ++i) {
+      if (tensor.dtype() == DT_INT32) {
+        values->push_back(tensor.flat<int32>()(i));
+      } else if (tensor.dtype() == DT_INT64) {
+        values->push_back(tensor.flat<int64>()(i));
+      } else {
+        return false;
+      }
+    }
+    return true;
+  }
+
+  // The slice of `label` is `input[:, :, :, start::2]`.
+  static bool CheckSlice(RemapperContext* ctx,
+                         const MatchedProperties& properties,
+                         const string& label, int start) {
+    auto& graph_view = ctx->graph_view;
+    const NodeDef* slice = properties.GetNode(&graph_view, label.c_str());
+    int begin_mask = 0, end_mask = 0, ellipsis_mask = 0, new_axis_mask = 0,
+        shrink_axis_mask = 0;
+    if (!TryGetNodeAttr(*slice, "begin_mask", &begin_mask) ||
+        !TryGetNodeAttr(*slice, "end_mask", &end_mask) ||
+        !TryGetNodeAttr(*slice, "ellipsis_mask", &ellipsis_mask) ||
+        !TryGetNodeAttr(*slice, "new_axis_mask", &new_axis_mask) ||
+        !TryGetNodeAttr(*slice, "shrink_axis_mask", &shrink_axis_mask) ||
+        ellipsis_mask != 0 || new_axis_mask != 0 || shrink_axis_mask != 0) {
+      return false;
+    }
+
+    std::vector<int64> begin, strides;
+    if (!GetIntValues(*properties.GetNode(&graph_view,
+                                          (label + "_begin").c_str()),
+                      &begin) ||
+        !GetIntValues(*properties.GetNode(&graph_view,
+                                          (label + "_strides").c_str()),
+                      &strides) ||
+        begin.size() != 4 || strides != std::vector<int64>{1, 1, 1, 2}) {
+      return false;
+    }
+
+    // Every dim is sliced to its end.
+    if ((end_mask & 0xf) != 0xf) return false;
+    for (int i = 0; i < 4; ++i) {
+      const int64 expected = i == 3 ? start : 0;
+      if (!(begin_mask & (1 << i)) && begin[i] != expected) return false;
+      if ((begin_mask & (1 << i)) && expected != 0) return false;
+    }
+    return true;
+  }
+
+  // Neg and the other slice are stacked on a new last axis.
+  static bool CheckPack(RemapperContext* ctx,
+                        const MatchedProperties& properties) {
+    const NodeDef* pack = properties.GetNode(&ctx->graph_view, "pack");
+    int axis = 0;
+    return TryGetNodeAttr(*pack, "axis", &axis) && (axis == -1 || axis == 4);
+  }
+
+  // sin and cos are [batch or 1, length, 1, rotary_dim].
+  static bool CheckSinCos(RemapperContext* ctx,
+                          const MatchedProperties& properties,
+                          const char* mul_label, const char* label,
+                          const TensorShapeProto& input_shape) {
+    TensorShapeProto shape;
+    if (!GetInputShape(ctx, properties, mul_label, label, &shape) ||
+        Rank(shape) != 4) {
+      return false;
+    }
+    auto same_dim = [&](int i) {
+      const int64 size = shape.dim(i).size();
+      return size == input_shape.dim(i).size() && !IsUnknown(shape.dim(i));
+    };
+    return (shape.dim(0).size() == 1 || same_dim(0)) && same_dim(1) &&
+           shape.dim(2).size() == 1 && same_dim(3);
+  }
+};
+REGISTER_FUSION(RotaryEmbeddingFusion)
+
+}  // namespace graph
+}  // namespace itex
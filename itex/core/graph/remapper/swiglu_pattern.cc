@@ -0,0 +1,268 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include <string>
+#include <vector>
+
+#include "absl/strings/str_join.h"
+#include "itex/core/graph/remapper/constant_names.h"
+#include "itex/core/graph/remapper/fusion.h"
+#include "itex/core/graph/remapper/remapper.h"
+#include "itex/core/graph/utils/pattern_utils.h"
+#include "itex/core/graph/utils/symbolic_shapes.h"
+#include "itex/core/graph/utils/utils.h"
+#include "itex/core/utils/op_kernel.h"
+
+namespace itex {
+namespace graph {
+
+// SwiGLU feed-forward block of LLaMA-style models, swish(x * w) * (x * v),
+// fused to a BatchMatMul with Swish and the gate as post ops:
+/*
+      x   w
+      \  /
+   BatchMatMulV2                          x   v
+     |      \                             \  /
+     |    Sigmoid       x  v    =>   BatchMatMulV2(gate)   x   w
+      \    /            \ /                          \    |   /
+        Mul       BatchMatMulV2(gate)      _ITEXFusedBatchMatMulV2
+            \       /                     fused_ops = [Swish, Mul]
+               Mul
+*/
+// The gate is the binary input of the fused op, so it must have the shape of
+// the output. The binary input of the fused op needs 3 dims at least, so the
+// 2-D MatMul of Keras Dense on 2-D inputs is rewritten to
+//   Squeeze(_ITEXFusedBatchMatMulV2(ExpandDims(x), w, ExpandDims(gate)))
+// where w is broadcast on the batch dim. The subclasses match Swish as Sigmoid
+// and Mul, and as _ITEXSwish, which the swish fusions create.
+class SwiGluFusionBase : public Fusion {
+ public:
+  SwiGluFusionBase() : Fusion() {}
+
+  ~SwiGluFusionBase() {}
+
+  MatchedProperties Check(RemapperContext* ctx,
+                          const int node_index) const override {
+    auto& graph_view = ctx->graph_view;
+    MatchedProperties ret =
+        FillProperties(&graph_view, graph_view.GetNode(node_index), pattern_);
+    if (ret.Empty() || ret.map.at("matmul") == ret.map.at("gate")) {
+      return ret.ToEmpty();
+    }
+
+    const NodeDef* output = ret.GetNode(&graph_view, "output");
+    const NodeDef* matmul = ret.GetNode(&graph_view, "matmul");
+    const NodeDef* gate = ret.GetNode(&graph_view, "gate");
+    const DataType dtype = GetDataTypeFromAttr(*output, "T");
+    if ((dtype != DT_FLOAT && dtype != DT_BFLOAT16 && dtype != DT_HALF) ||
+        GetDataTypeFromAttr(*matmul, "T") != dtype ||
+        GetDataTypeFromAttr(*gate, "T") != dtype) {
+      return ret.ToEmpty();
+    }
+
+    auto matmul_props = GetOutputProperties(ctx, ret.map.at("matmul"));
+    auto gate_props = GetOutputProperties(ctx, ret.map.at("gate"));
+    if (matmul_props.empty() || gate_props.empty() ||
+        Rank(matmul_props[0].shape()) < 2 ||
+        !ShapesSymbolicallyEqual(matmul_props[0].shape(),
+                                 gate_props[0].shape())) {
+      return ret.ToEmpty();
+    }
+
+    return ret;
+  }
+
+  Status Update(RemapperContext* ctx,
+                const MatchedProperties& properties) const override {
+    auto& graph_view = ctx->graph_view;
+    const NodeDef* output = properties.GetNode(&graph_view, "output");
+    const NodeDef* matmul = properties.GetNode(&graph_view, "matmul");
+    const NodeDef* gate = properties.GetNode(&graph_view, "gate");
+
+    auto matmul_props = GetOutputProperties(ctx, properties.map.at("matmul"));
+    if (Rank(matmul_props[0].shape()) >= 3) {
+      NodeDef fused_node;
+      fused_node.set_name(output->name());
+      fused_node.set_op(kFusedBatchMatMul);
+      fused_node.set_device(matmul->device());
+      fused_node.add_input(matmul->input(0));
+      fused_node.add_input(matmul->input(1));
+      fused_node.add_input(FindInput(*output, gate));
+
+      CopyAllAttrs(*matmul, &fused_node);
+      SetFusedOpAttributes(&fused_node, {kSwish, kBinaryMul}, /*num_args=*/1);
+
+      utils::Mutation* mutation = graph_view.GetMutationBuilder();
+      Status status;
+      mutation->AddNode(std::move(fused_node), &status);
+      TF_RETURN_IF_ERROR(status);
+      TF_RETURN_IF_ERROR(mutation->Apply());
+      return Status::OK();
+    }
+
+    // 2-D matmul, add a batch dim of 1 to x and gate, and remove it from the
+    // result.
+    const DataType dtype = GetDataTypeFromAttr(*matmul, "T");
+    const string& device = matmul->device();
+    bool adj_x = false;
+    bool adj_y = false;
+    if (matmul->op() == kMatMul) {
+      TF_RETURN_IF_ERROR(GetNodeAttr(*matmul, "transpose_a", &adj_x));
+      TF_RETURN_IF_ERROR(GetNodeAttr(*matmul, "transpose_b", &adj_y));
+    } else {
+      TF_RETURN_IF_ERROR(GetNodeAttr(*matmul, "adj_x", &adj_x));
+      TF_RETURN_IF_ERROR(GetNodeAttr(*matmul, "adj_y", &adj_y));
+    }
+
+    NodeDef axis;
+    axis.set_name(AddPrefixToNodeName("batch_axis", output->name()));
+    axis.set_op(kConst);
+    axis.set_device(device);
+    TensorProto axis_value;
+    axis_value.set_dtype(DT_INT32);
+    axis_value.mutable_tensor_shape();
+    axis_value.add_int_val(0);
+    AddNodeAttr("dtype", DT_INT32, &axis);
+    AddNodeAttr("value", axis_value, &axis);
+
+    auto expand_dims = [&](const string& name, const string& input) {
+      NodeDef node;
+      node.set_name(AddPrefixToNodeName(name, output->name()));
+      node.set_op(kExpandDims);
+      node.set_device(device);
+      node.add_input(input);
+      node.add_input(axis.name());
+      AddNodeAttr("T", dtype, &node);
+      AddNodeAttr("Tdim", DT_INT32, &node);
+      return node;
+    };
+    NodeDef x_3d = expand_dims("x_3d", matmul->input(0));
+    NodeDef gate_3d = expand_dims("gate_3d", FindInput(*output, gate));
+
+    NodeDef fused_node;
+    fused_node.set_name(AddPrefixToNodeName("fused", output->name()));
+    fused_node.set_op(kFusedBatchMatMul);
+    fused_node.set_device(device);
+    fused_node.add_input(x_3d.name());
+    fused_node.add_input(matmul->input(1));
+    fused_node.add_input(gate_3d.name());
+    AddNodeAttr("T", dtype, &fused_node);
+    AddNodeAttr("adj_x", adj_x, &fused_node);
+    AddNodeAttr("adj_y", adj_y, &fused_node);
+    SetFusedOpAttributes(&fused_node, {kSwish, kBinaryMul}, /*num_args=*/1);
+
+    NodeDef squeeze;
+    squeeze.set_name(output->name());
+    squeeze.set_op(kSqueeze);
+    squeeze.set_device(device);
+    squeeze.add_input(fused_node.name());
+    AddNodeAttr("T", dtype, &squeeze);
+    AddNodeAttr("squeeze_dims", std::vector<int32>{0}, &squeeze);
+
+    utils::Mutation* mutation = graph_view.GetMutationBuilder();
+    Status status;
+    for (NodeDef* node : {&axis, &x_3d, &gate_3d, &fused_node, &squeeze}) {
+      mutation->AddNode(std::move(*node), &status);
+      TF_RETURN_IF_ERROR(status);
+    }
+    TF_RETURN_IF_ERROR(mutation->Apply());
+    return Status::OK();
+  }
+
+ protected:
+  // MatMul is the 2-D form of BatchMatMulV2.
+  static string MatMulOps() {
+    std::vector<string> matmul_ops{kBatchMatMulV2, kMatMul};
+    return absl::StrJoin(matmul_ops, "|");
+  }
+
+ private:
+  // Returns the input of `node` read from `producer`.
+  static string FindInput(const NodeDef& node, const NodeDef* producer) {
+    for (const string& input : node.input()) {
+      if (NodeName(input) == producer->name()) return input;
+    }
+    return producer->name();
+  }
+};
+
+class SwiGluFusion : public SwiGluFusionBase {
+ public:
+  SwiGluFusion() : SwiGluFusionBase() {
+    using utils::NodeStatus;
+    using utils::OpTypePattern;
+    OpTypePattern x = {kAny, "x", NodeStatus::kRemain};
+    OpTypePattern w = {kAny, "w", NodeStatus::kRemain};
+    OpTypePattern matmul = {MatMulOps(), "matmul", NodeStatus::kRemove};
+    OpTypePattern sigmoid = {kSigmoid, "sigmoid", NodeStatus::kRemove};
+    OpTypePattern swish = {kMul, "swish", NodeStatus::kRemove};
+    OpTypePattern gate = {MatMulOps(), "gate", NodeStatus::kRemain};
+    OpTypePattern output = {kMul, "output", NodeStatus::kReplace};
+
+    matmul.AddInput(x).AddInput(w);
+    sigmoid.AddInput(matmul);
+    swish.AddInput(sigmoid).AddInput(matmul);
+    output.AddInput(swish).AddInput(gate);
+
+    pattern_ = InternalPattern(std::move(output));
+  }
+
+  ~SwiGluFusion() {}
+
+  std::string Name() override { return "swiglu"; }
+};
+REGISTER_FUSION(SwiGluFusion)
+
+class SwishGluFusion : public SwiGluFusionBase {
+ public:
+  SwishGluFusion() : SwiGluFusionBase() {
+    using utils::NodeStatus;
+    using utils::OpTypePattern;
+    OpTypePattern x = {kAny, "x", NodeStatus::kRemain};
+    OpTypePattern w = {kAny, "w", NodeStatus::kRemain};
+    OpTypePattern matmul = {MatMulOps(), "matmul", NodeStatus::kRemove};
+    OpTypePattern swish = {kSwish, "swish", NodeStatus::kRemove};
+    OpTypePattern gate = {MatMulOps(), "gate", NodeStatus::kRemain};
+    OpTypePattern output = {kMul, "output", NodeStatus::kReplace};
+
+    matmul.AddInput(x).AddInput(w);
+    swish.AddInput(matmul);
+    output.AddInput(swish).AddInput(gate);
+
+    pattern_ = InternalPattern(std::move(output));
+  }
+
+  ~SwishGluFusion() {}
+
+  std::string Name() override { return "swish-glu"; }
+
+  MatchedProperties Check(RemapperContext* ctx,
+                          const int node_index) const override {
+    MatchedProperties ret = SwiGluFusionBase::Check(ctx, node_index);
+    if (ret.Empty()) return ret;
+
+    // oneDNN Swish post op has alpha 1.
+    const NodeDef* swish = ret.GetNode(&ctx->graph_view, "swish");
+    float alpha = 1.0f;
+    if (TryGetNodeAttr(*swish, "alpha", &alpha) && alpha != 1.0f) {
+      return ret.ToEmpty();
+    }
+    return ret;
+  }
+};
+REGISTER_FUSION(SwishGluFusion)
+
+}  // namespace graph
+}  // namespace itex
@@ -0,0 +1,364 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include "itex/core/graph/remapper/user_defined_fusion.h"
+
+#include <algorithm>
+#include <set>
+#include <utility>
+
+#include "absl/strings/match.h"
+#include "absl/strings/str_split.h"
+#include "itex/core/graph/config_util.h"
+#include "itex/core/graph/remapper/constant_names.h"
+#include "itex/core/graph/utils/utils.h"
+#include "itex/core/utils/attr_value_util.h"
+#include "itex/core/utils/errors.h"
+#include "itex/core/utils/mutex.h"
+#include "itex/core/utils/proto_serialization.h"
+#include "itex/core/utils/types.h"
+
+namespace itex {
+namespace graph {
+
+using utils::NodeStatus;
+using utils::OpTypePattern;
+
+namespace {
+
+typedef std::unordered_map<string, const FusionPatternNode*> NodesByLabel;
+
+// Splits "<label>:<attr>" of `FusionAttr.copy_from`.
+bool SplitCopyFrom(const string& copy_from, string* label, string* attr) {
+  std::vector<string> parts =
+      absl::StrSplit(copy_from, absl::MaxSplits(':', 1));
+  if (parts.size() != 2 || parts[0].empty() || parts[1].empty()) return false;
+  *label = parts[0];
+  *attr = parts[1];
+  return true;
+}
+
+// Converts the node `label` and its inputs, recursively. A node used by
+// several nodes is converted for each of them, with the same label, which
+// the matcher resolves to the same graph node.
+Status BuildNodePattern(const NodesByLabel& nodes, const string& label,
+                        const string& output_label,
+                        std::set<string>* visiting, std::set<string>* visited,
+                        OpTypePattern* pattern) {
+  auto it = nodes.find(label);
+  if (it == nodes.end()) {
+    return errors::InvalidArgument("Unknown label ", label);
+  }
+  if (visiting->count(label) != 0) {
+    return errors::InvalidArgument("Cycle at node ", label);
+  }
+
+  const FusionPatternNode& node = *it->second;
+  const bool is_input = node.op() == kAny;
+  if (is_input && node.inputs_size() > 0) {
+    return errors::InvalidArgument("Input node ", label,
+                                   " with op \"*\" can't have inputs");
+  }
+
+  pattern->op = node.op();
+  pattern->label = label;
+  if (label == output_label) {
+    pattern->node_status = NodeStatus::kReplace;
+  } else if (is_input) {
+    pattern->node_status = NodeStatus::kRemain;
+  } else {
+    pattern->node_status = NodeStatus::kRemove;
+  }
+
+  visiting->insert(label);
+  visited->insert(label);
+  for (const string& input : node.inputs()) {
+    OpTypePattern child;
+    TF_RETURN_IF_ERROR(BuildNodePattern(nodes, input, output_label, visiting,
+                                        visited, &child));
+    pattern->AddInput(child);
+  }
+  visiting->erase(label);
+  return Status::OK();
+}
+
+class UserDefinedFusion : public Fusion {
+ public:
+  UserDefinedFusion(const FusionPattern& spec, OpTypePattern&& pattern)
+      : Fusion(), spec_(spec), output_label_(spec.nodes(0).label()) {
+    pattern_ = InternalPattern(std::move(pattern));
+    // The first node which consumes each input, to find the exact tensor it
+    // reads.
+    for (const FusionPatternNode& node : spec.nodes()) {
+      for (const string& input : node.inputs()) {
+        consumers_.emplace(input, node.label());
+      }
+    }
+  }
+
+  ~UserDefinedFusion() {}
+
+  std::string Name() override { return spec_.name(); }
+
+  MatchedProperties Check(RemapperContext* ctx,
+                          const int node_index) const override {
+    auto& graph_view = ctx->graph_view;
+    MatchedProperties ret =
+        FillProperties(&graph_view, graph_view.GetNode(node_index), pattern_);
+    if (ret.Empty()) return ret;
+
+    for (int index : ret.deleted) {
+      if (IsInPreserveSet(*ctx, graph_view.GetNode(index)->node())) {
+        return ret.ToEmpty();
+      }
+    }
+
+    // Check the replacement here, as a failed update aborts the remapper.
+    NodeDef fused_op;
+    Status status = BuildReplacement(ctx, ret, &fused_op);
+    if (!status.ok()) {
+      ITEX_VLOG(1) << "Skip fusion " << spec_.name() << ": " << status;
+      return ret.ToEmpty();
+    }
+    return ret;
+  }
+
+  Status Update(RemapperContext* ctx,
+                const MatchedProperties& properties) const override {
+    NodeDef fused_op;
+    TF_RETURN_IF_ERROR(BuildReplacement(ctx, properties, &fused_op));
+
+    Status status;
+    utils::Mutation* mutation = ctx->graph_view.GetMutationBuilder();
+    mutation->AddNode(std::move(fused_op), &status);
+    TF_RETURN_IF_ERROR(status);
+    TF_RETURN_IF_ERROR(mutation->Apply());
+    return Status::OK();
+  }
+
+ private:
+  const NodeDef* GetMatchedNode(RemapperContext* ctx,
+                                const MatchedProperties& properties,
+                                const string& label) const {
+    return ctx->graph_view.GetNode(properties.map.at(label))->node();
+  }
+
+  Status BuildReplacement(RemapperContext* ctx,
+                          const MatchedProperties& properties,
+                          NodeDef* fused_op) const {
+    const FusionReplacement& replacement = spec_.replacement();
+    const NodeDef* output = GetMatchedNode(ctx, properties, output_label_);
+    fused_op->set_name(output->name());
+    fused_op->set_op(replacement.op());
+    fused_op->set_device(output->device());
+
+    for (const string& input : replacement.inputs()) {
+      const NodeDef* producer = GetMatchedNode(ctx, properties, input);
+      const NodeDef* consumer =
+          GetMatchedNode(ctx, properties, consumers_.at(input));
+      auto it = std::find_if(consumer->input().begin(), consumer->input().end(),
+                             [producer](const string& tensor) {
+                               return NodeName(tensor) == producer->name();
+                             });
+      if (it == consumer->input().end()) {
+        return errors::Internal("Node ", consumer->name(),
+                                " doesn't read input ", producer->name());
+      }
+      fused_op->add_input(*it);
+    }
+
+    auto* attr = fused_op->mutable_attr();
+    for (const auto& item : replacement.attrs()) {
+      const FusionAttr& value = item.second;
+      AttrValue* attr_value = &(*attr)[item.first];
+      switch (value.value_case()) {
+        case FusionAttr::kCopyFrom: {
+          string label, name;
+          SplitCopyFrom(value.copy_from(), &label, &name);
+          const NodeDef* node = GetMatchedNode(ctx, properties, label);
+          auto attr_it = node->attr().find(name);
+          if (attr_it == node->attr().end()) {
+            return errors::InvalidArgument("Node ", node->name(),
+                                           " has no attribute ", name);
+          }
+          *attr_value = attr_it->second;
+          break;
+        }
+        case FusionAttr::kS:
+          SetAttrValue(value.s(), attr_value);
+          break;
+        case FusionAttr::kI:
+          SetAttrValue(static_cast<int64>(value.i()), attr_value);
+          break;
+        case FusionAttr::kF:
+          SetAttrValue(value.f(), attr_value);
+          break;
+        case FusionAttr::kB:
+          SetAttrValue(value.b(), attr_value);
+          break;
+        case FusionAttr::kType: {
+          DataType dtype = DT_INVALID;
+          DataTypeFromString(value.type(), &dtype);
+          SetAttrValue(dtype, attr_value);
+          break;
+        }
+        default:
+          return errors::InvalidArgument("Attribute ", item.first,
+                                         " has no value");
+      }
+    }
+    return Status::OK();
+  }
+
+  FusionPattern spec_;
+  string output_label_;
+  std::unordered_map<string, string> consumers_;
+};
+
+}  // namespace
+
+Status BuildFusionPattern(const FusionPattern& spec, OpTypePattern* pattern) {
+  if (spec.name().empty()) {
+    return errors::InvalidArgument("Fusion pattern has no name");
+  }
+  if (spec.nodes_size() == 0) {
+    return errors::InvalidArgument("Fusion pattern has no node");
+  }
+  if (spec.replacement().op().empty()) {
+    return errors::InvalidArgument("Fusion pattern has no replacement op");
+  }
+
+  NodesByLabel nodes;
+  for (const FusionPatternNode& node : spec.nodes()) {
+    // A trailing '*' means variadic inputs to the matcher.
+    if (node.label().empty() || absl::EndsWith(node.label(), "*")) {
+      return errors::InvalidArgument("Invalid label \"", node.label(), "\"");
+    }
+    if (node.op().empty()) {
+      return errors::InvalidArgument("Node ", node.label(), " has no op");
+    }
+    if (!nodes.emplace(node.label(), &node).second) {
+      return errors::InvalidArgument("Duplicate label ", node.label());
+    }
+  }
+
+  const string& output_label = spec.nodes(0).label();
+  if (spec.nodes(0).op() == kAny) {
+    return errors::InvalidArgument("Output node ", output_label,
+                                   " can't be \"*\"");
+  }
+  std::set<string> visiting, visited;
+  TF_RETURN_IF_ERROR(BuildNodePattern(nodes, output_label, output_label,
+                                      &visiting, &visited, pattern));
+  for (const FusionPatternNode& node : spec.nodes()) {
+    if (visited.count(node.label()) == 0) {
+      return errors::InvalidArgument("Node ", node.label(),
+                                     " is not an input of the output node");
+    }
+  }
+
+  for (const string& input : spec.replacement().inputs()) {
+    auto it = nodes.find(input);
+    if (it == nodes.end() || it->second->op() != kAny) {
+      return errors::InvalidArgument("Replacement input ", input,
+                                     " must be a node with op \"*\"");
+    }
+  }
+  for (const auto& item : spec.replacement().attrs()) {
+    const FusionAttr& value = item.second;
+    string label, name;
+    if (value.value_case() == FusionAttr::kCopyFrom &&
+        (!SplitCopyFrom(value.copy_from(), &label, &name) ||
+         nodes.count(label) == 0)) {
+      return errors::InvalidArgument("Attribute ", item.first,
+                                     " copies from unknown node attribute ",
+                                     value.copy_from());
+    }
+    DataType dtype;
+    if (value.value_case() == FusionAttr::kType &&
+        !DataTypeFromString(value.type(), &dtype)) {
+      return errors::InvalidArgument("Attribute ", item.first,
+                                     " has unknown type ", value.type());
+    }
+    if (value.value_case() == FusionAttr::VALUE_NOT_SET) {
+      return errors::InvalidArgument("Attribute ", item.first,
+                                     " has no value");
+    }
+  }
+  return Status::OK();
+}
+
+UserDefinedFusions::UserDefinedFusions(const GraphOptions& options) {
+  for (const FusionPattern& spec : options.fusion_patterns()) {
+    OpTypePattern pattern;
+    Status status = BuildFusionPattern(spec, &pattern);
+    if (!status.ok()) {
+      ITEX_LOG(WARNING) << "Ignore invalid fusion pattern " << spec.name()
+                        << ": " << status;
+      continue;
+    }
+
+    std::vector<string> keys = absl::StrSplit(pattern.op, "|");
+    fusions_.emplace_back(new UserDefinedFusion(spec, std::move(pattern)));
+    for (const auto& key : keys) {
+      map_[key].push_back(fusions_.back().get());
+      ITEX_VLOG(1) << "Register user-defined fusion " << spec.name()
+                   << " with " << key;
+    }
+  }
+
+  // Same priority as FusionMgr, the earlier registered one first on a tie.
+  for (auto& [key, value] : map_) {
+    std::stable_sort(value.begin(), value.end(),
+                     [](const Fusion* left, const Fusion* right) {
+                       return left->NumNodes() > right->NumNodes();
+                     });
+  }
+}
+
+const std::vector<Fusion*>& UserDefinedFusions::GetFusions(
+    const std::string& key) const {
+  auto it = map_.find(key);
+  if (it != map_.end()) return it->second;
+
+  static const auto* const empty_vector = new std::vector<Fusion*>();
+  return *empty_vector;
+}
+
+std::shared_ptr<const UserDefinedFusions> GetUserDefinedFusions() {
+  const ConfigProto config = itex_get_config();
+  const GraphOptions& options = config.graph_options();
+  if (options.fusion_patterns_size() == 0) return nullptr;
+
+  GraphOptions patterns;
+  *patterns.mutable_fusion_patterns() = options.fusion_patterns();
+  string key;
+  SerializeToStringDeterministic(patterns, &key);
+
+  // Graphs are optimized concurrently by the inter-op threads.
+  static mutex mu;
+  static auto* const last_key = new string();
+  static auto* const last_fusions =
+      new std::shared_ptr<const UserDefinedFusions>();
+  mutex_lock lock(&mu);
+  if (*last_fusions == nullptr || *last_key != key) {
+    *last_fusions = std::make_shared<const UserDefinedFusions>(options);
+    *last_key = std::move(key);
+  }
+  return *last_fusions;
+}
+
+}  // namespace graph
+}  // namespace itex
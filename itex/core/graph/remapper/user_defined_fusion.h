@@ -0,0 +1,63 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#ifndef ITEX_CORE_GRAPH_REMAPPER_USER_DEFINED_FUSION_H_
+#define ITEX_CORE_GRAPH_REMAPPER_USER_DEFINED_FUSION_H_
+
+#include <memory>
+#include <string>
+#include <unordered_map>
+#include <vector>
+
+#include "itex/core/graph/remapper/fusion.h"
+#include "itex/core/utils/protobuf/config.pb.h"
+
+namespace itex {
+namespace graph {
+
+// Converts a `FusionPattern` of the config to the pattern of a `Fusion`,
+// checking the labels it refers to.
+Status BuildFusionPattern(const FusionPattern& spec,
+                          utils::OpTypePattern* pattern);
+
+// The fusions of `GraphOptions.fusion_patterns`, which users register at
+// runtime with `itex.register_fusion_pattern()`. Unlike the built-in fusions
+// of `FusionMgr`, they change with the config, so each remapper pass holds
+// the ones of the config it started with.
+class UserDefinedFusions {
+ public:
+  explicit UserDefinedFusions(const GraphOptions& options);
+
+  UserDefinedFusions(const UserDefinedFusions& other) = delete;
+  void operator=(const UserDefinedFusions& other) = delete;
+
+  // Fusions whose output node op is `key`, the one with more nodes first.
+  const std::vector<Fusion*>& GetFusions(const std::string& key) const;
+
+  bool Empty() const { return fusions_.empty(); }
+
+ private:
+  std::vector<std::unique_ptr<Fusion>> fusions_;
+  std::unordered_map<std::string, std::vector<Fusion*>> map_;
+};
+
+// Returns the fusions of the current ITEX config, or nullptr if there is
+// none. They are built again only when the patterns change.
+std::shared_ptr<const UserDefinedFusions> GetUserDefinedFusions();
+
+}  // namespace graph
+}  // namespace itex
+
+#endif  // ITEX_CORE_GRAPH_REMAPPER_USER_DEFINED_FUSION_H_
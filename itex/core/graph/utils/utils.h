@@ -21,6 +21,7 @@ limitations under the License.
 #include <algorithm>
 #include <functional>
 #include <iterator>
+#include <map>
 #include <set>
 #include <string>
 #include <utility>
@@ -45,6 +46,14 @@ limitations under the License.
 namespace itex {
 namespace graph {
 
+// Profile of one fusion: how often it is tried, how often it matches and the
+// time spent in it.
+struct FusionStats {
+  int64 calls = 0;
+  int64 hits = 0;
+  uint64 elapsed_ns = 0;
+};
+
 struct OptimizerContext {
   explicit OptimizerContext(const char* device_name)
       : device_name(device_name),
@@ -54,6 +63,9 @@ struct OptimizerContext {
   bool is_compute_intensive;
   bool enable_complete_opt;
   bool is_quantization_graph;
+  // If not null, the remapper passes add the profile of their fusions to it,
+  // see optimizer_report.h.
+  std::map<string, FusionStats>* fusion_stats = nullptr;
 };
 
 // Check whether current graph contains compute-intensive ops or not.
@@ -31,6 +31,7 @@ limitations under the License.
 #include "itex/core/utils/hw_info.h"
 #include "itex/core/utils/logging.h"
 #include "itex/core/utils/numbers.h"
+#include "itex/core/utils/thread_pool_backend.h"
 #include "itex/core/utils/tf_version.h"
 #include "itex/core/version.h"
 #include "tensorflow/c/experimental/grappler/grappler.h"
@@ -105,14 +106,17 @@ void InitGlobalSetting(const OptimizerConfigFlags& config) {
   // Keep the the minimum inter number to 1 to ensure no resource conflicts.
   const int32_t itex_inter_num = std::max((cpu_num + omp_num - 1) / omp_num, 1);
 
-  // Set inter_op_parallelism_threads if it's not initialized.
+  // Set inter_op_parallelism_threads if it's not initialized. The hybrid
+  // thread pool keeps the default of TensorFlow, so independent small ops
+  // can run concurrently.
   bool enable_omp = true;
   ITEX_CHECK_OK(
       itex::ReadBoolFromEnvVar("ITEX_OMP_THREADPOOL", true, &enable_omp));
+  const bool enable_hybrid = itex::IsHybridThreadPoolAvailable();
 #ifdef CC_THREADPOOL_BUILD
   enable_omp = false;
 #endif
-  if (enable_omp)
+  if (enable_omp && !enable_hybrid)
     setenv("TF_NUM_INTEROP_THREADS", std::to_string(itex_inter_num).c_str(), 0);
 
   // Initialize CPU allocator:
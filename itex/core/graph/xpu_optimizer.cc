@@ -12,6 +12,7 @@ limitations under the License.
 
 #include "itex/core/graph/xpu_optimizer.h"
 
+#include <memory>
 #include <string>
 
 #include "itex/core/graph/auto_mixed_precision/auto_mixed_precision.h"
@@ -22,11 +23,14 @@ limitations under the License.
 #include "itex/core/graph/onednn_graph/onednn_graph.h"
 #endif  // ITEX_ONEDNN_GRAPH
 #include "itex/core/graph/onednn_layout/onednn_layout.h"
+#include "itex/core/graph/optimized_graph_cache.h"
 #include "itex/core/graph/optimizer_config.h"
+#include "itex/core/graph/optimizer_report.h"
 #include "itex/core/graph/remapper/remapper.h"
 #include "itex/core/graph/utils/utils.h"
 #include "itex/core/utils/errors.h"
 #include "itex/core/utils/op_kernel.h"
+#include "itex/core/utils/strcat.h"
 #include "tensorflow/c/experimental/grappler/grappler.h"
 
 #if 0
@@ -58,6 +62,20 @@ void Optimizer_Destroy(void* optimizer) {
   if (optimizer) delete reinterpret_cast<Optimizer*>(optimizer);
 }
 
+namespace {
+void WriteOptimizerReport(const OptimizerReport& report,
+                          const GraphDef& optimized_graph) {
+  string path;
+  Status status = report.Write(optimized_graph, &path);
+  if (status.ok()) {
+    ITEX_VLOG(1) << "Write graph optimization report to " << path;
+  } else {
+    ITEX_LOG(WARNING) << "Failed to write graph optimization report: "
+                      << status;
+  }
+}
+}  // namespace
+
 void Optimizer_Optimize(void* optimizer, const TF_Buffer* graph_buf,
                         const TF_GrapplerItem* tf_item,
                         TF_Buffer* optimized_graph_buf, TF_Status* tf_status) {
@@ -86,8 +104,55 @@ void Optimizer_Optimize(void* optimizer, const TF_Buffer* graph_buf,
   GraphDef optimized_graph_def = graph_def;
   auto config = GetOptimizerConfigFlags();
 
+  std::unique_ptr<OptimizerReport> report;
+  if (IsGraphReportEnabled()) {
+    report.reset(new OptimizerReport(opt_ctx.device_name, graph_def));
+    opt_ctx.fusion_stats = report->fusion_stats();
+  }
+  // Records the pass which just wrote `optimized_graph_def` in the report.
+  auto record_pass = [&](const string& name) {
+    if (report) report->RecordPass(name, optimized_graph_def);
+  };
+
   opt_ctx.is_compute_intensive = HaveComputeIntensiveNode(graph_def);
   opt_ctx.is_quantization_graph = HaveQuantizeDequantizeNode(graph_def);
+
+  // The optimization pass order with or without oneDNN Graph are different.
+  // With oneDNN Graph:     partial_remapper -> auto_mixed_precision
+  //                                         -> onednn_graph -> full_remapper
+  // Without oneDNN Graph:  full_remapper -> auto_mixed_precision
+  bool onednn_graph_optimize =
+      config.enable_onednn_graph &&
+      (opt_ctx.is_quantization_graph || config.enable_onednn_graph_all_type);
+
+  // Skip the whole optimization if the graph was optimized by a previous run.
+  // The partitions of oneDNN Graph only live in the process which created
+  // them, so those graphs are optimized again.
+  std::string cache_key;
+  if (IsGraphCacheEnabled() && !onednn_graph_optimize) {
+    cache_key = GetGraphCacheKey(opt_ctx.device_name, item, graph_def, config);
+    GraphDef cached_graph_def;
+    Status cache_status =
+        cache_key.empty() ? errors::Internal("Failed to fingerprint graph")
+                          : LookupOptimizedGraph(cache_key, &cached_graph_def);
+    if (cache_status.ok()) {
+      ITEX_VLOG(1) << "Load optimized graph from cache: " << cache_key;
+      if (report) {
+        report->SetCacheHit();
+        report->RecordPass("graph_cache", cached_graph_def);
+        WriteOptimizerReport(*report, cached_graph_def);
+      }
+      SET_STATUS_IF_ERROR(
+          tf_status, MessageToBuffer(cached_graph_def, optimized_graph_buf));
+      TF_StatusFromStatus(status, tf_status);
+      return;
+    }
+    if (!errors::IsNotFound(cache_status)) {
+      ITEX_LOG(WARNING) << "Graph cache is skipped: " << cache_status;
+    }
+    record_pass("graph_cache");
+  }
+
 #ifndef INTEL_CPU_ONLY
   // Compute-extensive check is not required on GPU except AutoShard.
   opt_ctx.enable_complete_opt = true;
@@ -139,19 +204,12 @@ void Optimizer_Optimize(void* optimizer, const TF_Buffer* graph_buf,
   }
 #endif  // INTEL_CPU_ONLY
 
-  // The optimization pass order with or without oneDNN Graph are different.
-  // With oneDNN Graph:     partial_remapper -> auto_mixed_precision
-  //                                         -> onednn_graph -> full_remapper
-  // Without oneDNN Graph:  full_remapper -> auto_mixed_precision
-  bool onednn_graph_optimize =
-      config.enable_onednn_graph &&
-      (opt_ctx.is_quantization_graph || config.enable_onednn_graph_all_type);
-
   optimized_graph_def.Swap(&graph_def);
   GenericLayoutOptimizer generic_layout_opt;
   SET_STATUS_IF_ERROR(tf_status,
                       generic_layout_opt.Optimize(&opt_ctx, item, graph_def,
                                                   &optimized_graph_def));
+  record_pass("generic_layout");
 
   if (config.enable_remapper && opt_ctx.enable_complete_opt) {
     if (onednn_graph_optimize) {
@@ -159,6 +217,7 @@ void Optimizer_Optimize(void* optimizer, const TF_Buffer* graph_buf,
       optimized_graph_def.Swap(&graph_def);
       SET_STATUS_IF_ERROR(tf_status, RunRemapper(&opt_ctx, item, graph_def,
                                                  &optimized_graph_def, false));
+      record_pass("remapper_partial");
     } else {
       // Run remapper twice for full scope fusions if oneDNN graph is disabled.
       for (int i = 0; i < config.remapper_run_pass; ++i) {
@@ -166,6 +225,7 @@ void Optimizer_Optimize(void* optimizer, const TF_Buffer* graph_buf,
         SET_STATUS_IF_ERROR(tf_status, RunRemapper(&opt_ctx, item, graph_def,
                                                    &optimized_graph_def, true,
                                                    RemapperLevel(i)));
+        record_pass(strings::StrCat("remapper_", i));
       }
     }
   }
@@ -175,6 +235,7 @@ void Optimizer_Optimize(void* optimizer, const TF_Buffer* graph_buf,
     SET_STATUS_IF_ERROR(
         tf_status,
         RunAutoMixedPrecision(&opt_ctx, item, graph_def, &optimized_graph_def));
+    record_pass("auto_mixed_precision");
     // Because after running auto_mixed_precision, it will insert Cast op
     // before Const op. So run remapper Const + Cast fusion will remove
     // these overhead.
@@ -183,6 +244,7 @@ void Optimizer_Optimize(void* optimizer, const TF_Buffer* graph_buf,
       optimized_graph_def.Swap(&graph_def);
       SET_STATUS_IF_ERROR(tf_status, RunRemapper(&opt_ctx, item, graph_def,
                                                  &optimized_graph_def));
+      record_pass("remapper_after_amp");
     }
   }
 
@@ -191,6 +253,7 @@ void Optimizer_Optimize(void* optimizer, const TF_Buffer* graph_buf,
     optimized_graph_def.Swap(&graph_def);
     SET_STATUS_IF_ERROR(tf_status,
                         RunOneDnnGraph(item, graph_def, &optimized_graph_def));
+    record_pass("onednn_graph");
 
     // Run the full scope remapper here since only got partial remapper before
     // if oneDNN graph is enabled.
@@ -200,6 +263,7 @@ void Optimizer_Optimize(void* optimizer, const TF_Buffer* graph_buf,
         SET_STATUS_IF_ERROR(tf_status, RunRemapper(&opt_ctx, item, graph_def,
                                                    &optimized_graph_def, true,
                                                    RemapperLevel(i)));
+        record_pass(strings::StrCat("remapper_after_onednn_graph_", i));
       }
     }
   }
@@ -209,6 +273,7 @@ void Optimizer_Optimize(void* optimizer, const TF_Buffer* graph_buf,
     optimized_graph_def.Swap(&graph_def);
     SET_STATUS_IF_ERROR(tf_status, RunOneDnnLayout(&opt_ctx, item, graph_def,
                                                    &optimized_graph_def));
+    record_pass("onednn_layout");
   }
 
   // Put post Native Format rewrite pass for better co-working with oneDNN
@@ -216,11 +281,13 @@ void Optimizer_Optimize(void* optimizer, const TF_Buffer* graph_buf,
   optimized_graph_def.Swap(&graph_def);
   SET_STATUS_IF_ERROR(tf_status, RunNativeLayout(&opt_ctx, item, graph_def,
                                                  &optimized_graph_def));
+  record_pass("native_layout");
 
   // Memory Optimization
   optimized_graph_def.Swap(&graph_def);
   SET_STATUS_IF_ERROR(tf_status, RunMemoryOptPass(&opt_ctx, item, graph_def,
                                                   &optimized_graph_def));
+  record_pass("memory_opt");
 
   if (IsVerboseEnabled()) {
     end = std::chrono::steady_clock::now();
@@ -233,6 +300,21 @@ void Optimizer_Optimize(void* optimizer, const TF_Buffer* graph_buf,
     DumpGraphDefToFile("itex_optimizer", optimized_graph_def, "./");
   }
 
+  if (report) WriteOptimizerReport(*report, optimized_graph_def);
+
+  if (!cache_key.empty() && !IsGraphCacheable(optimized_graph_def)) {
+    ITEX_VLOG(1) << "Don't cache graph with oneDNN Graph partitions: "
+                 << cache_key;
+  } else if (!cache_key.empty()) {
+    Status cache_status = SaveOptimizedGraph(cache_key, optimized_graph_def);
+    if (cache_status.ok()) {
+      ITEX_VLOG(1) << "Save optimized graph to cache: " << cache_key;
+    } else {
+      ITEX_LOG(WARNING) << "Failed to save optimized graph to cache: "
+                        << cache_status;
+    }
+  }
+
   // Serialize output GraphDef into optimized_graph_buf.
   SET_STATUS_IF_ERROR(
       tf_status, MessageToBuffer(optimized_graph_def, optimized_graph_buf));
@@ -16,8 +16,44 @@ limitations under the License.
 #include "itex/core/kernels/common.h"
 
 #include <mutex>  // NOLINT(build/c++11)
+#include <string>
+#include <unordered_set>
+
+#include "protos/op_def.pb.h"
+#include "tensorflow/c/c_api.h"
+
+namespace {
+// Serialized OpList of the ops added to TensorFlow by RegisterOps().
+std::string* registered_op_list = new std::string;
+
+itex::OpList GetAllOpList() {
+  TF_Buffer* buffer = TF_GetAllOpList();
+  itex::OpList op_list;
+  op_list.ParseFromArray(buffer->data, buffer->length);
+  TF_DeleteBuffer(buffer);
+  return op_list;
+}
+
+void RegisterOpsAndRecord() {
+  std::unordered_set<std::string> tf_ops;
+  for (const auto& op : GetAllOpList().op()) tf_ops.insert(op.name());
+
+  RegisterOps();
+
+  itex::OpList itex_ops;
+  for (const auto& op : GetAllOpList().op()) {
+    if (tf_ops.count(op.name()) == 0) *itex_ops.add_op() = op;
+  }
+  itex_ops.SerializeToString(registered_op_list);
+}
+}  // namespace
 
 void CallOnce_RegisterOps() {
   static std::once_flag flag;
-  std::call_once(flag, RegisterOps);
+  std::call_once(flag, RegisterOpsAndRecord);
+}
+
+const char* GetRegisteredOpList(size_t* length) {
+  *length = registered_op_list->size();
+  return registered_op_list->data();
 }
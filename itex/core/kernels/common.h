@@ -16,11 +16,19 @@ limitations under the License.
 #ifndef ITEX_CORE_KERNELS_COMMON_H_
 #define ITEX_CORE_KERNELS_COMMON_H_
 
+#include <stddef.h>
+
 #include "itex/core/ops/op_init.h"
 #ifdef __cplusplus
 extern "C" {
 #endif
 void CallOnce_RegisterOps();
+
+// Serialized OpList of the ops ITEX added to TensorFlow in
+// CallOnce_RegisterOps(), empty before it. Ops which TensorFlow already has,
+// e.g. the legacy ops of Intel TensorFlow, are not included. It's used to
+// generate the Python op wrappers of ITEX only.
+const char* GetRegisteredOpList(size_t* length);
 #ifdef __cplusplus
 }
 #endif
@@ -26,6 +26,7 @@ limitations under the License.
 
 #include "itex/core/kernels/common/host_data_cache.h"
 #include "itex/core/kernels/common/matmul_op.h"
+#include "itex/core/utils/onednn/onednn_primitive_cache.h"
 
 namespace itex {
 
@@ -172,10 +173,18 @@ class BatchMatMulOp : public OpKernel {
                                      GetTensorBuffer<Toutput>(&bias_tensor));
       }
 
-      // Create matmul forward primitive
-      auto fwd_pd =
-          GetPrimitiveDesc(ctx, src_md, wei_md_prefer, bias_md, dst_md);
-      matmul_primitive_ = matmul(fwd_pd);
+      // Create matmul forward primitive, or reuse it if this shape has been
+      // seen before.
+      PrimitiveCacheKeyCreator key_creator;
+      key_creator.AddAsKey(params->a_dims);
+      key_creator.AddAsKey(params->a_strides);
+      key_creator.AddAsKey(params->b_dims);
+      key_creator.AddAsKey(params->b_strides);
+      key_creator.AddAsKey(params->c_dims);
+      key_creator.AddAsKey<bool>(is_filter_const_);
+      key_creator.AddAsKey<bool>(post_op_util_.HasBias());
+      auto fwd_pd = GetOrCreatePrimitive(ctx, src_md, wei_md_prefer, bias_md,
+                                         dst_md, &key_creator);
 
       // Create src memory, check if src needs to be reordered
       src_mem_ = CreateDnnlMemory(src_md, onednn_engine_,
@@ -328,17 +337,14 @@ class BatchMatMulOp : public OpKernel {
     return;
   }
 
-  matmul::primitive_desc GetPrimitiveDesc(OpKernelContext* ctx,
-                                          const memory::desc& src_desc,
-                                          const memory::desc& weights_desc,
-                                          const memory::desc& bias_desc,
-                                          const memory::desc& dst_desc) {
-    dnnl::primitive_attr post_ops_attr;
-    post_ops_attr.set_scratchpad_mode(dnnl::scratchpad_mode::user);
-    if (std::is_same<Tlhs, float>::value) {
-      post_ops_attr.set_fpmath_mode(fp32_math_mode_);
-    }
-
+  // Set `matmul_primitive_` and return its primitive desc. The primitive is
+  // taken from `primitive_cache_` if `key_creator` combined with the binary
+  // input shapes and post op attributes hits, otherwise it is created and
+  // cached.
+  matmul::primitive_desc GetOrCreatePrimitive(
+      OpKernelContext* ctx, const memory::desc& src_desc,
+      const memory::desc& weights_desc, const memory::desc& bias_desc,
+      const memory::desc& dst_desc, PrimitiveCacheKeyCreator* key_creator) {
     if (post_op_util_.HasOutputScales()) {
       // mul_value = INT8 scale
       float mul_value = 1.0;
@@ -367,6 +373,7 @@ class BatchMatMulOp : public OpKernel {
 
       auto binary_dims = TFShapeToOneDnnDims(tf_shape);
       auto binary_strides = CalculateTFStrides(binary_dims);
+      key_creator->AddAsKey(binary_dims);
       auto binary_md =
           memory::desc(binary_dims, OneDnnType<Toutput>(), binary_strides);
 
@@ -378,14 +385,35 @@ class BatchMatMulOp : public OpKernel {
           {DNNL_ARG_ATTR_MULTIPLE_POST_OP(i) | DNNL_ARG_SRC_1, binary_mem_[i]});
     }
 
+    key_creator->AddAsKey<int>(static_cast<int>(OneDnnType<Tlhs>()));
+    key_creator->AddAsKey<int>(static_cast<int>(OneDnnType<Trhs>()));
+    key_creator->AddAsKey<int>(static_cast<int>(OneDnnType<Toutput>()));
+    key_creator->AddAsKey<int>(static_cast<int>(fp32_math_mode_));
+    key_creator->AddAsKey<const void*>(onednn_engine_.get());
+    post_op_util_.AddAsKey(key_creator);
+    auto* cached = primitive_cache_.Get(key_creator->GetKey());
+    if (cached != nullptr) {
+      matmul_primitive_ = cached->primitive;
+      return cached->pd;
+    }
+
+    dnnl::primitive_attr post_ops_attr;
+    post_ops_attr.set_scratchpad_mode(dnnl::scratchpad_mode::user);
+    if (std::is_same<Tlhs, float>::value) {
+      post_ops_attr.set_fpmath_mode(fp32_math_mode_);
+    }
     post_op_util_.SetPostOpAttr(&post_ops_attr, md_list);
+    matmul::primitive_desc fwd_pd;
     if (post_op_util_.HasBias()) {
-      return matmul::primitive_desc(onednn_engine_, src_desc, weights_desc,
-                                    bias_desc, dst_desc, post_ops_attr);
+      fwd_pd = matmul::primitive_desc(onednn_engine_, src_desc, weights_desc,
+                                      bias_desc, dst_desc, post_ops_attr);
     } else {
-      return matmul::primitive_desc(onednn_engine_, src_desc, weights_desc,
-                                    dst_desc, post_ops_attr);
+      fwd_pd = matmul::primitive_desc(onednn_engine_, src_desc, weights_desc,
+                                      dst_desc, post_ops_attr);
     }
+    matmul_primitive_ = matmul(fwd_pd);
+    primitive_cache_.Insert(key_creator->GetKey(), {fwd_pd, matmul_primitive_});
+    return fwd_pd;
   }
 
  private:
@@ -419,6 +447,9 @@ class BatchMatMulOp : public OpKernel {
   memory src_mem_, weights_mem_, weights_mem_input_, bias_mem_, dst_mem_,
       binary_mem_[kMaxBinaryNum_], scratchpad_mem_;
   dnnl::matmul matmul_primitive_;
+  // Primitives of recently seen shapes, guarded by `mu_compute_`.
+  PrimitiveLRUCache<CachedPrimitive<matmul::primitive_desc, matmul>>
+      primitive_cache_;
   Tensor* dst_tensor_;
   std::shared_ptr<Tensor> tmp_weight_;
   std::shared_ptr<Tensor> scratchpad_tensor_;
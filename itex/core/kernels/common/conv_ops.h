@@ -28,6 +28,7 @@ limitations under the License.
 #include "itex/core/utils/errors.h"
 #include "itex/core/utils/onednn/onednn_layout_util.h"
 #include "itex/core/utils/onednn/onednn_post_op_util.h"
+#include "itex/core/utils/onednn/onednn_primitive_cache.h"
 #include "itex/core/utils/onednn/onednn_util.h"
 #include "itex/core/utils/op_kernel.h"
 #include "itex/core/utils/op_requires.h"
@@ -903,20 +904,6 @@ class ConvOpBase : public OpKernel {
           memory::desc({dst_dims_onednn_}, OneDnnType<Toutput>(), tag_opt);
 
       this->ExtendInt8PostOps(context);
-      // Set post op attribution.
-      dnnl::primitive_attr post_ops_attr;
-      if (!post_op_util_.HasBN()) {
-        post_op_util_.SetPostOpAttr(&post_ops_attr);
-      }
-      post_ops_attr.set_scratchpad_mode(dnnl::scratchpad_mode::user);
-      if (std::is_same<Tinput, float>::value) {
-        post_ops_attr.set_fpmath_mode(fp32_math_mode_);
-      }
-      if (this->post_op_util_.HasOutputScales() &&
-          post_op_util_.GetOutputScale().size() > 1 && is_depthwise) {
-        // For depthwise convolution mask should be 1<<0 + 1<<1 in onednn3.0
-        post_ops_attr.set_scales_mask(DNNL_ARG_WEIGHTS, 3);
-      }
 
       if (post_op_util_.HasBN()) {
         // Since batchnorm do the following for each input x:
@@ -947,20 +934,14 @@ class ConvOpBase : public OpKernel {
             bn_var_tensor.vec<float>(), bn_epsilon_);
         post_op_util_.SetBNMemory(bn_scale_tensor, bn_mean_tensor,
                                   bn_offset_tensor, cached_bn_rsqrt_tensor_);
-        post_op_util_.SetBNPostOpAttr(&post_ops_attr);
       }
 
-      fwd_pd_ =
-          ConvFwdPd(onednn_engine_, prop_kind::forward,
-                    dnnl::algorithm::convolution_direct, src_md_opt,
-                    filter_md_prefer, dst_md_opt, stride_dims, dilation_dims,
-                    pad_left_dims, pad_right_dims, post_ops_attr);
-
+      memory::desc bias_md;
       if (post_op_util_.HasBias()) {
         const Tensor& bias_tensor = context->input(kBiasIndex_);
         TensorShape bias_tensor_shape = bias_tensor.shape();
         conv_util.GetBiasDimension(bias_tensor_shape, &bias_dims);
-        auto bias_md =
+        bias_md =
             memory::desc(bias_dims, OneDnnType<Tbias>(), memory::format_tag::x);
         // GetBiasHandle is needed for INT8 kernels, where bias scaling is
         // required.
@@ -979,11 +960,62 @@ class ConvOpBase : public OpKernel {
         }
 
         fwd_primitives_args_.insert({DNNL_ARG_BIAS, bias_mem_});
-        fwd_pd_ = ConvFwdPd(onednn_engine_, prop_kind::forward,
-                            dnnl::algorithm::convolution_direct, src_md_opt,
-                            filter_md_prefer, bias_md, dst_md_opt, stride_dims,
-                            dilation_dims, pad_left_dims, pad_right_dims,
-                            post_ops_attr);
+      }
+
+      // Reuse the primitive if this shape has been seen before.
+      PrimitiveCacheKeyCreator key_creator;
+      key_creator.AddAsKey(src_dims);
+      key_creator.AddAsKey(filter_dims);
+      key_creator.AddAsKey(dst_dims_onednn_);
+      key_creator.AddAsKey(stride_dims);
+      key_creator.AddAsKey(dilation_dims);
+      key_creator.AddAsKey(pad_left_dims);
+      key_creator.AddAsKey(pad_right_dims);
+      key_creator.AddAsKey(bias_dims);
+      key_creator.AddAsKey<bool>(is_grouped_convolution);
+      key_creator.AddAsKey<int>(static_cast<int>(fp32_math_mode_));
+      key_creator.AddAsKey<const void*>(onednn_engine_.get());
+      post_op_util_.AddAsKey(&key_creator);
+      auto* cached = primitive_cache_.Get(key_creator.GetKey());
+      if (cached != nullptr) {
+        fwd_pd_ = cached->pd;
+        fwd_primitive_ = cached->primitive;
+      } else {
+        // Set post op attribution.
+        dnnl::primitive_attr post_ops_attr;
+        if (!post_op_util_.HasBN()) {
+          post_op_util_.SetPostOpAttr(&post_ops_attr);
+        }
+        post_ops_attr.set_scratchpad_mode(dnnl::scratchpad_mode::user);
+        if (std::is_same<Tinput, float>::value) {
+          post_ops_attr.set_fpmath_mode(fp32_math_mode_);
+        }
+        if (this->post_op_util_.HasOutputScales() &&
+            post_op_util_.GetOutputScale().size() > 1 && is_depthwise) {
+          // For depthwise convolution mask should be 1<<0 + 1<<1 in onednn3.0
+          post_ops_attr.set_scales_mask(DNNL_ARG_WEIGHTS, 3);
+        }
+        if (post_op_util_.HasBN()) {
+          post_op_util_.SetBNPostOpAttr(&post_ops_attr);
+        }
+
+        if (post_op_util_.HasBias()) {
+          fwd_pd_ = ConvFwdPd(onednn_engine_, prop_kind::forward,
+                              dnnl::algorithm::convolution_direct, src_md_opt,
+                              filter_md_prefer, bias_md, dst_md_opt,
+                              stride_dims, dilation_dims, pad_left_dims,
+                              pad_right_dims, post_ops_attr);
+        } else {
+          fwd_pd_ =
+              ConvFwdPd(onednn_engine_, prop_kind::forward,
+                        dnnl::algorithm::convolution_direct, src_md_opt,
+                        filter_md_prefer, dst_md_opt, stride_dims,
+                        dilation_dims, pad_left_dims, pad_right_dims,
+                        post_ops_attr);
+        }
+        fwd_primitive_ = convolution_forward(fwd_pd_);
+        primitive_cache_.Insert(key_creator.GetKey(),
+                                {fwd_pd_, fwd_primitive_});
       }
 
       // keep tensor out of if block to avoid of being deallocated
@@ -1018,8 +1050,6 @@ class ConvOpBase : public OpKernel {
           dnnl::memory(fwd_pd_.scratchpad_desc(), onednn_engine_,
                        GetTensorBuffer<Tinput>(scratchpad_tensor_.get()));
 
-      fwd_primitive_ = convolution_forward(fwd_pd_);
-
       src_mem_ = CreateDnnlMemory(src_md, onednn_engine_,
                                   GetTensorBuffer<Tinput>(&src_tensor));
       dst_mem_ = CreateDnnlMemory(
@@ -1101,6 +1131,8 @@ class ConvOpBase : public OpKernel {
       if (post_op_util_.HasBN()) {
         post_op_util_.AddBNPrimArgs(&fwd_primitives_args_);
       }
+      // Output scales aren't part of the cached primitive, so they are always
+      // passed as an execution argument.
       if (this->post_op_util_.HasOutputScales()) {
         float* output_scale_ptr = output_scale_cache_.GetCachedPtr(
             context, this->post_op_util_.GetOutputScale().data(),
@@ -1146,6 +1178,8 @@ class ConvOpBase : public OpKernel {
 
   mutex mu_compute_;
   HostDataCache<Device, float> output_scale_cache_;
+  // Primitives of recently seen shapes, guarded by `mu_compute_`.
+  PrimitiveLRUCache<CachedPrimitive<ConvFwdPd, primitive>> primitive_cache_;
 
  protected:
   std::vector<int64_t> explicit_paddings_;
@@ -0,0 +1,130 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#ifndef ITEX_CORE_KERNELS_COMMON_FP8_AMAX_AND_SCALE_UPDATE_OP_H_
+#define ITEX_CORE_KERNELS_COMMON_FP8_AMAX_AND_SCALE_UPDATE_OP_H_
+
+#include <numeric>
+#include <string>
+#include <vector>
+
+#include "itex/core/kernels/common/variable_input_helpers.h"
+#include "itex/core/utils/errors.h"
+#include "itex/core/utils/op_kernel.h"
+#include "itex/core/utils/op_requires.h"
+#include "itex/core/utils/plugin_tensor.h"
+#include "itex/core/utils/tensor_shape.h"
+#include "itex/core/utils/types.h"
+
+namespace itex {
+namespace functor {
+
+// Updates the amax history and scaling factors of a fp8 meta tensor in place.
+// `amax_history` is [history_len, num] and `scale`/`scale_inv` are [num]. The
+// first row holds the amaxes of the current step, which are written by fp8
+// kernels, and the other rows are a ring buffer of the amaxes of previous
+// steps, whose next slot to write is `amax_history_index`.
+//
+// For each tensor, amax is the max of the history ("max") or the first row
+// ("most_recent"), and the new scale is
+//   2 ^ (floor(log2(fp8_max / amax)) - margin),
+// or the old scale if amax is 0 or not finite. Then the first row is moved
+// to the ring buffer and zeroed for the next step, which writes O(num)
+// elements instead of rolling the whole history.
+template <typename Device>
+struct Fp8AmaxAndScaleUpdate {
+  void operator()(OpKernelContext* ctx, float* amax_history,
+                  int64* amax_history_index, float* scale, float* scale_inv,
+                  int history_len, int num, float fp8_max, float margin,
+                  bool most_recent);
+};
+
+}  // namespace functor
+
+// Updates N fp8 meta tensors with one op. All inputs are resource variables
+// updated in place: amax_history[N], amax_history_index[N], scale[N] and
+// scale_inv[N]. They are locked for the update and copied first if they are
+// shared with other tensors.
+template <typename Device>
+class Fp8AmaxAndScaleUpdateOp : public OpKernel {
+ public:
+  explicit Fp8AmaxAndScaleUpdateOp(OpKernelConstruction* context)
+      : OpKernel(context) {
+    OP_REQUIRES_OK(context, context->GetAttr("fp8_max", &fp8_max_));
+    OP_REQUIRES_OK(context, context->GetAttr("margin", &margin_));
+    std::string amax_compute_algo;
+    OP_REQUIRES_OK(context,
+                   context->GetAttr("amax_compute_algo", &amax_compute_algo));
+    most_recent_ = amax_compute_algo == "most_recent";
+  }
+
+  void Compute(OpKernelContext* context) override {
+    const int n = context->num_inputs() / 4;
+    OP_REQUIRES(
+        context, static_cast<int>(fp8_max_.size()) == n,
+        errors::InvalidArgument("fp8_max must have ", n, " elements, but got ",
+                                fp8_max_.size()));
+
+    std::vector<int> variable_ids(4 * n);
+    std::iota(variable_ids.begin(), variable_ids.end(), 0);
+    VariableInputLocks locks(context, /*do_lock=*/true, variable_ids);
+
+    auto get_variable = [context](int input, Tensor* out) {
+      return GetVariableInput<Device>(context, input, /*lock_held=*/true, out);
+    };
+
+    for (int i = 0; i < n; ++i) {
+      Tensor amax_history, amax_history_index, scale, scale_inv;
+      OP_REQUIRES_OK(context, get_variable(i, &amax_history));
+      OP_REQUIRES_OK(context, get_variable(n + i, &amax_history_index));
+      OP_REQUIRES_OK(context, get_variable(2 * n + i, &scale));
+      OP_REQUIRES_OK(context, get_variable(3 * n + i, &scale_inv));
+
+      OP_REQUIRES(context, amax_history.dims() == 2,
+                  errors::InvalidArgument("amax_history must be 2-dimensional",
+                                          amax_history.shape().DebugString()));
+      const int history_len = amax_history.dim_size(0);
+      const int num = amax_history.dim_size(1);
+      OP_REQUIRES(context, history_len > 0,
+                  errors::InvalidArgument("amax_history must not be empty"));
+      OP_REQUIRES(context, amax_history_index.NumElements() == 1,
+                  errors::InvalidArgument(
+                      "amax_history_index must be a scalar, but got ",
+                      amax_history_index.shape().DebugString()));
+      OP_REQUIRES(context,
+                  scale.NumElements() == num && scale_inv.NumElements() == num,
+                  errors::InvalidArgument("scale and scale_inv must have ", num,
+                                          " elements, but got ",
+                                          scale.shape().DebugString(), " and ",
+                                          scale_inv.shape().DebugString()));
+      if (num == 0) continue;
+
+      functor::Fp8AmaxAndScaleUpdate<Device>()(
+          context, amax_history.flat<float>().data(),
+          amax_history_index.flat<int64>().data(), scale.flat<float>().data(),
+          scale_inv.flat<float>().data(), history_len, num, fp8_max_[i],
+          margin_, most_recent_);
+    }
+  }
+
+ private:
+  std::vector<float> fp8_max_;
+  float margin_;
+  bool most_recent_;
+};
+
+}  // namespace itex
+
+#endif  // ITEX_CORE_KERNELS_COMMON_FP8_AMAX_AND_SCALE_UPDATE_OP_H_
@@ -29,6 +29,7 @@ limitations under the License.
 #include "itex/core/utils/errors.h"
 #include "itex/core/utils/onednn/onednn_layout_util.h"
 #include "itex/core/utils/onednn/onednn_post_op_util.h"
+#include "itex/core/utils/onednn/onednn_primitive_cache.h"
 #include "itex/core/utils/onednn/onednn_util.h"
 #include "itex/core/utils/op_kernel.h"
 #include "itex/core/utils/op_requires.h"
@@ -483,29 +484,54 @@ class MatMulOp : public OpKernel {
       auto dst_md =
           memory::desc(params->c_dims, OneDnnType<Tout>(), params->c_strides);
       dnnl::matmul::primitive_desc matmul_pd;
-      dnnl::primitive_attr post_ops_attr;
-
-      post_ops_attr.set_scratchpad_mode(dnnl::scratchpad_mode::user);
-      if (std::is_same<T, float>::value) {
-        post_ops_attr.set_fpmath_mode(fp32_math_mode_);
-      }
-      // Set post ops attr after handling all fusions.
-      post_op_util_.SetPostOpAttr(&post_ops_attr);
-
+      memory::desc bias_md;
       if (post_op_util_.HasBias()) {
         // bias use same dims as dst
-        auto bias_md = memory::desc(params->bias_dims, OneDnnType<Tpost>(),
-                                    params->bias_strides);
+        bias_md = memory::desc(params->bias_dims, OneDnnType<Tpost>(),
+                               params->bias_strides);
         // create bias memory
         const Tensor& bias_tensor = context->input(kBiasIndex_);
         bias_mem_ = CreateDnnlMemory(bias_md, dnnl_engine_,
                                      GetTensorBuffer<Tpost>(&bias_tensor));
-        matmul_pd = dnnl::matmul::primitive_desc(dnnl_engine_, src_md,
-                                                 weights_md_prefer, bias_md,
-                                                 dst_md, post_ops_attr);
+      }
+
+      // Reuse the primitive if this shape has been seen before.
+      PrimitiveCacheKeyCreator key_creator;
+      key_creator.AddAsKey(params->a_dims);
+      key_creator.AddAsKey(params->a_strides);
+      key_creator.AddAsKey(params->b_dims);
+      key_creator.AddAsKey(params->b_strides);
+      key_creator.AddAsKey(params->c_dims);
+      key_creator.AddAsKey<int>(static_cast<int>(OneDnnType<T>()));
+      key_creator.AddAsKey<int>(static_cast<int>(OneDnnType<Tout>()));
+      key_creator.AddAsKey<int>(static_cast<int>(fp32_math_mode_));
+      key_creator.AddAsKey<bool>(is_filter_const_);
+      key_creator.AddAsKey<const void*>(dnnl_engine_.get());
+      post_op_util_.AddAsKey(&key_creator);
+      auto* cached = primitive_cache_.Get(key_creator.GetKey());
+      if (cached != nullptr) {
+        matmul_pd = cached->pd;
+        matmul_primitive_ = cached->primitive;
       } else {
-        matmul_pd = dnnl::matmul::primitive_desc(
-            dnnl_engine_, src_md, weights_md_prefer, dst_md, post_ops_attr);
+        dnnl::primitive_attr post_ops_attr;
+        post_ops_attr.set_scratchpad_mode(dnnl::scratchpad_mode::user);
+        if (std::is_same<T, float>::value) {
+          post_ops_attr.set_fpmath_mode(fp32_math_mode_);
+        }
+        // Set post ops attr after handling all fusions.
+        post_op_util_.SetPostOpAttr(&post_ops_attr);
+
+        if (post_op_util_.HasBias()) {
+          matmul_pd = dnnl::matmul::primitive_desc(dnnl_engine_, src_md,
+                                                   weights_md_prefer, bias_md,
+                                                   dst_md, post_ops_attr);
+        } else {
+          matmul_pd = dnnl::matmul::primitive_desc(
+              dnnl_engine_, src_md, weights_md_prefer, dst_md, post_ops_attr);
+        }
+        matmul_primitive_ = dnnl::matmul(matmul_pd);
+        primitive_cache_.Insert(key_creator.GetKey(),
+                                {matmul_pd, matmul_primitive_});
       }
 
       // Handle Add fusion and decide output tensor buffer.
@@ -600,7 +626,6 @@ class MatMulOp : public OpKernel {
           dnnl::memory(matmul_pd.scratchpad_desc(), dnnl_engine_,
                        GetTensorBuffer<T>(scratchpad_tensor_.get()));
 
-      matmul_primitive_ = dnnl::matmul(matmul_pd);
       src_mem_ = CreateDnnlMemory(src_md, dnnl_engine_,
                                   GetTensorBuffer<T>(&src_tensor));
       dst_mem_ = CreateDnnlMemory(dst_md, dnnl_engine_,
@@ -673,6 +698,10 @@ class MatMulOp : public OpKernel {
   bool enable_omp_;
 #endif
   mutex mu_compute_;
+  // Primitives of recently seen shapes, guarded by `mu_compute_`.
+  PrimitiveLRUCache<
+      CachedPrimitive<dnnl::matmul::primitive_desc, dnnl::matmul>>
+      primitive_cache_;
   std::unordered_map<int, memory> fwd_primitive_args_;
   memory src_mem_, weights_mem_, weights_mem_input_, dst_mem_, bias_mem_,
       add_mem_, fuse_add_src_mem_, fuse_add_dst_mem_, scratchpad_mem_;
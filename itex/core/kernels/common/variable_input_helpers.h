@@ -0,0 +1,111 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#ifndef ITEX_CORE_KERNELS_COMMON_VARIABLE_INPUT_HELPERS_H_
+#define ITEX_CORE_KERNELS_COMMON_VARIABLE_INPUT_HELPERS_H_
+
+#include <cstring>
+#include <vector>
+
+#include "itex/core/utils/errors.h"
+#include "itex/core/utils/op_kernel.h"
+#include "itex/core/utils/plugin_tensor.h"
+#include "itex/core/utils/status.h"
+#include "itex/core/utils/tensor_shape.h"
+#include "itex/core/utils/types.h"
+
+namespace itex {
+
+// Copies a resource variable which is shared with other tensors before it's
+// updated in place, see PrepareToUpdateVariable of TensorFlow. The copy is
+// bytewise, so one functor serves all data types.
+template <typename Device>
+void CopyVariable(TF_OpKernelContext* tf_ctx, TF_Tensor* tf_source,
+                  TF_Tensor* tf_dest);
+
+template <>
+inline void CopyVariable<Eigen::ThreadPoolDevice>(TF_OpKernelContext* tf_ctx,
+                                                  TF_Tensor* tf_source,
+                                                  TF_Tensor* tf_dest) {
+  const Tensor source(tf_source);
+  Tensor dest(tf_dest);
+  std::memcpy(dest.data(), source.data(), source.TotalBytes());
+}
+
+#ifndef INTEL_CPU_ONLY
+template <>
+inline void CopyVariable<Eigen::GpuDevice>(TF_OpKernelContext* tf_ctx,
+                                           TF_Tensor* tf_source,
+                                           TF_Tensor* tf_dest) {
+  OpKernelContext ctx(tf_ctx);
+  const Tensor source(tf_source);
+  Tensor dest(tf_dest);
+  ctx.GetDeviceStream()
+      ->memcpy(dest.data(), source.data(), source.TotalBytes())
+      .wait();
+}
+#endif  // INTEL_CPU_ONLY
+
+// Holds the mutexes of the variable inputs, which are acquired in address
+// order, until destroyed.
+class VariableInputLocks {
+ public:
+  VariableInputLocks(OpKernelContext* ctx, bool do_lock,
+                     const std::vector<int>& input_ids) {
+    TF_Status* tf_status = TF_NewStatus();
+    TF_MaybeLockVariableInputMutexesInOrder(
+        ctx->Get(), do_lock, /*sparse=*/false, input_ids.data(),
+        input_ids.size(), EmptyCopyFunctor, &lock_holder_, tf_status);
+    ITEX_CHECK_OK(StatusFromTF_Status(tf_status));
+    TF_DeleteStatus(tf_status);
+  }
+
+  ~VariableInputLocks() { TF_ReleaseVariableInputLockHolder(lock_holder_); }
+
+ private:
+  TF_VariableInputLockHolder* lock_holder_ = nullptr;
+};
+
+// Gets the variable of input `input` to update in place. The variable is
+// copied first if it's shared with other tensors, so the update isn't seen
+// by the tensors read from it before.
+template <typename Device>
+Status GetVariableInput(OpKernelContext* ctx, int input, bool lock_held,
+                        Tensor* out) {
+  TF_Status* tf_status = TF_NewStatus();
+  TF_Tensor* tf_tensor = nullptr;
+  TF_GetInputTensorFromVariable(ctx->Get(), input, lock_held,
+                                /*isVariantType=*/false, /*sparse=*/false,
+                                CopyVariable<Device>, &tf_tensor, tf_status);
+  Status status = StatusFromTF_Status(tf_status);
+  TF_DeleteStatus(tf_status);
+  TF_RETURN_IF_ERROR(status);
+
+  TensorShape shape;
+  for (int i = 0; i < TF_NumDims(tf_tensor); ++i) {
+    shape.AddDim(TF_Dim(tf_tensor, i));
+  }
+  *out =
+      Tensor(static_cast<DataType>(TF_TensorType(tf_tensor)), shape, tf_tensor);
+  if (!out->IsInitialized()) {
+    return errors::FailedPrecondition(
+        "Attempting to use uninitialized variables");
+  }
+  return Status::OK();
+}
+
+}  // namespace itex
+
+#endif  // ITEX_CORE_KERNELS_COMMON_VARIABLE_INPUT_HELPERS_H_
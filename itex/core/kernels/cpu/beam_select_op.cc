@@ -0,0 +1,251 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include <cstring>
+#include <vector>
+
+#include "itex/core/kernels/common/variable_input_helpers.h"
+#include "itex/core/utils/errors.h"
+#include "itex/core/utils/op_kernel.h"
+#include "itex/core/utils/op_requires.h"
+#include "itex/core/utils/plugin_tensor.h"
+#include "itex/core/utils/register_types.h"
+#include "itex/core/utils/tensor_shape.h"
+#include "itex/core/utils/types.h"
+#include "third_party/eigen3/unsupported/Eigen/CXX11/Tensor"
+
+namespace itex {
+
+typedef Eigen::ThreadPoolDevice CPUDevice;
+
+namespace functor {
+
+// Copies the kv cache of beam indices[b, j] to beam j for each batch b, i.e.
+// tf.gather(cache, indices, axis=1, batch_dims=1), for the tokens in
+// [input_length, valid_length). Tokens before input_length are the prompt,
+// which is the same for all beams. `cache` and `output_cache` are
+// [batch, beam, num_heads, length, head_dim], and may be the same buffer.
+//
+// Each (batch, head) is an independent task. The tokens of one beam are
+// contiguous, so a beam is moved with one memcpy. Beams selecting themselves
+// are skipped, which is the common case after a few decoding steps.
+template <typename T, typename Index>
+struct BeamSelectKVCache {
+  void operator()(const CPUDevice& d, const T* cache, const Index* indices,
+                  T* output_cache, int batch, int beam, int num_heads,
+                  int length, int head_dim, int input_length,
+                  int valid_length) {
+    const int64 beam_stride = static_cast<int64>(num_heads) * length * head_dim;
+    const int64 head_stride = static_cast<int64>(length) * head_dim;
+    const int64 prefix_size = static_cast<int64>(input_length) * head_dim;
+    const int64 select_size =
+        static_cast<int64>(valid_length - input_length) * head_dim;
+    const bool inplace = cache == output_cache;
+
+    auto task = [&](Eigen::Index first, Eigen::Index last) {
+      std::vector<T> buffer;
+      for (Eigen::Index id = first; id < last; ++id) {
+        const int64 b = id / num_heads;
+        const int64 h = id % num_heads;
+        const Index* beam_indices = indices + b * beam;
+        const int64 offset = b * beam * beam_stride + h * head_stride;
+
+        if (!inplace) {
+          for (int j = 0; j < beam; ++j) {
+            const T* src = cache + offset + j * beam_stride;
+            T* dst = output_cache + offset + j * beam_stride;
+            std::memcpy(dst, src, prefix_size * sizeof(T));
+            std::memcpy(
+                dst + prefix_size,
+                cache + offset + beam_indices[j] * beam_stride + prefix_size,
+                select_size * sizeof(T));
+            std::memcpy(dst + prefix_size + select_size,
+                        src + prefix_size + select_size,
+                        (head_stride - prefix_size - select_size) * sizeof(T));
+          }
+          continue;
+        }
+
+        // Stash the beams that are read by other beams before overwriting.
+        bool identity = true;
+        for (int j = 0; j < beam; ++j) identity &= beam_indices[j] == j;
+        if (identity || select_size == 0) continue;
+        buffer.resize(beam * select_size);
+        std::vector<bool> stashed(beam, false);
+        for (int j = 0; j < beam; ++j) {
+          const Index src = beam_indices[j];
+          if (src == j || stashed[src]) continue;
+          std::memcpy(buffer.data() + src * select_size,
+                      cache + offset + src * beam_stride + prefix_size,
+                      select_size * sizeof(T));
+          stashed[src] = true;
+        }
+        for (int j = 0; j < beam; ++j) {
+          const Index src = beam_indices[j];
+          if (src == j) continue;
+          std::memcpy(output_cache + offset + j * beam_stride + prefix_size,
+                      buffer.data() + src * select_size,
+                      select_size * sizeof(T));
+        }
+      }
+    };
+
+    const int64 bytes_per_task = beam * head_stride * sizeof(T);
+    d.parallelFor(batch * num_heads,
+                  Eigen::TensorOpCost(bytes_per_task, bytes_per_task, 0), task);
+  }
+};
+
+}  // namespace functor
+
+namespace {
+
+Status ValidateBeamSelectInputs(const Tensor& cache, const Tensor& indices,
+                                int input_length, int valid_length) {
+  if (cache.dims() != 5) {
+    return errors::InvalidArgument("cache must be 5-dimensional",
+                                   cache.shape().DebugString());
+  }
+  if (indices.dims() != 2) {
+    return errors::InvalidArgument("beam indices must be 2-dimensional",
+                                   indices.shape().DebugString());
+  }
+  if (cache.dim_size(0) != indices.dim_size(0) ||
+      cache.dim_size(1) != indices.dim_size(1)) {
+    return errors::InvalidArgument(
+        "First two dims of cache and indices must be [batch, beam], but got ",
+        cache.shape().DebugString(), " and ", indices.shape().DebugString());
+  }
+  if (input_length < 0 || input_length > valid_length ||
+      valid_length > cache.dim_size(3)) {
+    return errors::InvalidArgument(
+        "Must have 0 <= input_length <= valid_length <= ", cache.dim_size(3),
+        ", but got input_length ", input_length, " and valid_length ",
+        valid_length);
+  }
+  return Status::OK();
+}
+
+template <typename Index>
+Status ValidateBeamIndices(const Tensor& indices, int beam) {
+  const Index* data = indices.flat<Index>().data();
+  for (int64 i = 0; i < indices.NumElements(); ++i) {
+    if (data[i] < 0 || data[i] >= beam) {
+      return errors::InvalidArgument("beam indices must be in [0, ", beam,
+                                     "), but got ", data[i]);
+    }
+  }
+  return Status::OK();
+}
+
+}  // namespace
+
+// Same as the GPU kernel, except the input is forwarded to the output only if
+// it's not used by others, so the result is the same as tf.gather.
+template <typename T, typename Index>
+class BeamSelectOp : public OpKernel {
+ public:
+  explicit BeamSelectOp(OpKernelConstruction* ctx) : OpKernel(ctx) {
+    OP_REQUIRES_OK(ctx, ctx->GetAttr("input_length", &input_length_));
+  }
+
+  void Compute(OpKernelContext* ctx) override {
+    const Tensor& cache = ctx->input(0);
+    const Tensor& indices = ctx->input(1);
+    OP_REQUIRES_OK(ctx, ValidateBeamSelectInputs(
+                            cache, indices, input_length_,
+                            cache.dims() == 5 ? cache.dim_size(3) : 0));
+    OP_REQUIRES_OK(ctx, ValidateBeamIndices<Index>(indices, cache.dim_size(1)));
+
+    Tensor* output_cache = nullptr;
+    OP_REQUIRES_OK(ctx, ctx->forward_input_or_allocate_output(
+                            {0}, 0, cache.shape(), &output_cache));
+    if (cache.NumElements() == 0) return;
+
+    functor::BeamSelectKVCache<T, Index>()(
+        ctx->eigen_cpu_device(), cache.flat<T>().data(),
+        indices.flat<Index>().data(), output_cache->flat<T>().data(),
+        cache.dim_size(0), cache.dim_size(1), cache.dim_size(2),
+        cache.dim_size(3), cache.dim_size(4), input_length_, cache.dim_size(3));
+  }
+
+ private:
+  int input_length_;
+};
+
+// Reorders the beams of a preallocated kv cache variable in place. Only the
+// tokens in [input_length, valid_length) are moved, so the cost follows the
+// decoded length instead of the preallocated one. The variable is locked and
+// copied first if it's shared, e.g. by a value read before this op.
+template <typename T, typename Index>
+class ResourceBeamSelectOp : public OpKernel {
+ public:
+  explicit ResourceBeamSelectOp(OpKernelConstruction* ctx) : OpKernel(ctx) {
+    OP_REQUIRES_OK(ctx, ctx->GetAttr("input_length", &input_length_));
+  }
+
+  void Compute(OpKernelContext* ctx) override {
+    VariableInputLocks locks(ctx, /*do_lock=*/true, {0});
+    Tensor cache;
+    OP_REQUIRES_OK(
+        ctx, GetVariableInput<CPUDevice>(ctx, 0, /*lock_held=*/true, &cache));
+    const Tensor& indices = ctx->input(1);
+    const Tensor& valid_length_tensor = ctx->input(2);
+    OP_REQUIRES(
+        ctx, TensorShapeUtils::IsScalar(valid_length_tensor.shape()),
+        errors::InvalidArgument("valid_length must be a scalar, but "
+                                "got ",
+                                valid_length_tensor.shape().DebugString()));
+    const int valid_length = valid_length_tensor.scalar<int32>()();
+    OP_REQUIRES_OK(ctx, ValidateBeamSelectInputs(cache, indices, input_length_,
+                                                 valid_length));
+    OP_REQUIRES_OK(ctx, ValidateBeamIndices<Index>(indices, cache.dim_size(1)));
+    if (cache.NumElements() == 0) return;
+
+    T* data = cache.flat<T>().data();
+    functor::BeamSelectKVCache<T, Index>()(
+        ctx->eigen_cpu_device(), data, indices.flat<Index>().data(), data,
+        cache.dim_size(0), cache.dim_size(1), cache.dim_size(2),
+        cache.dim_size(3), cache.dim_size(4), input_length_, valid_length);
+  }
+
+ private:
+  int input_length_;
+};
+
+#define REGISTER_BEAM_SELECT(type, index_type)                      \
+  REGISTER_KERNEL_BUILDER(Name("BeamSelectKVCache")                 \
+                              .Device(DEVICE_CPU)                   \
+                              .TypeConstraint<type>("T")            \
+                              .TypeConstraint<index_type>("Index"), \
+                          BeamSelectOp<type, index_type>);          \
+  REGISTER_KERNEL_BUILDER(Name("ResourceBeamSelectKVCache")         \
+                              .Device(DEVICE_CPU)                   \
+                              .TypeConstraint<type>("T")            \
+                              .TypeConstraint<index_type>("Index"), \
+                          ResourceBeamSelectOp<type, index_type>);
+
+#define REGISTER_BEAM_SELECT_ALL_INDICES(type) \
+  REGISTER_BEAM_SELECT(type, int32);           \
+  REGISTER_BEAM_SELECT(type, int64_t);
+
+TF_CALL_float(REGISTER_BEAM_SELECT_ALL_INDICES);
+TF_CALL_half(REGISTER_BEAM_SELECT_ALL_INDICES);
+TF_CALL_bfloat16(REGISTER_BEAM_SELECT_ALL_INDICES);
+
+#undef REGISTER_BEAM_SELECT_ALL_INDICES
+#undef REGISTER_BEAM_SELECT
+
+}  // namespace itex
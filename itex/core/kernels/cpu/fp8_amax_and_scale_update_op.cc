@@ -0,0 +1,78 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include "itex/core/kernels/common/fp8_amax_and_scale_update_op.h"
+
+#include <algorithm>
+#include <cmath>
+#include <cstring>
+#include <vector>
+
+namespace itex {
+
+typedef Eigen::ThreadPoolDevice CPUDevice;
+
+namespace functor {
+
+// Reference implementation, which follows the per-tensor python path in
+// intel_extension_for_tensorflow/python/fp8/autocast.py.
+template <>
+struct Fp8AmaxAndScaleUpdate<CPUDevice> {
+  void operator()(OpKernelContext* ctx, float* amax_history,
+                  int64* amax_history_index, float* scale, float* scale_inv,
+                  int history_len, int num, float fp8_max, float margin,
+                  bool most_recent) {
+    // Scan the history row by row, so the reduction is contiguous in memory.
+    std::vector<float> amax(amax_history, amax_history + num);
+    if (!most_recent) {
+      for (int h = 1; h < history_len; ++h) {
+        const float* row = amax_history + static_cast<int64_t>(h) * num;
+        for (int i = 0; i < num; ++i) {
+          if (std::isnan(amax[i]) || std::isnan(row[i])) {
+            amax[i] = NAN;
+          } else {
+            amax[i] = std::max(amax[i], row[i]);
+          }
+        }
+      }
+    }
+
+    for (int i = 0; i < num; ++i) {
+      const float exp = std::floor(std::log2(fp8_max / amax[i])) - margin;
+      float sf = std::round(std::pow(2.0f, std::fabs(exp)));
+      if (!(amax[i] > 0.0f) || !std::isfinite(amax[i])) sf = scale[i];
+      if (exp < 0.0f) sf = 1.0f / sf;
+      scale[i] = sf;
+      scale_inv[i] = 1.0f / sf;
+    }
+
+    // Move the current amaxes to the ring buffer, then zero them out.
+    const int64_t row_bytes = static_cast<int64_t>(num) * sizeof(float);
+    if (history_len > 1) {
+      const int64 ring_len = history_len - 1;
+      const int64 slot = (*amax_history_index % ring_len + ring_len) % ring_len;
+      std::memcpy(amax_history + (slot + 1) * num, amax_history, row_bytes);
+      *amax_history_index = (slot + 1) % ring_len;
+    }
+    std::memset(amax_history, 0, row_bytes);
+  }
+};
+
+}  // namespace functor
+
+REGISTER_KERNEL_BUILDER(Name("Fp8AmaxAndScaleUpdate").Device(DEVICE_CPU),
+                        Fp8AmaxAndScaleUpdateOp<CPUDevice>);
+
+}  // namespace itex
@@ -0,0 +1,346 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include <algorithm>
+#include <cmath>
+#include <vector>
+
+#include "itex/core/utils/errors.h"
+#include "itex/core/utils/op_kernel.h"
+#include "itex/core/utils/op_requires.h"
+#include "itex/core/utils/plugin_tensor.h"
+#include "itex/core/utils/register_types.h"
+#include "itex/core/utils/tensor_shape.h"
+#include "itex/core/utils/types.h"
+#include "third_party/eigen3/unsupported/Eigen/CXX11/Tensor"
+
+namespace itex {
+
+typedef Eigen::ThreadPoolDevice CPUDevice;
+
+namespace functor {
+
+// Shape of a channels-last input viewed as [batches, hw, channels], whose
+// channels are split into `groups` contiguous groups.
+struct GroupNormShape {
+  int64 batches;
+  int64 hw;
+  int64 channels;
+  int64 groups;
+  int64 chans_per_group;
+};
+
+// Mean and 1 / sqrt(variance + epsilon) of group `g` of batch `n`, computed
+// with the sum and the sum of squares in one pass.
+template <typename T>
+inline void GroupNormStats(const T* x, const GroupNormShape& shape, int64 n,
+                           int64 g, float epsilon, float* mean, float* rstd) {
+  const T* group =
+      x + n * shape.hw * shape.channels + g * shape.chans_per_group;
+  float sum = 0.f, square_sum = 0.f;
+  for (int64 i = 0; i < shape.hw; ++i) {
+    const T* row = group + i * shape.channels;
+    // Partial sums of a row keep the accumulation error small for large hw.
+    float row_sum = 0.f, row_square_sum = 0.f;
+    for (int64 c = 0; c < shape.chans_per_group; ++c) {
+      const float value = static_cast<float>(row[c]);
+      row_sum += value;
+      row_square_sum += value * value;
+    }
+    sum += row_sum;
+    square_sum += row_square_sum;
+  }
+  const float count = static_cast<float>(shape.hw * shape.chans_per_group);
+  *mean = sum / count;
+  const float variance = std::max(square_sum / count - *mean * *mean, 0.f);
+  *rstd = 1.f / std::sqrt(variance + epsilon);
+}
+
+// Each (batch, group) is a task. The statistics are computed in one pass, and
+// the normalization, scale and offset in another one.
+template <typename T>
+struct GroupNormCPUFunctor {
+  void operator()(const CPUDevice& d, const T* x, const T* gamma, const T* beta,
+                  T* y, float epsilon, bool use_scale, bool use_center,
+                  const GroupNormShape& shape) {
+    auto task = [&](Eigen::Index first, Eigen::Index last) {
+      std::vector<float> scale(shape.chans_per_group);
+      std::vector<float> offset(shape.chans_per_group);
+      for (Eigen::Index id = first; id < last; ++id) {
+        const int64 n = id / shape.groups;
+        const int64 g = id % shape.groups;
+        float mean, rstd;
+        GroupNormStats(x, shape, n, g, epsilon, &mean, &rstd);
+
+        // y = x * scale + offset with the statistics folded in.
+        const int64 c_begin = g * shape.chans_per_group;
+        for (int64 c = 0; c < shape.chans_per_group; ++c) {
+          const float gamma_c =
+              use_scale ? static_cast<float>(gamma[c_begin + c]) : 1.f;
+          const float beta_c =
+              use_center ? static_cast<float>(beta[c_begin + c]) : 0.f;
+          scale[c] = rstd * gamma_c;
+          offset[c] = beta_c - mean * scale[c];
+        }
+
+        const int64 offset_ng = n * shape.hw * shape.channels + c_begin;
+        for (int64 i = 0; i < shape.hw; ++i) {
+          const T* x_row = x + offset_ng + i * shape.channels;
+          T* y_row = y + offset_ng + i * shape.channels;
+          for (int64 c = 0; c < shape.chans_per_group; ++c) {
+            y_row[c] = static_cast<T>(static_cast<float>(x_row[c]) * scale[c] +
+                                      offset[c]);
+          }
+        }
+      }
+    };
+    const int64 bytes_per_group = shape.hw * shape.chans_per_group * sizeof(T);
+    d.parallelFor(shape.batches * shape.groups,
+                  Eigen::TensorOpCost(2 * bytes_per_group, bytes_per_group,
+                                      5 * shape.hw * shape.chans_per_group),
+                  task);
+  }
+};
+
+// With x_hat = (x - mean) * rstd and dx_hat = dy * gamma, for each group:
+//   dx = rstd * (dx_hat - mean(dx_hat) - x_hat * mean(dx_hat * x_hat))
+//   dgamma = sum(dy * x_hat), dbeta = sum(dy) over batches and hw.
+// Each (batch, group) is a task which writes dgamma and dbeta of its channels
+// into its own row of a [batches, channels] buffer, summed at the end.
+template <typename T>
+struct GroupNormGradCPUFunctor {
+  void operator()(const CPUDevice& d, const T* dy, const T* x, const T* gamma,
+                  T* dx, T* dgamma, T* dbeta, float epsilon, bool use_scale,
+                  const GroupNormShape& shape) {
+    std::vector<float> partials(2 * shape.batches * shape.channels, 0.f);
+    float* dgamma_partials = partials.data();
+    float* dbeta_partials = dgamma_partials + shape.batches * shape.channels;
+
+    auto task = [&](Eigen::Index first, Eigen::Index last) {
+      for (Eigen::Index id = first; id < last; ++id) {
+        const int64 n = id / shape.groups;
+        const int64 g = id % shape.groups;
+        float mean, rstd;
+        GroupNormStats(x, shape, n, g, epsilon, &mean, &rstd);
+
+        const int64 c_begin = g * shape.chans_per_group;
+        const int64 offset_ng = n * shape.hw * shape.channels + c_begin;
+        float* dgamma_ng = dgamma_partials + n * shape.channels + c_begin;
+        float* dbeta_ng = dbeta_partials + n * shape.channels + c_begin;
+        // sum(dy * (x - mean)) and sum(dy) of each channel.
+        for (int64 i = 0; i < shape.hw; ++i) {
+          const T* x_row = x + offset_ng + i * shape.channels;
+          const T* dy_row = dy + offset_ng + i * shape.channels;
+          for (int64 c = 0; c < shape.chans_per_group; ++c) {
+            const float g_value = static_cast<float>(dy_row[c]);
+            dgamma_ng[c] += g_value * (static_cast<float>(x_row[c]) - mean);
+            dbeta_ng[c] += g_value;
+          }
+        }
+
+        // Reduce the channel sums into the group means of dx_hat and
+        // dx_hat * x_hat.
+        float sum_dx_hat = 0.f, sum_dx_hat_x_hat = 0.f;
+        for (int64 c = 0; c < shape.chans_per_group; ++c) {
+          const float gamma_c =
+              use_scale ? static_cast<float>(gamma[c_begin + c]) : 1.f;
+          sum_dx_hat += dbeta_ng[c] * gamma_c;
+          sum_dx_hat_x_hat += dgamma_ng[c] * gamma_c;
+          dgamma_ng[c] *= rstd;
+        }
+        const float count =
+            static_cast<float>(shape.hw * shape.chans_per_group);
+        const float mean_dx_hat = sum_dx_hat / count;
+        const float mean_dx_hat_x_hat = sum_dx_hat_x_hat * rstd / count;
+
+        for (int64 i = 0; i < shape.hw; ++i) {
+          const T* x_row = x + offset_ng + i * shape.channels;
+          const T* dy_row = dy + offset_ng + i * shape.channels;
+          T* dx_row = dx + offset_ng + i * shape.channels;
+          for (int64 c = 0; c < shape.chans_per_group; ++c) {
+            const float gamma_c =
+                use_scale ? static_cast<float>(gamma[c_begin + c]) : 1.f;
+            const float x_hat = (static_cast<float>(x_row[c]) - mean) * rstd;
+            const float dx_hat = static_cast<float>(dy_row[c]) * gamma_c;
+            dx_row[c] = static_cast<T>(
+                rstd * (dx_hat - mean_dx_hat - x_hat * mean_dx_hat_x_hat));
+          }
+        }
+      }
+    };
+    const int64 bytes_per_group = shape.hw * shape.chans_per_group * sizeof(T);
+    d.parallelFor(shape.batches * shape.groups,
+                  Eigen::TensorOpCost(5 * bytes_per_group, bytes_per_group,
+                                      15 * shape.hw * shape.chans_per_group),
+                  task);
+
+    auto reduce = [&](Eigen::Index first, Eigen::Index last) {
+      for (Eigen::Index c = first; c < last; ++c) {
+        float dgamma_sum = 0.f, dbeta_sum = 0.f;
+        for (int64 n = 0; n < shape.batches; ++n) {
+          dgamma_sum += dgamma_partials[n * shape.channels + c];
+          dbeta_sum += dbeta_partials[n * shape.channels + c];
+        }
+        dgamma[c] = static_cast<T>(use_scale ? dgamma_sum : 0.f);
+        dbeta[c] = static_cast<T>(dbeta_sum);
+      }
+    };
+    d.parallelFor(shape.channels,
+                  Eigen::TensorOpCost(2 * shape.batches * sizeof(float),
+                                      2 * sizeof(T), 2 * shape.batches),
+                  reduce);
+  }
+};
+
+}  // namespace functor
+
+namespace {
+
+Status GetGroupNormShape(const Tensor& input, int num_groups,
+                         functor::GroupNormShape* shape) {
+  // TODO(itex): support channel first
+  if (input.dims() < 3) {
+    return errors::InvalidArgument("input must be at least 3-dimensional",
+                                   input.shape().DebugString());
+  }
+  const int64 channels = input.dim_size(input.dims() - 1);
+  if (num_groups <= 0 || channels % num_groups != 0) {
+    return errors::InvalidArgument("Number of groups (", num_groups,
+                                   ") must divide the number of channels (",
+                                   channels, ")");
+  }
+  shape->batches = input.dim_size(0);
+  shape->channels = channels;
+  shape->hw = shape->batches * channels == 0
+                  ? 0
+                  : input.NumElements() / shape->batches / channels;
+  shape->groups = num_groups;
+  shape->chans_per_group = channels / num_groups;
+  return Status::OK();
+}
+
+}  // namespace
+
+template <typename T>
+class GroupNormOp : public OpKernel {
+ public:
+  explicit GroupNormOp(OpKernelConstruction* context) : OpKernel(context) {
+    OP_REQUIRES_OK(context, context->GetAttr("num_groups", &num_groups_));
+    OP_REQUIRES_OK(context, context->GetAttr("epsilon", &epsilon_));
+    OP_REQUIRES_OK(context, context->GetAttr("use_scale", &use_scale_));
+    OP_REQUIRES_OK(context, context->GetAttr("use_center", &use_center_));
+  }
+
+  void Compute(OpKernelContext* context) override {
+    const Tensor& input = context->input(0);
+    const Tensor& gamma = context->input(1);
+    const Tensor& beta = context->input(2);
+
+    functor::GroupNormShape shape;
+    OP_REQUIRES_OK(context, GetGroupNormShape(input, num_groups_, &shape));
+    OP_REQUIRES(context, !use_scale_ || gamma.NumElements() == shape.channels,
+                errors::InvalidArgument("gamma must have ", shape.channels,
+                                        " elements, but got ",
+                                        gamma.shape().DebugString()));
+    OP_REQUIRES(context, !use_center_ || beta.NumElements() == shape.channels,
+                errors::InvalidArgument("beta must have ", shape.channels,
+                                        " elements, but got ",
+                                        beta.shape().DebugString()));
+
+    Tensor* output = nullptr;
+    OP_REQUIRES_OK(context,
+                   context->allocate_output(0, input.shape(), &output));
+    if (input.NumElements() == 0) return;
+
+    functor::GroupNormCPUFunctor<T>()(
+        context->eigen_cpu_device(), input.flat<T>().data(),
+        gamma.flat<T>().data(), beta.flat<T>().data(), output->flat<T>().data(),
+        epsilon_, use_scale_, use_center_, shape);
+  }
+
+ private:
+  int num_groups_;
+  bool use_scale_;
+  bool use_center_;
+  float epsilon_;
+};
+
+template <typename T>
+class GroupNormGradOp : public OpKernel {
+ public:
+  explicit GroupNormGradOp(OpKernelConstruction* context) : OpKernel(context) {
+    OP_REQUIRES_OK(context, context->GetAttr("num_groups", &num_groups_));
+    OP_REQUIRES_OK(context, context->GetAttr("epsilon", &epsilon_));
+    OP_REQUIRES_OK(context, context->GetAttr("use_scale", &use_scale_));
+  }
+
+  void Compute(OpKernelContext* context) override {
+    const Tensor& y_backprop = context->input(0);
+    const Tensor& input = context->input(1);
+    const Tensor& gamma = context->input(2);
+
+    functor::GroupNormShape shape;
+    OP_REQUIRES_OK(context, GetGroupNormShape(input, num_groups_, &shape));
+    OP_REQUIRES(context, y_backprop.shape() == input.shape(),
+                errors::InvalidArgument(
+                    "y_backprop and x must have the same shape, but got ",
+                    y_backprop.shape().DebugString(), " and ",
+                    input.shape().DebugString()));
+    OP_REQUIRES(context, !use_scale_ || gamma.NumElements() == shape.channels,
+                errors::InvalidArgument("gamma must have ", shape.channels,
+                                        " elements, but got ",
+                                        gamma.shape().DebugString()));
+
+    Tensor* x_backprop = nullptr;
+    Tensor* scale_backprop = nullptr;
+    Tensor* offset_backprop = nullptr;
+    OP_REQUIRES_OK(context,
+                   context->allocate_output(0, input.shape(), &x_backprop));
+    OP_REQUIRES_OK(context, context->allocate_output(1, {shape.channels},
+                                                     &scale_backprop));
+    OP_REQUIRES_OK(context, context->allocate_output(2, {shape.channels},
+                                                     &offset_backprop));
+    if (input.NumElements() == 0) {
+      scale_backprop->flat<T>().setZero();
+      offset_backprop->flat<T>().setZero();
+      return;
+    }
+
+    functor::GroupNormGradCPUFunctor<T>()(
+        context->eigen_cpu_device(), y_backprop.flat<T>().data(),
+        input.flat<T>().data(), gamma.flat<T>().data(),
+        x_backprop->flat<T>().data(), scale_backprop->flat<T>().data(),
+        offset_backprop->flat<T>().data(), epsilon_, use_scale_, shape);
+  }
+
+ private:
+  int num_groups_;
+  bool use_scale_;
+  float epsilon_;
+};
+
+#define REGISTER_GROUP_NORM_CPU(T)                                         \
+  REGISTER_KERNEL_BUILDER(                                                 \
+      Name("ITEXGroupNorm").Device(DEVICE_CPU).TypeConstraint<T>("T"),     \
+      GroupNormOp<T>);                                                     \
+  REGISTER_KERNEL_BUILDER(                                                 \
+      Name("ITEXGroupNormGrad").Device(DEVICE_CPU).TypeConstraint<T>("T"), \
+      GroupNormGradOp<T>);
+REGISTER_GROUP_NORM_CPU(float);
+REGISTER_GROUP_NORM_CPU(Eigen::bfloat16);
+REGISTER_GROUP_NORM_CPU(Eigen::half);
+#undef REGISTER_GROUP_NORM_CPU
+
+}  // namespace itex
@@ -38,9 +38,8 @@ class MHAOp : public OpKernel {
     if (!is_inference) {
       OP_REQUIRES_OK(context, context->GetAttr("use_dropout", &use_dropout));
       OP_REQUIRES_OK(context, context->GetAttr("dropout_prob", &dropout_prob));
-    } else {
-      OP_REQUIRES_OK(context, context->GetAttr("use_causal", &use_causal));
     }
+    OP_REQUIRES_OK(context, context->GetAttr("use_causal", &use_causal));
     OP_REQUIRES_OK(context, context->GetAttr("use_mask", &use_mask));
   }
 
@@ -58,26 +57,42 @@ class MHAOp : public OpKernel {
     int64_t q_seq_len = query.dim_size(2);
     int64_t head_size = query.dim_size(3);
     int64_t k_seq_len = key.dim_size(2);
+    OP_REQUIRES(context, !use_causal || q_seq_len <= k_seq_len,
+                errors::InvalidArgument(
+                    "Causal attention needs q_seq_len <= k_seq_len, but got ",
+                    q_seq_len, " and ", k_seq_len));
 
     Tensor* output = nullptr;
     OP_REQUIRES_OK(
         context,
         context->allocate_output(
             0, {batch_size, q_seq_len, num_heads, head_size}, &output));
+    // The log-sum-exp of each query is saved for the backward in training.
+    Tensor* l = nullptr;
+    if (!is_inference) {
+      OP_REQUIRES_OK(context, context->allocate_output(
+                                  1, {batch_size, num_heads, q_seq_len}, &l));
+    }
 
 #define CALL_FMHA_FUNC(T, qSplitSize, kvSplitSize)                            \
   FmhaFunctor<T, qSplitSize, kvSplitSize>()(                                  \
       query, key, value, batch_size, q_seq_len, num_heads, head_size,         \
       k_seq_len, use_mask, use_causal, use_dropout, atten_mask, dropout_mask, \
-      dropout_prob, output)
-
-    if (q_seq_len >= 768) {
+      dropout_prob, output, l)
+
+    if (is_inference && FmhaDecodeFunctor<T>::IsPreferred(
+                            batch_size, q_seq_len, num_heads, k_seq_len, 32)) {
+      FmhaDecodeFunctor<T>()(query, key, value, batch_size, q_seq_len,
+                             num_heads, head_size, k_seq_len, use_mask,
+                             use_causal, atten_mask, output);
+    } else if (q_seq_len >= 768) {
       CALL_FMHA_FUNC(T, 256, 512);
     } else if (q_seq_len >= 192) {
       CALL_FMHA_FUNC(T, 64, 512);
     } else {
       CALL_FMHA_FUNC(T, 32, 512);
     }
+#undef CALL_FMHA_FUNC
   }
 
  private:
@@ -88,14 +103,82 @@ class MHAOp : public OpKernel {
   bool is_inference = false;
 };
 
-#define REGISTER_MHA_INF_CPU(type)                                   \
+template <typename T>
+class MHAGradOp : public OpKernel {
+ public:
+  explicit MHAGradOp(OpKernelConstruction* context) : OpKernel(context) {
+    OP_REQUIRES_OK(context, context->GetAttr("dropout_prob", &dropout_prob));
+    OP_REQUIRES_OK(context, context->GetAttr("use_mask", &use_mask));
+    OP_REQUIRES_OK(context, context->GetAttr("use_causal", &use_causal));
+  }
+
+  void Compute(OpKernelContext* context) override {
+    const Tensor& query = context->input(0);
+    const Tensor& key = context->input(1);
+    const Tensor& value = context->input(2);
+    const Tensor& out = context->input(3);
+    const Tensor& atten_mask = context->input(4);
+    const Tensor& grad_out = context->input(5);
+    const Tensor& l = context->input(6);
+    const Tensor& dropout_mask = context->input(7);
+    const bool use_dropout = dropout_prob > 0.f;
+
+    int64_t batch_size = query.dim_size(0);
+    int64_t num_heads = query.dim_size(1);
+    int64_t q_seq_len = query.dim_size(2);
+    int64_t head_size = query.dim_size(3);
+    int64_t k_seq_len = key.dim_size(2);
+    OP_REQUIRES(context, !use_causal || q_seq_len <= k_seq_len,
+                errors::InvalidArgument(
+                    "Causal attention needs q_seq_len <= k_seq_len, but got ",
+                    q_seq_len, " and ", k_seq_len));
+
+    Tensor* grad_query = nullptr;
+    Tensor* grad_key = nullptr;
+    Tensor* grad_value = nullptr;
+    OP_REQUIRES_OK(context,
+                   context->allocate_output(0, query.shape(), &grad_query));
+    OP_REQUIRES_OK(context,
+                   context->allocate_output(1, key.shape(), &grad_key));
+    OP_REQUIRES_OK(context,
+                   context->allocate_output(2, value.shape(), &grad_value));
+
+#define CALL_FMHA_BACKWARD_FUNC(T, qSplitSize, kvSplitSize)                  \
+  FmhaBackwardFunctor<T, qSplitSize, kvSplitSize>()(                         \
+      query, key, value, out, grad_out, l, batch_size, q_seq_len, num_heads, \
+      head_size, k_seq_len, use_mask, use_causal, use_dropout, atten_mask,   \
+      dropout_mask, dropout_prob, grad_query, grad_key, grad_value)
+
+    if (q_seq_len >= 192) {
+      CALL_FMHA_BACKWARD_FUNC(T, 64, 128);
+    } else {
+      CALL_FMHA_BACKWARD_FUNC(T, 32, 128);
+    }
+#undef CALL_FMHA_BACKWARD_FUNC
+  }
+
+ private:
+  float dropout_prob = 0;
+  bool use_mask = false;
+  bool use_causal = false;
+};
+
+#define REGISTER_MHA_CPU(type)                                       \
   REGISTER_KERNEL_BUILDER(Name("ScaledDotProductAttentionInference") \
                               .Device(DEVICE_CPU)                    \
                               .TypeConstraint<type>("T"),            \
-                          MHAOp<type>);
+                          MHAOp<type>);                              \
+  REGISTER_KERNEL_BUILDER(Name("FlashScaledDotProductAttention")     \
+                              .Device(DEVICE_CPU)                    \
+                              .TypeConstraint<type>("T"),            \
+                          MHAOp<type>);                              \
+  REGISTER_KERNEL_BUILDER(Name("FlashScaledDotProductAttentionGrad") \
+                              .Device(DEVICE_CPU)                    \
+                              .TypeConstraint<type>("T"),            \
+                          MHAGradOp<type>);
 
-REGISTER_MHA_INF_CPU(Eigen::bfloat16);
-REGISTER_MHA_INF_CPU(float);
-#undef REGISTER_MHA_INF_GPU
+REGISTER_MHA_CPU(Eigen::bfloat16);
+REGISTER_MHA_CPU(float);
+#undef REGISTER_MHA_CPU
 
 }  // namespace itex
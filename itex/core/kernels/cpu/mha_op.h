@@ -72,7 +72,7 @@ class FmhaFunctor {
                   int64_t head_size, int64_t k_seq_len, bool use_mask,
                   bool use_causal, bool use_dropout, const Tensor& atten_mask,
                   const Tensor& dropout_mask, float dropout_prob,
-                  Tensor* output) {
+                  Tensor* output, Tensor* logsumexp = nullptr) {
     int64_t q_stride_b = num_heads * q_seq_len * head_size;
     int64_t q_stride_h = q_seq_len * head_size;
     int64_t q_stride_m = head_size;
@@ -119,6 +119,16 @@ class FmhaFunctor {
     float* buf_data = buf.flat<float>().data();
     T* buf_reduced_data =
         is_reduced_type ? buf_reduced.flat<T>().data() : nullptr;
+    // Dropout mask is [batch_size, num_heads, q_seq_len, k_seq_len], and kept
+    // probabilities are scaled by 1 / (1 - dropout_prob).
+    const bool* dropout_mask_data =
+        use_dropout ? dropout_mask.flat<bool>().data() : nullptr;
+    const float dropout_scale =
+        use_dropout ? 1.0f / (1.0f - dropout_prob) : 1.0f;
+    // Log-sum-exp of the scaled scores of each query, which is
+    // [batch_size, num_heads, q_seq_len] and used by the backward.
+    float* lse_data =
+        logsumexp != nullptr ? logsumexp->flat<float>().data() : nullptr;
 
     int64_t kv_blocks = k_seq_len / kvSplitSize;
 
@@ -187,10 +197,13 @@ class FmhaFunctor {
                 int64_t row_end = std::min(
                     n + kv_block_size - causal_q_start - 1, q_block_size);
                 for (int row = 0; row < row_end; ++row) {
+                  // Keys from last_col on are masked, last_col is the key
+                  // index while qk_data only holds the keys from n on.
                   int64_t last_col = causal_q_start + 1 + row;
+                  int64_t first_masked = std::max<int64_t>(last_col - n, 0);
                   float* row_ptr = qk_data + row * kv_block_size;
-                  Fvec causal_mask_vec(row_ptr + last_col,
-                                       n + kv_block_size - last_col);
+                  Fvec causal_mask_vec(row_ptr + first_masked,
+                                       kv_block_size - first_masked);
                   causal_mask_vec.setConstant(
                       -std::numeric_limits<float>::infinity());
                 }
@@ -244,6 +257,16 @@ class FmhaFunctor {
                 qk_max_data[row] = tmp_max;
 
                 pij_vec = pij_vec / qk_sum_data[row];
+                if (use_dropout) {
+                  const bool* keep =
+                      dropout_mask_data +
+                      ((i * num_heads + j) * q_seq_len + m + row) * k_seq_len +
+                      n;
+                  float* p_row = qk_data + row * kv_block_size;
+                  for (int64_t col = 0; col < kv_block_size; ++col) {
+                    p_row[col] = keep[col] ? p_row[col] * dropout_scale : 0.f;
+                  }
+                }
                 if (is_reduced_type) {
                   Tvec reduced_vec(qk_reduced_data + row * kv_block_size,
                                    kv_block_size);
@@ -271,12 +294,452 @@ class FmhaFunctor {
               Fvec dst_vec(dst_data + i * head_size, head_size);
               out_vec = dst_vec.cast<T>();
             }
+            if (lse_data != nullptr) {
+              float* lse_cur_data =
+                  lse_data + (i * num_heads + j) * q_seq_len + m;
+              for (int64_t row = 0; row < q_block_size; ++row) {
+                lse_cur_data[row] =
+                    qk_max_data[row] + std::log(qk_sum_data[row]);
+              }
+            }
             // Move to the next query
             DataIndexStep(&i, batch_size, &j, num_heads, &k, q_slice);
           }
         });
   }
 };
+
+// Inference of a few queries against a long key/value cache, e.g. the
+// autoregressive decoding with q_seq_len = 1. FmhaFunctor parallelizes over
+// batch_size * num_heads * q_slice, which leaves most cores idle when the
+// queries of a head fit in one block. Here the keys of each head are split
+// into chunks which are tasks of their own:
+//   1. Each (batch, head, chunk) computes the max m, the sum l of
+//      exp(score - m) and the unnormalized output acc of its keys.
+//   2. Each (batch, head, query) merges the chunks into
+//      sum(acc * exp(m - M)) / sum(l * exp(m - M)) with M = max(m).
+// The queries are the last q_seq_len positions of the sequence, so with
+// use_causal query i attends to the first k_seq_len - q_seq_len + i + 1 keys,
+// i.e. the cached past keys and itself.
+template <typename T>
+class FmhaDecodeFunctor {
+ public:
+  // Keys of a chunk. Smaller chunks don't pay off the reduction.
+  static constexpr int64_t kMinChunkSize = 64;
+
+  void operator()(const Tensor& query, const Tensor& key, const Tensor& value,
+                  int64_t batch_size, int64_t q_seq_len, int64_t num_heads,
+                  int64_t head_size, int64_t k_seq_len, bool use_mask,
+                  bool use_causal, const Tensor& atten_mask, Tensor* output) {
+    const float scaling_factor =
+        1.0 / std::sqrt(static_cast<double>(head_size));
+    const int64_t num_bh = batch_size * num_heads;
+    // Enough chunks to give every thread a task.
+    const int64_t max_chunks = std::max<int64_t>(1, k_seq_len / kMinChunkSize);
+    const int64_t num_chunks =
+        std::min<int64_t>(max_chunks, (GetNumThreads() + num_bh - 1) / num_bh);
+    const int64_t chunk_size = (k_seq_len + num_chunks - 1) / num_chunks;
+    const int64_t o_stride_m = num_heads * head_size;
+
+    // Partial results of each (batch, head, chunk, query).
+    const int64_t num_partials = num_bh * num_chunks * q_seq_len;
+    Tensor buf(DT_FLOAT, {num_partials * (2 + head_size)});
+    float* max_data = buf.flat<float>().data();
+    float* sum_data = max_data + num_partials;
+    float* acc_data = sum_data + num_partials;
+
+    const T* q_data = query.flat<T>().data();
+    const T* k_data = key.flat<T>().data();
+    const T* v_data = value.flat<T>().data();
+    T* out_data = output->flat<T>().data();
+
+    Eigen::TensorOpCost chunk_cost(
+        2 * chunk_size * head_size * q_seq_len * sizeof(T),
+        (2 + head_size) * q_seq_len * sizeof(float),
+        4 * chunk_size * head_size * q_seq_len);
+    ParallelFor(
+        num_bh * num_chunks, chunk_cost, [&](int64_t begin, int64_t end) {
+          std::vector<float> q_row(head_size);
+          std::vector<float> scores(chunk_size);
+          for (int64_t task = begin; task < end; ++task) {
+            const int64_t bh = task / num_chunks;
+            const int64_t chunk = task % num_chunks;
+            const int64_t b = bh / num_heads;
+            const int64_t h = bh % num_heads;
+            const int64_t n_begin = chunk * chunk_size;
+            const T* k_head = k_data + bh * k_seq_len * head_size;
+            const T* v_head = v_data + bh * k_seq_len * head_size;
+
+            for (int64_t row = 0; row < q_seq_len; ++row) {
+              const int64_t partial = task * q_seq_len + row;
+              float* acc = acc_data + partial * head_size;
+              std::fill(acc, acc + head_size, 0.f);
+              max_data[partial] = -std::numeric_limits<float>::infinity();
+              sum_data[partial] = 0.f;
+
+              const int64_t num_keys =
+                  use_causal ? k_seq_len - q_seq_len + row + 1 : k_seq_len;
+              const int64_t n_end =
+                  std::min(n_begin + chunk_size, std::min(num_keys, k_seq_len));
+              if (n_begin >= n_end) continue;
+
+              const T* q_ptr = q_data + (bh * q_seq_len + row) * head_size;
+              for (int64_t c = 0; c < head_size; ++c) {
+                q_row[c] = static_cast<float>(q_ptr[c]) * scaling_factor;
+              }
+              const T* mask_ptr =
+                  use_mask ? MaskRow(atten_mask, b, h, row, k_seq_len)
+                           : nullptr;
+
+              float max = -std::numeric_limits<float>::infinity();
+              for (int64_t n = n_begin; n < n_end; ++n) {
+                const T* k_ptr = k_head + n * head_size;
+                float score = 0.f;
+                for (int64_t c = 0; c < head_size; ++c) {
+                  score += q_row[c] * static_cast<float>(k_ptr[c]);
+                }
+                if (use_mask) score += static_cast<float>(mask_ptr[n]);
+                scores[n - n_begin] = score;
+                max = std::max(max, score);
+              }
+              // All keys of the chunk are masked out by atten_mask.
+              if (max == -std::numeric_limits<float>::infinity()) continue;
+
+              float sum = 0.f;
+              for (int64_t n = n_begin; n < n_end; ++n) {
+                const float p = std::exp(scores[n - n_begin] - max);
+                sum += p;
+                const T* v_ptr = v_head + n * head_size;
+                for (int64_t c = 0; c < head_size; ++c) {
+                  acc[c] += p * static_cast<float>(v_ptr[c]);
+                }
+              }
+              max_data[partial] = max;
+              sum_data[partial] = sum;
+            }
+          }
+        });
+
+    Eigen::TensorOpCost reduce_cost(
+        num_chunks * (2 + head_size) * sizeof(float), head_size * sizeof(T),
+        3 * num_chunks * head_size);
+    ParallelFor(
+        num_bh * q_seq_len, reduce_cost, [&](int64_t begin, int64_t end) {
+          std::vector<float> dst(head_size);
+          for (int64_t task = begin; task < end; ++task) {
+            const int64_t bh = task / q_seq_len;
+            const int64_t row = task % q_seq_len;
+            const int64_t b = bh / num_heads;
+            const int64_t h = bh % num_heads;
+            const int64_t first = bh * num_chunks * q_seq_len + row;
+
+            float max = -std::numeric_limits<float>::infinity();
+            for (int64_t chunk = 0; chunk < num_chunks; ++chunk) {
+              max = std::max(max, max_data[first + chunk * q_seq_len]);
+            }
+            float sum = 0.f;
+            std::fill(dst.begin(), dst.end(), 0.f);
+            for (int64_t chunk = 0; chunk < num_chunks; ++chunk) {
+              const int64_t partial = first + chunk * q_seq_len;
+              if (sum_data[partial] == 0.f) continue;
+              const float correction = std::exp(max_data[partial] - max);
+              sum += sum_data[partial] * correction;
+              const float* acc = acc_data + partial * head_size;
+              for (int64_t c = 0; c < head_size; ++c) {
+                dst[c] += acc[c] * correction;
+              }
+            }
+
+            T* out_ptr = out_data + b * q_seq_len * o_stride_m +
+                         row * o_stride_m + h * head_size;
+            const float inv_sum = 1.f / sum;
+            for (int64_t c = 0; c < head_size; ++c) {
+              out_ptr[c] = static_cast<T>(dst[c] * inv_sum);
+            }
+          }
+        });
+  }
+
+  // Whether the decode mode has more parallelism than FmhaFunctor, whose
+  // tasks are batch_size * num_heads * q_slice.
+  static bool IsPreferred(int64_t batch_size, int64_t q_seq_len,
+                          int64_t num_heads, int64_t k_seq_len,
+                          int64_t q_split_size) {
+    if (q_seq_len > q_split_size) return false;
+    return batch_size * num_heads < GetNumThreads() &&
+           k_seq_len >= 2 * kMinChunkSize;
+  }
+
+ private:
+  // The mask is broadcast from
+  // [batch_size or 1, num_heads or 1, q_seq_len or 1, k_seq_len].
+  static const T* MaskRow(const Tensor& atten_mask, int64_t b, int64_t h,
+                          int64_t q_index, int64_t k_seq_len) {
+    const int64_t mask_num_heads = atten_mask.dim_size(1);
+    const int64_t mask_q_size = atten_mask.dim_size(2);
+    const int64_t b_index = atten_mask.dim_size(0) > 1 ? b : 0;
+    const int64_t h_index = mask_num_heads > 1 ? h : 0;
+    q_index = mask_q_size > 1 ? q_index : 0;
+    return atten_mask.flat<T>().data() +
+           ((b_index * mask_num_heads + h_index) * mask_q_size + q_index) *
+               k_seq_len;
+  }
+};
+
+// Backward of FmhaFunctor in training, which recomputes the attention
+// probabilities block by block from the saved log-sum-exp instead of reading
+// a [q_seq_len, k_seq_len] probability tensor:
+//   P = exp(scale * Q @ K.T + mask - logsumexp), Pd = dropout(P)
+//   dV = Pd.T @ dO, dPd = dO @ V.T, dP = dropout(dPd)
+//   dS = P * (dP - rowsum(dO * O))
+//   dQ = scale * dS @ K, dK = scale * dS.T @ Q
+// Each (batch, head) is a task which accumulates dK and dV of all keys in
+// float per-thread buffers, so the extra memory is O(seq_len * head_size).
+template <typename T, int64_t qSplitSize, int64_t kvSplitSize>
+class FmhaBackwardFunctor {
+ public:
+  using Fvec = typename TTypes<float>::Flat;
+
+  void operator()(const Tensor& query, const Tensor& key, const Tensor& value,
+                  const Tensor& out, const Tensor& grad_out,
+                  const Tensor& logsumexp, int64_t batch_size,
+                  int64_t q_seq_len, int64_t num_heads, int64_t head_size,
+                  int64_t k_seq_len, bool use_mask, bool use_causal,
+                  bool use_dropout, const Tensor& atten_mask,
+                  const Tensor& dropout_mask, float dropout_prob,
+                  Tensor* grad_query, Tensor* grad_key, Tensor* grad_value) {
+    const float scaling_factor =
+        1.0 / std::sqrt(static_cast<double>(head_size));
+    const float dropout_scale =
+        use_dropout ? 1.0f / (1.0f - dropout_prob) : 1.0f;
+    const int64_t q_split_size = std::min(qSplitSize, q_seq_len);
+    const int64_t kv_split_size = std::min(kvSplitSize, k_seq_len);
+    // Q, dQ: [batch_size, num_heads, q_seq_len, head_size]
+    // K, V, dK, dV: [batch_size, num_heads, k_seq_len, head_size]
+    // O, dO: [batch_size, q_seq_len, num_heads, head_size]
+    const int64_t q_stride_h = q_seq_len * head_size;
+    const int64_t k_stride_h = k_seq_len * head_size;
+    const int64_t o_stride_b = q_seq_len * num_heads * head_size;
+    const int64_t o_stride_m = num_heads * head_size;
+
+    constexpr bool is_reduced_type = is_reduced_floating_point_v<T>;
+    // Float copies of Q, K, V and dO of a head are only needed for reduced
+    // types, whose gemm requires dense operands.
+    const int64_t input_size =
+        is_reduced_type ? 2 * q_stride_h + 2 * k_stride_h : 0;
+    const int64_t size_per_thread =
+        /* dq, dk, dv */ q_stride_h + 2 * k_stride_h +
+        /* p, pd, dp  */ 3 * q_split_size * kv_split_size +
+        /* d          */ q_split_size + input_size;
+    const int64_t num_thread = GetNumThreads() + 1;
+    Tensor buf(DT_FLOAT, {num_thread, size_per_thread});
+    float* buf_data = buf.flat<float>().data();
+
+    const T* q_data = query.flat<T>().data();
+    const T* k_data = key.flat<T>().data();
+    const T* v_data = value.flat<T>().data();
+    const T* o_data = out.flat<T>().data();
+    const T* do_data = grad_out.flat<T>().data();
+    const float* lse_data = logsumexp.flat<float>().data();
+    const bool* dropout_mask_data =
+        use_dropout ? dropout_mask.flat<bool>().data() : nullptr;
+    T* dq_data = grad_query->flat<T>().data();
+    T* dk_data = grad_key->flat<T>().data();
+    T* dv_data = grad_value->flat<T>().data();
+
+    const double load_cost = (3 * q_stride_h + 2 * k_stride_h) * sizeof(T) +
+                             (q_seq_len * k_seq_len) * (use_dropout ? 1 : 0);
+    const double store_cost = (q_stride_h + 2 * k_stride_h) * sizeof(T);
+    const double compute_cost = 10.0 * q_seq_len * k_seq_len * head_size;
+    Eigen::TensorOpCost cost(load_cost, store_cost, compute_cost);
+
+    ParallelFor(batch_size * num_heads, cost, [&](int64_t begin, int64_t end) {
+      int thread_idx = GetThreadNum() + 1;
+      float* dq = buf_data + thread_idx * size_per_thread;
+      float* dk = dq + q_stride_h;
+      float* dv = dk + k_stride_h;
+      float* p = dv + k_stride_h;
+      float* pd = p + q_split_size * kv_split_size;
+      float* dp = pd + q_split_size * kv_split_size;
+      float* d = dp + q_split_size * kv_split_size;
+      float* inputs = d + q_split_size;
+
+      for (int64_t bh = begin; bh < end; ++bh) {
+        const int64_t b = bh / num_heads;
+        const int64_t h = bh % num_heads;
+        const T* o_head = o_data + b * o_stride_b + h * head_size;
+        const T* do_head = do_data + b * o_stride_b + h * head_size;
+
+        // Operands of gemm and their leading dims.
+        const float *q, *k, *v, *dout;
+        int64_t ld_dout;
+        if (is_reduced_type) {
+          float* q_f = inputs;
+          float* k_f = q_f + q_stride_h;
+          float* v_f = k_f + k_stride_h;
+          float* do_f = v_f + k_stride_h;
+          ToFloat(q_data + bh * q_stride_h, q_seq_len, head_size, head_size,
+                  q_f);
+          ToFloat(k_data + bh * k_stride_h, k_seq_len, head_size, head_size,
+                  k_f);
+          ToFloat(v_data + bh * k_stride_h, k_seq_len, head_size, head_size,
+                  v_f);
+          ToFloat(do_head, q_seq_len, head_size, o_stride_m, do_f);
+          q = q_f;
+          k = k_f;
+          v = v_f;
+          dout = do_f;
+          ld_dout = head_size;
+        } else {
+          q = reinterpret_cast<const float*>(q_data + bh * q_stride_h);
+          k = reinterpret_cast<const float*>(k_data + bh * k_stride_h);
+          v = reinterpret_cast<const float*>(v_data + bh * k_stride_h);
+          dout = reinterpret_cast<const float*>(do_head);
+          ld_dout = o_stride_m;
+        }
+
+        Fvec(dq, q_stride_h).setZero();
+        Fvec(dk, k_stride_h).setZero();
+        Fvec(dv, k_stride_h).setZero();
+
+        for (int64_t m = 0; m < q_seq_len; m += q_split_size) {
+          const int64_t q_block_size = std::min(q_split_size, q_seq_len - m);
+          const float* lse = lse_data + bh * q_seq_len + m;
+
+          // d = rowsum(dO * O)
+          for (int64_t row = 0; row < q_block_size; ++row) {
+            float sum = 0.f;
+            const T* o_row = o_head + (m + row) * o_stride_m;
+            const T* do_row = do_head + (m + row) * o_stride_m;
+            for (int64_t c = 0; c < head_size; ++c) {
+              sum +=
+                  static_cast<float>(o_row[c]) * static_cast<float>(do_row[c]);
+            }
+            d[row] = sum;
+          }
+
+          const int64_t causal_q_start = k_seq_len - q_seq_len + m;
+          const int64_t num_keys =
+              use_causal ? std::min(causal_q_start + q_block_size, k_seq_len)
+                         : k_seq_len;
+          for (int64_t n = 0; n < num_keys; n += kv_split_size) {
+            const int64_t kv_block_size = std::min(kv_split_size, num_keys - n);
+
+            // P = exp(scale * Q @ K.T + mask - logsumexp)
+            cpublas::gemm('N', 'T', q_block_size, kv_block_size, head_size,
+                          scaling_factor, const_cast<float*>(q + m * head_size),
+                          head_size, const_cast<float*>(k + n * head_size),
+                          head_size, 0.f, p, kv_block_size);
+            for (int64_t row = 0; row < q_block_size; ++row) {
+              float* p_row = p + row * kv_block_size;
+              if (use_mask) {
+                AddMask(atten_mask, b, h, m + row, n, kv_block_size, k_seq_len,
+                        p_row);
+              }
+              // Keys after causal_q_start + row are masked out.
+              const int64_t valid =
+                  use_causal
+                      ? std::min(kv_block_size, causal_q_start + row + 1 - n)
+                      : kv_block_size;
+              for (int64_t col = 0; col < kv_block_size; ++col) {
+                p_row[col] =
+                    col < valid ? std::exp(p_row[col] - lse[row]) : 0.f;
+              }
+            }
+
+            // dP = dO @ V.T
+            cpublas::gemm('N', 'T', q_block_size, kv_block_size, head_size, 1.f,
+                          const_cast<float*>(dout + m * ld_dout), ld_dout,
+                          const_cast<float*>(v + n * head_size), head_size, 0.f,
+                          dp, kv_block_size);
+
+            // Apply dropout to P into pd and to dP in place.
+            float* p_dropped = p;
+            if (use_dropout) {
+              p_dropped = pd;
+              for (int64_t row = 0; row < q_block_size; ++row) {
+                const bool* keep = dropout_mask_data +
+                                   (bh * q_seq_len + m + row) * k_seq_len + n;
+                const float* p_row = p + row * kv_block_size;
+                float* pd_row = pd + row * kv_block_size;
+                float* dp_row = dp + row * kv_block_size;
+                for (int64_t col = 0; col < kv_block_size; ++col) {
+                  const float s = keep[col] ? dropout_scale : 0.f;
+                  pd_row[col] = p_row[col] * s;
+                  dp_row[col] *= s;
+                }
+              }
+            }
+
+            // dV += dropout(P).T @ dO
+            cpublas::gemm('T', 'N', kv_block_size, head_size, q_block_size, 1.f,
+                          p_dropped, kv_block_size,
+                          const_cast<float*>(dout + m * ld_dout), ld_dout, 1.f,
+                          dv + n * head_size, head_size);
+
+            // dS = P * (dP - d), stored in p.
+            for (int64_t row = 0; row < q_block_size; ++row) {
+              float* p_row = p + row * kv_block_size;
+              const float* dp_row = dp + row * kv_block_size;
+              for (int64_t col = 0; col < kv_block_size; ++col) {
+                p_row[col] *= dp_row[col] - d[row];
+              }
+            }
+
+            // dQ += scale * dS @ K, dK += scale * dS.T @ Q
+            cpublas::gemm('N', 'N', q_block_size, head_size, kv_block_size,
+                          scaling_factor, p, kv_block_size,
+                          const_cast<float*>(k + n * head_size), head_size, 1.f,
+                          dq + m * head_size, head_size);
+            cpublas::gemm('T', 'N', kv_block_size, head_size, q_block_size,
+                          scaling_factor, p, kv_block_size,
+                          const_cast<float*>(q + m * head_size), head_size, 1.f,
+                          dk + n * head_size, head_size);
+          }
+        }
+
+        FromFloat(dq, q_stride_h, dq_data + bh * q_stride_h);
+        FromFloat(dk, k_stride_h, dk_data + bh * k_stride_h);
+        FromFloat(dv, k_stride_h, dv_data + bh * k_stride_h);
+      }
+    });
+  }
+
+ private:
+  static void ToFloat(const T* src, int64_t rows, int64_t cols, int64_t ld,
+                      float* dst) {
+    for (int64_t r = 0; r < rows; ++r) {
+      for (int64_t c = 0; c < cols; ++c) {
+        dst[r * cols + c] = static_cast<float>(src[r * ld + c]);
+      }
+    }
+  }
+
+  static void FromFloat(const float* src, int64_t size, T* dst) {
+    for (int64_t i = 0; i < size; ++i) dst[i] = static_cast<T>(src[i]);
+  }
+
+  // Adds row `q_index` of the mask, which is broadcast from
+  // [batch_size or 1, num_heads or 1, q_seq_len or 1, k_seq_len].
+  static void AddMask(const Tensor& atten_mask, int64_t b, int64_t h,
+                      int64_t q_index, int64_t n, int64_t size,
+                      int64_t k_seq_len, float* row) {
+    const int64_t mask_num_heads = atten_mask.dim_size(1);
+    const int64_t mask_q_size = atten_mask.dim_size(2);
+    const int64_t b_index = atten_mask.dim_size(0) > 1 ? b : 0;
+    const int64_t h_index = mask_num_heads > 1 ? h : 0;
+    q_index = mask_q_size > 1 ? q_index : 0;
+    const T* mask =
+        atten_mask.flat<T>().data() +
+        ((b_index * mask_num_heads + h_index) * mask_q_size + q_index) *
+            k_seq_len +
+        n;
+    for (int64_t col = 0; col < size; ++col) {
+      row[col] += static_cast<float>(mask[col]);
+    }
+  }
+};
+
 }  // namespace itex
 
 #endif  // ITEX_CORE_KERNELS_CPU_MHA_OP_H_
@@ -0,0 +1,155 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include <cmath>
+
+#include "itex/core/kernels/common/matmul_op.h"
+#include "itex/core/utils/errors.h"
+#include "itex/core/utils/op_kernel.h"
+#include "itex/core/utils/op_requires.h"
+#include "itex/core/utils/plugin_tensor.h"
+#include "itex/core/utils/register_types.h"
+#include "itex/core/utils/types.h"
+#include "third_party/eigen3/unsupported/Eigen/CXX11/Tensor"
+
+namespace itex {
+
+typedef Eigen::ThreadPoolDevice CPUDevice;
+
+namespace {
+
+// gelu(x) = 0.5 * x * (1 + t), t = tanh(sqrt(2 / pi) * (x + 0.044715 * x^3)),
+// the `eltwise_gelu_tanh` of oneDNN.
+//
+// Replaces `pre` (the biased matmul output) in place by the derivative of
+// gelu, which is the workspace consumed by the gradient, and writes gelu to
+// `out`. Both are computed in float from a single read of `pre`.
+template <typename T>
+void GeluWithDerivative(const CPUDevice& d, T* pre, T* out, int64 size) {
+  constexpr float kAlpha = 0.7978845608028654f;  // sqrt(2 / pi)
+  constexpr float kBeta = 0.044715f;
+  auto task = [=](Eigen::Index first, Eigen::Index last) {
+    for (Eigen::Index i = first; i < last; ++i) {
+      const float x = static_cast<float>(pre[i]);
+      const float x2 = x * x;
+      const float t = std::tanh(kAlpha * x * (1.f + kBeta * x2));
+      out[i] = static_cast<T>(0.5f * x * (1.f + t));
+      pre[i] = static_cast<T>(0.5f * (1.f + t) +
+                              0.5f * x * (1.f - t * t) * kAlpha *
+                                  (1.f + 3.f * kBeta * x2));
+    }
+  };
+  d.parallelFor(size,
+                Eigen::TensorOpCost(sizeof(T), 2 * sizeof(T),
+                                    Eigen::TensorOpCost::AddCost<float>() * 6 +
+                                        Eigen::TensorOpCost::MulCost<float>() *
+                                            10),
+                task);
+}
+
+}  // namespace
+
+// CPU counterpart of the XeTLA kernel. Inference runs a single oneDNN matmul
+// with bias and gelu post-ops, so the output is written once and the
+// workspace is empty. Training keeps the bias post-op only, and a fused pass
+// turns the pre-activation into gelu and its derivative, which is what the
+// registered gradient of FusedDenseBiasAddGelu multiplies the incoming
+// gradient by.
+template <typename Device, typename T>
+class FusedDenseBiasAddGeluOp : public OpKernel {
+ public:
+  explicit FusedDenseBiasAddGeluOp(OpKernelConstruction* context)
+      : OpKernel(context),
+        fused_gemm_({"BiasAdd", "GeluApproximate"}),
+        bias_gemm_({"BiasAdd"}) {
+    OP_REQUIRES_OK(context, context->GetAttr("is_training", &is_training_));
+  }
+
+  void Compute(OpKernelContext* context) override {
+    const Tensor& feature = context->input(0);
+    const Tensor& weights = context->input(1);
+    const Tensor& bias = context->input(2);
+
+    OP_REQUIRES(
+        context, feature.dims() == 2,
+        errors::InvalidArgument(
+            "expexted feature's dimension to be 2, but got ", feature.dims()));
+
+    OP_REQUIRES(
+        context, weights.dims() == 2,
+        errors::InvalidArgument(
+            "expexted weights's dimension to be 2, but got ", weights.dims()));
+
+    OP_REQUIRES(context, feature.dim_size(1) == weights.dim_size(0),
+                errors::InvalidArgument(
+                    "feature.dim_size[1] must equal to weights.dim_size[0], ",
+                    "but got feature.dim_size[1] =", feature.dim_size(1),
+                    " and weights.dim_size[0] =", weights.dim_size(0)));
+
+    OP_REQUIRES(context,
+                bias.dims() == 1 && bias.dim_size(0) == weights.dim_size(1),
+                errors::InvalidArgument(
+                    "bias must be 1-D with weights.dim_size[1] = ",
+                    weights.dim_size(1), " elements, but got shape ",
+                    bias.shape().DebugString()));
+
+    const int64 m = feature.dim_size(0);
+    const int64 k = feature.dim_size(1);
+    const int64 n = weights.dim_size(1);
+    Tensor* output = nullptr;
+    Tensor* workspace = nullptr;
+    OP_REQUIRES_OK(context,
+                   context->allocate_output(0, TensorShape({m, n}), &output));
+    OP_REQUIRES_OK(context, context->allocate_output(
+                                1, TensorShape({is_training_ ? m : 0, n}),
+                                &workspace));
+    if (output->NumElements() == 0) return;
+
+    T* feature_data = const_cast<T*>(feature.flat<T>().data());
+    T* weights_data = const_cast<T*>(weights.flat<T>().data());
+    T* bias_data = const_cast<T*>(bias.flat<T>().data());
+
+    if (!is_training_) {
+      fused_gemm_.SetContext(context);
+      fused_gemm_.Compute(feature_data, {m, k}, false, weights_data, {k, n},
+                          false, false, output->flat<T>().data(), bias_data);
+      return;
+    }
+
+    T* pre_data = workspace->flat<T>().data();
+    bias_gemm_.SetContext(context);
+    bias_gemm_.Compute(feature_data, {m, k}, false, weights_data, {k, n}, false,
+                       false, pre_data, bias_data);
+    if (!context->status().ok()) return;
+    GeluWithDerivative(context->eigen_device<Device>(), pre_data,
+                       output->flat<T>().data(), m * n);
+  }
+
+ private:
+  bool is_training_;
+  MatMulFunctor<Device, T, T, T, true> fused_gemm_;
+  MatMulFunctor<Device, T, T, T, true> bias_gemm_;
+};
+
+#define REGISTER_CPU(type)                                \
+  REGISTER_KERNEL_BUILDER(Name("FusedDenseBiasAddGelu")   \
+                              .Device(DEVICE_CPU)         \
+                              .TypeConstraint<type>("T"), \
+                          FusedDenseBiasAddGeluOp<CPUDevice, type>);
+
+TF_CALL_CPU_NUMBER_TYPES_WITHOUT_HALF(REGISTER_CPU);
+#undef REGISTER_CPU
+
+}  // namespace itex
@@ -0,0 +1,187 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include <cstring>
+#include <vector>
+
+#include "itex/core/utils/errors.h"
+#include "itex/core/utils/op_kernel.h"
+#include "itex/core/utils/op_requires.h"
+#include "itex/core/utils/plugin_tensor.h"
+#include "itex/core/utils/register_types.h"
+#include "itex/core/utils/tensor_shape.h"
+#include "itex/core/utils/types.h"
+#include "third_party/eigen3/unsupported/Eigen/CXX11/Tensor"
+
+namespace itex {
+
+typedef Eigen::ThreadPoolDevice CPUDevice;
+
+namespace functor {
+
+// Rotates every two elements of the first `rotary_dim` elements of each head:
+//   out[2i]     = x[2i]     * cos[2i]     - x[2i + 1] * sin[2i]
+//   out[2i + 1] = x[2i + 1] * cos[2i + 1] + x[2i]     * sin[2i + 1]
+// q and k are [B, L, num_heads, head_dim], sin and cos are [B or 1, L, 1,
+// rotary_dim]. Other elements of the head are copied if the output isn't
+// forwarded from the input.
+//
+// Each (b, l) row is a task. sin and cos of the row are converted to float
+// once, with the sign of sin folded in, so the rotation of every head is a
+// single loop over rotary_dim which the compiler vectorizes.
+template <typename T>
+struct QKRotaryPositionalEmbedding {
+  void operator()(const CPUDevice& d, const T* q, const T* k, const T* sin,
+                  const T* cos, T* output_q, T* output_k, bool bcast, int B,
+                  int length, int num_heads, int head_dim, int rotary_dim) {
+    const bool copy_q = q != output_q;
+    const bool copy_k = k != output_k;
+    const int64 row_size = static_cast<int64>(num_heads) * head_dim;
+
+    auto task = [&](Eigen::Index first, Eigen::Index last) {
+      std::vector<float> signed_sin(rotary_dim);
+      std::vector<float> cos_f(rotary_dim);
+      for (Eigen::Index row = first; row < last; ++row) {
+        const int64 sin_row = bcast ? row % length : row;
+        const T* sin_ptr = sin + sin_row * rotary_dim;
+        const T* cos_ptr = cos + sin_row * rotary_dim;
+        for (int i = 0; i < rotary_dim; ++i) {
+          const float s = static_cast<float>(sin_ptr[i]);
+          signed_sin[i] = (i & 1) ? s : -s;
+          cos_f[i] = static_cast<float>(cos_ptr[i]);
+        }
+
+        const int64 offset = row * row_size;
+        if (copy_q)
+          std::memcpy(output_q + offset, q + offset, row_size * sizeof(T));
+        if (copy_k)
+          std::memcpy(output_k + offset, k + offset, row_size * sizeof(T));
+        for (int n = 0; n < num_heads; ++n) {
+          Rotate(q + offset + n * head_dim, signed_sin.data(), cos_f.data(),
+                 rotary_dim, output_q + offset + n * head_dim);
+          Rotate(k + offset + n * head_dim, signed_sin.data(), cos_f.data(),
+                 rotary_dim, output_k + offset + n * head_dim);
+        }
+      }
+    };
+
+    const int64 bytes_per_row = 2 * row_size * sizeof(T);
+    const int64 flops_per_row = 6 * num_heads * rotary_dim;
+    d.parallelFor(
+        static_cast<int64>(B) * length,
+        Eigen::TensorOpCost(bytes_per_row, bytes_per_row, flops_per_row), task);
+  }
+
+ private:
+  // `x` and `out` may be the same buffer, so a pair is read before written.
+  static void Rotate(const T* x, const float* signed_sin, const float* cos,
+                     int rotary_dim, T* out) {
+    for (int i = 0; i < rotary_dim; i += 2) {
+      const float x0 = static_cast<float>(x[i]);
+      const float x1 = static_cast<float>(x[i + 1]);
+      out[i] = static_cast<T>(x0 * cos[i] + x1 * signed_sin[i]);
+      out[i + 1] = static_cast<T>(x1 * cos[i + 1] + x0 * signed_sin[i + 1]);
+    }
+  }
+};
+
+}  // namespace functor
+
+template <typename T>
+class QKRotaryPositionalEmbeddingOp : public OpKernel {
+ public:
+  explicit QKRotaryPositionalEmbeddingOp(OpKernelConstruction* ctx)
+      : OpKernel(ctx) {
+    OP_REQUIRES_OK(ctx, ctx->GetAttr("rotary_dim", &rotary_dim_));
+    OP_REQUIRES_OK(ctx,
+                   ctx->GetAttr("num_attention_heads", &num_attention_heads_));
+    OP_REQUIRES_OK(ctx, ctx->GetAttr("head_dim", &head_dim_));
+  }
+
+  void Compute(OpKernelContext* ctx) override {
+    const Tensor& q = ctx->input(0);
+    const Tensor& k = ctx->input(1);
+    const Tensor& sin = ctx->input(2);
+    const Tensor& cos = ctx->input(3);
+
+    OP_REQUIRES(ctx, q.dims() == 4 && q.shape() == k.shape(),
+                errors::InvalidArgument(
+                    "query and key must be 4-dimensional with the same shape, "
+                    "but got ",
+                    q.shape().DebugString(), " and ", k.shape().DebugString()));
+    OP_REQUIRES(
+        ctx,
+        q.dim_size(2) == num_attention_heads_ && q.dim_size(3) == head_dim_,
+        errors::InvalidArgument("query must be [batch, length, ",
+                                num_attention_heads_, ", ", head_dim_,
+                                "], but got ", q.shape().DebugString()));
+    OP_REQUIRES(
+        ctx,
+        rotary_dim_ > 0 && rotary_dim_ % 2 == 0 && rotary_dim_ <= head_dim_,
+        errors::InvalidArgument(
+            "rotary_dim must be even and in (0, head_dim], but got ",
+            rotary_dim_));
+
+    const int B = q.dim_size(0);
+    const int length = q.dim_size(1);
+    OP_REQUIRES(
+        ctx, sin.shape() == cos.shape(),
+        errors::InvalidArgument(
+            "sin and cos must have the same shape, but got ",
+            sin.shape().DebugString(), " and ", cos.shape().DebugString()));
+    OP_REQUIRES(ctx,
+                sin.dims() == 4 &&
+                    (sin.dim_size(0) == B || sin.dim_size(0) == 1) &&
+                    sin.dim_size(1) == length && sin.dim_size(2) == 1 &&
+                    sin.dim_size(3) == rotary_dim_,
+                errors::InvalidArgument("sin must be [", B, " or 1, ", length,
+                                        ", 1, ", rotary_dim_, "], but got ",
+                                        sin.shape().DebugString()));
+
+    Tensor* output_q = nullptr;
+    Tensor* output_k = nullptr;
+    OP_REQUIRES_OK(ctx, ctx->forward_input_or_allocate_output({0}, 0, q.shape(),
+                                                              &output_q));
+    OP_REQUIRES_OK(ctx, ctx->forward_input_or_allocate_output({1}, 1, k.shape(),
+                                                              &output_k));
+    if (q.NumElements() == 0) return;
+
+    const bool bcast = sin.dim_size(0) != B;
+    functor::QKRotaryPositionalEmbedding<T>()(
+        ctx->eigen_cpu_device(), q.flat<T>().data(), k.flat<T>().data(),
+        sin.flat<T>().data(), cos.flat<T>().data(), output_q->flat<T>().data(),
+        output_k->flat<T>().data(), bcast, B, length, num_attention_heads_,
+        head_dim_, rotary_dim_);
+  }
+
+ private:
+  int rotary_dim_;
+  int num_attention_heads_;
+  int head_dim_;
+};
+
+#define REGISTER_QK_ROTARY_EMBEDDING(type)                    \
+  REGISTER_KERNEL_BUILDER(Name("QKRotaryPositionalEmbedding") \
+                              .Device(DEVICE_CPU)             \
+                              .TypeConstraint<type>("T"),     \
+                          QKRotaryPositionalEmbeddingOp<type>)
+
+TF_CALL_float(REGISTER_QK_ROTARY_EMBEDDING);
+TF_CALL_half(REGISTER_QK_ROTARY_EMBEDDING);
+TF_CALL_bfloat16(REGISTER_QK_ROTARY_EMBEDDING);
+
+#undef REGISTER_QK_ROTARY_EMBEDDING
+
+}  // namespace itex
@@ -0,0 +1,270 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include <algorithm>
+#include <cmath>
+#include <vector>
+
+#include "itex/core/utils/errors.h"
+#include "itex/core/utils/op_kernel.h"
+#include "itex/core/utils/op_requires.h"
+#include "itex/core/utils/plugin_tensor.h"
+#include "itex/core/utils/register_types.h"
+#include "itex/core/utils/tensor_shape.h"
+#include "itex/core/utils/types.h"
+#include "third_party/eigen3/unsupported/Eigen/CXX11/Tensor"
+
+namespace itex {
+
+typedef Eigen::ThreadPoolDevice CPUDevice;
+
+namespace functor {
+
+// Returns 1 / sqrt(mean(x * x) + epsilon) of a row and stores the row in
+// float, so that the row is read from memory only once.
+template <typename T>
+inline float RMSNormRowRstd(const T* x, int cols, float epsilon, float* x_f) {
+  float sum = 0.f;
+  for (int i = 0; i < cols; ++i) {
+    x_f[i] = static_cast<float>(x[i]);
+    sum += x_f[i] * x_f[i];
+  }
+  return 1.f / std::sqrt(sum / cols + epsilon);
+}
+
+// y = x / sqrt(mean(x * x) + epsilon) * gamma + beta over the last dim.
+// Each row is a task, which is read once into a float buffer and written
+// once, with float accumulation for reduced types.
+template <typename T, typename U>
+struct RMSNormCPUFunctor {
+  void operator()(const CPUDevice& d, const T* x, const U* gamma, const U* beta,
+                  T* y, float epsilon, bool use_scale, bool use_center,
+                  int64 rows, int cols) {
+    auto task = [&](Eigen::Index first, Eigen::Index last) {
+      std::vector<float> x_f(cols);
+      for (Eigen::Index row = first; row < last; ++row) {
+        const int64 offset = row * cols;
+        const float rstd =
+            RMSNormRowRstd(x + offset, cols, epsilon, x_f.data());
+        T* y_row = y + offset;
+        for (int i = 0; i < cols; ++i) {
+          float value = x_f[i] * rstd;
+          if (use_scale) value *= static_cast<float>(gamma[i]);
+          if (use_center) value += static_cast<float>(beta[i]);
+          y_row[i] = static_cast<T>(value);
+        }
+      }
+    };
+    const int64 bytes_per_row = cols * sizeof(T);
+    d.parallelFor(rows,
+                  Eigen::TensorOpCost(bytes_per_row, bytes_per_row, 5 * cols),
+                  task);
+  }
+};
+
+// With x_hat = x * rstd:
+//   dx = rstd * (dy * gamma - x_hat * mean(dy * gamma * x_hat))
+//   dgamma = sum(dy * x_hat), dbeta = sum(dy) over the rows.
+// Rows are split into one block per thread. Each block accumulates dgamma and
+// dbeta in its own float buffer, which are summed at the end.
+template <typename T, typename U>
+struct RMSNormGradCPUFunctor {
+  void operator()(const CPUDevice& d, const T* dy, const T* x, const U* gamma,
+                  T* dx, U* dgamma, U* dbeta, float epsilon, bool use_scale,
+                  int64 rows, int cols) {
+    const int64 num_blocks =
+        std::max<int64>(1, std::min<int64>(rows, d.numThreads()));
+    const int64 block_size = (rows + num_blocks - 1) / num_blocks;
+    // dgamma and dbeta of each block.
+    std::vector<float> partials(num_blocks * 2 * cols, 0.f);
+
+    auto task = [&](Eigen::Index first, Eigen::Index last) {
+      std::vector<float> x_f(cols);
+      std::vector<float> dy_f(cols);
+      for (Eigen::Index block = first; block < last; ++block) {
+        float* dgamma_block = partials.data() + block * 2 * cols;
+        float* dbeta_block = dgamma_block + cols;
+        const int64 row_end = std::min(rows, (block + 1) * block_size);
+        for (int64 row = block * block_size; row < row_end; ++row) {
+          const int64 offset = row * cols;
+          const float rstd =
+              RMSNormRowRstd(x + offset, cols, epsilon, x_f.data());
+          const T* dy_row = dy + offset;
+          float dot = 0.f;
+          for (int i = 0; i < cols; ++i) {
+            const float x_hat = x_f[i] * rstd;
+            const float g = static_cast<float>(dy_row[i]);
+            dgamma_block[i] += g * x_hat;
+            dbeta_block[i] += g;
+            dy_f[i] = use_scale ? g * static_cast<float>(gamma[i]) : g;
+            dot += dy_f[i] * x_hat;
+          }
+          const float mean_dot = dot / cols;
+          T* dx_row = dx + offset;
+          for (int i = 0; i < cols; ++i) {
+            dx_row[i] =
+                static_cast<T>(rstd * (dy_f[i] - x_f[i] * rstd * mean_dot));
+          }
+        }
+      }
+    };
+    const int64 bytes_per_block = 3 * block_size * cols * sizeof(T);
+    d.parallelFor(num_blocks,
+                  Eigen::TensorOpCost(bytes_per_block, bytes_per_block,
+                                      10 * block_size * cols),
+                  task);
+
+    auto reduce = [&](Eigen::Index first, Eigen::Index last) {
+      for (Eigen::Index i = first; i < last; ++i) {
+        float dgamma_sum = 0.f, dbeta_sum = 0.f;
+        for (int64 block = 0; block < num_blocks; ++block) {
+          dgamma_sum += partials[block * 2 * cols + i];
+          dbeta_sum += partials[block * 2 * cols + cols + i];
+        }
+        dgamma[i] = static_cast<U>(use_scale ? dgamma_sum : 0.f);
+        dbeta[i] = static_cast<U>(dbeta_sum);
+      }
+    };
+    d.parallelFor(cols,
+                  Eigen::TensorOpCost(2 * num_blocks * sizeof(float),
+                                      2 * sizeof(U), 2 * num_blocks),
+                  reduce);
+  }
+};
+
+}  // namespace functor
+
+namespace {
+
+Status ValidateRMSNormInputs(const Tensor& input, const Tensor& gamma) {
+  if (input.dims() < 1) {
+    return errors::InvalidArgument("input must be at least 1-dimensional",
+                                   input.shape().DebugString());
+  }
+  if (gamma.dims() != 1 ||
+      gamma.dim_size(0) != input.dim_size(input.dims() - 1)) {
+    return errors::InvalidArgument(
+        "gamma's size", gamma.shape().DebugString(),
+        " must be equal to input's last-dimensional size, but got",
+        input.shape().DebugString());
+  }
+  return Status::OK();
+}
+
+}  // namespace
+
+template <typename T, typename U>
+class RMSNormOp : public OpKernel {
+ public:
+  explicit RMSNormOp(OpKernelConstruction* context) : OpKernel(context) {
+    OP_REQUIRES_OK(context, context->GetAttr("epsilon", &epsilon_));
+    OP_REQUIRES_OK(context, context->GetAttr("use_scale", &use_scale_));
+    OP_REQUIRES_OK(context, context->GetAttr("use_center", &use_center_));
+  }
+
+  void Compute(OpKernelContext* context) override {
+    const Tensor& input = context->input(0);
+    const Tensor& gamma = context->input(1);
+    const Tensor& beta = context->input(2);
+    OP_REQUIRES_OK(context, ValidateRMSNormInputs(input, gamma));
+    OP_REQUIRES(context, beta.shape() == gamma.shape(),
+                errors::InvalidArgument(
+                    "beta's size", beta.shape().DebugString(),
+                    " must be equal to input's last-dimensional size, but got",
+                    input.shape().DebugString()));
+
+    Tensor* output = nullptr;
+    OP_REQUIRES_OK(context, context->forward_input_or_allocate_output(
+                                {0}, 0, input.shape(), &output));
+    if (input.NumElements() == 0) return;
+
+    const int cols = input.dim_size(input.dims() - 1);
+    functor::RMSNormCPUFunctor<T, U>()(
+        context->eigen_cpu_device(), input.flat<T>().data(),
+        gamma.flat<U>().data(), beta.flat<U>().data(), output->flat<T>().data(),
+        epsilon_, use_scale_, use_center_, input.NumElements() / cols, cols);
+  }
+
+ private:
+  bool use_scale_;
+  bool use_center_;
+  float epsilon_;
+};
+
+template <typename T, typename U>
+class RMSNormGradOp : public OpKernel {
+ public:
+  explicit RMSNormGradOp(OpKernelConstruction* context) : OpKernel(context) {
+    OP_REQUIRES_OK(context, context->GetAttr("epsilon", &epsilon_));
+    OP_REQUIRES_OK(context, context->GetAttr("use_scale", &use_scale_));
+  }
+
+  void Compute(OpKernelContext* context) override {
+    const Tensor& y_backprop = context->input(0);
+    const Tensor& input = context->input(1);
+    const Tensor& gamma = context->input(2);
+    OP_REQUIRES_OK(context, ValidateRMSNormInputs(input, gamma));
+    OP_REQUIRES(context, y_backprop.shape() == input.shape(),
+                errors::InvalidArgument(
+                    "y_backprop and x must have the same shape, but got ",
+                    y_backprop.shape().DebugString(), " and ",
+                    input.shape().DebugString()));
+
+    Tensor* x_backprop = nullptr;
+    Tensor* scale_backprop = nullptr;
+    Tensor* offset_backprop = nullptr;
+    OP_REQUIRES_OK(context, context->forward_input_or_allocate_output(
+                                {0}, 0, input.shape(), &x_backprop));
+    OP_REQUIRES_OK(context,
+                   context->allocate_output(1, gamma.shape(), &scale_backprop));
+    OP_REQUIRES_OK(
+        context, context->allocate_output(2, gamma.shape(), &offset_backprop));
+    const int cols = input.dim_size(input.dims() - 1);
+    if (input.NumElements() == 0) {
+      scale_backprop->flat<U>().setZero();
+      offset_backprop->flat<U>().setZero();
+      return;
+    }
+
+    functor::RMSNormGradCPUFunctor<T, U>()(
+        context->eigen_cpu_device(), y_backprop.flat<T>().data(),
+        input.flat<T>().data(), gamma.flat<U>().data(),
+        x_backprop->flat<T>().data(), scale_backprop->flat<U>().data(),
+        offset_backprop->flat<U>().data(), epsilon_, use_scale_,
+        input.NumElements() / cols, cols);
+  }
+
+ private:
+  bool use_scale_;
+  float epsilon_;
+};
+
+#define REGISTER_RMS_NORM_CPU(T, U)                    \
+  REGISTER_KERNEL_BUILDER(Name("ItexRmsNorm")          \
+                              .Device(DEVICE_CPU)      \
+                              .TypeConstraint<T>("T")  \
+                              .TypeConstraint<U>("U"), \
+                          RMSNormOp<T, U>);            \
+  REGISTER_KERNEL_BUILDER(Name("ItexRmsNormGrad")      \
+                              .Device(DEVICE_CPU)      \
+                              .TypeConstraint<T>("T")  \
+                              .TypeConstraint<U>("U"), \
+                          RMSNormGradOp<T, U>);
+REGISTER_RMS_NORM_CPU(float, float);
+REGISTER_RMS_NORM_CPU(Eigen::bfloat16, float);
+REGISTER_RMS_NORM_CPU(Eigen::half, float);
+#undef REGISTER_RMS_NORM_CPU
+
+}  // namespace itex
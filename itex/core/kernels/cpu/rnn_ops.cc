@@ -0,0 +1,575 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include <cmath>
+#include <cstring>
+#include <type_traits>
+
+#include "itex/core/kernels/common/rnn_ops.h"
+#include "itex/core/kernels/cpu/cpu_blas.h"
+#include "itex/core/utils/errors.h"
+#include "itex/core/utils/op_kernel.h"
+#include "itex/core/utils/op_requires.h"
+#include "itex/core/utils/plugin_tensor.h"
+#include "itex/core/utils/register_types.h"
+#include "itex/core/utils/tensor_shape.h"
+#include "itex/core/utils/types.h"
+#include "third_party/eigen3/unsupported/Eigen/CXX11/Tensor"
+
+namespace itex {
+
+typedef Eigen::ThreadPoolDevice CPUDevice;
+
+namespace internal {
+
+// The CPU kernels compute in float. Inputs of reduced types are cast into a
+// float temporary once, outputs are cast back at the end.
+template <typename From, typename To>
+void CastData(const CPUDevice& d, const From* in, To* out, int64 size) {
+  auto task = [&](Eigen::Index first, Eigen::Index last) {
+    for (Eigen::Index i = first; i < last; ++i) {
+      out[i] = static_cast<To>(static_cast<float>(in[i]));
+    }
+  };
+  d.parallelFor(size, Eigen::TensorOpCost(sizeof(From), sizeof(To), 1), task);
+}
+
+// Float view of an optional input of type T.
+template <typename T>
+class FloatInput {
+ public:
+  Status Init(OpKernelContext* context, const Tensor* input) {
+    if (input == nullptr) return Status::OK();
+    if (std::is_same<T, float>::value) {
+      data_ = reinterpret_cast<const float*>(input->flat<T>().data());
+      return Status::OK();
+    }
+    TF_RETURN_IF_ERROR(
+        context->allocate_temp(DT_FLOAT, input->shape(), &buffer_));
+    CastData(context->eigen_device<CPUDevice>(), input->flat<T>().data(),
+             buffer_.flat<float>().data(), input->NumElements());
+    data_ = buffer_.flat<float>().data();
+    return Status::OK();
+  }
+
+  const float* data() const { return data_; }
+
+ private:
+  Tensor buffer_;
+  const float* data_ = nullptr;
+};
+
+// Float view of an output of type T, which Commit() casts into the output.
+template <typename T>
+class FloatOutput {
+ public:
+  Status Init(OpKernelContext* context, Tensor* output) {
+    output_ = output;
+    if (std::is_same<T, float>::value) {
+      data_ = reinterpret_cast<float*>(output->flat<T>().data());
+      return Status::OK();
+    }
+    TF_RETURN_IF_ERROR(
+        context->allocate_temp(DT_FLOAT, output->shape(), &buffer_));
+    data_ = buffer_.flat<float>().data();
+    return Status::OK();
+  }
+
+  float* data() const { return data_; }
+
+  void Commit(const CPUDevice& d) {
+    if (std::is_same<T, float>::value) return;
+    CastData(d, static_cast<const float*>(data_), output_->flat<T>().data(),
+             output_->NumElements());
+  }
+
+ private:
+  Tensor* output_ = nullptr;
+  Tensor buffer_;
+  float* data_ = nullptr;
+};
+
+// out[r, :] (+)= in[r, :] * mask for each of the `rows` rows of `size`.
+inline void ApplyMask(const CPUDevice& d, const float* in, const float* mask,
+                      float* out, int64 rows, int64 size, bool accumulate) {
+  auto task = [&](Eigen::Index first, Eigen::Index last) {
+    for (Eigen::Index r = first; r < last; ++r) {
+      const float* in_row = in + r * size;
+      float* out_row = out + r * size;
+      if (accumulate) {
+        for (int64 k = 0; k < size; ++k) out_row[k] += in_row[k] * mask[k];
+      } else {
+        for (int64 k = 0; k < size; ++k) out_row[k] = in_row[k] * mask[k];
+      }
+    }
+  };
+  d.parallelFor(rows, Eigen::TensorOpCost(8 * size, 4 * size, size), task);
+}
+
+inline float Sigmoid(float x) { return 1.f / (1.f + std::exp(-x)); }
+
+// Offset of c_states in the training workspace, whose layout is shared with
+// the GPU kernel, see RnnCommonKernel::ExtractInput. The CPU kernels only use
+// gates and c_states: the masked inputs are recomputed by the gradient, which
+// is cheaper than the strided GEMMs they would need.
+inline int64 CStatesOffset(const RnnModelConfig& rmc) {
+  const int64 size = static_cast<int64>(rmc.max_seq_length) * rmc.num_gates *
+                     rmc.batch_size;
+  int64 offset = size * rmc.output_size;
+  if (rmc.HasDpMask()) offset += size * rmc.input_size;
+  if (rmc.HasRecDpMask()) offset += size * rmc.output_size;
+  return offset;
+}
+
+// LSTM forward. The params are [W_ih (4H, I), W_hh (4H, H), bias (4H)] with
+// gates in i, f, c, o order.
+//   1. The input projection of all timesteps is one [T * B, I] x [I, 4H]
+//      GEMM, or one per gate with input dropout.
+//   2. Each timestep accumulates h_prev x W_hh^T onto its igates, then a fused
+//      pass applies bias and nonlinearities and updates h and c in place.
+// With var_seq_length, the steps after a sequence's length output zeros and
+// carry h and c, so output_h and output_c are the states at the length.
+inline Status LstmForward(OpKernelContext* context, const RnnModelConfig& rmc,
+                          const float* x, const float* h0, const float* c0,
+                          const float* params, const float* dp_mask,
+                          const float* rec_dp_mask, const int32* seq_lengths,
+                          float* output, float* hy, float* cy, float* gates,
+                          float* c_states) {
+  const CPUDevice& d = context->eigen_device<CPUDevice>();
+  const int64 seq = rmc.max_seq_length;
+  const int64 batch = rmc.batch_size;
+  const int64 in = rmc.input_size;
+  const int64 hidden = rmc.output_size;
+  const int64 gh = 4 * hidden;
+  const float* w_ih = params;
+  const float* w_hh = w_ih + gh * in;
+  const float* bias = w_hh + gh * hidden;
+
+  // igates: (max_seq_length, batch_size, num_gates * output_size)
+  Tensor igates_t;
+  TF_RETURN_IF_ERROR(
+      context->allocate_temp(DT_FLOAT, TensorShape({seq * batch * gh}),
+                             &igates_t));
+  float* igates = igates_t.flat<float>().data();
+  if (dp_mask != nullptr) {
+    Tensor masked_t;
+    TF_RETURN_IF_ERROR(context->allocate_temp(
+        DT_FLOAT, TensorShape({seq * batch * in}), &masked_t));
+    float* masked = masked_t.flat<float>().data();
+    for (int64 g = 0; g < 4; ++g) {
+      ApplyMask(d, x, dp_mask + g * batch * in, masked, seq, batch * in,
+                false);
+      cpublas::gemm('N', 'T', seq * batch, hidden, in, 1.f, masked, in,
+                    const_cast<float*>(w_ih + g * hidden * in), in, 0.f,
+                    igates + g * hidden, gh);
+    }
+  } else {
+    cpublas::gemm('N', 'T', seq * batch, gh, in, 1.f, const_cast<float*>(x),
+                  in, const_cast<float*>(w_ih), in, 0.f, igates, gh);
+  }
+
+  // h, c and the recurrent-dropout masked h of the current step.
+  Tensor states_t;
+  TF_RETURN_IF_ERROR(context->allocate_temp(
+      DT_FLOAT, TensorShape({3 * batch * hidden}), &states_t));
+  float* h = states_t.flat<float>().data();
+  float* c = h + batch * hidden;
+  float* masked_h = c + batch * hidden;
+  std::memcpy(h, h0, batch * hidden * sizeof(float));
+  std::memcpy(c, c0, batch * hidden * sizeof(float));
+
+  for (int64 t = 0; t < seq; ++t) {
+    float* igates_step = igates + t * batch * gh;
+    if (rec_dp_mask != nullptr) {
+      for (int64 g = 0; g < 4; ++g) {
+        ApplyMask(d, h, rec_dp_mask + g * batch * hidden, masked_h, 1,
+                  batch * hidden, false);
+        cpublas::gemm('N', 'T', batch, hidden, hidden, 1.f, masked_h, hidden,
+                      const_cast<float*>(w_hh + g * hidden * hidden), hidden,
+                      1.f, igates_step + g * hidden, gh);
+      }
+    } else {
+      cpublas::gemm('N', 'T', batch, gh, hidden, 1.f, h, hidden,
+                    const_cast<float*>(w_hh), hidden, 1.f, igates_step, gh);
+    }
+
+    auto cell = [&](Eigen::Index first, Eigen::Index last) {
+      for (Eigen::Index b = first; b < last; ++b) {
+        float* h_row = h + b * hidden;
+        float* c_row = c + b * hidden;
+        float* out_row = output + (t * batch + b) * hidden;
+        float* gates_row =
+            gates == nullptr ? nullptr : gates + (t * 4 * batch + b) * hidden;
+        const int64 gate_stride = batch * hidden;
+        const bool active = seq_lengths == nullptr || t < seq_lengths[b];
+        if (!active) {
+          std::memset(out_row, 0, hidden * sizeof(float));
+          if (gates != nullptr) {
+            for (int64 g = 0; g < 4; ++g) {
+              std::memset(gates_row + g * gate_stride, 0,
+                          hidden * sizeof(float));
+            }
+          }
+        } else {
+          const float* pre = igates_step + b * gh;
+          for (int64 j = 0; j < hidden; ++j) {
+            const float it = Sigmoid(pre[j] + bias[j]);
+            const float ft = Sigmoid(pre[hidden + j] + bias[hidden + j]);
+            const float ct =
+                std::tanh(pre[2 * hidden + j] + bias[2 * hidden + j]);
+            const float ot =
+                Sigmoid(pre[3 * hidden + j] + bias[3 * hidden + j]);
+            c_row[j] = ft * c_row[j] + it * ct;
+            h_row[j] = ot * std::tanh(c_row[j]);
+            out_row[j] = h_row[j];
+            if (gates != nullptr) {
+              gates_row[j] = it;
+              gates_row[gate_stride + j] = ft;
+              gates_row[2 * gate_stride + j] = ct;
+              gates_row[3 * gate_stride + j] = ot;
+            }
+          }
+        }
+        if (c_states != nullptr) {
+          std::memcpy(c_states + (t * batch + b) * hidden, c_row,
+                      hidden * sizeof(float));
+        }
+      }
+    };
+    d.parallelFor(batch,
+                  Eigen::TensorOpCost(4 * gh, 12 * hidden, 40 * hidden), cell);
+  }
+  std::memcpy(hy, h, batch * hidden * sizeof(float));
+  std::memcpy(cy, c, batch * hidden * sizeof(float));
+  return Status::OK();
+}
+
+// LSTM backward through time with the gates and c_states saved by the
+// forward. The per-step work is the fused gate gradient and one
+// [B, 4H] x [4H, H] GEMM for dh_prev. dgates of all timesteps are kept in a
+// [T * B, 4H] buffer, so that dx, dW_ih and dW_hh are each one large GEMM
+// (one per gate with dropout) after the loop.
+inline Status LstmBackward(OpKernelContext* context, const RnnModelConfig& rmc,
+                           const float* x, const float* h0, const float* c0,
+                           const float* params, const float* dp_mask,
+                           const float* rec_dp_mask, const int32* seq_lengths,
+                           const float* output, const float* gates,
+                           const float* c_states, const float* dy,
+                           const float* dhy, const float* dcy, float* dx,
+                           float* dh0, float* dc0, float* dparams) {
+  const CPUDevice& d = context->eigen_device<CPUDevice>();
+  const int64 seq = rmc.max_seq_length;
+  const int64 batch = rmc.batch_size;
+  const int64 in = rmc.input_size;
+  const int64 hidden = rmc.output_size;
+  const int64 gh = 4 * hidden;
+  const float* w_ih = params;
+  const float* w_hh = w_ih + gh * in;
+  float* dw_ih = dparams;
+  float* dw_hh = dw_ih + gh * in;
+  float* dbias = dw_hh + gh * hidden;
+
+  // dgates: (max_seq_length, batch_size, num_gates * output_size)
+  Tensor dgates_t;
+  TF_RETURN_IF_ERROR(
+      context->allocate_temp(DT_FLOAT, TensorShape({seq * batch * gh}),
+                             &dgates_t));
+  float* dgates = dgates_t.flat<float>().data();
+
+  // dh and dc carried to the previous step, dh_prev from the GEMM and a
+  // buffer for the recurrent-dropout masked GEMMs.
+  Tensor states_t;
+  TF_RETURN_IF_ERROR(context->allocate_temp(
+      DT_FLOAT, TensorShape({4 * batch * hidden}), &states_t));
+  float* dh = states_t.flat<float>().data();
+  float* dc = dh + batch * hidden;
+  float* dh_prev = dc + batch * hidden;
+  float* dh_gate = dh_prev + batch * hidden;
+  std::memcpy(dh, dhy, batch * hidden * sizeof(float));
+  std::memcpy(dc, dcy, batch * hidden * sizeof(float));
+
+  for (int64 t = seq - 1; t >= 0; --t) {
+    float* dgates_step = dgates + t * batch * gh;
+    const float* c_prev = t == 0 ? c0 : c_states + (t - 1) * batch * hidden;
+
+    auto cell_grad = [&](Eigen::Index first, Eigen::Index last) {
+      for (Eigen::Index b = first; b < last; ++b) {
+        float* dgates_row = dgates_step + b * gh;
+        if (seq_lengths != nullptr && t >= seq_lengths[b]) {
+          // dh and dc pass through the padded steps.
+          std::memset(dgates_row, 0, gh * sizeof(float));
+          continue;
+        }
+        const int64 gate_stride = batch * hidden;
+        const float* gates_row = gates + (t * 4 * batch + b) * hidden;
+        const float* c_row = c_states + (t * batch + b) * hidden;
+        const float* c_prev_row = c_prev + b * hidden;
+        const float* dy_row = dy + (t * batch + b) * hidden;
+        float* dh_row = dh + b * hidden;
+        float* dc_row = dc + b * hidden;
+        for (int64 j = 0; j < hidden; ++j) {
+          const float it = gates_row[j];
+          const float ft = gates_row[gate_stride + j];
+          const float ct = gates_row[2 * gate_stride + j];
+          const float ot = gates_row[3 * gate_stride + j];
+          const float dh_next = dh_row[j] + dy_row[j];
+          const float tanh_c = std::tanh(c_row[j]);
+          const float dc_next =
+              dc_row[j] + dh_next * ot * (1.f - tanh_c * tanh_c);
+          dgates_row[j] = dc_next * ct * it * (1.f - it);
+          dgates_row[hidden + j] = dc_next * c_prev_row[j] * ft * (1.f - ft);
+          dgates_row[2 * hidden + j] = dc_next * it * (1.f - ct * ct);
+          dgates_row[3 * hidden + j] = dh_next * tanh_c * ot * (1.f - ot);
+          dc_row[j] = dc_next * ft;
+        }
+      }
+    };
+    d.parallelFor(batch,
+                  Eigen::TensorOpCost(12 * hidden, 4 * gh, 30 * hidden),
+                  cell_grad);
+
+    if (rec_dp_mask != nullptr) {
+      for (int64 g = 0; g < 4; ++g) {
+        cpublas::gemm('N', 'N', batch, hidden, hidden, 1.f,
+                      dgates_step + g * hidden, gh,
+                      const_cast<float*>(w_hh + g * hidden * hidden), hidden,
+                      0.f, dh_gate, hidden);
+        ApplyMask(d, dh_gate, rec_dp_mask + g * batch * hidden, dh_prev, 1,
+                  batch * hidden, g > 0);
+      }
+    } else {
+      cpublas::gemm('N', 'N', batch, hidden, gh, 1.f, dgates_step, gh,
+                    const_cast<float*>(w_hh), hidden, 0.f, dh_prev, hidden);
+    }
+    for (int64 b = 0; b < batch; ++b) {
+      if (seq_lengths == nullptr || t < seq_lengths[b]) {
+        std::memcpy(dh + b * hidden, dh_prev + b * hidden,
+                    hidden * sizeof(float));
+      }
+    }
+  }
+  std::memcpy(dh0, dh, batch * hidden * sizeof(float));
+  std::memcpy(dc0, dc, batch * hidden * sizeof(float));
+
+  // h_prev of all timesteps is h0 followed by output[0 : T - 1]. Padded
+  // steps have zero dgates, so their zero outputs don't contribute.
+  if (rec_dp_mask != nullptr) {
+    Tensor masked_t;
+    TF_RETURN_IF_ERROR(context->allocate_temp(
+        DT_FLOAT, TensorShape({seq * batch * hidden}), &masked_t));
+    float* masked = masked_t.flat<float>().data();
+    for (int64 g = 0; g < 4; ++g) {
+      const float* mask = rec_dp_mask + g * batch * hidden;
+      ApplyMask(d, h0, mask, masked, 1, batch * hidden, false);
+      ApplyMask(d, output, mask, masked + batch * hidden, seq - 1,
+                batch * hidden, false);
+      cpublas::gemm('T', 'N', hidden, hidden, seq * batch, 1.f,
+                    dgates + g * hidden, gh, masked, hidden, 0.f,
+                    dw_hh + g * hidden * hidden, hidden);
+    }
+  } else {
+    cpublas::gemm('T', 'N', gh, hidden, batch, 1.f, dgates, gh,
+                  const_cast<float*>(h0), hidden, 0.f, dw_hh, hidden);
+    if (seq > 1) {
+      cpublas::gemm('T', 'N', gh, hidden, (seq - 1) * batch, 1.f,
+                    dgates + batch * gh, gh, const_cast<float*>(output),
+                    hidden, 1.f, dw_hh, hidden);
+    }
+  }
+
+  if (dp_mask != nullptr) {
+    Tensor masked_t;
+    TF_RETURN_IF_ERROR(context->allocate_temp(
+        DT_FLOAT, TensorShape({seq * batch * in}), &masked_t));
+    float* masked = masked_t.flat<float>().data();
+    for (int64 g = 0; g < 4; ++g) {
+      const float* mask = dp_mask + g * batch * in;
+      ApplyMask(d, x, mask, masked, seq, batch * in, false);
+      cpublas::gemm('T', 'N', hidden, in, seq * batch, 1.f,
+                    dgates + g * hidden, gh, masked, in, 0.f,
+                    dw_ih + g * hidden * in, in);
+      cpublas::gemm('N', 'N', seq * batch, in, hidden, 1.f,
+                    dgates + g * hidden, gh,
+                    const_cast<float*>(w_ih + g * hidden * in), in, 0.f,
+                    masked, in);
+      ApplyMask(d, masked, mask, dx, seq, batch * in, g > 0);
+    }
+  } else {
+    cpublas::gemm('T', 'N', gh, in, seq * batch, 1.f, dgates, gh,
+                  const_cast<float*>(x), in, 0.f, dw_ih, in);
+    cpublas::gemm('N', 'N', seq * batch, in, gh, 1.f, dgates, gh,
+                  const_cast<float*>(w_ih), in, 0.f, dx, in);
+  }
+
+  auto bias_grad = [&](Eigen::Index first, Eigen::Index last) {
+    for (Eigen::Index k = first; k < last; ++k) dbias[k] = 0.f;
+    for (int64 r = 0; r < seq * batch; ++r) {
+      const float* row = dgates + r * gh;
+      for (Eigen::Index k = first; k < last; ++k) dbias[k] += row[k];
+    }
+  };
+  d.parallelFor(gh, Eigen::TensorOpCost(4 * seq * batch, 4, seq * batch),
+                bias_grad);
+  return Status::OK();
+}
+
+}  // namespace internal
+
+namespace functor {
+
+template <typename T>
+struct RnnFunctor<CPUDevice, T> {
+  void operator()(OpKernelContext* context, const RnnModelConfig& rmc,
+                  const Tensor* input, const Tensor* input_h,
+                  const Tensor* input_c, const Tensor* params,
+                  const Tensor* seq_lengths, const Tensor* dp_mask,
+                  const Tensor* rec_dp_mask, Tensor* output, Tensor* output_h,
+                  Tensor* output_c, Tensor* workspace,
+                  MatMulFunctor<CPUDevice, T, T, T, true>* input_gemm,
+                  MatMulFunctor<CPUDevice, T, T, T, true>* h_gemm) {
+    OP_REQUIRES(context, rmc.rnn_mode == RnnMode::kRnnLstm,
+                errors::Unimplemented("ItexRnn only supports lstm on CPU."));
+    OP_REQUIRES(context, rmc.num_proj == 0,
+                errors::Unimplemented(
+                    "ItexRnn doesn't support num_proj on CPU."));
+    if (output->NumElements() == 0) {
+      output_h->flat<T>() = input_h->flat<T>();
+      output_c->flat<T>() = input_c->flat<T>();
+      return;
+    }
+
+    internal::FloatInput<T> x, h0, c0, w, dp, rec_dp;
+    OP_REQUIRES_OK(context, x.Init(context, input));
+    OP_REQUIRES_OK(context, h0.Init(context, input_h));
+    OP_REQUIRES_OK(context, c0.Init(context, input_c));
+    OP_REQUIRES_OK(context, w.Init(context, params));
+    OP_REQUIRES_OK(context, dp.Init(context, rmc.HasDpMask() ? dp_mask
+                                                             : nullptr));
+    OP_REQUIRES_OK(context, rec_dp.Init(context, rmc.HasRecDpMask()
+                                                     ? rec_dp_mask
+                                                     : nullptr));
+
+    internal::FloatOutput<T> y, hy, cy, ws;
+    OP_REQUIRES_OK(context, y.Init(context, output));
+    OP_REQUIRES_OK(context, hy.Init(context, output_h));
+    OP_REQUIRES_OK(context, cy.Init(context, output_c));
+    float* gates = nullptr;
+    float* c_states = nullptr;
+    if (rmc.is_training) {
+      OP_REQUIRES_OK(context, ws.Init(context, workspace));
+      gates = ws.data();
+      c_states = gates + internal::CStatesOffset(rmc);
+    }
+
+    OP_REQUIRES_OK(
+        context,
+        internal::LstmForward(
+            context, rmc, x.data(), h0.data(), c0.data(), w.data(), dp.data(),
+            rec_dp.data(),
+            rmc.var_seq_length ? seq_lengths->flat<int32>().data() : nullptr,
+            y.data(), hy.data(), cy.data(), gates, c_states));
+
+    const CPUDevice& d = context->eigen_device<CPUDevice>();
+    y.Commit(d);
+    hy.Commit(d);
+    cy.Commit(d);
+    if (rmc.is_training) ws.Commit(d);
+  }
+};
+
+template <typename T>
+struct RnnGradFunctor<CPUDevice, T> {
+  void operator()(
+      OpKernelContext* context, const RnnModelConfig& rmc, const Tensor* input,
+      const Tensor* input_h, const Tensor* input_c, const Tensor* params,
+      const Tensor* seq_lengths, const Tensor* dp_mask,
+      const Tensor* rec_dp_mask, const Tensor* output, const Tensor* output_h,
+      const Tensor* output_c, const Tensor* workspace,
+      const Tensor* output_backprop, const Tensor* output_h_backprop,
+      const Tensor* output_c_backprop, Tensor* input_backprop,
+      Tensor* input_h_backprop, Tensor* input_c_backprop,
+      Tensor* params_backprop,
+      MatMulFunctor<CPUDevice, T, T, T, false>* hidden_gemm,
+      MatMulFunctor<CPUDevice, T, T, T, true>* input_gemm,
+      MatMulFunctor<CPUDevice, T, T, T, true>* params_wei_ih_gemm,
+      MatMulFunctor<CPUDevice, T, T, T, true>* params_wei_hh_gemm) {
+    OP_REQUIRES(context, rmc.rnn_mode == RnnMode::kRnnLstm,
+                errors::Unimplemented("ItexRnnGrad only supports lstm on CPU."));
+    OP_REQUIRES(context, rmc.num_proj == 0,
+                errors::Unimplemented(
+                    "ItexRnnGrad doesn't support num_proj on CPU."));
+    if (output_backprop->NumElements() == 0) {
+      input_h_backprop->flat<T>() = output_h_backprop->flat<T>();
+      input_c_backprop->flat<T>() = output_c_backprop->flat<T>();
+      params_backprop->flat<T>().setZero();
+      return;
+    }
+
+    internal::FloatInput<T> x, h0, c0, w, dp, rec_dp, y, ws, dy, dhy, dcy;
+    OP_REQUIRES_OK(context, x.Init(context, input));
+    OP_REQUIRES_OK(context, h0.Init(context, input_h));
+    OP_REQUIRES_OK(context, c0.Init(context, input_c));
+    OP_REQUIRES_OK(context, w.Init(context, params));
+    OP_REQUIRES_OK(context, dp.Init(context, rmc.HasDpMask() ? dp_mask
+                                                             : nullptr));
+    OP_REQUIRES_OK(context, rec_dp.Init(context, rmc.HasRecDpMask()
+                                                     ? rec_dp_mask
+                                                     : nullptr));
+    OP_REQUIRES_OK(context, y.Init(context, output));
+    OP_REQUIRES_OK(context, ws.Init(context, workspace));
+    OP_REQUIRES_OK(context, dy.Init(context, output_backprop));
+    OP_REQUIRES_OK(context, dhy.Init(context, output_h_backprop));
+    OP_REQUIRES_OK(context, dcy.Init(context, output_c_backprop));
+
+    internal::FloatOutput<T> dx, dh0, dc0, dw;
+    OP_REQUIRES_OK(context, dx.Init(context, input_backprop));
+    OP_REQUIRES_OK(context, dh0.Init(context, input_h_backprop));
+    OP_REQUIRES_OK(context, dc0.Init(context, input_c_backprop));
+    OP_REQUIRES_OK(context, dw.Init(context, params_backprop));
+
+    OP_REQUIRES_OK(
+        context,
+        internal::LstmBackward(
+            context, rmc, x.data(), h0.data(), c0.data(), w.data(), dp.data(),
+            rec_dp.data(),
+            rmc.var_seq_length ? seq_lengths->flat<int32>().data() : nullptr,
+            y.data(), ws.data(), ws.data() + internal::CStatesOffset(rmc),
+            dy.data(), dhy.data(), dcy.data(), dx.data(), dh0.data(),
+            dc0.data(), dw.data()));
+
+    const CPUDevice& d = context->eigen_device<CPUDevice>();
+    dx.Commit(d);
+    dh0.Commit(d);
+    dc0.Commit(d);
+    dw.Commit(d);
+  }
+};
+
+}  // namespace functor
+
+#define REGISTER_CPU(T)                                              \
+  REGISTER_KERNEL_BUILDER(                                           \
+      Name("ItexRnn").Device(DEVICE_CPU).TypeConstraint<T>("T"),     \
+      RnnOp<CPUDevice, T>);                                          \
+  REGISTER_KERNEL_BUILDER(                                           \
+      Name("ItexRnnGrad").Device(DEVICE_CPU).TypeConstraint<T>("T"), \
+      RnnGradOp<CPUDevice, T>);
+
+TF_CALL_half(REGISTER_CPU);
+TF_CALL_float(REGISTER_CPU);
+TF_CALL_bfloat16(REGISTER_CPU);
+#undef REGISTER_CPU
+
+}  // namespace itex
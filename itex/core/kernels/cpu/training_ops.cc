@@ -0,0 +1,392 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include <algorithm>
+#include <cmath>
+#include <vector>
+
+#include "itex/core/kernels/common/variable_input_helpers.h"
+#include "itex/core/utils/errors.h"
+#include "itex/core/utils/op_kernel.h"
+#include "itex/core/utils/op_requires.h"
+#include "itex/core/utils/plugin_tensor.h"
+#include "itex/core/utils/register_types.h"
+#include "itex/core/utils/tensor_shape.h"
+#include "itex/core/utils/types.h"
+#include "third_party/eigen3/unsupported/Eigen/CXX11/Tensor"
+
+namespace itex {
+
+typedef Eigen::ThreadPoolDevice CPUDevice;
+
+namespace functor {
+
+// A variable updated by the AdamW / LAMB functors. vhat is nullptr if amsgrad
+// is off.
+template <typename T>
+struct AdamVariable {
+  T* var;
+  T* m;
+  T* v;
+  T* vhat;
+  const T* grad;
+  int64 size;
+  float weight_decay;
+  bool use_lamb;
+};
+
+struct AdamHyperParams {
+  float beta1_power;
+  float beta2_power;
+  float lr;
+  float beta1;
+  float beta2;
+  float epsilon;
+};
+
+// A contiguous range of one variable, which is the unit of parallelism, so
+// many small variables are updated in one sweep and large ones are split.
+struct AdamChunk {
+  int variable;
+  int64 begin;
+  int64 end;
+};
+
+// Elements per chunk. The arrays touched by a chunk stay in L2.
+constexpr int64 kAdamChunkSize = 16384;
+
+template <typename T>
+std::vector<AdamChunk> SplitIntoChunks(
+    const std::vector<AdamVariable<T>>& variables) {
+  std::vector<AdamChunk> chunks;
+  for (int i = 0; i < variables.size(); ++i) {
+    for (int64 begin = 0; begin < variables[i].size; begin += kAdamChunkSize) {
+      chunks.push_back(
+          {i, begin, std::min(variables[i].size, begin + kAdamChunkSize)});
+    }
+  }
+  return chunks;
+}
+
+// Updates the moments of element i, and returns the second moment used by the
+// update, which is vhat with amsgrad.
+template <typename T>
+inline float UpdateMoments(const AdamVariable<T>& x, int64 i, float beta1_sub,
+                           float beta2_sub, float v_scale) {
+  const float g = static_cast<float>(x.grad[i]);
+  float m = static_cast<float>(x.m[i]);
+  float v = static_cast<float>(x.v[i]);
+  m += (g - m) * beta1_sub;
+  v += (g * g - v) * beta2_sub;
+  x.m[i] = static_cast<T>(m);
+  x.v[i] = static_cast<T>(v);
+  v *= v_scale;
+  if (x.vhat != nullptr) {
+    v = std::max(static_cast<float>(x.vhat[i]), v);
+    x.vhat[i] = static_cast<T>(v);
+  }
+  return v;
+}
+
+// Same as ComputeAdamWeightDecayKernel of the GPU:
+//   m = m + (g - m) * (1 - beta1)
+//   v = v + (g * g - v) * (1 - beta2)
+//   var = var * (1 - wd * lr) - m * alpha / (sqrt(v) + epsilon)
+// with alpha = lr * sqrt(1 - beta2_power) / (1 - beta1_power). All the
+// variables are updated in one parallel sweep over their chunks.
+template <typename T>
+struct ApplyAdamWithWeightDecayCPU {
+  void operator()(const CPUDevice& d,
+                  const std::vector<AdamVariable<T>>& variables,
+                  const AdamHyperParams& p) {
+    const std::vector<AdamChunk> chunks = SplitIntoChunks(variables);
+    const float alpha =
+        p.lr * std::sqrt(1.f - p.beta2_power) / (1.f - p.beta1_power);
+    const float beta1_sub = 1.f - p.beta1;
+    const float beta2_sub = 1.f - p.beta2;
+
+    auto task = [&](Eigen::Index first, Eigen::Index last) {
+      for (Eigen::Index c = first; c < last; ++c) {
+        const AdamChunk& chunk = chunks[c];
+        const AdamVariable<T>& x = variables[chunk.variable];
+        const float wd_sub = 1.f - x.weight_decay * p.lr;
+        for (int64 i = chunk.begin; i < chunk.end; ++i) {
+          const float v = UpdateMoments(x, i, beta1_sub, beta2_sub, 1.f);
+          const float m = static_cast<float>(x.m[i]);
+          x.var[i] = static_cast<T>(wd_sub * static_cast<float>(x.var[i]) -
+                                    m * alpha / (std::sqrt(v) + p.epsilon));
+        }
+      }
+    };
+    const int64 bytes = 5 * kAdamChunkSize * sizeof(T);
+    d.parallelFor(chunks.size(),
+                  Eigen::TensorOpCost(bytes, bytes, 12 * kAdamChunkSize), task);
+  }
+};
+
+// Same as ApplyLAMBStage1/2 of the GPU:
+//   m_hat = m / (1 - beta1_power), v_hat = v / (1 - beta2_power)
+//   update = m_hat / (sqrt(v_hat) + epsilon) + wd * var
+//   var = var - ratio * lr * update
+// with ratio = ||var|| / ||update|| for use_lamb variables, and 1 otherwise.
+//
+// The first sweep updates the moments and computes the squared norms of var
+// and update of every chunk in the same pass. Variables without layer
+// adaptation are finished in this sweep. The second sweep recomputes the
+// update from the stored moments instead of keeping it in a temp buffer as
+// large as the model, and applies the ratio.
+template <typename T>
+struct ApplyLAMBCPU {
+  void operator()(const CPUDevice& d,
+                  const std::vector<AdamVariable<T>>& variables,
+                  const AdamHyperParams& p) {
+    const std::vector<AdamChunk> chunks = SplitIntoChunks(variables);
+    const float m_scale = 1.f / (1.f - p.beta1_power);
+    const float v_scale = 1.f / (1.f - p.beta2_power);
+    const float beta1_sub = 1.f - p.beta1;
+    const float beta2_sub = 1.f - p.beta2;
+    auto update_of = [&](const AdamVariable<T>& x, int64 i, float v) {
+      return static_cast<float>(x.m[i]) * m_scale / (std::sqrt(v) + p.epsilon) +
+             x.weight_decay * static_cast<float>(x.var[i]);
+    };
+
+    // Squared norms of var and update of each chunk.
+    std::vector<float> partials(2 * chunks.size(), 0.f);
+    auto stage1 = [&](Eigen::Index first, Eigen::Index last) {
+      for (Eigen::Index c = first; c < last; ++c) {
+        const AdamChunk& chunk = chunks[c];
+        const AdamVariable<T>& x = variables[chunk.variable];
+        float w_norm = 0.f, u_norm = 0.f;
+        for (int64 i = chunk.begin; i < chunk.end; ++i) {
+          const float v = UpdateMoments(x, i, beta1_sub, beta2_sub, v_scale);
+          const float w = static_cast<float>(x.var[i]);
+          const float u = update_of(x, i, v);
+          if (x.use_lamb) {
+            w_norm += w * w;
+            u_norm += u * u;
+          } else {
+            x.var[i] = static_cast<T>(w - p.lr * u);
+          }
+        }
+        partials[2 * c] = w_norm;
+        partials[2 * c + 1] = u_norm;
+      }
+    };
+    const int64 bytes = 5 * kAdamChunkSize * sizeof(T);
+    d.parallelFor(chunks.size(),
+                  Eigen::TensorOpCost(bytes, bytes, 16 * kAdamChunkSize),
+                  stage1);
+
+    // Chunks of a variable are consecutive, so the ratio of each variable is
+    // reduced from its own range of partials.
+    std::vector<float> ratios(variables.size(), 1.f);
+    std::vector<int> lamb_chunks;
+    for (int c = 0; c < chunks.size();) {
+      const int variable = chunks[c].variable;
+      double w_norm = 0., u_norm = 0.;
+      for (; c < chunks.size() && chunks[c].variable == variable; ++c) {
+        w_norm += partials[2 * c];
+        u_norm += partials[2 * c + 1];
+        if (variables[variable].use_lamb) lamb_chunks.push_back(c);
+      }
+      if (w_norm > 0. && u_norm > 0.) {
+        ratios[variable] = static_cast<float>(std::sqrt(w_norm / u_norm));
+      }
+    }
+    if (lamb_chunks.empty()) return;
+
+    auto stage2 = [&](Eigen::Index first, Eigen::Index last) {
+      for (Eigen::Index id = first; id < last; ++id) {
+        const AdamChunk& chunk = chunks[lamb_chunks[id]];
+        const AdamVariable<T>& x = variables[chunk.variable];
+        const float step = ratios[chunk.variable] * p.lr;
+        for (int64 i = chunk.begin; i < chunk.end; ++i) {
+          const float v = x.vhat != nullptr
+                              ? static_cast<float>(x.vhat[i])
+                              : static_cast<float>(x.v[i]) * v_scale;
+          x.var[i] = static_cast<T>(static_cast<float>(x.var[i]) -
+                                    step * update_of(x, i, v));
+        }
+      }
+    };
+    d.parallelFor(
+        lamb_chunks.size(),
+        Eigen::TensorOpCost(4 * kAdamChunkSize * sizeof(T),
+                            kAdamChunkSize * sizeof(T), 8 * kAdamChunkSize),
+        stage2);
+  }
+};
+
+}  // namespace functor
+
+// Kernel of ITEX(Resource)ApplyAdamWithWeightDecay and ITEX(Resource)ApplyLAMB,
+// and of their multi-tensor variants, which take N variables at once:
+//   var, m, v: N, beta1_power, beta2_power, lr, beta1, beta2, epsilon,
+//   weight_decay: [N], vhat: N, grad: N
+// so the single tensor ops are the case N = 1.
+template <typename T, bool is_lamb>
+class ApplyAdamWithWeightDecayOp : public OpKernel {
+ public:
+  explicit ApplyAdamWithWeightDecayOp(OpKernelConstruction* ctx)
+      : OpKernel(ctx) {
+    OP_REQUIRES_OK(ctx, ctx->GetAttr("use_locking", &use_exclusive_lock_));
+    OP_REQUIRES_OK(ctx, ctx->GetAttr("use_amsgrad", &use_amsgrad_));
+    if (ctx->HasAttr("N")) {
+      OP_REQUIRES_OK(ctx, ctx->GetAttr("N", &num_variables_));
+    }
+    use_lamb_.assign(num_variables_, false);
+    if (is_lamb && ctx->HasAttr("N")) {
+      OP_REQUIRES_OK(ctx, ctx->GetAttr("use_lamb", &use_lamb_));
+      OP_REQUIRES(
+          ctx, use_lamb_.size() == num_variables_,
+          errors::InvalidArgument("use_lamb must have ", num_variables_,
+                                  " elements, but got ", use_lamb_.size()));
+    } else if (is_lamb) {
+      bool use_lamb;
+      OP_REQUIRES_OK(ctx, ctx->GetAttr("use_lamb", &use_lamb));
+      use_lamb_[0] = use_lamb;
+    }
+  }
+
+  void Compute(OpKernelContext* ctx) override {
+    const int n = num_variables_;
+    const int scalar_start = 3 * n;
+    const int vhat_start = scalar_start + 7;
+    const int grad_start = vhat_start + n;
+
+    std::vector<int> variable_ids;
+    for (int i = 0; i < 3 * n; ++i) variable_ids.push_back(i);
+    if (use_amsgrad_) {
+      for (int i = 0; i < n; ++i) variable_ids.push_back(vhat_start + i);
+    }
+    VariableInputLocks locks(ctx, use_exclusive_lock_, variable_ids);
+
+    const Tensor& weight_decay = ctx->input(scalar_start + 6);
+    OP_REQUIRES(ctx, weight_decay.NumElements() == n,
+                errors::InvalidArgument("weight_decay must have ", n,
+                                        " elements, but got ",
+                                        weight_decay.shape().DebugString()));
+    functor::AdamHyperParams p;
+    float* fields[] = {&p.beta1_power, &p.beta2_power, &p.lr,
+                       &p.beta1,       &p.beta2,       &p.epsilon};
+    for (int i = 0; i < 6; ++i) {
+      const Tensor& t = ctx->input(scalar_start + i);
+      OP_REQUIRES(ctx, TensorShapeUtils::IsScalar(t.shape()),
+                  errors::InvalidArgument(
+                      "Hyper parameter ", i,
+                      " is not a scalar: ", t.shape().DebugString()));
+      *fields[i] = static_cast<float>(t.scalar<T>()());
+    }
+
+    // Keep the tensors alive until the update is done.
+    std::vector<Tensor> tensors((use_amsgrad_ ? 4 : 3) * n);
+    std::vector<functor::AdamVariable<T>> variables;
+    for (int i = 0; i < n; ++i) {
+      Tensor* var = &tensors[i];
+      Tensor* m = &tensors[n + i];
+      Tensor* v = &tensors[2 * n + i];
+      OP_REQUIRES_OK(ctx, GetVariableInput<CPUDevice>(
+                              ctx, i, use_exclusive_lock_, var));
+      OP_REQUIRES_OK(ctx, GetVariableInput<CPUDevice>(
+                              ctx, n + i, use_exclusive_lock_, m));
+      OP_REQUIRES_OK(ctx, GetVariableInput<CPUDevice>(
+                              ctx, 2 * n + i, use_exclusive_lock_, v));
+      const Tensor& grad = ctx->input(grad_start + i);
+      OP_REQUIRES(
+          ctx, var->shape().IsSameSize(m->shape()),
+          errors::InvalidArgument("var and m do not have the same shape",
+                                  var->shape().DebugString(), " ",
+                                  m->shape().DebugString()));
+      OP_REQUIRES(
+          ctx, var->shape().IsSameSize(v->shape()),
+          errors::InvalidArgument("var and v do not have the same shape",
+                                  var->shape().DebugString(), " ",
+                                  v->shape().DebugString()));
+      OP_REQUIRES(ctx, var->shape().IsSameSize(grad.shape()),
+                  errors::InvalidArgument("var and grad do not have the same "
+                                          "shape",
+                                          var->shape().DebugString(), " ",
+                                          grad.shape().DebugString()));
+      T* vhat_ptr = nullptr;
+      if (use_amsgrad_) {
+        Tensor* vhat = &tensors[3 * n + i];
+        OP_REQUIRES_OK(
+            ctx, GetVariableInput<CPUDevice>(ctx, vhat_start + i,
+                                             use_exclusive_lock_, vhat));
+        OP_REQUIRES(
+            ctx, var->shape().IsSameSize(vhat->shape()),
+            errors::InvalidArgument("var and vhat do not have the same shape",
+                                    var->shape().DebugString(), " ",
+                                    vhat->shape().DebugString()));
+        vhat_ptr = vhat->flat<T>().data();
+      }
+      variables.push_back({var->flat<T>().data(), m->flat<T>().data(),
+                           v->flat<T>().data(), vhat_ptr, grad.flat<T>().data(),
+                           var->NumElements(),
+                           static_cast<float>(weight_decay.flat<T>()(i)),
+                           static_cast<bool>(use_lamb_[i])});
+    }
+
+    if (is_lamb) {
+      functor::ApplyLAMBCPU<T>()(ctx->eigen_cpu_device(), variables, p);
+    } else {
+      functor::ApplyAdamWithWeightDecayCPU<T>()(ctx->eigen_cpu_device(),
+                                                variables, p);
+    }
+
+    if (ctx->input_is_ref(0)) ctx->forward_ref_input_to_ref_output(0, 0);
+  }
+
+ private:
+  bool use_exclusive_lock_;
+  bool use_amsgrad_;
+  int num_variables_ = 1;
+  std::vector<bool> use_lamb_;
+};
+
+#define REGISTER_ADAM_WEIGHT_DECAY_CPU(T)                              \
+  REGISTER_KERNEL_BUILDER(Name("ITEXApplyAdamWithWeightDecay")         \
+                              .Device(DEVICE_CPU)                      \
+                              .TypeConstraint<T>("T"),                 \
+                          ApplyAdamWithWeightDecayOp<T, false>);       \
+  REGISTER_KERNEL_BUILDER(Name("ITEXResourceApplyAdamWithWeightDecay") \
+                              .Device(DEVICE_CPU)                      \
+                              .TypeConstraint<T>("T"),                 \
+                          ApplyAdamWithWeightDecayOp<T, false>);       \
+  REGISTER_KERNEL_BUILDER(                                             \
+      Name("ITEXResourceMultiTensorApplyAdamWithWeightDecay")          \
+          .Device(DEVICE_CPU)                                          \
+          .TypeConstraint<T>("T"),                                     \
+      ApplyAdamWithWeightDecayOp<T, false>);
+TF_CALL_half(REGISTER_ADAM_WEIGHT_DECAY_CPU);
+TF_CALL_float(REGISTER_ADAM_WEIGHT_DECAY_CPU);
+TF_CALL_bfloat16(REGISTER_ADAM_WEIGHT_DECAY_CPU);
+#undef REGISTER_ADAM_WEIGHT_DECAY_CPU
+
+#define REGISTER_LAMB_CPU(T)                                                   \
+  REGISTER_KERNEL_BUILDER(                                                     \
+      Name("ITEXApplyLAMB").Device(DEVICE_CPU).TypeConstraint<T>("T"),         \
+      ApplyAdamWithWeightDecayOp<T, true>);                                    \
+  REGISTER_KERNEL_BUILDER(                                                     \
+      Name("ITEXResourceApplyLAMB").Device(DEVICE_CPU).TypeConstraint<T>("T"), \
+      ApplyAdamWithWeightDecayOp<T, true>);                                    \
+  REGISTER_KERNEL_BUILDER(Name("ITEXResourceMultiTensorApplyLAMB")             \
+                              .Device(DEVICE_CPU)                              \
+                              .TypeConstraint<T>("T"),                         \
+                          ApplyAdamWithWeightDecayOp<T, true>);
+TF_CALL_float(REGISTER_LAMB_CPU);
+#undef REGISTER_LAMB_CPU
+
+}  // namespace itex
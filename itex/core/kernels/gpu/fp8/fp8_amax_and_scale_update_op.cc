@@ -0,0 +1,138 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include "itex/core/kernels/common/fp8_amax_and_scale_update_op.h"
+
+#include "itex/core/utils/gpu_helper.h"
+
+namespace itex {
+
+typedef Eigen::GpuDevice GPUDevice;
+
+namespace functor {
+
+// One work item per fp8 tensor. Each work item only touches its own column,
+// so the history can be updated in place.
+struct Fp8AmaxAndScaleUpdateKernel {
+  Fp8AmaxAndScaleUpdateKernel(float* amax_history,
+                              const int64* amax_history_index, float* scale,
+                              float* scale_inv, int history_len, int num,
+                              float fp8_max, float margin, bool most_recent)
+      : amax_history_(amax_history),
+        amax_history_index_(amax_history_index),
+        scale_(scale),
+        scale_inv_(scale_inv),
+        history_len_(history_len),
+        num_(num),
+        fp8_max_(fp8_max),
+        margin_(margin),
+        most_recent_(most_recent) {}
+  void operator()(sycl::nd_item<1> item) const {
+    auto id = item.get_global_linear_id();
+    if (id >= num_) return;
+    const float current = amax_history_[id];
+    float amax = current;
+    if (!most_recent_) {
+      for (int h = 1; h < history_len_; ++h) {
+        float value = amax_history_[h * num_ + id];
+        amax = (sycl::isnan(amax) || sycl::isnan(value))
+                   ? NAN
+                   : sycl::fmax(amax, value);
+      }
+    }
+    float exp = sycl::floor(sycl::log2(fp8_max_ / amax)) - margin_;
+    float sf = sycl::round(sycl::pow(2.0f, sycl::fabs(exp)));
+    if (!(amax > 0.0f) || !sycl::isfinite(amax)) sf = scale_[id];
+    if (exp < 0.0f) sf = 1.0f / sf;
+    scale_[id] = sf;
+    scale_inv_[id] = 1.0f / sf;
+
+    // Move the current amax to the ring buffer, then zero it out.
+    if (history_len_ > 1) {
+      const int64 ring_len = history_len_ - 1;
+      const int64 slot =
+          (*amax_history_index_ % ring_len + ring_len) % ring_len;
+      amax_history_[(slot + 1) * num_ + id] = current;
+    }
+    amax_history_[id] = 0.0f;
+  }
+
+ private:
+  float* amax_history_;
+  const int64* amax_history_index_;
+  float* scale_;
+  float* scale_inv_;
+  const int history_len_;
+  const int num_;
+  const float fp8_max_;
+  const float margin_;
+  const bool most_recent_;
+};
+
+// Advances the ring buffer index after all columns are updated.
+struct Fp8AmaxHistoryIndexUpdateKernel {
+  Fp8AmaxHistoryIndexUpdateKernel(int64* amax_history_index, int history_len)
+      : amax_history_index_(amax_history_index), history_len_(history_len) {}
+  void operator()(sycl::nd_item<1> item) const {
+    if (item.get_global_linear_id() != 0) return;
+    const int64 ring_len = history_len_ - 1;
+    const int64 slot = (*amax_history_index_ % ring_len + ring_len) % ring_len;
+    *amax_history_index_ = (slot + 1) % ring_len;
+  }
+
+ private:
+  int64* amax_history_index_;
+  const int history_len_;
+};
+
+template <>
+struct Fp8AmaxAndScaleUpdate<GPUDevice> {
+  void operator()(OpKernelContext* ctx, float* amax_history,
+                  int64* amax_history_index, float* scale, float* scale_inv,
+                  int history_len, int num, float fp8_max, float margin,
+                  bool most_recent) {
+    auto* stream = ctx->eigen_gpu_device().stream();
+    auto group_size =
+        (*stream)
+            .get_device()
+            .template get_info<sycl::info::device::max_work_group_size>();
+
+    auto num_groups = (num + group_size - 1) / group_size;
+    stream->submit([&](sycl::handler& cgh) {
+      Fp8AmaxAndScaleUpdateKernel task(amax_history, amax_history_index, scale,
+                                       scale_inv, history_len, num, fp8_max,
+                                       margin, most_recent);
+      cgh.parallel_for<Fp8AmaxAndScaleUpdateKernel>(
+          sycl::nd_range<1>(sycl::range<1>(group_size * num_groups),
+                            sycl::range<1>(group_size)),
+          task);
+    });
+
+    if (history_len > 1) {
+      stream->submit([&](sycl::handler& cgh) {
+        Fp8AmaxHistoryIndexUpdateKernel task(amax_history_index, history_len);
+        cgh.parallel_for<Fp8AmaxHistoryIndexUpdateKernel>(
+            sycl::nd_range<1>(sycl::range<1>(1), sycl::range<1>(1)), task);
+      });
+    }
+  }
+};
+
+}  // namespace functor
+
+REGISTER_KERNEL_BUILDER(Name("Fp8AmaxAndScaleUpdate").Device(DEVICE_GPU),
+                        Fp8AmaxAndScaleUpdateOp<GPUDevice>);
+
+}  // namespace itex
@@ -112,7 +112,8 @@ struct ComputeRotaryPositionalEmbeddingKernelBcast {
     int x = id / (Num_heads_ * rotary_dim_);
     int n = (id - x * Num_heads_ * rotary_dim_) / rotary_dim_;
     int idx = id % rotary_dim_;
-    int l_sin = x / B_;
+    // x is b * Length + l, sin and cos only have the length dim.
+    int l_sin = x % Length_;
     // out_q[b,l,n,2*idx] = q[b,l,n,2*idx] * cos[b,l,0,2*idx] - q[b,l,n,2*idx+1]
     // * sin[b,l,0,2*idx] out_q[b,l,n,2*idx+1] = q[b,l,n,2*idx+1] *
     // cos[b,l,0,2*idx+1] + q[b,l,n,2*idx] * sin[b,l,0,2*idx+1] k is the same
@@ -218,18 +219,32 @@ class QKRotaryPositionalEmbeddingOp : public OpKernel {
     const Tensor& k = ctx->input(1);
     const Tensor& sin = ctx->input(2);
     const Tensor& cos = ctx->input(3);
-    Tensor* output_q = nullptr;
-    Tensor* output_k = nullptr;
-    ctx->set_output(0, q);
-    ctx->set_output(1, k);
-    output_q = ctx->mutable_output(0);
-    output_k = ctx->mutable_output(1);
-
     TensorShape q_shape = q.shape();
     int B = q_shape.dim_size(0);  // Batch * Beam
     int Length = q_shape.dim_size(1);
     int rotary_dim_half = rotary_dim_ / 2;
 
+    // The inputs are updated in place only if no one else uses them, e.g.
+    // query and key are the same tensor after the rotary embedding fusion.
+    Tensor* output_q = nullptr;
+    Tensor* output_k = nullptr;
+    const TensorShape output_shape(
+        {B, Length, num_attention_heads_, head_dim_});
+    OP_REQUIRES_OK(ctx, ctx->forward_input_or_allocate_output(
+                            {0}, 0, output_shape, &output_q));
+    OP_REQUIRES_OK(ctx, ctx->forward_input_or_allocate_output(
+                            {1}, 1, output_shape, &output_k));
+    if (q.NumElements() == 0) return;
+
+    // The elements after rotary_dim are passed through.
+    auto* stream = ctx->GetDeviceStream();
+    if (output_q->data() != q.data()) {
+      stream->memcpy(output_q->data(), q.data(), q.TotalBytes());
+    }
+    if (output_k->data() != k.data()) {
+      stream->memcpy(output_k->data(), k.data(), k.TotalBytes());
+    }
+
     const Device& device = ctx->template eigen_device<Device>();
     bool bcast = sin.shape().dim_size(0) == 1 && sin.shape().dim_size(0) != B;
     functor::RotaryPositionalEmbedding<T> embedding;
@@ -239,9 +254,6 @@ class QKRotaryPositionalEmbeddingOp : public OpKernel {
               bcast, B, Length, num_attention_heads_, head_dim_,
               rotary_dim_half,
               B * Length * num_attention_heads_ * rotary_dim_half);
-
-    output_q->set_shape({B, Length, num_attention_heads_, head_dim_});
-    output_k->set_shape({B, Length, num_attention_heads_, head_dim_});
   }
 
  private:
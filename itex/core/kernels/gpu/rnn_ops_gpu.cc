@@ -21,8 +21,8 @@ limitations under the License.
 #include <utility>
 #include <vector>
 
+#include "itex/core/kernels/common/rnn_ops.h"
 #include "itex/core/kernels/gpu/col_reduction_kernels.h"
-#include "itex/core/kernels/gpu/rnn_ops.h"
 #include "itex/core/utils/op_requires.h"
 #include "itex/core/utils/register_types.h"
 #include "itex/core/utils/types.h"
@@ -18,9 +18,14 @@ limitations under the License.
 #include "itex/core/devices/gpu/gpu_pool_allocator.h"
 #include "third_party/build_option/dpcpp/runtime/itex_gpu_runtime.h"
 #endif  // INTEL_CPU_ONLY
+#include <memory>
+#include <unordered_map>
+#include <vector>
+
 #include "itex/core/utils/errors.h"
 #include "itex/core/utils/onednn/onednn_graph_util.h"
 #include "itex/core/utils/onednn/onednn_layout_util.h"
+#include "itex/core/utils/onednn/onednn_primitive_cache.h"
 #include "itex/core/utils/onednn/onednn_util.h"
 #include "itex/core/utils/op_kernel.h"
 #include "itex/core/utils/op_requires.h"
@@ -171,6 +176,80 @@ void GetInplaceIdMap(
   }
 }
 
+// A compiled partition and what is derived from it, which only depend on the
+// input logical tensors.
+struct CompiledPartitionEntry {
+  explicit CompiledPartitionEntry(dnnl::graph::compiled_partition c_partition)
+      : c_partition(std::move(c_partition)) {}
+
+  dnnl::graph::compiled_partition c_partition;
+  std::unordered_map<size_t, size_t> inplace_id_map;  // <output_id, input_id>
+  std::vector<dnnl::graph::logical_tensor> output_logical_tensors;
+};
+
+void AddLogicalTensorAsKey(const dnnl::graph::logical_tensor& lt,
+                           PrimitiveCacheKeyCreator* key_creator) {
+  using layout_type = dnnl::graph::logical_tensor::layout_type;
+  key_creator->AddAsKey<int>(static_cast<int>(lt.get_data_type()));
+  key_creator->AddAsKey(lt.get_dims());
+  key_creator->AddAsKey<int>(static_cast<int>(lt.get_layout_type()));
+  if (lt.get_layout_type() == layout_type::opaque) {
+    key_creator->AddAsKey<size_t>(lt.get_layout_id());
+  } else if (lt.get_layout_type() == layout_type::strided) {
+    key_creator->AddAsKey(lt.get_strides());
+  }
+  key_creator->AddAsKey<int>(static_cast<int>(lt.get_property_type()));
+}
+
+// Compiled partitions of recently seen input shapes, data types and layouts,
+// owned by a single kernel. Compiling a partition is much more costly than
+// executing it, especially for INT8 graphs. The kernel may be executed by
+// several inter-op threads at once, so the cache is guarded by a mutex, which
+// isn't held while compiling. Capacity and statistics are shared with the
+// oneDNN primitive cache.
+class CompiledPartitionCache {
+ public:
+  std::shared_ptr<const CompiledPartitionEntry> GetOrCompile(
+      int partition_id,
+      const std::vector<dnnl::graph::logical_tensor>& input_logical_tensors,
+      const std::vector<dnnl::graph::logical_tensor>& output_logical_tensors,
+      const dnnl::engine& onednn_engine) {
+    PrimitiveCacheKeyCreator key_creator;
+    for (const auto& lt : input_logical_tensors) {
+      AddLogicalTensorAsKey(lt, &key_creator);
+    }
+    for (const auto& lt : output_logical_tensors) {
+      AddLogicalTensorAsKey(lt, &key_creator);
+    }
+    key_creator.AddAsKey<const void*>(onednn_engine.get());
+    {
+      mutex_lock lock(&mu_);
+      auto* cached = cache_.Get(key_creator.GetKey());
+      if (cached != nullptr) return *cached;
+    }
+
+    dnnl::graph::partition partition =
+        graph::GetOneDnnGraphPartition(partition_id);
+    auto entry = std::make_shared<CompiledPartitionEntry>(partition.compile(
+        input_logical_tensors, output_logical_tensors, onednn_engine));
+    GetInplaceIdMap(entry->c_partition, input_logical_tensors,
+                    output_logical_tensors, &entry->inplace_id_map);
+    for (const auto& lt : output_logical_tensors) {
+      entry->output_logical_tensors.push_back(
+          entry->c_partition.query_logical_tensor(lt.get_id()));
+    }
+
+    mutex_lock lock(&mu_);
+    cache_.Insert(key_creator.GetKey(), entry);
+    return entry;
+  }
+
+ private:
+  mutex mu_;
+  PrimitiveLRUCache<std::shared_ptr<const CompiledPartitionEntry>> cache_
+      TF_GUARDED_BY(mu_);
+};
+
 // Currently, LLGA kernels only works with Layout pass ON. Because meta tensor
 // is required to pass the LLGA layout information
 // TODO(itex): Enable LLGA with ITEX plain format.
@@ -200,9 +279,6 @@ class OneDnnGraphOp : public OpKernel {
 
     dnnl::engine onednn_engine = CreateDnnlEngine<Device>(ctx);
     dnnl::stream onednn_stream = CreateDnnlStream(*ctx, onednn_engine);
-    auto partition = std::make_shared<dnnl::graph::partition>(
-        graph::GetOneDnnGraphPartition(partition_id_));
-
     ITEX_CHECK_EQ(input_edge_ids_.size(), is_constant_input_edge_.size());
 
     // Prepare input tensors and logical tensors
@@ -245,28 +321,27 @@ class OneDnnGraphOp : public OpKernel {
           dnnl::graph::logical_tensor::layout_type::strided));
     }
 
-    auto c_partition = partition->compile(
-        l_input_logical_tensor, l_output_logical_tensor, onednn_engine);
-
-    std::unordered_map<size_t, size_t> inplace_id_map;  // <output_id, input_id>
-    GetInplaceIdMap(c_partition, l_input_logical_tensor,
-                    l_output_logical_tensor, &inplace_id_map);
+    std::shared_ptr<const CompiledPartitionEntry> compiled =
+        compiled_partition_cache_.GetOrCompile(
+            partition_id_, l_input_logical_tensor, l_output_logical_tensor,
+            onednn_engine);
+    const auto& inplace_id_map = compiled->inplace_id_map;
 
     // Prepare output tensors
     for (int index = 0; index < output_edge_ids_.size(); index++) {
       TensorShape tf_shape;
-      auto output_logical_tensor =
-          c_partition.query_logical_tensor(output_edge_ids_[index]);
+      const auto& output_logical_tensor =
+          compiled->output_logical_tensors[index];
       for (int dim : output_logical_tensor.get_dims()) {
         tf_shape.AddDim(dim);
       }
 
       if (inplace_id_map.find(index) != inplace_id_map.end() &&
-          candidate_inplace_input_edge_[inplace_id_map[index]] == true) {
+          candidate_inplace_input_edge_[inplace_id_map.at(index)] == true) {
         // TODO(itex): Check whether LLGA and TensorFlow inplace mechanism
         // are exacly the same
 
-        int input_index = inplace_id_map[index];
+        int input_index = inplace_id_map.at(index);
         const Tensor& input_tensor = ctx->input(input_index);
 
         if (input_tensor.dtype() != ctx->expected_output_dtype(index)) {
@@ -296,7 +371,8 @@ class OneDnnGraphOp : public OpKernel {
     }
 
     // Execute
-    c_partition.execute(onednn_stream, l_input_tensor, l_output_tensor);
+    compiled->c_partition.execute(onednn_stream, l_input_tensor,
+                                  l_output_tensor);
     ITEX_VLOG(3) << "PARTITION EXECUTED SUCCESSFULLY";
   }
 
@@ -308,6 +384,7 @@ class OneDnnGraphOp : public OpKernel {
   std::vector<bool> is_constant_input_edge_;
   std::vector<bool> candidate_inplace_input_edge_;
   std::vector<string> framework_ops_;
+  CompiledPartitionCache compiled_partition_cache_;
 };
 
 #define MATCH_TYPE_AND_SIZE(TYPE) \
@@ -360,9 +437,6 @@ class OneDnnGraphWithLayoutOp : public OpKernel {
 
     dnnl::engine onednn_engine = CreateDnnlEngine<Device>(ctx);
     dnnl::stream onednn_stream = CreateDnnlStream(*ctx, onednn_engine);
-    auto partition = std::make_shared<dnnl::graph::partition>(
-        graph::GetOneDnnGraphPartition(partition_id_));
-
     ITEX_CHECK_EQ(input_edge_ids_.size(), is_constant_input_edge_.size());
 
     // Prepare input tensors and logical tensors
@@ -430,17 +504,16 @@ class OneDnnGraphWithLayoutOp : public OpKernel {
             dnnl::graph::logical_tensor::layout_type::any));
     }
 
-    auto c_partition = partition->compile(
-        l_input_logical_tensor, l_output_logical_tensor, onednn_engine);
-
-    std::unordered_map<size_t, size_t> inplace_id_map;  // <output_id, input_id>
-    GetInplaceIdMap(c_partition, l_input_logical_tensor,
-                    l_output_logical_tensor, &inplace_id_map);
+    std::shared_ptr<const CompiledPartitionEntry> compiled =
+        compiled_partition_cache_.GetOrCompile(
+            partition_id_, l_input_logical_tensor, l_output_logical_tensor,
+            onednn_engine);
+    const auto& inplace_id_map = compiled->inplace_id_map;
 
     // Prepare output tensors
     for (int index = 0; index < output_edge_ids_.size(); index++) {
-      auto output_logical_tensor =
-          c_partition.query_logical_tensor(output_edge_ids_[index]);
+      const auto& output_logical_tensor =
+          compiled->output_logical_tensors[index];
       TensorShape tf_shape;
       if (is_end_node_[index]) {
         auto sizes = output_logical_tensor.get_dims();
@@ -475,10 +548,10 @@ class OneDnnGraphWithLayoutOp : public OpKernel {
       }
 
       if (inplace_id_map.find(index) != inplace_id_map.end() &&
-          candidate_inplace_input_edge_[inplace_id_map[index]] == true) {
+          candidate_inplace_input_edge_[inplace_id_map.at(index)] == true) {
         // TODO(itex): Check whether LLGA and TensorFlow inplace mechanism
         // are exacly the same
-        int input_index = inplace_id_map[index];
+        int input_index = inplace_id_map.at(index);
         const Tensor& input_tensor = ctx->input(input_index);
 
         if (input_tensor.dtype() != ctx->expected_output_dtype(index)) {
@@ -520,7 +593,8 @@ class OneDnnGraphWithLayoutOp : public OpKernel {
     }
 
     // Execute
-    c_partition.execute(onednn_stream, l_input_tensor, l_output_tensor);
+    compiled->c_partition.execute(onednn_stream, l_input_tensor,
+                                  l_output_tensor);
     ITEX_VLOG(3) << "PARTITION EXECUTED SUCCESSFULLY";
   }
 
@@ -533,6 +607,7 @@ class OneDnnGraphWithLayoutOp : public OpKernel {
   std::vector<bool> candidate_inplace_input_edge_;
   std::vector<string> framework_ops_;
   std::vector<bool> is_end_node_;
+  CompiledPartitionCache compiled_partition_cache_;
 };
 
 #ifdef INTEL_CPU_ONLY
@@ -19,6 +19,30 @@ limitations under the License.
 #include "tensorflow/c/ops.h"
 #include "tensorflow/c/tf_status.h"
 
+void Register_Fp8AmaxAndScaleUpdateOp() {
+  itex::StatusUniquePtr status(TF_NewStatus());
+  {
+    TF_OpDefinitionBuilder* op_builder =
+        TF_NewOpDefinitionBuilder("Fp8AmaxAndScaleUpdate");
+    TF_OpDefinitionBuilderAddInput(op_builder, "amax_history: N * resource");
+    TF_OpDefinitionBuilderAddInput(op_builder,
+                                   "amax_history_index: N * resource");
+    TF_OpDefinitionBuilderAddInput(op_builder, "scale: N * resource");
+    TF_OpDefinitionBuilderAddInput(op_builder, "scale_inv: N * resource");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "N: int >= 1");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "fp8_max: list(float)");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "margin: float = 0.0");
+    TF_OpDefinitionBuilderAddAttr(
+        op_builder, "amax_compute_algo: {'max', 'most_recent'} = 'max'");
+    TF_OpDefinitionBuilderSetIsStateful(op_builder, true);
+    TF_OpDefinitionBuilderSetShapeInferenceFunction(op_builder,
+                                                    &empty_shape_fn);
+    TF_RegisterOpDefinition(op_builder, status.get());
+    ITEX_CHECK_EQ(TF_OK, TF_GetCode(status.get()))
+        << "Fp8AmaxAndScaleUpdate op registration failed: ";
+  }
+}
+
 void Register_Fp8QuantizeOp() {
   itex::StatusUniquePtr status(TF_NewStatus());
   {
@@ -3027,6 +3027,30 @@ void Register_ITEXGroupNormOp() {
   }
 }
 
+void Register_ITEXGroupNormGradOp() {
+  itex::StatusUniquePtr status(TF_NewStatus());
+  {
+    TF_OpDefinitionBuilder* op_builder =
+        TF_NewOpDefinitionBuilder("ITEXGroupNormGrad");
+    TF_OpDefinitionBuilderAddInput(op_builder, "y_backprop: T");
+    TF_OpDefinitionBuilderAddInput(op_builder, "x: T");
+    TF_OpDefinitionBuilderAddInput(op_builder, "scale: T");
+    TF_OpDefinitionBuilderAddOutput(op_builder, "x_backprop: T");
+    TF_OpDefinitionBuilderAddOutput(op_builder, "scale_backprop: T");
+    TF_OpDefinitionBuilderAddOutput(op_builder, "offset_backprop: T");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "T: {half, bfloat16, float}");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "num_groups: int");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "epsilon: float = 0.0001");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "use_scale: bool = true");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "use_center: bool = true");
+    TF_OpDefinitionBuilderSetShapeInferenceFunction(op_builder,
+                                                    &unknown_shape_fn);
+    TF_RegisterOpDefinition(op_builder, status.get());
+    ITEX_CHECK_EQ(TF_OK, TF_GetCode(status.get()))
+        << "ITEXGroupNormGrad op registration failed: ";
+  }
+}
+
 void Register_ITEXRMSNormOp() {
   itex::StatusUniquePtr status(TF_NewStatus());
   {
@@ -3049,6 +3073,30 @@ void Register_ITEXRMSNormOp() {
   }
 }
 
+void Register_ITEXRMSNormGradOp() {
+  itex::StatusUniquePtr status(TF_NewStatus());
+  {
+    TF_OpDefinitionBuilder* op_builder =
+        TF_NewOpDefinitionBuilder("ItexRmsNormGrad");
+    TF_OpDefinitionBuilderAddInput(op_builder, "y_backprop: T");
+    TF_OpDefinitionBuilderAddInput(op_builder, "x: T");
+    TF_OpDefinitionBuilderAddInput(op_builder, "scale: U");
+    TF_OpDefinitionBuilderAddOutput(op_builder, "x_backprop: T");
+    TF_OpDefinitionBuilderAddOutput(op_builder, "scale_backprop: U");
+    TF_OpDefinitionBuilderAddOutput(op_builder, "offset_backprop: U");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "T: {half, bfloat16, float}");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "U: {float}");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "epsilon: float = 0.0001");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "use_scale: bool = true");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "use_center: bool = false");
+    TF_OpDefinitionBuilderSetShapeInferenceFunction(op_builder,
+                                                    &unknown_shape_fn);
+    TF_RegisterOpDefinition(op_builder, status.get());
+    ITEX_CHECK_EQ(TF_OK, TF_GetCode(status.get()))
+        << "ITEXRMSNormGrad op registration failed: ";
+  }
+}
+
 void Register_ITEXLayerNormOp() {
   itex::StatusUniquePtr status(TF_NewStatus());
   {
@@ -4737,6 +4785,27 @@ void Register_BeamSelectKVCacheOp() {
   }
 }
 
+void Register_ResourceBeamSelectKVCacheOp() {
+  itex::StatusUniquePtr status(TF_NewStatus());
+  {
+    TF_OpDefinitionBuilder* op_builder =
+        TF_NewOpDefinitionBuilder("ResourceBeamSelectKVCache");
+    TF_OpDefinitionBuilderAddInput(op_builder, "cache: resource");
+    TF_OpDefinitionBuilderAddInput(op_builder, "indices: Index");
+    TF_OpDefinitionBuilderAddInput(op_builder, "valid_length: int32");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "T: {bfloat16, half, float}");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "Index: {int32,int64}");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "input_length: int = 0");
+    TF_OpDefinitionBuilderSetIsStateful(op_builder, true);
+    TF_OpDefinitionBuilderSetShapeInferenceFunction(op_builder,
+                                                    &empty_shape_fn);
+
+    TF_RegisterOpDefinition(op_builder, status.get());
+    ITEX_CHECK_EQ(TF_OK, TF_GetCode(status.get()))
+        << "ResourceBeamSelectKVCache op registration failed: ";
+  }
+}
+
 void Register_SDPOp() {
   itex::StatusUniquePtr status(TF_NewStatus());
   {
@@ -4831,6 +4900,7 @@ void Register_FlashSDPOp() {
     TF_OpDefinitionBuilderAddAttr(op_builder, "dropout_prob: float = 0.0");
     // TF_OpDefinitionBuilderAddAttr(op_builder, "dropout_seed: int");
     // TF_OpDefinitionBuilderAddAttr(op_builder, "dropout_offset: int");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "use_causal: bool = false");
     TF_OpDefinitionBuilderAddAttr(op_builder, "is_inference: bool = false");
     TF_OpDefinitionBuilderAddAttr(op_builder, "T: {bfloat16, half, float}");
 
@@ -4859,6 +4929,7 @@ void Register_FlashSDPGradOp() {
     TF_OpDefinitionBuilderAddOutput(op_builder, "key_backprop: T");
     TF_OpDefinitionBuilderAddOutput(op_builder, "value_backprop: T");
     TF_OpDefinitionBuilderAddAttr(op_builder, "use_mask: bool = false");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "use_causal: bool = false");
     TF_OpDefinitionBuilderAddAttr(op_builder, "dropout_prob: float = 0.0");
     // TF_OpDefinitionBuilderAddAttr(op_builder, "dropout_seed: int");
     // TF_OpDefinitionBuilderAddAttr(op_builder, "dropout_offset: int");
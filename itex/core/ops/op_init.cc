@@ -79,6 +79,8 @@ void RegisterOps() {
   Register_ITEXFusedApplyAdamWithWeightDecayOp();
   Register_ITEXResourceApplyAdamWithWeightDecayOp();
   Register_ITEXResourceApplyLAMBOp();
+  Register_ITEXResourceMultiTensorApplyAdamWithWeightDecayOp();
+  Register_ITEXResourceMultiTensorApplyLAMBOp();
   Register_ITEXFusedApplyMomentumOp();
   Register_ITEXFusedResourceApplyAdamOp();
   Register_ITEXFusedResourceApplyAdamWithWeightDecayOp();
@@ -148,6 +150,7 @@ void RegisterOps() {
   Register_OneDnnGraphOp();
   Register_QKRotaryPositionalEmbeddingOp();
   Register_BeamSelectKVCacheOp();
+  Register_ResourceBeamSelectKVCacheOp();
 
   // Native kernels
   Register_ITEXAddNOp();
@@ -187,7 +190,9 @@ void RegisterOps() {
   Register_ITEXLayerNormOp();
   Register_ITEXLayerNormGradOp();
   Register_ITEXGroupNormOp();
+  Register_ITEXGroupNormGradOp();
   Register_ITEXRMSNormOp();
+  Register_ITEXRMSNormGradOp();
   Register_ITEXLeakyReluGradOp();
   Register_ITEXLeakyReluOp();
   Register_ITEXMatMul();
@@ -371,6 +376,7 @@ void RegisterOps() {
   Register_FlashSDPGradOp();
 
   // FP8 kernels
+  Register_Fp8AmaxAndScaleUpdateOp();
   Register_Fp8QuantizeOp();
   Register_Fp8DequantizeOp();
   Register_Fp8LayerNormOp();
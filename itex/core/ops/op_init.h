@@ -33,6 +33,8 @@ void Register_ITEXFusedResourceApplyAdamWithWeightDecayOp();
 void Register_ITEXFusedResourceApplyMomentumOp();
 void Register_ITEXResourceApplyAdamWithWeightDecayOp();
 void Register_ITEXResourceApplyLAMBOp();
+void Register_ITEXResourceMultiTensorApplyAdamWithWeightDecayOp();
+void Register_ITEXResourceMultiTensorApplyLAMBOp();
 
 // Unupstreamed ops. These ops are only available in spr-base branch, not in
 // TF master.
@@ -55,6 +57,7 @@ void Register_QuantizedFusedBatchNormOp();
 
 // Custom kernels
 void Register_BeamSelectKVCacheOp();
+void Register_ResourceBeamSelectKVCacheOp();
 void Register_GeluOp();
 void Register_GeluGradOp();
 void Register_QKRotaryPositionalEmbeddingOp();
@@ -110,7 +113,9 @@ void Register_ITEXTensorArraySplit();
 void Register_ITEXTensorArraySize();
 void Register_ITEXTensorArrayClose();
 void Register_ITEXGroupNormOp();
+void Register_ITEXGroupNormGradOp();
 void Register_ITEXRMSNormOp();
+void Register_ITEXRMSNormGradOp();
 void Register_ITEXRnnOp();
 void Register_ITEXRnnGradOp();
 void Register_LayerNormOp();
@@ -338,6 +343,7 @@ void Register_FlashSDPOp();
 void Register_FlashSDPGradOp();
 
 // FP8 kernels
+void Register_Fp8AmaxAndScaleUpdateOp();
 void Register_Fp8QuantizeOp();
 void Register_Fp8DequantizeOp();
 void Register_Fp8LayerNormOp();
@@ -347,6 +347,70 @@ void Register_ITEXResourceApplyLAMBOp() {
   }
 }
 
+void Register_ITEXResourceMultiTensorApplyAdamWithWeightDecayOp() {
+  itex::StatusUniquePtr status(TF_NewStatus());
+  {
+    TF_OpDefinitionBuilder* op_builder = TF_NewOpDefinitionBuilder(
+        "ITEXResourceMultiTensorApplyAdamWithWeightDecay");
+
+    TF_OpDefinitionBuilderAddInput(op_builder, "var: N * resource");
+    TF_OpDefinitionBuilderAddInput(op_builder, "m: N * resource");
+    TF_OpDefinitionBuilderAddInput(op_builder, "v: N * resource");
+    TF_OpDefinitionBuilderAddInput(op_builder, "beta1_power: T");
+    TF_OpDefinitionBuilderAddInput(op_builder, "beta2_power: T");
+    TF_OpDefinitionBuilderAddInput(op_builder, "lr: T");
+    TF_OpDefinitionBuilderAddInput(op_builder, "beta1: T");
+    TF_OpDefinitionBuilderAddInput(op_builder, "beta2: T");
+    TF_OpDefinitionBuilderAddInput(op_builder, "epsilon: T");
+    TF_OpDefinitionBuilderAddInput(op_builder, "weight_decay: T");
+    TF_OpDefinitionBuilderAddInput(op_builder, "vhat: N * resource");
+    TF_OpDefinitionBuilderAddInput(op_builder, "grad: N * T");
+
+    TF_OpDefinitionBuilderAddAttr(op_builder, "N: int >= 1");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "T: {half, bfloat16, float}");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "use_locking: bool = false");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "use_amsgrad: bool = false");
+    TF_OpDefinitionBuilderSetShapeInferenceFunction(op_builder,
+                                                    &empty_shape_fn);
+    TF_RegisterOpDefinition(op_builder, status.get());
+    ITEX_CHECK_EQ(TF_OK, TF_GetCode(status.get()))
+        << "ITEXResourceMultiTensorApplyAdamWithWeightDecay op registration "
+           "failed: ";
+  }
+}
+
+void Register_ITEXResourceMultiTensorApplyLAMBOp() {
+  itex::StatusUniquePtr status(TF_NewStatus());
+  {
+    TF_OpDefinitionBuilder* op_builder =
+        TF_NewOpDefinitionBuilder("ITEXResourceMultiTensorApplyLAMB");
+
+    TF_OpDefinitionBuilderAddInput(op_builder, "var: N * resource");
+    TF_OpDefinitionBuilderAddInput(op_builder, "m: N * resource");
+    TF_OpDefinitionBuilderAddInput(op_builder, "v: N * resource");
+    TF_OpDefinitionBuilderAddInput(op_builder, "beta1_power: T");
+    TF_OpDefinitionBuilderAddInput(op_builder, "beta2_power: T");
+    TF_OpDefinitionBuilderAddInput(op_builder, "lr: T");
+    TF_OpDefinitionBuilderAddInput(op_builder, "beta1: T");
+    TF_OpDefinitionBuilderAddInput(op_builder, "beta2: T");
+    TF_OpDefinitionBuilderAddInput(op_builder, "epsilon: T");
+    TF_OpDefinitionBuilderAddInput(op_builder, "weight_decay: T");
+    TF_OpDefinitionBuilderAddInput(op_builder, "vhat: N * resource");
+    TF_OpDefinitionBuilderAddInput(op_builder, "grad: N * T");
+
+    TF_OpDefinitionBuilderAddAttr(op_builder, "N: int >= 1");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "T: {float}");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "use_locking: bool = false");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "use_amsgrad: bool = false");
+    TF_OpDefinitionBuilderAddAttr(op_builder, "use_lamb: list(bool)");
+    TF_OpDefinitionBuilderSetShapeInferenceFunction(op_builder,
+                                                    &empty_shape_fn);
+    TF_RegisterOpDefinition(op_builder, status.get());
+    ITEX_CHECK_EQ(TF_OK, TF_GetCode(status.get()))
+        << "ITEXResourceMultiTensorApplyLAMB op registration failed: ";
+  }
+}
+
 void Register_ITEXApplyRMSPropComputeRMSOp() {
   itex::StatusUniquePtr status(TF_NewStatus());
   {
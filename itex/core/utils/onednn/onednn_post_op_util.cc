@@ -294,6 +294,25 @@ void PostOpUtil::SetPostOpAttr(dnnl::primitive_attr* attr,
   }
 }
 
+void PostOpUtil::AddAsKey(PrimitiveCacheKeyCreator* key_creator) {
+  ITEX_DCHECK(key_creator);
+  for (const auto& postop_data : postop_scale_list_) {
+    key_creator->AddAsKey(postop_data.first);
+    key_creator->AddAsKey<float>(postop_data.second);
+  }
+  if (has_leaky_relu_) key_creator->AddAsKey<float>(leaky_relu_alpha_);
+  if (has_linear_) {
+    key_creator->AddAsKey<float>(linear_alpha_);
+    key_creator->AddAsKey<float>(linear_beta_);
+  }
+  if (has_output_scales_) {
+    // The values are execution arguments, see `SetOutputScale`.
+    key_creator->AddAsKey<int>(output_scale_param_.mask);
+    key_creator->AddAsKey<size_t>(output_scale_param_.scales.size());
+  }
+  if (has_bn_) key_creator->AddAsKey<float>(bn_epsilon_);
+}
+
 // Since batchnorm do the following for each input x:
 // scale * (x - mean) / sqrt(\sigma + \epsilon) + offset
 // BatchNorm can be decomposed into the following post ops:
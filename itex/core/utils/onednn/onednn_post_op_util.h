@@ -23,6 +23,7 @@ limitations under the License.
 #include <vector>
 
 #include "dnnl.h"  // NOLINT(build/include_subdir)
+#include "itex/core/utils/onednn/onednn_primitive_cache.h"
 #include "itex/core/utils/onednn/onednn_util.h"
 
 namespace itex {
@@ -107,6 +108,13 @@ class PostOpUtil {
   void SetPostOpAttr(dnnl::primitive_attr* attr,
                      const std::vector<dnnl::memory::desc>& md_list = {});
 
+  // Append everything that `SetPostOpAttr` bakes into the primitive attr
+  // to `key_creator`. Post op scales are part of the primitive, so they are
+  // part of the key. Output scales only set a mask in the attr, and their
+  // values are passed with `DNNL_ARG_ATTR_SCALES` in every execution, so only
+  // the mask and the number of scales are part of the key.
+  void AddAsKey(PrimitiveCacheKeyCreator* key_creator);
+
   // Set batchnorm and post op attribution for `attr`.
   void SetBNPostOpAttr(dnnl::primitive_attr* attr,
                        const std::vector<dnnl::memory::desc>& md_list = {});
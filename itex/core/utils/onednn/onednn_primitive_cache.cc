@@ -0,0 +1,79 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include "itex/core/utils/onednn/onednn_primitive_cache.h"
+
+#include <atomic>
+
+#include "itex/core/utils/env_var.h"
+#include "itex/core/utils/logging.h"
+#include "itex/core/utils/status.h"
+
+namespace itex {
+namespace {
+// Default number of primitives cached by each kernel instance. It covers the
+// common serving case that alternates between a few batch sizes or sequence
+// lengths.
+constexpr int64_t kDefaultPrimitiveCacheCapacity = 16;
+
+std::atomic<int64_t> primitive_cache_hits{0};
+std::atomic<int64_t> primitive_cache_misses{0};
+std::atomic<int64_t> primitive_cache_evictions{0};
+}  // namespace
+
+void RecordPrimitiveCacheHit() {
+  primitive_cache_hits.fetch_add(1, std::memory_order_relaxed);
+}
+
+void RecordPrimitiveCacheMiss() {
+  primitive_cache_misses.fetch_add(1, std::memory_order_relaxed);
+}
+
+void RecordPrimitiveCacheEviction() {
+  primitive_cache_evictions.fetch_add(1, std::memory_order_relaxed);
+}
+
+PrimitiveCacheStats GetPrimitiveCacheStats() {
+  PrimitiveCacheStats stats;
+  stats.hits = primitive_cache_hits.load(std::memory_order_relaxed);
+  stats.misses = primitive_cache_misses.load(std::memory_order_relaxed);
+  stats.evictions = primitive_cache_evictions.load(std::memory_order_relaxed);
+  return stats;
+}
+
+void ResetPrimitiveCacheStats() {
+  primitive_cache_hits.store(0, std::memory_order_relaxed);
+  primitive_cache_misses.store(0, std::memory_order_relaxed);
+  primitive_cache_evictions.store(0, std::memory_order_relaxed);
+}
+
+int64_t GetPrimitiveCacheCapacity() {
+  static int64_t capacity = [] {
+    int64 value;
+    ITEX_CHECK_OK(ReadInt64FromEnvVar("ITEX_PRIMITIVE_CACHE_CAPACITY",
+                                      kDefaultPrimitiveCacheCapacity, &value));
+    if (value < 0) {
+      ITEX_LOG(WARNING) << "ITEX_PRIMITIVE_CACHE_CAPACITY must be "
+                        << "non-negative, but got " << value
+                        << ". Primitive cache is disabled.";
+      value = 0;
+    }
+    ITEX_VLOG(1) << "oneDNN primitive cache capacity per kernel: " << value;
+    return value;
+  }();
+  return capacity;
+}
+
+}  // namespace itex
@@ -0,0 +1,159 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#ifndef ITEX_CORE_UTILS_ONEDNN_ONEDNN_PRIMITIVE_CACHE_H_
+#define ITEX_CORE_UTILS_ONEDNN_ONEDNN_PRIMITIVE_CACHE_H_
+
+#include <cstdint>
+#include <list>
+#include <string>
+#include <unordered_map>
+#include <utility>
+#include <vector>
+
+namespace itex {
+
+// Process-wide counters of all per-kernel primitive caches. They are
+// implemented in libitex_common, so kernel libraries and the Python wrapper
+// observe the same values.
+struct PrimitiveCacheStats {
+  int64_t hits = 0;
+  int64_t misses = 0;
+  int64_t evictions = 0;
+};
+
+void RecordPrimitiveCacheHit();
+void RecordPrimitiveCacheMiss();
+void RecordPrimitiveCacheEviction();
+PrimitiveCacheStats GetPrimitiveCacheStats();
+void ResetPrimitiveCacheStats();
+
+// Max number of primitives kept by each kernel instance, read once from
+// `ITEX_PRIMITIVE_CACHE_CAPACITY`. 0 disables the cache.
+int64_t GetPrimitiveCacheCapacity();
+
+// Helper to build a cache key from shapes, data types and attributes. Every
+// item is appended as raw bytes followed by a delimiter.
+class PrimitiveCacheKeyCreator {
+ public:
+  PrimitiveCacheKeyCreator() { key_.reserve(kMaxKeyLength); }
+  ~PrimitiveCacheKeyCreator() = default;
+
+  void AddAsKey(const std::string& str) { Append(str.data(), str.size()); }
+
+  // Dims of different rank must not collide, so the rank is part of the key.
+  void AddAsKey(const std::vector<int64_t>& dims) {
+    AddAsKey<size_t>(dims.size());
+    for (const int64_t dim : dims) AddAsKey<int64_t>(dim);
+  }
+
+  template <typename T>
+  void AddAsKey(const T data) {
+    Append(reinterpret_cast<const char*>(&data), sizeof(T));
+  }
+
+  const std::string& GetKey() const { return key_; }
+
+ private:
+  void Append(const char* data, size_t size) {
+    key_.append(data, size);
+    key_.append(1, kDelimiter);
+  }
+
+  static constexpr char kDelimiter = 'x';
+  static constexpr int kMaxKeyLength = 256;
+  std::string key_;
+};
+
+// A LRU cache for oneDNN primitives (or any other objects that are costly to
+// create) owned by a single kernel. It is not thread safe, the owner kernel
+// is expected to guard it with its compute mutex.
+template <typename T>
+class PrimitiveLRUCache {
+ public:
+  PrimitiveLRUCache() : capacity_(GetPrimitiveCacheCapacity()) {}
+  explicit PrimitiveLRUCache(int64_t capacity) : capacity_(capacity) {}
+  ~PrimitiveLRUCache() = default;
+
+  bool IsEnabled() const { return capacity_ > 0; }
+  size_t Size() const { return cache_.size(); }
+  int64_t Capacity() const { return capacity_; }
+
+  // Returns the cached object and marks it as most recently used, or nullptr
+  // if `key` is not found. Lookups of a disabled cache are not counted.
+  T* Get(const std::string& key) {
+    if (!IsEnabled()) return nullptr;
+    auto it = cache_.find(key);
+    if (it == cache_.end()) {
+      RecordPrimitiveCacheMiss();
+      return nullptr;
+    }
+    RecordPrimitiveCacheHit();
+    lru_list_.splice(lru_list_.begin(), lru_list_, it->second.lru_iterator);
+    return &it->second.value;
+  }
+
+  // Inserts `value` as the most recently used object, evicting the least
+  // recently used one if the cache is full. Returns the cached object.
+  T* Insert(const std::string& key, T value) {
+    if (!IsEnabled()) return nullptr;
+
+    auto it = cache_.find(key);
+    if (it != cache_.end()) {
+      it->second.value = std::move(value);
+      lru_list_.splice(lru_list_.begin(), lru_list_, it->second.lru_iterator);
+      return &it->second.value;
+    }
+
+    while (cache_.size() >= static_cast<size_t>(capacity_)) {
+      cache_.erase(lru_list_.back());
+      lru_list_.pop_back();
+      RecordPrimitiveCacheEviction();
+    }
+
+    lru_list_.push_front(key);
+    auto result =
+        cache_.emplace(key, Entry{std::move(value), lru_list_.begin()});
+    return &result.first->second.value;
+  }
+
+  void Clear() {
+    cache_.clear();
+    lru_list_.clear();
+  }
+
+ private:
+  struct Entry {
+    T value;
+    std::list<std::string>::iterator lru_iterator;
+  };
+
+  int64_t capacity_;
+  // Keys ordered from the most to the least recently used.
+  std::list<std::string> lru_list_;
+  std::unordered_map<std::string, Entry> cache_;
+};
+
+// Primitive descriptor and primitive created from it. The descriptor is kept
+// to query weights/scratchpad layouts when the primitive is reused.
+template <typename PrimitiveDesc, typename Primitive>
+struct CachedPrimitive {
+  PrimitiveDesc pd;
+  Primitive primitive;
+};
+
+}  // namespace itex
+
+#endif  // ITEX_CORE_UTILS_ONEDNN_ONEDNN_PRIMITIVE_CACHE_H_
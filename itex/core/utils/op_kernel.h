@@ -36,6 +36,7 @@ limitations under the License.
 #include "itex/core/utils/mutex.h"
 #include "itex/core/utils/notification.h"
 #include "itex/core/utils/plugin_tensor.h"
+#include "itex/core/utils/thread_pool_backend.h"
 #include "itex/core/utils/types.h"
 #include "protos/node_def.pb.h"
 #include "third_party/eigen3/unsupported/Eigen/CXX11/Tensor"
@@ -623,7 +624,14 @@ class OpKernel {
 
   const absl::string_view type() const { return op_type; }
 
-  void set_type(absl::string_view type) { op_type = type; }
+  void set_type(absl::string_view type) {
+    op_type = type;
+    parallel_region_counter_ = GetParallelRegionCounter(std::string(type));
+  }
+
+  ParallelRegionCounter* parallel_region_counter() const {
+    return parallel_region_counter_;
+  }
 
   std::string ShapeTraceString(const OpKernelContext& ctx) const;
 
@@ -632,6 +640,7 @@ class OpKernel {
  private:
   absl::string_view op_name;
   absl::string_view op_type;
+  ParallelRegionCounter* parallel_region_counter_ = nullptr;
 };
 
 class AsyncOpKernel : public OpKernel {
@@ -915,6 +924,8 @@ class OpTypeFactory {
                  << op->type();                                             \
     AnnotatedTraceMe activity(                                              \
         [op, &context] { return op->TraceString(context); });               \
+    ScopedParallelRegionCounter region_counter(                             \
+        op->parallel_region_counter());                                     \
     RunOrWaitUntilFinish(&context, op);                                     \
   }                                                                         \
   static void Register##ctr(const char* device_name, const char* backend) { \
@@ -964,6 +975,8 @@ class OpTypeFactory {
                  << op->type();                                             \
     AnnotatedTraceMe activity(                                              \
         [op, &context] { return op->TraceString(*context.get()); });        \
+    ScopedParallelRegionCounter region_counter(                             \
+        op->parallel_region_counter());                                     \
     RunOrWaitUntilFinish(context.get(), op, &callback);                     \
   }                                                                         \
   static void Register##ctr(const char* device_name, const char* backend) { \
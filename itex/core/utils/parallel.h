@@ -13,21 +13,26 @@ limitations under the License.
 #ifndef ITEX_CORE_UTILS_PARALLEL_H_
 #define ITEX_CORE_UTILS_PARALLEL_H_
 
+#include <algorithm>
+
 #include "itex/core/utils/parallel_openmp.h"
+#include "itex/core/utils/thread_pool_backend.h"
 #include "third_party/eigen3/unsupported/Eigen/CXX11/Tensor"
 
 namespace itex {
 
 // Returns the maximum number of threads that may be used in a parallel region
 inline int GetNumThreads() {
-  bool is_omp = true;
-  ITEX_CHECK_OK(ReadBoolFromEnvVar("ITEX_OMP_THREADPOOL", true, &is_omp));
-  if (is_omp) {
-    return GetOmpNumThreads();
-  } else {
-    const Eigen::ThreadPoolDevice& device =
-        OpKernelContext::eigen_cpu_device_singleton();
-    return device.numThreadsInPool();
+  const Eigen::ThreadPoolDevice& device =
+      OpKernelContext::eigen_cpu_device_singleton();
+  switch (GetThreadPoolBackend()) {
+    case ThreadPoolBackend::kOpenMP:
+      return GetOmpNumThreads();
+    case ThreadPoolBackend::kEigen:
+      return device.numThreadsInPool();
+    default:
+      // A region of the hybrid mode may run on either pool.
+      return std::max(GetOmpNumThreads(), device.numThreadsInPool());
   }
 }
 
@@ -37,29 +42,50 @@ inline int GetNumThreads() {
 // amount is less than the num threads, one task can be executed in the main
 // thread, which returns -1 as thread id).
 inline int GetThreadNum() {
-  bool is_omp = true;
-  ITEX_CHECK_OK(ReadBoolFromEnvVar("ITEX_OMP_THREADPOOL", true, &is_omp));
-  if (is_omp) {
-    return GetOmpThreadNum();
-  } else {
-    const Eigen::ThreadPoolDevice& device =
-        OpKernelContext::eigen_cpu_device_singleton();
-    return device.currentThreadId();
+  const Eigen::ThreadPoolDevice& device =
+      OpKernelContext::eigen_cpu_device_singleton();
+  switch (GetThreadPoolBackend()) {
+    case ThreadPoolBackend::kOpenMP:
+      return GetOmpThreadNum();
+    case ThreadPoolBackend::kEigen:
+      return device.currentThreadId();
+    default:
+      return InParallelRegion() ? GetOmpThreadNum() : device.currentThreadId();
   }
 }
 
+// Runs f(begin, end) over [0, n) on the thread pool selected by
+// GetThreadPoolBackend(), and counts one parallel region for the running op.
+//
+// The hybrid mode runs regions whose total cost reaches GetHybridOmpMinCost()
+// on OpenMP, with the threads not taken by concurrent regions of other ops,
+// and cheaper ones on the Eigen pool. Nested regions stay on OpenMP, which
+// runs them sequentially, so thread numbers of the two pools never mix.
 template <typename F>
 inline void ParallelFor(int64_t n, const Eigen::TensorOpCost& cost,
                         const F& f) {
-  bool is_omp = true;
-  ITEX_CHECK_OK(ReadBoolFromEnvVar("ITEX_OMP_THREADPOOL", true, &is_omp));
-
-  if (is_omp) {
-    OmpParallelFor(0, n, 1, f);
-  } else {
-    const Eigen::ThreadPoolDevice& device =
-        OpKernelContext::eigen_cpu_device_singleton();
-    device.parallelFor(n, cost, f);
+  RecordParallelRegion();
+  const Eigen::ThreadPoolDevice& device =
+      OpKernelContext::eigen_cpu_device_singleton();
+  switch (GetThreadPoolBackend()) {
+    case ThreadPoolBackend::kOpenMP:
+      OmpParallelFor(0, n, 1, f);
+      break;
+    case ThreadPoolBackend::kEigen:
+      device.parallelFor(n, cost, f);
+      break;
+    default:
+      if (InParallelRegion()) {
+        OmpParallelFor(0, n, 1, f);
+      } else if (Eigen::TensorCostModel<Eigen::ThreadPoolDevice>::totalCost(
+                     n, cost) >= GetHybridOmpMinCost()) {
+        const int num_threads = AcquireOmpThreads(GetOmpNumThreads());
+        OmpParallelFor(0, n, 1, f, num_threads);
+        ReleaseOmpThreads(num_threads);
+      } else {
+        RecordEigenRegion();
+        device.parallelFor(n, cost, f);
+      }
   }
 }
 }  // namespace itex
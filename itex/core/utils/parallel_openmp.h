@@ -51,22 +51,25 @@ inline bool InParallelRegion() {
 inline int64_t DivUp(int64_t x, int64_t y) { return (x + y - 1) / y; }
 
 #ifdef _OPENMP
+// Runs f over [begin, end) split into one chunk per thread. `max_threads`
+// limits the team size, 0 means all the OpenMP threads.
 template <typename F>
 inline void OmpParallelFor(int64_t begin, int64_t end, int64_t grain_size,
-                           const F& f) {
+                           const F& f, int max_threads = 0) {
   if (begin >= end) {
     return;
   }
 
+  const int team_size = max_threads > 0 ? max_threads : GetOmpNumThreads();
   const auto numiter = end - begin;
   const bool use_parallel = (numiter > grain_size && numiter > 1 &&
-                             !InParallelRegion() && GetOmpNumThreads() > 1);
+                             !InParallelRegion() && team_size > 1);
   if (!use_parallel) {
     f(begin, end);
     return;
   }
 
-#pragma omp parallel
+#pragma omp parallel num_threads(team_size)
   {
     int64_t num_threads = omp_get_num_threads();
     if (grain_size > 0) {
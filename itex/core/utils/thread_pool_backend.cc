@@ -0,0 +1,193 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#include "itex/core/utils/thread_pool_backend.h"
+
+#include <algorithm>
+#include <memory>
+#include <mutex>  // NOLINT(build/c++11)
+
+#include "itex/core/utils/env_var.h"
+#include "itex/core/utils/logging.h"
+#include "itex/core/utils/status.h"
+
+namespace itex {
+namespace {
+
+// Default of ITEX_HYBRID_OMP_MIN_COST. Forking an OpenMP team costs a few
+// microseconds, which is only amortized by regions of about 1M cycles.
+constexpr int64 kDefaultHybridOmpMinCost = 1000000;
+
+std::atomic<ThreadPoolBackend>& Backend() {
+  static std::atomic<ThreadPoolBackend> backend(ReadThreadPoolBackendFromEnv());
+  return backend;
+}
+
+struct ParallelRegionCounters {
+  std::mutex mu;
+  std::map<std::string, std::unique_ptr<ParallelRegionCounter>> counters;
+};
+
+ParallelRegionCounters& Counters() {
+  static ParallelRegionCounters* counters = new ParallelRegionCounters;
+  return *counters;
+}
+
+thread_local ParallelRegionCounter* current_counter = nullptr;
+
+// Number of OpenMP threads used by the regions of kHybrid.
+std::atomic<int> omp_threads_in_use{0};
+
+// Regions of kHybrid by the pool they run on, and the OpenMP regions which
+// got fewer threads than requested.
+std::atomic<int64_t> hybrid_omp_regions{0};
+std::atomic<int64_t> hybrid_eigen_regions{0};
+std::atomic<int64_t> hybrid_partitioned_regions{0};
+
+}  // namespace
+
+ThreadPoolBackend ReadThreadPoolBackendFromEnv() {
+#ifdef CC_THREADPOOL_BUILD
+  return ThreadPoolBackend::kEigen;
+#else
+  bool is_omp = true;
+  ITEX_CHECK_OK(ReadBoolFromEnvVar("ITEX_OMP_THREADPOOL", true, &is_omp));
+  bool is_hybrid = false;
+  ITEX_CHECK_OK(
+      ReadBoolFromEnvVar("ITEX_HYBRID_THREADPOOL", false, &is_hybrid));
+  if (is_hybrid && !is_omp) {
+    ITEX_LOG(WARNING) << "ITEX_HYBRID_THREADPOOL requires OpenMP thread pool, "
+                      << "but ITEX_OMP_THREADPOOL=0. Use Eigen thread pool.";
+  }
+  if (!is_omp) return ThreadPoolBackend::kEigen;
+  return is_hybrid ? ThreadPoolBackend::kHybrid : ThreadPoolBackend::kOpenMP;
+#endif
+}
+
+ThreadPoolBackend GetThreadPoolBackend() {
+  return Backend().load(std::memory_order_relaxed);
+}
+
+void SetThreadPoolBackend(ThreadPoolBackend backend) {
+#ifdef CC_THREADPOOL_BUILD
+  if (backend != ThreadPoolBackend::kEigen) {
+    ITEX_LOG(WARNING) << "OpenMP thread pool is not available in the "
+                      << "threadpool build, keep using Eigen thread pool.";
+    return;
+  }
+#endif
+  if (backend == ThreadPoolBackend::kHybrid && !IsHybridThreadPoolAvailable()) {
+    ITEX_LOG(WARNING) << "Hybrid thread pool requires ITEX_HYBRID_THREADPOOL=1 "
+                      << "before ITEX is loaded, use OpenMP thread pool.";
+    backend = ThreadPoolBackend::kOpenMP;
+  }
+  if (Backend().exchange(backend, std::memory_order_relaxed) != backend) {
+    static const char* const kNames[] = {"OpenMP", "Eigen", "hybrid"};
+    ITEX_VLOG(1) << "Switched CPU intra-op thread pool to "
+                 << kNames[static_cast<int>(backend)];
+  }
+}
+
+bool IsHybridThreadPoolAvailable() {
+  static const bool available =
+      ReadThreadPoolBackendFromEnv() == ThreadPoolBackend::kHybrid;
+  return available;
+}
+
+double GetHybridOmpMinCost() {
+  static double min_cost = [] {
+    int64 value;
+    ITEX_CHECK_OK(ReadInt64FromEnvVar("ITEX_HYBRID_OMP_MIN_COST",
+                                      kDefaultHybridOmpMinCost, &value));
+    return static_cast<double>(value);
+  }();
+  return min_cost;
+}
+
+int AcquireOmpThreads(int max_threads) {
+  int in_use = omp_threads_in_use.load(std::memory_order_relaxed);
+  int claimed;
+  do {
+    claimed = std::max(1, max_threads - in_use);
+  } while (!omp_threads_in_use.compare_exchange_weak(
+      in_use, in_use + claimed, std::memory_order_relaxed));
+  hybrid_omp_regions.fetch_add(1, std::memory_order_relaxed);
+  if (claimed < max_threads) {
+    hybrid_partitioned_regions.fetch_add(1, std::memory_order_relaxed);
+  }
+  return claimed;
+}
+
+void ReleaseOmpThreads(int num_threads) {
+  omp_threads_in_use.fetch_sub(num_threads, std::memory_order_relaxed);
+}
+
+void RecordEigenRegion() {
+  hybrid_eigen_regions.fetch_add(1, std::memory_order_relaxed);
+}
+
+std::map<std::string, int64_t> GetHybridThreadPoolStats() {
+  return {
+      {"omp", hybrid_omp_regions.load(std::memory_order_relaxed)},
+      {"eigen", hybrid_eigen_regions.load(std::memory_order_relaxed)},
+      {"partitioned",
+       hybrid_partitioned_regions.load(std::memory_order_relaxed)},
+  };
+}
+
+ParallelRegionCounter* GetParallelRegionCounter(const std::string& op_type) {
+  ParallelRegionCounters& counters = Counters();
+  std::lock_guard<std::mutex> lock(counters.mu);
+  std::unique_ptr<ParallelRegionCounter>& counter = counters.counters[op_type];
+  if (counter == nullptr) counter.reset(new ParallelRegionCounter(0));
+  return counter.get();
+}
+
+ParallelRegionCounter* SetCurrentParallelRegionCounter(
+    ParallelRegionCounter* counter) {
+  ParallelRegionCounter* previous = current_counter;
+  current_counter = counter;
+  return previous;
+}
+
+void RecordParallelRegion() {
+  if (current_counter != nullptr) {
+    current_counter->fetch_add(1, std::memory_order_relaxed);
+  }
+}
+
+std::map<std::string, int64_t> GetParallelRegionStats() {
+  ParallelRegionCounters& counters = Counters();
+  std::lock_guard<std::mutex> lock(counters.mu);
+  std::map<std::string, int64_t> stats;
+  for (const auto& entry : counters.counters) {
+    const int64_t count = entry.second->load(std::memory_order_relaxed);
+    if (count > 0) stats[entry.first] = count;
+  }
+  return stats;
+}
+
+void ResetParallelRegionStats() {
+  ParallelRegionCounters& counters = Counters();
+  std::lock_guard<std::mutex> lock(counters.mu);
+  for (auto& entry : counters.counters) {
+    entry.second->store(0, std::memory_order_relaxed);
+  }
+  hybrid_omp_regions.store(0, std::memory_order_relaxed);
+  hybrid_eigen_regions.store(0, std::memory_order_relaxed);
+  hybrid_partitioned_regions.store(0, std::memory_order_relaxed);
+}
+
+}  // namespace itex
@@ -0,0 +1,121 @@
+/* Copyright (c) 2023 Intel Corporation
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+==============================================================================*/
+
+#ifndef ITEX_CORE_UTILS_THREAD_POOL_BACKEND_H_
+#define ITEX_CORE_UTILS_THREAD_POOL_BACKEND_H_
+
+#include <atomic>
+#include <cstdint>
+#include <map>
+#include <string>
+
+namespace itex {
+
+// Thread pool used by the parallel regions of ITEX CPU kernels, see
+// itex/core/utils/parallel.h. The state is implemented in libitex_common, so
+// kernel libraries and the Python wrapper observe the same values.
+//
+// kHybrid routes each region by its cost: expensive regions run on OpenMP
+// with a share of the cores, cheap ones on the Eigen pool, so independent
+// small ops can run concurrently without forking the whole OpenMP team.
+enum class ThreadPoolBackend {
+  kOpenMP = 0,
+  kEigen = 1,
+  kHybrid = 2,
+};
+
+// Returns the backend selected by `ITEX_OMP_THREADPOOL` and
+// `ITEX_HYBRID_THREADPOOL`, always Eigen in the threadpool build.
+ThreadPoolBackend ReadThreadPoolBackendFromEnv();
+
+// Returns the current backend. It is resolved once from the environment on
+// first use, so the hot path is a single atomic load.
+ThreadPoolBackend GetThreadPoolBackend();
+
+// Switches the backend at runtime, e.g. from `itex.set_config`. It only
+// affects ITEX's own parallel regions: the oneDNN runtime (OpenMP or
+// threadpool) is chosen when the CPU library is loaded and can't be changed.
+// kHybrid falls back to kOpenMP if IsHybridThreadPoolAvailable() is false.
+void SetThreadPoolBackend(ThreadPoolBackend backend);
+
+// Whether kHybrid may be selected. It needs the inter-op threads of
+// TensorFlow, which are pinned for OpenMP when the plugin is loaded unless
+// `ITEX_HYBRID_THREADPOOL` is set, so it can't be enabled later at runtime.
+// Latched on the first call, from InitGlobalSetting.
+bool IsHybridThreadPoolAvailable();
+
+inline bool IsOmpThreadPoolEnabled() {
+  return GetThreadPoolBackend() == ThreadPoolBackend::kOpenMP;
+}
+
+// Min total cost, in cycles as estimated by Eigen::TensorCostModel, of a
+// parallel region that kHybrid runs on OpenMP. Read once from
+// `ITEX_HYBRID_OMP_MIN_COST`.
+double GetHybridOmpMinCost();
+
+// Partitions the OpenMP threads between the regions kHybrid runs
+// concurrently from different inter-op threads. Claims up to `max_threads`
+// of the threads not used by other regions, at least 1, and returns the
+// number claimed, which must be given back with ReleaseOmpThreads. Each call
+// counts one OpenMP region of kHybrid, and one partitioned region if fewer
+// threads than `max_threads` are claimed.
+int AcquireOmpThreads(int max_threads);
+void ReleaseOmpThreads(int num_threads);
+
+// Counts one region kHybrid runs on the Eigen pool.
+void RecordEigenRegion();
+
+// Number of the regions of kHybrid since the last ResetParallelRegionStats,
+// keyed by "omp", "eigen" and "partitioned".
+std::map<std::string, int64_t> GetHybridThreadPoolStats();
+
+// Counter of the parallel regions (fork/join) entered by kernels of one op
+// type. Counters are never freed, so kernels may keep the pointer.
+using ParallelRegionCounter = std::atomic<int64_t>;
+
+ParallelRegionCounter* GetParallelRegionCounter(const std::string& op_type);
+
+// Sets the counter of the op running on the calling thread and returns the
+// previous one. nullptr stops counting.
+ParallelRegionCounter* SetCurrentParallelRegionCounter(
+    ParallelRegionCounter* counter);
+
+// Increments the counter of the op running on the calling thread, if any.
+void RecordParallelRegion();
+
+// Number of parallel regions of each op type since the last reset. Op types
+// without any region are omitted. The reset also clears the counters of
+// GetHybridThreadPoolStats.
+std::map<std::string, int64_t> GetParallelRegionStats();
+void ResetParallelRegionStats();
+
+// Counts the parallel regions of `counter`'s op in the current scope.
+class ScopedParallelRegionCounter {
+ public:
+  explicit ScopedParallelRegionCounter(ParallelRegionCounter* counter)
+      : previous_(SetCurrentParallelRegionCounter(counter)) {}
+  ~ScopedParallelRegionCounter() { SetCurrentParallelRegionCounter(previous_); }
+
+  ScopedParallelRegionCounter(const ScopedParallelRegionCounter&) = delete;
+  ScopedParallelRegionCounter& operator=(const ScopedParallelRegionCounter&) =
+      delete;
+
+ private:
+  ParallelRegionCounter* previous_;
+};
+
+}  // namespace itex
+
+#endif  // ITEX_CORE_UTILS_THREAD_POOL_BACKEND_H_
@@ -14,18 +14,51 @@
 # ==============================================================================
 '''Init file for graph optimizer config, custom ops'''
 
+import importlib as _importlib
+
 import tensorflow  # pylint: disable=unused-import
 import intel_extension_for_tensorflow_lib  # pylint: disable=unused-import
 from intel_extension_for_tensorflow.python.config import set_config  # pylint: disable=unused-import
 from intel_extension_for_tensorflow.python.config import get_config  # pylint: disable=unused-import
+from intel_extension_for_tensorflow.python.config import get_primitive_cache_stats  # pylint: disable=unused-import
+from intel_extension_for_tensorflow.python.config import reset_primitive_cache_stats  # pylint: disable=unused-import
+from intel_extension_for_tensorflow.python.config import get_parallel_region_stats  # pylint: disable=unused-import
+from intel_extension_for_tensorflow.python.config import reset_parallel_region_stats  # pylint: disable=unused-import
+from intel_extension_for_tensorflow.python.config import get_hybrid_threadpool_stats  # pylint: disable=unused-import
+from intel_extension_for_tensorflow.python.config import register_fusion_pattern  # pylint: disable=unused-import
+from intel_extension_for_tensorflow.python.config import unregister_fusion_pattern  # pylint: disable=unused-import
+from intel_extension_for_tensorflow.python.config import get_fusion_patterns  # pylint: disable=unused-import
 from intel_extension_for_tensorflow.python.device import get_backend  # pylint: disable=unused-import
 from intel_extension_for_tensorflow.python.device import is_xehpc  # pylint: disable=unused-import
 from intel_extension_for_tensorflow.python.device import has_xmx  # pylint: disable=unused-import
 from intel_extension_for_tensorflow.python import ops  # pylint: disable=unused-import,line-too-long
-from intel_extension_for_tensorflow.python import distribute # pylint: disable=unused-import,line-too-long
 from intel_extension_for_tensorflow.python.version import __version__  # pylint: disable=unused-import
 from intel_extension_for_tensorflow.python import version  # pylint: disable=unused-import
-from intel_extension_for_tensorflow.python import test_func  # pylint: disable=unused-import
 
 from intel_extension_for_tensorflow.core.utils.protobuf.config_pb2 import *  # pylint: disable=unused-import,wildcard-import,unused-wildcard-import
-from intel_extension_for_tensorflow.python.experimental_ops_override import experimental_ops_override
+
+# Non-core attributes are imported on first access (PEP 562), so importing
+# ITEX doesn't pay for the test utilities, the distribute strategies or the
+# Keras ops overriding.
+_LAZY_ATTRIBUTES = {
+    "distribute": ("intel_extension_for_tensorflow.python.distribute", None),
+    "test_func": ("intel_extension_for_tensorflow.python.test_func", None),
+    "experimental_ops_override": (
+        "intel_extension_for_tensorflow.python.experimental_ops_override",
+        "experimental_ops_override"),
+}
+
+
+def __getattr__(name):
+  if name not in _LAZY_ATTRIBUTES:
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+  module_name, attr = _LAZY_ATTRIBUTES[name]
+  value = _importlib.import_module(module_name)
+  if attr is not None:
+    value = getattr(value, attr)
+  globals()[name] = value
+  return value
+
+
+def __dir__():
+  return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
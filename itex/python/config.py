@@ -18,6 +18,11 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import json
+
+from google.protobuf import json_format
+from tensorflow.python.framework import op_def_registry
+
 from intel_extension_for_tensorflow.python._pywrap_itex import *
 from intel_extension_for_tensorflow.core.utils.protobuf import config_pb2
 
@@ -36,3 +41,189 @@ def get_config():
   config = config_pb2.ConfigProto()
   config.ParseFromString(config_str)
   return config
+
+def get_primitive_cache_stats():
+  """Get hit/miss/eviction counters of the oneDNN primitive cache.
+
+  The counters are accumulated over all MatMul/BatchMatMul/Conv kernels in
+  the process. `capacity` is the max number of primitives kept per kernel,
+  set by `ITEX_PRIMITIVE_CACHE_CAPACITY`.
+  """
+  return dict(ITEX_GetPrimitiveCacheStats())
+
+def reset_primitive_cache_stats():
+  """Reset counters of the oneDNN primitive cache to 0."""
+  ITEX_ResetPrimitiveCacheStats()
+
+def get_parallel_region_stats():
+  """Get the number of parallel regions entered by each op type on CPU.
+
+  Every `ParallelFor` of an ITEX CPU kernel forks and joins the intra-op
+  thread pool once, so a large count relative to the op's runtime shows
+  fork/join overhead in graphs with many small ops. Op types without any
+  parallel region are omitted.
+  """
+  return dict(ITEX_GetParallelRegionStats())
+
+def reset_parallel_region_stats():
+  """Reset counters of the CPU parallel regions to 0.
+
+  It also resets the counters of `get_hybrid_threadpool_stats`.
+  """
+  ITEX_ResetParallelRegionStats()
+
+def get_hybrid_threadpool_stats():
+  """Get the number of CPU parallel regions routed by the hybrid thread pool.
+
+  `omp` and `eigen` count the regions run on OpenMP and on Eigen thread pool,
+  `partitioned` the OpenMP regions which got fewer threads than the team as
+  concurrent regions held the others. They stay 0 unless
+  `ITEX_HYBRID_THREADPOOL=1` is set before ITEX is loaded.
+  """
+  return dict(ITEX_GetHybridThreadPoolStats())
+
+# Names accepted by DataTypeFromString for the `type` of a `FusionAttr`, each
+# also with a "_ref" suffix.
+_FUSION_ATTR_TYPES = frozenset([
+    'float', 'float32', 'double', 'float64', 'int32', 'uint32', 'uint8',
+    'uint16', 'int16', 'int8', 'string', 'complex64', 'complex128', 'int64',
+    'uint64', 'bool', 'qint8', 'quint8', 'qint16', 'quint16', 'qint32',
+    'bfloat16', 'half', 'float16', 'resource', 'variant'])
+
+def _check_fusion_pattern(pattern):
+  """Check a `FusionPattern` as BuildFusionPattern of the remapper does."""
+  if not pattern.name:
+    raise ValueError('fusion pattern must have a name')
+  if not pattern.nodes:
+    raise ValueError('fusion pattern %s has no node' % pattern.name)
+  nodes = {}
+  for node in pattern.nodes:
+    # A trailing '*' means variadic inputs to the matcher.
+    if (not node.label or node.label.endswith('*') or
+        node.label in nodes):
+      raise ValueError('fusion pattern %s has an empty, duplicate or invalid '
+                       'label %r' % (pattern.name, node.label))
+    if not node.op:
+      raise ValueError('node %s of fusion pattern %s has no op' %
+                       (node.label, pattern.name))
+    nodes[node.label] = node
+  for node in pattern.nodes:
+    if node.op == '*' and node.inputs:
+      raise ValueError('input node %s of fusion pattern %s with op "*" can\'t '
+                       'have inputs' % (node.label, pattern.name))
+    for label in node.inputs:
+      if label not in nodes:
+        raise ValueError('node %s of fusion pattern %s has unknown input %s' %
+                         (node.label, pattern.name, label))
+  if pattern.nodes[0].op == '*':
+    raise ValueError('output node of fusion pattern %s can\'t be "*"' %
+                     pattern.name)
+
+  # Walk the inputs from the output node, the subgraph must be acyclic and
+  # every node must be reached.
+  visited = set()
+  visiting = set()
+  def visit(label):
+    if label in visiting:
+      raise ValueError('fusion pattern %s has a cycle at node %s' %
+                       (pattern.name, label))
+    if label in visited:
+      return
+    visiting.add(label)
+    visited.add(label)
+    for input_label in nodes[label].inputs:
+      visit(input_label)
+    visiting.remove(label)
+  visit(pattern.nodes[0].label)
+  for node in pattern.nodes:
+    if node.label not in visited:
+      raise ValueError('node %s of fusion pattern %s is not an input of the '
+                       'output node' % (node.label, pattern.name))
+
+  replacement = pattern.replacement
+  if op_def_registry.get(replacement.op) is None:
+    raise ValueError('replacement op %r of fusion pattern %s is not '
+                     'registered' % (replacement.op, pattern.name))
+  for label in replacement.inputs:
+    if label not in nodes or nodes[label].op != '*':
+      raise ValueError('replacement input %s of fusion pattern %s must be a '
+                       'node with op "*"' % (label, pattern.name))
+  for name, attr in replacement.attrs.items():
+    value = attr.WhichOneof('value')
+    if value is None:
+      raise ValueError('attribute %s of fusion pattern %s has no value' %
+                       (name, pattern.name))
+    if value == 'copy_from':
+      label, _, attr_name = attr.copy_from.partition(':')
+      if label not in nodes or not attr_name:
+        raise ValueError('attribute %s of fusion pattern %s copies from unknown '
+                         'node attribute %r' % (name, pattern.name,
+                                                attr.copy_from))
+    if value == 'type':
+      dtype = attr.type
+      if dtype.endswith('_ref'):
+        dtype = dtype[:-len('_ref')]
+      if dtype not in _FUSION_ATTR_TYPES:
+        raise ValueError('attribute %s of fusion pattern %s has unknown type '
+                         '%r' % (name, pattern.name, attr.type))
+
+def register_fusion_pattern(pattern):
+  """Register a fusion of a subgraph to a single op, applied by the remapper.
+
+  A user-defined fusion is tried before the built-in ones, and only affects
+  the graphs optimized after it's registered. The pattern replaces the one
+  registered with the same name. For example, to fuse `x * sigmoid(x)`:
+
+    itex.register_fusion_pattern({
+        "name": "sigmoid-with-mul",
+        "nodes": [
+            {"label": "mul", "op": "Mul", "inputs": ["sigmoid", "x"]},
+            {"label": "sigmoid", "op": "Sigmoid", "inputs": ["x"]},
+            {"label": "x", "op": "*"},
+        ],
+        "replacement": {
+            "op": "_ITEXSwish",
+            "inputs": ["x"],
+            "attrs": {"T": {"copy_from": "mul:T"}},
+        },
+    })
+
+  Args:
+    pattern: an `itex.FusionPattern`, or a dict or JSON string of it.
+
+  Raises:
+    ValueError: if the pattern is invalid.
+  """
+  if isinstance(pattern, str):
+    pattern = json.loads(pattern)
+  if isinstance(pattern, dict):
+    pattern = json_format.ParseDict(pattern, config_pb2.FusionPattern())
+  if not isinstance(pattern, config_pb2.FusionPattern):
+    raise TypeError('pattern must be a FusionPattern, dict or JSON string, '
+                    'but got %s' % type(pattern))
+  _check_fusion_pattern(pattern)
+
+  config = get_config()
+  patterns = config.graph_options.fusion_patterns
+  for i, registered in enumerate(patterns):
+    if registered.name == pattern.name:
+      patterns[i].CopyFrom(pattern)
+      break
+  else:
+    patterns.add().CopyFrom(pattern)
+  set_config(config)
+
+def unregister_fusion_pattern(name):
+  """Unregister the user-defined fusion `name`, if it's registered."""
+  config = get_config()
+  patterns = config.graph_options.fusion_patterns
+  for i, registered in enumerate(patterns):
+    if registered.name == name:
+      del patterns[i]
+      set_config(config)
+      return
+
+def get_fusion_patterns():
+  """Get the registered user-defined fusions as a list of dicts."""
+  return [json_format.MessageToDict(pattern, preserving_proto_field_name=True)
+          for pattern in get_config().graph_options.fusion_patterns]
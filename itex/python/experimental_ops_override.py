@@ -395,20 +395,18 @@ def experimental_ops_override():
     self._could_use_itex_kernel = (
         self.activation in (tf.keras.activations.tanh, tf.nn.tanh) and
         self.recurrent_activation in (tf.keras.activations.sigmoid, tf.nn.sigmoid) and
-        self.use_bias) and (config.list_logical_devices('XPU'))
-    # TODO: use ITEX get_backend to check GPU.
-    if config.list_logical_devices('XPU'):
-      # Only show the message when there is GPU available, itex LSTM only support GPU currently
-      if self._could_use_itex_kernel:
-        logging.debug('Layer %s will use ITEX kernels when running on GPU.' % self.name)
-      else:
-        logging.warning('Layer %s will not use ITEX kernels since it '
-                        'doesn\'t meet the criteria. It will '
-                        'use a generic GPU kernel as fallback when running '
-                        'on GPU.' % self.name)
+        self.use_bias) and (
+            bool(config.list_logical_devices('XPU')) or get_backend() == b"CPU")
+    # ItexRnn has CPU kernels only in the CPU build.
+    if self._could_use_itex_kernel:
+      logging.debug('Layer %s will use ITEX kernels.' % self.name)
+    else:
+      logging.warning('Layer %s will not use ITEX kernels since it '
+                      'doesn\'t meet the criteria. It will '
+                      'use a generic kernel as fallback.' % self.name)
 
   def itex_lstm_call(self, inputs, mask=None, training=None, initial_state=None):
-    # if is ragged tensor or on CPU, fall back
+    # if is ragged tensor, fall back
     if (not self._could_use_itex_kernel):
       return tf_lstm_call(self, inputs, mask, training, initial_state)
     if (isinstance(inputs, tf.RaggedTensor)):
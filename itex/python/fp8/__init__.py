@@ -15,4 +15,4 @@
 
 # pylint: disable=g-bad-import-order,unused-import,missing-module-docstring,unused-import,line-too-long
 from intel_extension_for_tensorflow.python.fp8.recipe import DelayedScaling, Format
-from intel_extension_for_tensorflow.python.fp8.autocast import fp8_autocast
+from intel_extension_for_tensorflow.python.fp8.autocast import fp8_autocast, amax_and_scale_update_all, get_fp8_out_scale_registry_size
@@ -1,24 +1,75 @@
+import weakref
 from contextlib import contextmanager
 from typing import Optional
 
 import tensorflow as tf
 from intel_extension_for_tensorflow.python.fp8 import DelayedScaling, Format
+from intel_extension_for_tensorflow.python.ops.load_ops_library import load_ops_library
 
 _FP8_ENABLED = False
 _FP8_RECIPE = None
-_global_fp8_outs_buffer = {}
+_FP8_BATCHED_UPDATE = False
+# Weak references to the modules with fp8 meta tensors, in creation order.
+_fp8_modules = []
 
-def record_fp8_out_in_global_buffer(fp8_tensor, fp8_meta_tensor):
+class _Fp8OutScaleRegistry:
+  """
+  Maps fp8 outs to their scale inv factors. Fp8 outs are weakly referenced,
+  so an entry is dropped as soon as its fp8 out is garbage collected.
+  """
+  def __init__(self):
+    self._entries = {}
+
+  def record(self, fp8_tensor, scale_inv):
+    key = id(fp8_tensor)
+    if self.lookup(fp8_tensor) is not None:
+      return
+    entries = self._entries
+
+    def remove(ref):
+      # The id may be reused by a new tensor after the old one is collected.
+      if key in entries and entries[key][0] is ref:
+        del entries[key]
+
+    entries[key] = (weakref.ref(fp8_tensor, remove), scale_inv)
+
+  def lookup(self, fp8_tensor):
+    entry = self._entries.get(id(fp8_tensor))
+    if entry is None or entry[0]() is not fp8_tensor:
+      return None
+    return entry[1]
+
+  def clear(self):
+    self._entries.clear()
+
+  def __len__(self):
+    return len(self._entries)
+
+# Fp8 outs recorded out of fp8_autocast, e.g. by backward.
+_default_fp8_out_scale_registry = _Fp8OutScaleRegistry()
+# One registry for each active fp8_autocast, cleared when it exits.
+_fp8_out_scale_registries = []
+
+def record_fp8_out_scale_inv(fp8_tensor, fp8_meta_tensor):
   """Map each fp8 out to its scale inv factor."""
-  tensor_key = fp8_tensor.ref()
-  if not tensor_key in _global_fp8_outs_buffer:
-    _global_fp8_outs_buffer[tensor_key] = fp8_meta_tensor
+  registry = (_fp8_out_scale_registries[-1] if _fp8_out_scale_registries
+              else _default_fp8_out_scale_registry)
+  registry.record(fp8_tensor, fp8_meta_tensor)
 
 def get_fp8_out_scale_inv(fp8_tensor):
   """Get fp8 scale inv factor."""
-  tensor_key = fp8_tensor.ref()
-  assert tensor_key in _global_fp8_outs_buffer
-  return _global_fp8_outs_buffer[tensor_key]
+  for registry in reversed(_fp8_out_scale_registries):
+    scale_inv = registry.lookup(fp8_tensor)
+    if scale_inv is not None:
+      return scale_inv
+  scale_inv = _default_fp8_out_scale_registry.lookup(fp8_tensor)
+  assert scale_inv is not None
+  return scale_inv
+
+def get_fp8_out_scale_registry_size():
+  """Number of fp8 outs whose scale inv factors are tracked."""
+  return len(_default_fp8_out_scale_registry) + sum(
+    len(registry) for registry in _fp8_out_scale_registries)
 
 def get_default_fp8_recipe():
   """
@@ -40,6 +91,17 @@ def get_fp8_recipe():
   """Return the fp8 recipe"""
   return _FP8_RECIPE
 
+def is_fp8_batched_update():
+  """Are fp8 meta tensors updated by amax_and_scale_update_all"""
+  return _FP8_BATCHED_UPDATE
+
+def register_fp8_module(module):
+  """Register a module whose fp8 meta tensors are updated in batch."""
+  for ref in _fp8_modules:
+    if ref() is module:
+      return
+  _fp8_modules.append(weakref.ref(module))
+
 # TODO(ITEX): Plan to decorate this func by tf.function(jit_compile=True).
 def _default_sf_compute(amax, scale, fp8_max, margin):
   """Default function to convert amax to scaling factor."""
@@ -50,80 +112,112 @@ def _default_sf_compute(amax, scale, fp8_max, margin):
   sf = tf.where(exp < float(0.0), float(1.0) / sf, sf)
   return sf
 
-def _roll_and_zero_out(amax_history):
-  """Update amax history and set next amax to zero."""
-  amax_history = tf.roll(amax_history, -1, 0)
-  zeros = tf.zeros(shape=amax_history[0].shape)
-  updated = tf.tensor_scatter_nd_update(amax_history, [[0]], [zeros])
-  return updated
-
-def _reduce_max_and_default_sf_compute(amax_history, scale, fp8_max, margin):
-  """Get amax using max algorithm and compute scaling factor."""
-  amax = tf.reduce_max(amax_history, axis=0)
-  sf = _default_sf_compute(amax, scale, fp8_max, margin)
-  updated = _roll_and_zero_out(amax_history)
-  return updated, sf
-
-def _most_recent_and_default_sf_compute(amax_history, scale, fp8_max, margin):
-  """Get amax using most-recent algorithm and compute scaling factor."""
-  amax = amax_history[0]
-  sf = _default_sf_compute(amax, scale, fp8_max, margin)
-  updated = _roll_and_zero_out(amax_history)
-  return updated, sf
-
-def fused_amax_and_scale_update(
-    amax_history,
-    scale,
-    fp8_max,
-    margin,
-    amax_compute_algo,
-):
-  """Amax to scale conversion."""
+def _compute_amax(amax_history, amax_compute_algo):
+  """Get amax using max or most-recent algorithm."""
   if amax_compute_algo == "max":
-    updated, sf = _reduce_max_and_default_sf_compute(
-      amax_history, scale, fp8_max, margin
-    )
-  else:
-    assert amax_compute_algo == "most_recent"
-    updated, sf = _most_recent_and_default_sf_compute(
-      amax_history, scale, fp8_max, margin
-    )
+    return tf.reduce_max(amax_history, axis=0)
+  assert amax_compute_algo == "most_recent"
+  return amax_history[0]
 
-  return updated, sf
-
-def amax_and_scale_update(fp8_meta_tensors, recipe, fp8_max):
-  """Updates fp8 amaxes/scales for fwd | bwd."""
-  amax_compute = recipe.amax_compute_algo
-  sf_compute = recipe.scaling_factor_compute_algo
-
-  if not callable(amax_compute) and sf_compute is None:
-    amax, scale = fused_amax_and_scale_update(
-      fp8_meta_tensors["amax_history"],
-      fp8_meta_tensors["scale"],
-      fp8_max,
-      recipe.margin,
-      recipe.amax_compute_algo,
-    )
-    fp8_meta_tensors["amax_history"] = (
-      fp8_meta_tensors["amax_history"].assign(amax)
-    )
-    fp8_meta_tensors["scale"] = (
-      fp8_meta_tensors["scale"].assign(scale)
-    )
-    fp8_meta_tensors["scale_inv"] = (
-      fp8_meta_tensors["scale_inv"].assign(1.0 / scale)
-    )
-  else:
+def _move_to_ring_buffer_and_zero_out(amax_history, amax_history_index):
+  """
+  Move the current amax (the first row) to the ring buffer of previous amaxes
+  (the other rows) and set next amax to zero. Only O(N) elements are written,
+  instead of rolling the whole history.
+  """
+  history_len = amax_history.shape[0]
+  current = amax_history[0]
+  if history_len > 1:
+    slot = amax_history_index % (history_len - 1)
+    amax_history[slot + 1].assign(current)
+    amax_history_index.assign((slot + 1) % (history_len - 1))
+  amax_history[0].assign(tf.zeros_like(current))
+
+def _check_fp8_recipe(recipe):
+  """Check the recipe is supported by the fused amax and scale update."""
+  if callable(recipe.amax_compute_algo) or \
+     recipe.scaling_factor_compute_algo is not None:
     raise ValueError(
       "We only support the fp8 recipe with 'max' or 'most_recent' "
       "amax_compute_algo and default scaling_factor_compute_algo at this "
       "moment."
     )
 
+def batched_amax_and_scale_update(fp8_meta_tensors_list, fp8_maxes, recipe):
+  """
+  Updates fp8 amaxes/scales of many fp8 meta tensors with one op.
+
+  The op updates the meta tensors in place, so the number of ops per step
+  doesn't grow with the number of fp8 tensors. `fp8_maxes` is the fp8 max of
+  each item in `fp8_meta_tensors_list`.
+  """
+  _check_fp8_recipe(recipe)
+  if not fp8_meta_tensors_list:
+    return
+
+  def handles(key):
+    return [m[key].handle for m in fp8_meta_tensors_list]
+
+  load_ops_library.fp8_amax_and_scale_update(
+    amax_history=handles("amax_history"),
+    amax_history_index=handles("amax_history_index"),
+    scale=handles("scale"),
+    scale_inv=handles("scale_inv"),
+    fp8_max=[float(m) for m in fp8_maxes],
+    margin=float(recipe.margin),
+    amax_compute_algo=recipe.amax_compute_algo)
+
+def amax_and_scale_update_all(fwd=True):
+  """
+  Updates fp8 amaxes/scales of all fp8 modules for fwd | bwd, with one op
+  for each recipe. It's used with `fp8_autocast(batched_update=True)`, which
+  stops the modules from updating their own fp8 meta tensors:
+
+  .. code-block:: python
+
+    with fp8_autocast(enabled=True, batched_update=True):
+      amax_and_scale_update_all(fwd=True)
+      out = model(inp)
+      amax_and_scale_update_all(fwd=False)
+    grads = tape.gradient(out, model.trainable_variables)
+  """
+  groups = {}
+  alive = []
+  for ref in _fp8_modules:
+    module = ref()
+    if module is None:
+      continue
+    alive.append(ref)
+    if not module.fp8:
+      continue
+    recipe = module.fp8_meta["recipe"]
+    fp8_meta_tensors_list, fp8_max = module.get_fp8_meta_tensors_to_update(fwd)
+    key = (recipe.amax_history_len, recipe.margin, recipe.amax_compute_algo)
+    group = groups.setdefault(key, (recipe, [], []))
+    group[1].extend(fp8_meta_tensors_list)
+    group[2].extend([fp8_max] * len(fp8_meta_tensors_list))
+  _fp8_modules[:] = alive
+
+  for recipe, fp8_meta_tensors_list, fp8_maxes in groups.values():
+    batched_amax_and_scale_update(fp8_meta_tensors_list, fp8_maxes, recipe)
+
+def amax_and_scale_update(fp8_meta_tensors, recipe, fp8_max):
+  """Updates fp8 amaxes/scales for fwd | bwd."""
+  _check_fp8_recipe(recipe)
+  amax = _compute_amax(
+    fp8_meta_tensors["amax_history"], recipe.amax_compute_algo)
+  scale = _default_sf_compute(
+    amax, fp8_meta_tensors["scale"], fp8_max, recipe.margin)
+  _move_to_ring_buffer_and_zero_out(
+    fp8_meta_tensors["amax_history"], fp8_meta_tensors["amax_history_index"])
+  fp8_meta_tensors["scale"].assign(scale)
+  fp8_meta_tensors["scale_inv"].assign(1.0 / scale)
+
 @contextmanager
 def fp8_autocast(
   enabled: bool = False,
-  fp8_recipe: Optional[DelayedScaling] = None
+  fp8_recipe: Optional[DelayedScaling] = None,
+  batched_update: bool = False,
 ):
   """
   Context manager for FP8 usage.
@@ -139,12 +233,21 @@ def fp8_autocast(
            whether or not to enable fp8
   fp8_recipe: recipe.DelayedScaling, default = `None`
               recipe used for FP8 training.
+  batched_update: bool, default = `False`
+                  whether fp8 meta tensors of all modules are updated
+                  together by `amax_and_scale_update_all` instead of by
+                  each module.
   """
-  global _FP8_ENABLED, _FP8_RECIPE
-  fp8_state = (_FP8_ENABLED, _FP8_RECIPE)
+  global _FP8_ENABLED, _FP8_RECIPE, _FP8_BATCHED_UPDATE
+  fp8_state = (_FP8_ENABLED, _FP8_RECIPE, _FP8_BATCHED_UPDATE)
+  registry = _Fp8OutScaleRegistry()
+  _fp8_out_scale_registries.append(registry)
   try:
     _FP8_ENABLED = enabled
     _FP8_RECIPE = get_default_fp8_recipe() if fp8_recipe is None else fp8_recipe
+    _FP8_BATCHED_UPDATE = batched_update
     yield
   finally:
-    _FP8_ENABLED, _FP8_RECIPE = fp8_state
+    _FP8_ENABLED, _FP8_RECIPE, _FP8_BATCHED_UPDATE = fp8_state
+    _fp8_out_scale_registries.remove(registry)
+    registry.clear()
@@ -18,6 +18,9 @@ limitations under the License.
 #include "Python.h"
 #include "itex/core/devices/device_backend_util.h"
 #include "itex/core/graph/config_util.h"
+#include "itex/core/kernels/common.h"
+#include "itex/core/utils/onednn/onednn_primitive_cache.h"
+#include "itex/core/utils/thread_pool_backend.h"
 #include "pybind11/pybind11.h"
 
 namespace py = pybind11;
@@ -53,6 +56,38 @@ static py::bytes ITEX_HasXMX() {
   return py::bytes(config_str);
 }
 
+static py::dict ITEX_GetPrimitiveCacheStats() {
+  PrimitiveCacheStats stats = GetPrimitiveCacheStats();
+  py::dict result;
+  result["hits"] = stats.hits;
+  result["misses"] = stats.misses;
+  result["evictions"] = stats.evictions;
+  result["capacity"] = GetPrimitiveCacheCapacity();
+  return result;
+}
+
+static py::bytes ITEX_GetRegisteredOpList() {
+  size_t length;
+  const char* data = GetRegisteredOpList(&length);
+  return py::bytes(data, length);
+}
+
+static py::dict ITEX_GetParallelRegionStats() {
+  py::dict result;
+  for (const auto& entry : GetParallelRegionStats()) {
+    result[py::str(entry.first)] = entry.second;
+  }
+  return result;
+}
+
+static py::dict ITEX_GetHybridThreadPoolStats() {
+  py::dict result;
+  for (const auto& entry : GetHybridThreadPoolStats()) {
+    result[py::str(entry.first)] = entry.second;
+  }
+  return result;
+}
+
 PYBIND11_MODULE(_pywrap_itex, m) {
   m.doc() = "pybind11 front-end api for Intel ® Extension for TensorFlow*";
   m.def("ITEX_GetBackend", &itex::ITEX_GetBackend);
@@ -70,6 +105,13 @@ PYBIND11_MODULE(_pywrap_itex, m) {
   m.def("ITEX_GetConfig", &itex::ITEX_GetConfig);
   m.def("ITEX_IsXeHPC", &itex::ITEX_IsXeHPC);
   m.def("ITEX_HasXMX", &itex::ITEX_HasXMX);
+  m.def("ITEX_GetPrimitiveCacheStats", &itex::ITEX_GetPrimitiveCacheStats);
+  m.def("ITEX_ResetPrimitiveCacheStats", &itex::ResetPrimitiveCacheStats);
+  m.def("ITEX_GetParallelRegionStats", &itex::ITEX_GetParallelRegionStats);
+  m.def("ITEX_ResetParallelRegionStats", &itex::ResetParallelRegionStats);
+  m.def("ITEX_GetHybridThreadPoolStats",
+        &itex::ITEX_GetHybridThreadPoolStats);
+  m.def("ITEX_GetRegisteredOpList", &itex::ITEX_GetRegisteredOpList);
 }
 
 }  // namespace itex
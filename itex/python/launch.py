@@ -15,14 +15,20 @@
 # ============================================================================
 
 from __future__ import absolute_import, division, print_function, unicode_literals
+import copy
+import json
 import math
 import sys
 import platform
+import shutil
+import signal
 import subprocess
 import os
+import time
 from os.path import expanduser
 import re
 import glob
+import tempfile
 from argparse import ArgumentParser, REMAINDER
 from argparse import RawTextHelpFormatter
 import logging
@@ -34,56 +40,137 @@ logging.basicConfig(level=logging.INFO, format=format_str)
 logger = logging.getLogger(__name__)
 
 
-class CPUinfo():
+_SYSFS_CPU_PATH = "/sys/devices/system/cpu"
+_SYSFS_NODE_PATH = "/sys/devices/system/node"
+
+
+def parse_cpu_list(cpu_list):
   '''
-  Get CPU inforamation, such as cores list and NUMA information.
+  Parse a Linux cpu list string such as "0-3,8,10-11" into a list of ints.
   '''
-
-  def __init__(self):
-
-    self.cpuinfo = []
-    if platform.system() == "Linux":
-      args = ["lscpu", "--parse=CPU,Core,Socket,Node"]
-      lscpu_info = subprocess.check_output(
-          args, universal_newlines=True).split("\n")
-
-      # Get information about  cpu, core, socket and node
-      for line in lscpu_info:
-        pattern = r"^([\d]+,[\d]+,[\d]+,[\d]?)"
-        regex_out = re.search(pattern, line)
-        if regex_out:
-          self.cpuinfo.append(regex_out.group(1).strip().split(","))
-      assert len(self.cpuinfo) > 0, "cpuinfo is empty"
-      self.get_socket_info()
+  cpus = []
+  for item in cpu_list.strip().split(","):
+    if not item:
+      continue
+    if "-" in item:
+      start, end = item.split("-")
+      cpus.extend(range(int(start), int(end) + 1))
     else:
+      cpus.append(int(item))
+  return cpus
+
+
+def _read_sysfs(path):
+  with open(path) as f:
+    return f.read().strip()
+
+
+def _read_sysfs_topology():
+  '''
+  Read [cpu, core, socket, node] of all online CPUs from sysfs, in the same
+  format as `lscpu --parse=CPU,Core,Socket,Node`. Like lscpu, cores are
+  numbered by the order they are first seen.
+  '''
+  online = parse_cpu_list(
+      _read_sysfs(os.path.join(_SYSFS_CPU_PATH, "online")))
+  cpu_node_map = {}
+  for node_path in glob.glob(os.path.join(_SYSFS_NODE_PATH, "node[0-9]*")):
+    node_id = int(os.path.basename(node_path)[len("node"):])
+    for cpu in parse_cpu_list(
+        _read_sysfs(os.path.join(node_path, "cpulist"))):
+      cpu_node_map[cpu] = node_id
+
+  core_index = {}
+  cpuinfo = []
+  for cpu in sorted(online):
+    topology_path = os.path.join(
+        _SYSFS_CPU_PATH, "cpu{}".format(cpu), "topology")
+    socket = int(_read_sysfs(
+        os.path.join(topology_path, "physical_package_id")))
+    core_id = int(_read_sysfs(os.path.join(topology_path, "core_id")))
+    core = core_index.setdefault((socket, core_id), len(core_index))
+    node = str(cpu_node_map[cpu]) if cpu in cpu_node_map else ''
+    cpuinfo.append([str(cpu), str(core), str(socket), node])
+  return cpuinfo
+
+
+def _read_lscpu_topology():
+  '''
+  Read [cpu, core, socket, node] of all online CPUs with lscpu.
+  '''
+  cpuinfo = []
+  args = ["lscpu", "--parse=CPU,Core,Socket,Node"]
+  lscpu_info = subprocess.check_output(
+      args, universal_newlines=True).split("\n")
+
+  # Get information about  cpu, core, socket and node
+  for line in lscpu_info:
+    pattern = r"^([\d]+,[\d]+,[\d]+,[\d]?)"
+    regex_out = re.search(pattern, line)
+    if regex_out:
+      cpuinfo.append(regex_out.group(1).strip().split(","))
+  return cpuinfo
+
+
+_cpu_topology = None
+
+
+def get_cpu_topology():
+  '''
+  Get [cpu, core, socket, node] of all online CPUs. The topology is parsed
+  once from sysfs, with lscpu as fallback, and cached for the process.
+  '''
+  global _cpu_topology
+  if _cpu_topology is None:
+    if platform.system() != "Linux":
       raise RuntimeError(
           "{} platform is not supported!!!".format(platform.system()))
+    try:
+      cpuinfo = _read_sysfs_topology()
+    except (OSError, ValueError) as e:
+      logger.debug("Failed to read CPU topology from sysfs: %s, "
+                    "fall back to lscpu", e)
+      cpuinfo = []
+    if not cpuinfo:
+      cpuinfo = _read_lscpu_topology()
+    assert len(cpuinfo) > 0, "cpuinfo is empty"
+    _cpu_topology = cpuinfo
+  return [list(line) for line in _cpu_topology]
+
+
+class CPUinfo():
+  '''
+  Get CPU inforamation, such as cores list and NUMA information.
+  `cpuinfo` is a list of [cpu, core, socket, node], by default it's the
+  topology of current machine.
+  '''
+
+  def __init__(self, cpuinfo=None):
+    self.cpuinfo = get_cpu_topology() if cpuinfo is None else cpuinfo
+    assert len(self.cpuinfo) > 0, "cpuinfo is empty"
+    self.get_socket_info()
 
   def get_socket_info(self):
     """A dummy docstring"""
     idx_active = 3
     if self.cpuinfo[0][idx_active] == '':
       idx_active = 2
-    self.nodes = int(max([line[idx_active] for line in self.cpuinfo])) + 1
-    self.node_physical_cores = []  # node_id is index
-    self.node_logical_cores = []   # node_id is index
+    self.nodes = int(max([int(line[idx_active] or 0)
+                          for line in self.cpuinfo])) + 1
+    self.node_physical_cores = [[] for _ in range(self.nodes)]  # node_id is index
+    self.node_logical_cores = [[] for _ in range(self.nodes)]   # node_id is index
     self.physical_core_node_map = {}  # phyical core to numa node id
     self.logical_core_node_map = {}   # logical core to numa node id
 
-    for node_id in range(self.nodes):
-      cur_node_physical_core = []
-      cur_node_logical_core = []
-      for line in self.cpuinfo:
-        nid = line[idx_active] if line[idx_active] != '' else '0'
-        if node_id == int(nid):
-          if int(line[1]) not in cur_node_physical_core:
-            cur_node_physical_core.append(int(line[1]))
-            self.physical_core_node_map[int(
-                line[1])] = int(node_id)
-          cur_node_logical_core.append(int(line[0]))
-          self.logical_core_node_map[int(line[0])] = int(node_id)
-      self.node_physical_cores.append(cur_node_physical_core)
-      self.node_logical_cores.append(cur_node_logical_core)
+    for line in self.cpuinfo:
+      node_id = int(line[idx_active]) if line[idx_active] != '' else 0
+      physical_core = int(line[1])
+      logical_core = int(line[0])
+      if physical_core not in self.physical_core_node_map:
+        self.node_physical_cores[node_id].append(physical_core)
+        self.physical_core_node_map[physical_core] = node_id
+      self.node_logical_cores[node_id].append(logical_core)
+      self.logical_core_node_map[logical_core] = node_id
 
   def node_nums(self):
     return self.nodes
@@ -132,13 +219,38 @@ class CPUinfo():
     return numa_ids
 
 
+def find_library(lib_type):
+  '''
+  Find lib<lib_type>.so in the conda/virtualenv and system library paths.
+  Returns the path of the library, or None if it's not found.
+  '''
+  library_paths = []
+  if "CONDA_PREFIX" in os.environ:
+    library_paths.append(os.environ["CONDA_PREFIX"] + "/lib/")
+  if "VIRTUAL_ENV" in os.environ:
+    library_paths.append(os.environ["VIRTUAL_ENV"] + "/lib/")
+
+  library_paths += ["{}/.local/lib/".format(expanduser("~")),
+                    "/usr/local/lib/", "/usr/local/lib64/",
+                    "/usr/lib/", "/usr/lib64/"]
+
+  for lib_path in library_paths:
+    matches = glob.glob(lib_path + "lib" + lib_type + ".so")
+    if len(matches) > 0:
+      return matches[0]
+  return None
+
+
+_numactl_available = None
+
+
 class Launcher():
   r"""
    Base class for launcher
   """
 
-  def __init__(self):
-    self.cpuinfo = CPUinfo()
+  def __init__(self, cpuinfo=None):
+    self.cpuinfo = CPUinfo() if cpuinfo is None else cpuinfo
 
   def launch(self, args):
     pass
@@ -147,44 +259,29 @@ class Launcher():
     '''
     Enale TCMalloc/JeMalloc/intel OpenMP
     '''
-    library_paths = []
-    if "CONDA_PREFIX" in os.environ:
-      library_paths.append(os.environ["CONDA_PREFIX"] + "/lib/")
-    if "VIRTUAL_ENV" in os.environ:
-      library_paths.append(os.environ["VIRTUAL_ENV"] + "/lib/")
-
-    library_paths += ["{}/.local/lib/".format(expanduser("~")),
-                      "/usr/local/lib/", "/usr/local/lib64/",
-                      "/usr/lib/", "/usr/lib64/"]
-
-    lib_find = False
-    lib_set = False
     for item in os.getenv("LD_PRELOAD", "").split(":"):
       if item.endswith('lib{}.so'.format(lib_type)):
-        lib_set = True
-        break
-    if not lib_set:
-      for lib_path in library_paths:
-        library_file = lib_path + "lib" + lib_type + ".so"
-        matches = glob.glob(library_file)
-        if len(matches) > 0:
-          if "LD_PRELOAD" in os.environ:
-            os.environ["LD_PRELOAD"] = matches[0] + \
-                ":" + os.environ["LD_PRELOAD"]
-          else:
-            os.environ["LD_PRELOAD"] = matches[0]
-          lib_find = True
-          break
-    return lib_set or lib_find
+        return True
+    library_file = find_library(lib_type)
+    if library_file is None:
+      return False
+    if "LD_PRELOAD" in os.environ:
+      os.environ["LD_PRELOAD"] = library_file + \
+          ":" + os.environ["LD_PRELOAD"]
+    else:
+      os.environ["LD_PRELOAD"] = library_file
+    return True
 
   def is_numactl_available(self):
-    numactl_available = False
-    cmd = ["numactl", "-C", "0", "-m", "0", "ls"]
-    r = subprocess.run(cmd, env=os.environ, stdout=subprocess.DEVNULL, \
-                       check=True)
-    if r.returncode == 0:
-      numactl_available = True
-    return numactl_available
+    global _numactl_available
+    if _numactl_available is None:
+      _numactl_available = False
+      if shutil.which("numactl"):
+        cmd = ["numactl", "-C", "0", "-m", "0", "true"]
+        r = subprocess.run(cmd, env=os.environ, stdout=subprocess.DEVNULL, \
+                           stderr=subprocess.DEVNULL, check=False)
+        _numactl_available = r.returncode == 0
+    return _numactl_available
 
   def set_memory_allocator(self, enable_tcmalloc=True,
                            enable_jemalloc=False, use_default_allocator=False):
@@ -332,14 +429,12 @@ class MultiInstanceLauncher(Launcher):
    Launcher for single instance and multi-instance
    """
 
-  def launch(self, args):
-    processes = []
-    processes_tune = []
+  def resolve_cores(self, args):
+    '''
+    Get the sorted cores to use, and resolve `args.ninstances` and
+    `args.ncore_per_instance` if they are not given.
+    '''
     cores = []
-    set_kmp_affinity = True
-    enable_taskset = False
-    if args.enable_op_parallelism:
-      self.set_env("ITEX_OMP_THREADPOOL","0")
     if args.core_list:  # user specify what cores will be used by params
       cores = [int(x) for x in args.core_list.split(",")]
       if args.ncore_per_instance == -1:
@@ -457,6 +552,46 @@ class MultiInstanceLauncher(Launcher):
         cores = self.cpuinfo.get_all_physical_cores()
         args.ncore_per_instance = len(cores) // args.ninstances
 
+    return sorted(cores)
+
+  def plan(self, args):
+    '''
+    Assign cores to each instance without launching anything. Returns a list
+    of dict with `instance_idx`, `cores` and `numa_nodes` of each instance.
+    Only the instance `args.instance_idx` is planned if it's set.
+    '''
+    cores = self.resolve_cores(args)
+    if args.instance_idx == -1:
+      instance_ids = range(args.ninstances)
+    else:
+      instance_ids = [args.instance_idx]
+
+    instances = []
+    node_map = self.cpuinfo.logical_core_node_map
+    for idx in instance_ids:
+      core_list = cores[idx * args.ncore_per_instance:
+                        (idx + 1) * args.ncore_per_instance]
+      numa_nodes = sorted({node_map[core] for core in core_list
+                           if core in node_map})
+      instances.append({"instance_idx": idx, "cores": core_list,
+                        "numa_nodes": numa_nodes})
+    return instances
+
+  def launch(self, args, timeout=None):
+    '''
+    Launch all instances and wait for them. Returns the instances planned by
+    `plan` with the `command` of each instance. If the instances don't finish
+    in `timeout` seconds, they are killed and `subprocess.TimeoutExpired` is
+    raised.
+    '''
+    processes = []
+    processes_tune = []
+    set_kmp_affinity = True
+    enable_taskset = False
+    if args.enable_op_parallelism:
+      self.set_env("ITEX_OMP_THREADPOOL","0")
+    instances = self.plan(args)
+
     if args.ninstances > 1 and args.instance_idx != -1:
       logger.info("assigning %s cores for instance %s", args.ncore_per_instance,
       args.instance_idx)
@@ -494,7 +629,8 @@ class MultiInstanceLauncher(Launcher):
     # os.environ["LAUNCH_CMD"] = "#"
     cmd_run = []
     cmd_tune = []
-    for i in range(args.ninstances):
+    log_names = []
+    for i, instance in enumerate(instances):
       cmd = []
       cur_process_cores = ""
       if not args.disable_numactl or enable_taskset:
@@ -503,16 +639,8 @@ class MultiInstanceLauncher(Launcher):
         elif enable_taskset:
           cmd = ["taskset"]
 
-        cores = sorted(cores)
-        if args.instance_idx == -1:  # sequentially assign ncores_per_instance to ninstances
-          core_list = cores[i * args.ncore_per_instance: (
-              i + 1) * args.ncore_per_instance]
-        else:  # assign ncores_per_instance from instance_idx
-          core_list = cores[args.instance_idx * args.ncore_per_instance: (
-              args.instance_idx + 1) * args.ncore_per_instance]
-
         core_ranges = []
-        for core in core_list:
+        for core in instance["cores"]:
           if len(core_ranges) == 0:
             range_elem = {'start': core, 'end': core}
             core_ranges.append(range_elem)
@@ -545,6 +673,7 @@ class MultiInstanceLauncher(Launcher):
           "_instance_{}_cores_".format(
               i) + cur_process_cores.replace(',', '_') + ".log"
       log_name = os.path.join(args.log_path, log_name)
+      log_names.append(log_name)
       cmd.extend(args.program_args)
       # os.environ["LAUNCH_CMD"] += " ".join(cmd) + ",#"
       cmd_s = " ".join(cmd)
@@ -558,6 +687,7 @@ class MultiInstanceLauncher(Launcher):
         cmd_run.append(cmd_s)
       elif enable_taskset:
         cmd_run.append(cmd)
+      instance["command"] = cmd_s
 
     if args.tune:
       candidates = [1]
@@ -570,12 +700,13 @@ class MultiInstanceLauncher(Launcher):
         candidates.append(args.ncore_per_instance)
       tune_time = [-1 for i in range(len(candidates))]
       logger.info("Start to tune TF_NUM_INTEROP_THREADS, candidates are {}".format(candidates))
-      loop = len(candidates) // args.ninstances + (1 if len(candidates) % args.ninstances > 0 else 0)
+      ntune = len(cmd_tune)
+      loop = len(candidates) // ntune + (1 if len(candidates) % ntune > 0 else 0)
       for l in range(loop):
-        for i in range(args.ninstances):
-          if l * args.ninstances + i >= len(candidates):
+        for i in range(ntune):
+          if l * ntune + i >= len(candidates):
             break
-          candidate = candidates[l * args.ninstances + i]
+          candidate = candidates[l * ntune + i]
           logger.info(candidate)
           timer = "/usr/bin/time -o tmp_itex_launcher_tune_inter_op_{}_time.log -f \"%e\" ".format(candidate)
           os.environ["TF_NUM_INTEROP_THREADS"] = str(candidate)
@@ -594,7 +725,7 @@ class MultiInstanceLauncher(Launcher):
           content = file.readline()
           tune_time[i] = float(content)
         os.remove("tmp_itex_launcher_tune_inter_op_{}_time.log".format(candidates[i]))
-      for i in range(min(len(candidates),args.ninstances)):
+      for i in range(min(len(candidates), ntune)):
         os.remove("tmp_itex_launcher_tune_result_{}.log".format(i))
       if -1 in tune_time:
         logger.error("--tune failed")
@@ -604,22 +735,257 @@ class MultiInstanceLauncher(Launcher):
       os.environ["OMP_NUM_THREADS"] = str(args.ncore_per_instance // best_config)
       logger.info("launcher tune result: TF_NUM_INTEROP_THREADS={}".format(best_config))
 
-    for i in range(args.ninstances):
+    log_files = []
+    for i in range(len(cmd_run)):
       logger.info(cmd_run[i])
+      # Each instance runs in its own session, so that a timed out instance
+      # can be killed together with its children.
       if not args.disable_numactl:
-        process = subprocess.Popen(cmd_run[i], env=os.environ, shell=True)
+        process = subprocess.Popen(cmd_run[i], env=os.environ, shell=True,
+                                   start_new_session=True)
       elif enable_taskset:
-        process = subprocess.Popen(cmd_run[i], env=os.environ)
+        stdout = None
+        if args.log_path:
+          stdout = open(log_names[i], "w")
+          log_files.append(stdout)
+        process = subprocess.Popen(cmd_run[i], env=os.environ, stdout=stdout,
+                                   stderr=subprocess.STDOUT if stdout else None,
+                                   start_new_session=True)
       processes.append(process)
-
-      if args.instance_idx != -1:  # launches single instance, instance_idx, only
-        break
     # os.environ["LAUNCH_CMD"] = os.environ["LAUNCH_CMD"][:-2]
-    for process in processes:
-      process.wait()
-      if process.returncode != 0:
-        raise subprocess.CalledProcessError(
-            returncode=process.returncode, cmd=cmd_s)
+    deadline = None if timeout is None else time.time() + timeout
+    try:
+      for process in processes:
+        process.wait(None if deadline is None else
+                     max(deadline - time.time(), 0))
+        if process.returncode != 0:
+          raise subprocess.CalledProcessError(
+              returncode=process.returncode, cmd=cmd_s)
+    finally:
+      for process in processes:
+        if process.poll() is None:
+          os.killpg(process.pid, signal.SIGKILL)
+          process.wait()
+      for log_file in log_files:
+        log_file.close()
+    return instances
+
+
+class AutoTuner():
+  r"""
+   Sweep the number of instances, threads and memory allocator to find the
+   launch configuration with the best metric reported by the program.
+
+   The sweep is staged to prune dominated configurations early: first the
+   cores per instance (and so the number of instances) with the default
+   threads and allocator, then the inter-op threads of the `--autotune_topk`
+   best core counts, and last the allocator of the best configuration.
+   A configuration is killed once it runs `--autotune_prune_ratio` times
+   longer than the best one so far, since it can't win on a fixed workload.
+   """
+
+  def __init__(self, args, cpuinfo=None):
+    self.args = args
+    self.cpuinfo = CPUinfo() if cpuinfo is None else cpuinfo
+    self.metric_pattern = re.compile(args.autotune_metric_regex)
+    self.higher_is_better = args.autotune_metric_mode == "throughput"
+    self.results = []
+
+  def ncore_candidates(self):
+    '''
+    Cores per instance to try: powers of 2 from 4 (or less on small nodes)
+    up to the cores of a NUMA node, plus the node and the whole machine.
+    '''
+    if self.args.ncore_per_instance != -1:
+      return [self.args.ncore_per_instance]
+    node_id = max(self.args.node_id, 0)
+    if self.args.use_logical_core:
+      ncore_per_node = len(self.cpuinfo.get_node_logical_cores(node_id))
+      ncore_total = len(self.cpuinfo.get_all_logical_cores())
+    else:
+      ncore_per_node = len(self.cpuinfo.get_node_physical_cores(node_id))
+      ncore_total = len(self.cpuinfo.get_all_physical_cores())
+    if self.args.node_id != -1:
+      ncore_total = ncore_per_node
+    candidates = set()
+    ncore = min(4, ncore_per_node)
+    while ncore < ncore_per_node:
+      candidates.add(ncore)
+      ncore *= 2
+    candidates.update([ncore_per_node, ncore_total])
+    return sorted(candidates)
+
+  def interop_candidates(self, ncore):
+    if self.args.tf_num_interop_threads is not None:
+      return [self.args.tf_num_interop_threads]
+    return [str(n) for n in (1, 2, 4) if n <= ncore and ncore % n == 0]
+
+  def allocator_candidates(self):
+    if self.args.enable_tcmalloc:
+      return ["tcmalloc"]
+    if self.args.enable_jemalloc:
+      return ["jemalloc"]
+    if self.args.use_default_allocator:
+      return ["default"]
+    return [lib for lib in ("tcmalloc", "jemalloc")
+            if find_library(lib) is not None] + ["default"]
+
+  def parse_metric(self, log_names):
+    '''
+    Parse the last metric printed by each instance. Throughput is summed over
+    instances and latency is averaged. Returns None if any instance doesn't
+    print the metric.
+    '''
+    metrics = []
+    for log_name in log_names:
+      with open(log_name, errors="replace") as f:
+        matches = self.metric_pattern.findall(f.read())
+      if not matches:
+        return None
+      match = matches[-1]
+      metrics.append(float(match[0] if isinstance(match, tuple) else match))
+    if not metrics:
+      return None
+    if self.higher_is_better:
+      return sum(metrics)
+    return sum(metrics) / len(metrics)
+
+  def is_better(self, result, best):
+    if best is None:
+      return True
+    if self.higher_is_better:
+      return result["metric"] > best["metric"]
+    return result["metric"] < best["metric"]
+
+  def best(self, results=None):
+    best = None
+    for result in self.results if results is None else results:
+      if result["status"] == "ok" and self.is_better(result, best):
+        best = result
+    return best
+
+  def run(self, knobs):
+    '''
+    Launch the program with `knobs` applied and record the result.
+    '''
+    for result in self.results:
+      if all(result["knobs"][key] == value for key, value in knobs.items()):
+        return result
+    best = self.best()
+    timeout = None
+    if best is not None and self.args.autotune_prune_ratio > 0:
+      timeout = best["elapsed"] * self.args.autotune_prune_ratio
+
+    args = copy.copy(self.args)
+    for key, value in knobs.items():
+      setattr(args, key, value)
+    args.ninstances = -1
+    args.program_args = list(self.args.program_args)
+    args.log_path = tempfile.mkdtemp(prefix="itex_launcher_autotune_")
+    args.log_file_prefix = "autotune"
+    logger.info("autotune: running %s", knobs)
+
+    env_before = dict(os.environ)
+    start = time.time()
+    try:
+      instances = MultiInstanceLauncher(self.cpuinfo).launch(args, timeout)
+      log_names = glob.glob(os.path.join(args.log_path, "autotune_instance_*"))
+      metric = self.parse_metric(log_names)
+      status = "ok" if metric is not None else "no_metric"
+    except subprocess.TimeoutExpired:
+      instances, metric, status = [], None, "pruned"
+    except subprocess.CalledProcessError:
+      instances, metric, status = [], None, "failed"
+    finally:
+      os.environ.clear()
+      os.environ.update(env_before)
+      shutil.rmtree(args.log_path, ignore_errors=True)
+
+    result = {"knobs": dict(knobs, ninstances=len(instances) or -1),
+              "metric": metric, "elapsed": time.time() - start,
+              "status": status}
+    logger.info("autotune: %s metric=%s elapsed=%.2fs", status, metric,
+                result["elapsed"])
+    self.results.append(result)
+    return result
+
+  def tune(self):
+    '''
+    Run the sweep, write the best configuration to `--autotune_output` and
+    return it. Returns None if no configuration reports the metric.
+    '''
+    allocators = self.allocator_candidates()
+
+    def make_knobs(ncore, interop, allocator):
+      return {"ncore_per_instance": ncore,
+              "tf_num_interop_threads": interop,
+              "enable_tcmalloc": allocator == "tcmalloc",
+              "enable_jemalloc": allocator == "jemalloc",
+              "use_default_allocator": allocator == "default"}
+
+    def allocator_of(knobs):
+      if knobs["enable_tcmalloc"]:
+        return "tcmalloc"
+      if knobs["enable_jemalloc"]:
+        return "jemalloc"
+      return "default"
+
+    # Stage 1: cores per instance.
+    stage = [self.run(make_knobs(ncore, self.interop_candidates(ncore)[0],
+                                 allocators[0]))
+             for ncore in self.ncore_candidates()]
+    survivors = sorted((r for r in stage if r["status"] == "ok"),
+                       key=lambda r: r["metric"],
+                       reverse=self.higher_is_better)
+    survivors = survivors[:self.args.autotune_topk]
+
+    # Stage 2: inter-op threads of the surviving core counts.
+    for result in survivors:
+      ncore = result["knobs"]["ncore_per_instance"]
+      for interop in self.interop_candidates(ncore):
+        self.run(make_knobs(ncore, interop, allocators[0]))
+
+    # Stage 3: allocator of the best configuration.
+    best = self.best()
+    if best is not None:
+      for allocator in allocators:
+        self.run(make_knobs(best["knobs"]["ncore_per_instance"],
+                            best["knobs"]["tf_num_interop_threads"],
+                            allocator))
+
+    best = self.best()
+    if best is None:
+      logger.error("autotune: no configuration reports the metric matching "
+                   "'%s'", self.args.autotune_metric_regex)
+      return None
+
+    config = {"knobs": best["knobs"],
+              "metric": best["metric"],
+              "metric_mode": self.args.autotune_metric_mode,
+              "allocator": allocator_of(best["knobs"]),
+              "results": self.results}
+    with open(self.args.autotune_output, "w") as f:
+      json.dump(config, f, indent=2)
+    logger.info("autotune: best configuration %s with metric %s is saved to "
+                "%s, replay it with --launch_config %s", best["knobs"],
+                best["metric"], self.args.autotune_output,
+                self.args.autotune_output)
+    return config
+
+
+def load_launch_config(args):
+  '''
+  Apply the knobs of the launch configuration saved by autotune to `args`.
+  '''
+  with open(args.launch_config) as f:
+    config = json.load(f)
+  for key, value in config["knobs"].items():
+    if not hasattr(args, key) or key in ("program", "program_args"):
+      raise ValueError("Unknown launcher knob in {}: {}".format(
+          args.launch_config, key))
+    setattr(args, key, value)
+  logger.info("Replay launch configuration %s: %s", args.launch_config,
+              config["knobs"])
 
 
 def add_itex_params(parser):
@@ -697,9 +1063,40 @@ def add_multi_instance_params(parser):
                      help="log file prefix")
 
 
-def parse_args():
+def add_autotune_params(parser):
+
+  group = parser.add_argument_group("Autotune Parameters")
+  group.add_argument("--autotune", action='store_true', default=False,
+                     help="Sweep the cores per instance, inter-op threads \
+                           and memory allocator, and save the best \
+                           configuration to --autotune_output.")
+  group.add_argument("--autotune_metric_regex", metavar='\b',
+                     default=r"[Tt]hroughput[^0-9]*([0-9]+(?:\.[0-9]+)?)",
+                     type=str,
+                     help="Regex to parse the metric from the log of each \
+                           instance, the first group is the metric value.")
+  group.add_argument("--autotune_metric_mode", default="throughput",
+                     choices=["throughput", "latency"],
+                     help="throughput: higher metric is better, summed \
+                           over instances. latency: lower metric is \
+                           better, averaged over instances.")
+  group.add_argument("--autotune_topk", metavar='\b', default=2, type=int,
+                     help="Number of best cores per instance whose \
+                           inter-op threads are tuned.")
+  group.add_argument("--autotune_prune_ratio", metavar='\b', default=2.0,
+                     type=float,
+                     help="Kill a configuration once it runs this times \
+                           longer than the best one, 0 to disable.")
+  group.add_argument("--autotune_output", metavar='\b',
+                     default="itex_launch_config.json", type=str,
+                     help="The JSON file to save the best configuration.")
+  group.add_argument("--launch_config", metavar='\b', default="", type=str,
+                     help="Replay the configuration saved by --autotune.")
+
+
+def build_parser():
   """
-  Helper function parsing the command line options
+  Helper function building the command line options
   @retval ArgumentParser
   """
   parser = ArgumentParser(description="This is a script for launching \
@@ -751,6 +1148,7 @@ def parse_args():
   add_memory_allocator_params(parser)
   add_itex_params(parser)
   add_multi_instance_params(parser)
+  add_autotune_params(parser)
   # positional
   parser.add_argument("program", type=str,
                       help="The full path to the proram/script to be launched. "
@@ -758,15 +1156,27 @@ def parse_args():
 
   # rest from the training program
   parser.add_argument('program_args', nargs=REMAINDER)
-  return parser.parse_args()
+  return parser
 
 
-def main():
-  env_before = set(os.environ.keys())
+def parse_args():
+  """
+  Helper function parsing the command line options
+  @retval Namespace
+  """
+  return build_parser().parse_args()
+
+
+def prepare_args(args):
+  """
+  Check the arguments and prepare log path and LD_PRELOAD.
+  """
   if platform.system() == "Windows":
     raise RuntimeError("Windows platform is not supported!!!")
 
-  args = parse_args()
+  if args.launch_config:
+    load_launch_config(args)
+
   if args.log_path:
     path = os.path.dirname(args.log_path if args.log_path.endswith(
         '/') else args.log_path + '/')
@@ -776,11 +1186,6 @@ def main():
 
     args.log_file_prefix = '{}_{}'.format(
         args.log_file_prefix, datetime.now().strftime("%Y%m%d%H%M%S"))
-    file_handler = logging.FileHandler(
-        "{0}/{1}_instances.log".format(args.log_path, args.log_file_prefix))
-    log_formatter = logging.Formatter(format_str)
-    file_handler.setFormatter(log_formatter)
-    logger.addHandler(file_handler)
 
   if args.latency_mode and args.throughput_mode:
     raise RuntimeError(
@@ -801,6 +1206,14 @@ def main():
         "is set")
     sys.exit()
 
+  if args.autotune and (args.tune or args.launch_config or
+                        args.latency_mode or args.throughput_mode or
+                        args.instance_idx != -1):
+    logger.error(
+        "'--autotune' is exclusive to '--tune', '--launch_config', "
+        "'--latency_mode', '--throughput_mode' and '--instance_idx'.")
+    sys.exit()
+
   # Verify LD_PRELOAD
   if "LD_PRELOAD" in os.environ:
     lst_valid = []
@@ -818,7 +1231,60 @@ def main():
     else:
       os.environ["LD_PRELOAD"] = ""
 
+
+def launch(program, program_args=None, dry_run=False, **kwargs):
+  """
+  Launch `program` in-process with the same knobs as the command line, e.g.
+
+    launch("infer_resnet50.py", ["--batch_size", "1"], ninstances=4,
+           ncore_per_instance=8, enable_jemalloc=True)
+
+  `kwargs` are the knob names without leading dashes. If `dry_run` is True,
+  only the core assignment is planned and nothing is launched.
+
+  Returns a list of dict, one per instance, with `instance_idx`, `cores`
+  (cores bound to the instance) and `numa_nodes` (NUMA nodes of the cores),
+  plus `command` if the instance is launched. With `autotune=True`, returns
+  the best configuration saved to `autotune_output` instead. Environment
+  variables set by the launcher are restored before returning.
+  """
+  args = build_parser().parse_args([program])
+  for key, value in kwargs.items():
+    if not hasattr(args, key) or key in ("program", "program_args"):
+      raise TypeError("Unknown launcher knob: {}".format(key))
+    setattr(args, key, value)
+  args.program_args = list(program_args or [])
+
+  env_before = dict(os.environ)
+  try:
+    prepare_args(args)
+    launcher = MultiInstanceLauncher()
+    if dry_run:
+      return launcher.plan(args)
+    if args.autotune:
+      return AutoTuner(args, launcher.cpuinfo).tune()
+    return launcher.launch(args)
+  finally:
+    os.environ.clear()
+    os.environ.update(env_before)
+
+
+def main():
+  env_before = set(os.environ.keys())
+  args = parse_args()
+  prepare_args(args)
+  if args.log_path:
+    file_handler = logging.FileHandler(
+        "{0}/{1}_instances.log".format(args.log_path, args.log_file_prefix))
+    log_formatter = logging.Formatter(format_str)
+    file_handler.setFormatter(log_formatter)
+    logger.addHandler(file_handler)
+
   launcher = MultiInstanceLauncher()
+  if args.autotune:
+    if AutoTuner(args, launcher.cpuinfo).tune() is None:
+      sys.exit(-1)
+    return
   launcher.launch(args)
   for x in sorted(set(os.environ.keys()) - env_before):
     logger.debug('%s=%s', x, os.environ[x])
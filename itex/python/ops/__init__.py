@@ -14,14 +14,42 @@
 # ==============================================================================
 
 # pylint: disable=g-bad-import-order,unused-import,missing-module-docstring,unused-import,line-too-long
-from intel_extension_for_tensorflow.python.ops.beam_select import beam_select_kv_cache
-from intel_extension_for_tensorflow.python.ops.activations import gelu
-from intel_extension_for_tensorflow.python.ops.rotary_embedding import qk_rotary_positional_embedding
+import importlib as _importlib
+
+# Gradients of the ITEX ops are registered eagerly, the ops and Keras layers
+# are imported on first access (PEP 562). Keras serializable objects, e.g.
+# "Itex>LayerNormalization", are registered as placeholders which import them
+# on deserialization.
 from intel_extension_for_tensorflow.python.ops import ops_grad as _ops_grad
-from intel_extension_for_tensorflow.python.ops.optimizers import AdamWithWeightDecayOptimizer, AdamWithWeightDecayLegacyOptimizer, LAMBOptimizer
-from intel_extension_for_tensorflow.python.ops.layer_norm import LayerNormalization
-from intel_extension_for_tensorflow.python.ops.group_norm import GroupNormalization
-from intel_extension_for_tensorflow.python.ops.rms_norm import RMSNormalization
-from intel_extension_for_tensorflow.python.ops.recurrent import ItexLSTM
-from intel_extension_for_tensorflow.python.ops.mlp import FusedDenseBiasAddGelu
-from intel_extension_for_tensorflow.python.ops.multi_head_attention import scaled_dot_product_attention
+from intel_extension_for_tensorflow.python.ops import keras_serializable as _keras_serializable
+
+_keras_serializable.register_lazy_objects()
+
+_LAZY_ATTRIBUTES = {
+    "beam_select_kv_cache": "beam_select",
+    "KVCache": "beam_select",
+    "gelu": "activations",
+    "qk_rotary_positional_embedding": "rotary_embedding",
+    "AdamWithWeightDecayOptimizer": "optimizers",
+    "AdamWithWeightDecayLegacyOptimizer": "optimizers",
+    "LAMBOptimizer": "optimizers",
+    "LayerNormalization": "layer_norm",
+    "GroupNormalization": "group_norm",
+    "RMSNormalization": "rms_norm",
+    "ItexLSTM": "recurrent",
+    "FusedDenseBiasAddGelu": "mlp",
+    "scaled_dot_product_attention": "multi_head_attention",
+}
+
+
+def __getattr__(name):
+  if name not in _LAZY_ATTRIBUTES:
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+  module = _importlib.import_module(f"{__name__}.{_LAZY_ATTRIBUTES[name]}")
+  value = getattr(module, name)
+  globals()[name] = value
+  return value
+
+
+def __dir__():
+  return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -16,11 +16,11 @@
 # ==============================================================================
 
 # pylint: disable=missing-module-docstring
-from tensorflow.python import keras
+from intel_extension_for_tensorflow.python.ops.keras_serializable import register_keras_serializable
 from tensorflow.python.framework import ops
 from intel_extension_for_tensorflow.python.ops.load_ops_library import load_ops_library
 
-@keras.utils.generic_utils.register_keras_serializable(package="Itex")
+@register_keras_serializable
 def gelu(features, approximate=False, name=None):
   """Applies the Gaussian error linear unit (GELU) activation function.
 
@@ -18,18 +18,93 @@
 # pylint: disable=missing-module-docstring
 import numpy as np
 import tensorflow as tf
-from tensorflow.python import keras
+from intel_extension_for_tensorflow.python.ops.keras_serializable import register_keras_serializable
 from tensorflow.python.framework import ops
 from typing import List, Optional, Union
 from intel_extension_for_tensorflow.python.ops.load_ops_library import load_ops_library
 from tensorflow.python.framework import config
+from intel_extension_for_tensorflow.python.device import get_backend
 
-@keras.utils.generic_utils.register_keras_serializable(package="Itex")
+@register_keras_serializable
 def beam_select_kv_cache(cache, indices, input_length=0, name=None):
-  if config.list_logical_devices('XPU'):
+  if config.list_logical_devices('XPU') or get_backend() == b"CPU":
     with ops.name_scope(name, "beam_select_kv_cache", [cache, indices, input_length]):
       cache = ops.convert_to_tensor(cache, name="cache")
       indices = ops.convert_to_tensor(indices, name="indices")
       return load_ops_library.beam_select_kv_cache(cache,indices,input_length=input_length)
   else:
     return tf.gather(params=cache, indices=indices, axis=1, batch_dims=1)
+
+
+class KVCache(object):
+  """Preallocated key and value cache for beam search decoding.
+
+  The cache holds `max_length` tokens for each beam and is never reallocated:
+  new tokens are written in place, and beams are reordered in place, only for
+  the tokens decoded so far.
+
+  Both key and value are [batch_size, beam_width, num_heads, max_length,
+  head_dim], of which the first `length` tokens are valid.
+  """
+
+  def __init__(self, batch_size, beam_width, num_heads, max_length, head_dim,
+               dtype=tf.float32, name=None):
+    shape = [batch_size, beam_width, num_heads, max_length, head_dim]
+    with ops.name_scope(name, "kv_cache"):
+      self.key = tf.Variable(tf.zeros(shape, dtype), trainable=False,
+                             name="key")
+      self.value = tf.Variable(tf.zeros(shape, dtype), trainable=False,
+                               name="value")
+      self.length = tf.Variable(0, dtype=tf.int32, trainable=False,
+                                name="length")
+    self.max_length = max_length
+    self.dtype = tf.as_dtype(dtype)
+    # Tokens of the prompt are the same for all beams, so they are never
+    # reordered.
+    self.input_length = 0
+
+  def reset(self):
+    """Drops all tokens, keeping the preallocated buffers."""
+    self.input_length = 0
+    return self.length.assign(0)
+
+  def prefill(self, key, value):
+    """Writes the prompt, which is broadcast to all beams if beam is 1."""
+    key = ops.convert_to_tensor(key, dtype=self.dtype)
+    value = ops.convert_to_tensor(value, dtype=self.dtype)
+    self.input_length = key.shape[3] or 0
+    self.length.assign(0)
+    return self.append(tf.broadcast_to(key, self._token_shape(key)),
+                       tf.broadcast_to(value, self._token_shape(value)))
+
+  def append(self, key, value):
+    """Writes new tokens of all beams after the valid ones."""
+    key = ops.convert_to_tensor(key, dtype=self.dtype)
+    value = ops.convert_to_tensor(value, dtype=self.dtype)
+    begin = self.length.read_value()
+    end = begin + tf.shape(key)[3]
+    self.key[:, :, :, begin:end, :].assign(key)
+    self.value[:, :, :, begin:end, :].assign(value)
+    return self.length.assign(end)
+
+  def reorder(self, beam_indices):
+    """Selects the beams of each batch by `beam_indices` [batch, beam]."""
+    beam_indices = ops.convert_to_tensor(beam_indices)
+    if get_backend() == b"CPU":
+      for cache in (self.key, self.value):
+        load_ops_library.resource_beam_select_kv_cache(
+            cache.handle, beam_indices, self.length, T=self.dtype,
+            input_length=self.input_length)
+    else:
+      for cache in (self.key, self.value):
+        cache.assign(beam_select_kv_cache(cache, beam_indices,
+                                          input_length=self.input_length))
+
+  def get(self):
+    """Returns the valid key and value, which are copied out of the cache."""
+    return (self.key[:, :, :, :self.length.read_value(), :],
+            self.value[:, :, :, :self.length.read_value(), :])
+
+  def _token_shape(self, tokens):
+    shape = tf.shape(tokens)
+    return [shape[0], tf.shape(self.key)[1], shape[2], shape[3], shape[4]]
@@ -16,6 +16,7 @@
 
 import tensorflow.compat.v2 as tf
 from intel_extension_for_tensorflow.python.ops.load_ops_library import load_ops_library
+from intel_extension_for_tensorflow.python.device import get_backend
 from tensorflow.python.framework import config
 from tensorflow.python.framework import dtypes
 from tensorflow.python.ops import math_ops
@@ -125,9 +126,12 @@ class GroupNormalization(Layer):
         self.axis = (self.axis + rank) % rank
         self.use_gpu = config.list_logical_devices('XPU')
         
-        # fused_group_norm only support GPU backend and NHWC and axis=-1 currently
+        # fused_group_norm only support NHWC and axis=-1 currently, and training
+        # only on CPU backend. The GPU build has no CPU kernel for it.
         # TODO(itex): support channel first and rank==any
-        self.use_fused_group_norm = self.use_gpu and (rank == 4) and (self.axis == rank - 1)
+        self.use_fused_group_norm = (
+            (rank == 4) and (self.axis == rank - 1) and
+            (bool(self.use_gpu) or get_backend() == b"CPU"))
 
         dim = input_shape[self.axis]
         if dim is None:
@@ -179,8 +183,8 @@ class GroupNormalization(Layer):
 
     def call(self, inputs, training=False):
         input_shape = tf.shape(inputs)
-        # TODO(itex): support GroupNormGrad
-        if self.use_fused_group_norm and training == False:
+        # TODO(itex): support GroupNormGrad on GPU
+        if self.use_fused_group_norm and (training == False or not self.use_gpu):
             normalized_inputs = load_ops_library.itex_group_norm(
                 inputs,
                 self.gamma,
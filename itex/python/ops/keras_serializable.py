@@ -0,0 +1,113 @@
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Keras serializable objects of ITEX ops.
+
+The modules defining them are imported lazily, so `register_lazy_objects`
+registers a placeholder of each object when ITEX is imported. A placeholder
+imports its module on first use, which replaces it with the real object.
+"""
+
+import importlib
+
+import keras
+from tensorflow.python import keras as tf_keras
+
+_PACKAGE = "Itex"
+
+# Keras serializable classes and functions, to the modules defining them.
+_LAZY_CLASSES = {
+    "FusedDenseBiasAddGelu": "mlp",
+    "ItexLSTM": "recurrent",
+    "LayerNormalization": "layer_norm",
+    "RMSNormalization": "rms_norm",
+}
+_LAZY_FUNCTIONS = {
+    "beam_select_kv_cache": "beam_select",
+    "gelu": "activations",
+    "qk_rotary_positional_embedding": "rotary_embedding",
+}
+
+
+def _registered_name(name):
+  return _PACKAGE + ">" + name
+
+
+def _registries():
+  """Returns the Keras modules whose registries hold the ITEX objects.
+
+  The layers are Keras layers, which look up their registered names in Keras
+  when saved. The registry of TensorFlow Keras is kept for compatibility.
+  """
+  registries = [tf_keras.utils.generic_utils, keras.utils]
+  if registries[0].get_custom_objects() is registries[1].get_custom_objects():
+    return registries[:1]
+  return registries
+
+
+def _load(name):
+  module = _LAZY_CLASSES.get(name) or _LAZY_FUNCTIONS[name]
+  module = importlib.import_module(
+      "intel_extension_for_tensorflow.python.ops." + module)
+  return getattr(module, name)
+
+
+class _LazyClass(object):
+  """Placeholder of a Keras serializable class."""
+
+  _itex_lazy = True
+
+  def __new__(cls, *args, **kwargs):
+    return _load(cls.__name__)(*args, **kwargs)
+
+  @classmethod
+  def from_config(cls, config):
+    return _load(cls.__name__).from_config(config)
+
+
+def _lazy_function(name):
+  """Returns a placeholder of a Keras serializable function."""
+
+  def function(*args, **kwargs):
+    return _load(name)(*args, **kwargs)
+
+  function.__name__ = name
+  function._itex_lazy = True  # pylint: disable=protected-access
+  return function
+
+
+def register_lazy_objects():
+  """Registers the placeholders of the objects not imported yet."""
+  placeholders = {name: type(name, (_LazyClass,), {}) for name in _LAZY_CLASSES}
+  placeholders.update(
+      {name: _lazy_function(name) for name in _LAZY_FUNCTIONS})
+  for registry in _registries():
+    custom_objects = registry.get_custom_objects()
+    for name, placeholder in placeholders.items():
+      custom_objects.setdefault(_registered_name(name), placeholder)
+
+
+def register_keras_serializable(arg):
+  """Registers `arg` as Keras serializable in package "Itex".
+
+  Same as `register_keras_serializable(package="Itex")` of Keras, except the
+  placeholder of `arg` is replaced and both registries are updated.
+  """
+  registered_name = _registered_name(arg.__name__)
+  for registry in _registries():
+    custom_objects = registry.get_custom_objects()
+    if getattr(custom_objects.get(registered_name), "_itex_lazy", False):
+      del custom_objects[registered_name]
+    arg = registry.register_keras_serializable(package=_PACKAGE)(arg)
+  return arg
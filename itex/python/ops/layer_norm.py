@@ -25,7 +25,7 @@ from __future__ import division
 from __future__ import print_function
 
 from intel_extension_for_tensorflow.python.ops.load_ops_library import load_ops_library
-from tensorflow.python import keras
+from intel_extension_for_tensorflow.python.ops.keras_serializable import register_keras_serializable
 from tensorflow.python.framework import dtypes
 from tensorflow.python.framework import ops
 from tensorflow.python.ops import array_ops
@@ -67,7 +67,7 @@ def _layer_norm(
       data_format=data_format)
   return y, running_mean, running_var
 
-@keras.utils.generic_utils.register_keras_serializable(package="Itex")
+@register_keras_serializable
 class LayerNormalization(Layer):
   """Layer normalization layer (Ba et al., 2016).
 
@@ -19,27 +19,82 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import os
 import sys
-import imp
+import types
 import hashlib
+import marshal
+import tempfile
+import threading
+import importlib.util
 
 from tensorflow.python.framework import _pywrap_python_op_gen
+from tensorflow.python.framework import versions
 from tensorflow.python.client import pywrap_tf_session as py_tf
+from intel_extension_for_tensorflow.python._pywrap_itex import ITEX_GetRegisteredOpList
 
-def _load_ops_library():
-  """Loads a TensorFlow plugin, containing custom ops and kernels.
+def _get_cache_dir():
+  """Returns the directory of cached op wrappers, or None if it's disabled.
 
-  Pass "library_filename" to a platform-specific mechanism for dynamically
-  loading a library. The rules for determining the exact location of the
-  library are platform-specific and are not documented here. When the
-  library is loaded, ops and kernels registered in the library via the
-  `REGISTER_*` macros are made available in the TensorFlow process. Note
-  that ops with the same name as an existing op are rejected and not
-  registered with the process.
+  It's `ITEX_OP_WRAPPER_CACHE_DIR` if set, where an empty value disables the
+  cache, and `intel_extension_for_tensorflow` in the user cache directory by
+  default.
+  """
+  cache_dir = os.environ.get("ITEX_OP_WRAPPER_CACHE_DIR")
+  if cache_dir is None:
+    cache_home = (os.environ.get("XDG_CACHE_HOME") or
+                  os.path.join(os.path.expanduser("~"), ".cache"))
+    cache_dir = os.path.join(cache_home, "intel_extension_for_tensorflow")
+  return cache_dir or None
+
+def _compile_op_wrappers(op_list):
+  """Returns the module name and code object of the wrappers of `op_list`.
+
+  The code object is cached on disk. Its key covers everything the generated
+  code depends on: the op definitions of the plugin build, the TensorFlow op
+  wrapper generator and the Python bytecode format.
+  """
+  key = hashlib.sha256(op_list)
+  key.update(versions.__version__.encode())
+  key.update(versions.__git_version__.encode())
+  key.update(importlib.util.MAGIC_NUMBER)
+  module_name = "itex_op_wrappers_" + key.hexdigest()
+
+  cache_dir = _get_cache_dir()
+  cache_path = (os.path.join(cache_dir, module_name + ".bin")
+                if cache_dir else None)
+  if cache_path and os.path.exists(cache_path):
+    try:
+      with open(cache_path, "rb") as f:
+        return module_name, marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+      pass
 
-  Args:
-    library_filename: Path to the plugin.
-      Relative or absolute filesystem path to a dynamic library file.
+  wrappers = _pywrap_python_op_gen.GetPythonWrappers(op_list)  # pylint: disable=c-extension-no-member
+  code = compile(wrappers, module_name, "exec")
+
+  if cache_path:
+    # Write to a temporary file then rename, so concurrent processes never
+    # read a partial file.
+    tmp_path = None
+    try:
+      os.makedirs(cache_dir, exist_ok=True)
+      fd, tmp_path = tempfile.mkstemp(dir=cache_dir,
+                                      prefix=module_name + ".tmp.")
+      with os.fdopen(fd, "wb") as f:
+        marshal.dump(code, f)
+      os.replace(tmp_path, cache_path)
+    except OSError:
+      if tmp_path and os.path.exists(tmp_path):
+        os.remove(tmp_path)
+  return module_name, code
+
+def _load_ops_library(all_ops=False):
+  """Loads the Python wrappers of the ops registered by the ITEX plugin.
+
+  Only the ops ITEX adds to TensorFlow are wrapped, unless `all_ops` is True
+  or the plugin didn't register any op, e.g. it's not loaded by TensorFlow.
+  Then the wrappers of all registered ops are generated instead.
 
   Returns:
     A python module containing the Python wrappers for Ops defined in
@@ -48,25 +103,63 @@ def _load_ops_library():
   Raises:
     RuntimeError: when unable to load the library or get the python wrappers.
   """
-  buf = py_tf.TF_GetAllOpList()
-  try:
-    wrappers = _pywrap_python_op_gen.GetPythonWrappers(  # pylint: disable=c-extension-no-member
-        py_tf.TF_GetBuffer(buf))
-  finally:
-    # Delete the buf to release any memory held in C
-    # that are no longer needed.
-    py_tf.TF_DeleteBuffer(buf)
-
-  # Get a unique name for the module.
-  module_name = hashlib.sha512(wrappers).hexdigest()
+  op_list = None if all_ops else ITEX_GetRegisteredOpList()
+  if op_list:
+    module_name, code = _compile_op_wrappers(op_list)
+  else:
+    buf = py_tf.TF_GetAllOpList()
+    try:
+      code = _pywrap_python_op_gen.GetPythonWrappers(  # pylint: disable=c-extension-no-member
+          py_tf.TF_GetBuffer(buf))
+    finally:
+      # Delete the buf to release any memory held in C
+      # that are no longer needed.
+      py_tf.TF_DeleteBuffer(buf)
+    # Get a unique name for the module.
+    module_name = hashlib.sha512(code).hexdigest()
+
   if module_name in sys.modules:
     return sys.modules[module_name]
-  module = imp.new_module(module_name)
+  module = types.ModuleType(module_name)
   # pylint: disable=exec-used
-  exec(wrappers, module.__dict__)
+  exec(code, module.__dict__)
   # Allow this to be recognized by AutoGraph.
   setattr(module, '_IS_TENSORFLOW_PLUGIN', True)
   sys.modules[module_name] = module
   return module
 
-load_ops_library = _load_ops_library()
+_lock = threading.Lock()
+_modules = {}
+
+def _get_ops_library(all_ops=False):
+  with _lock:
+    if all_ops not in _modules:
+      _modules[all_ops] = _load_ops_library(all_ops)
+    return _modules[all_ops]
+
+class _LazyOpsLibrary(types.ModuleType):
+  """Op wrappers of ITEX, which are loaded on the first op access.
+
+  Importing ITEX doesn't pay for generating the wrappers, and an op is
+  resolved from the loaded module once, then it's a plain attribute. Ops
+  which are not registered by ITEX, e.g. hidden TensorFlow ops used by tests,
+  fall back to the slow wrappers of all ops.
+  """
+
+  _IS_TENSORFLOW_PLUGIN = True
+
+  def __getattr__(self, name):
+    # Only called for attributes which are not resolved yet.
+    if name.startswith("__"):
+      raise AttributeError(name)
+    try:
+      value = getattr(_get_ops_library(), name)
+    except AttributeError:
+      value = getattr(_get_ops_library(all_ops=True), name)
+    setattr(self, name, value)
+    return value
+
+  def __dir__(self):
+    return dir(_get_ops_library())
+
+load_ops_library = _LazyOpsLibrary("load_ops_library")
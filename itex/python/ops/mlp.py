@@ -21,9 +21,9 @@ import tensorflow as tf
 from tensorflow.python.framework import config
 
 from intel_extension_for_tensorflow.python.ops.load_ops_library import load_ops_library
-from intel_extension_for_tensorflow.python.device import is_xehpc, has_xmx
+from intel_extension_for_tensorflow.python.device import get_backend, is_xehpc, has_xmx
 from intel_extension_for_tensorflow.python.ops.activations import gelu
-from tensorflow.python import keras
+from intel_extension_for_tensorflow.python.ops.keras_serializable import register_keras_serializable
 from keras import activations
 from keras import backend
 from keras import constraints
@@ -34,7 +34,7 @@ import functools
 # isort: off
 
 
-@keras.utils.generic_utils.register_keras_serializable(package="Itex")
+@register_keras_serializable
 class FusedDenseBiasAddGelu(Dense):
     """Just your regular densely-connected NN layer.
 
@@ -129,7 +129,11 @@ class FusedDenseBiasAddGelu(Dense):
             activity_regularizer=activity_regularizer,
             **kwargs
         )
-        self._could_use_fused_matmul_biasadd_gelu = (is_xehpc() and has_xmx())
+        # XeTLA kernel on GPU, oneDNN matmul with bias and gelu post-ops on
+        # CPU.
+        self._is_cpu = get_backend() == b"CPU"
+        self._could_use_fused_matmul_biasadd_gelu = (
+            self._is_cpu or (is_xehpc() and has_xmx()))
 
     def standard_dense(self, inputs):
         rank = inputs.shape.rank
@@ -212,20 +216,23 @@ class FusedDenseBiasAddGelu(Dense):
                     )
 
         rank = inputs.shape.rank
-        self._could_use_fused_matmul_biasadd_gelu = (
+        supported_dtypes = ((tf.float32, tf.bfloat16) if self._is_cpu else
+                            (tf.bfloat16, tf.float16))
+        use_fused_matmul_biasadd_gelu = (
             self._could_use_fused_matmul_biasadd_gelu
             and (not isinstance(inputs, tf.SparseTensor))
-            and (
-                self._compute_dtype_object == tf.bfloat16
-                or self._compute_dtype_object == tf.float16
-            )
+            and self._compute_dtype_object in supported_dtypes
         )
-        if self._could_use_fused_matmul_biasadd_gelu:
+        if use_fused_matmul_biasadd_gelu:
             k = inputs.shape[-1]
-            inputs = tf.reshape(inputs, [-1, k])            
+            outer_shape = tf.shape(inputs)[:-1]
+            inputs = tf.reshape(inputs, [-1, k])
             outputs, _ = load_ops_library.fused_dense_bias_add_gelu(
                 input=inputs, weights=self.kernel, bias=self.bias, is_training=training
             )
+            if rank != 2:
+                outputs = tf.reshape(
+                    outputs, tf.concat([outer_shape, [self.units]], axis=0))
         else:
             outputs = self.standard_dense(inputs)
 
@@ -84,6 +84,9 @@ def scaled_dot_product_attention(query,
             dropout_p (float): dropout probability, if greater than 0.0, dropout is applied
             seed ([int, int]): seed for dropout
             is_causal (bool): If true, assumes causal attention masking and errors if both atten_mask and is_causal are set.
+                The queries are the last F positions of the T keys, so decoding with a cached key/value of past
+                tokens passes F=1 and T=past_length+1, or F new tokens and T=past_length+F. F must not be
+                greater than T, otherwise the first queries have no key to attend to.
             use_fast_attention (bool): if true, use core op, otherwise use naive small ops implementation.
             use_stateless_randomuniform (bool): if true, use stateless_randomuniform to generate dropout mask.
             is_training (bool): if in training case, this parameter should be set to True.
@@ -92,13 +95,20 @@ def scaled_dot_product_attention(query,
         Returns:
           atten_output: Multi-headed outputs of attention computation.
     """ 
-    #TODO : remove is_causal limitation once flash attention backward is supported  
+    #TODO : remove is_causal limitation once xpu flash attention backward is supported
     q_seq_len = query.shape[2]
     head_size = query.shape[3]
+    k_seq_len = key.shape[2]
+    if is_causal and q_seq_len is not None and k_seq_len is not None and q_seq_len > k_seq_len:
+        raise ValueError("Causal attention needs the query sequence length ({}) not greater than the key "
+                         "sequence length ({}).".format(q_seq_len, k_seq_len))
     use_xpu = config.list_logical_devices('XPU')
-    # If run on cpu, fast sdp kernel only support inference. If run on xpu, fmha can properly run in the forward kernel,
-    # but in the backward kernel, it can be only available when the q_seq_len <= 512 and head_size <= 64.
-    can_use_fast_sdp = (not use_xpu and not is_training) or \
+    # If run on cpu, fast sdp kernel supports inference, and training with the flash implementation in float
+    # or bfloat16. If run on xpu, fmha can properly run in the forward kernel, but in the backward kernel, it can
+    # be only available when the q_seq_len <= 512 and head_size <= 64.
+    can_use_fast_sdp = (not use_xpu and (not is_training or \
+                        (not use_legacy_implementation and \
+                        (query.dtype == tf.float32 or query.dtype == tf.bfloat16)))) or \
                         (use_xpu and is_xehpc() and has_xmx() and \
                         (query.dtype == tf.bfloat16 or query.dtype == tf.float16) and \
                         is_causal == False and \
@@ -117,6 +127,15 @@ def scaled_dot_product_attention(query,
         if atten_mask is not None:
             atten_scores += atten_mask
 
+        # Query i is at position T - F + i, so it attends to the keys up to it.
+        if is_causal:
+            from_seq_len = tf.shape(query)[2]
+            to_seq_len = tf.shape(key)[2]
+            query_pos = tf.range(from_seq_len)[:, None] + (to_seq_len - from_seq_len)
+            causal_mask = tf.range(to_seq_len)[None, :] <= query_pos
+            atten_scores = tf.where(causal_mask, atten_scores,
+                                    tf.constant(i_dtype.min, i_dtype))
+
         #Normalize the attention scores to probabilities.
         # `atten_probs` =[B, N, F, T]
         atten_probs = tf.nn.softmax(atten_scores, -1)
@@ -158,7 +177,7 @@ def scaled_dot_product_attention(query,
                 value=value, 
                 atten_mask=actual_atten_mask, 
                 use_mask=use_mask,
-                use_causal=False,
+                use_causal=is_causal,
                 is_inference=True)
         else:
             if use_legacy_implementation:
@@ -180,7 +199,8 @@ def scaled_dot_product_attention(query,
                     dropout_mask=dropout_mask,
                     dropout_prob=dropout_p,
                     use_mask=use_mask,
-                    use_dropout=use_dropout)
+                    use_dropout=use_dropout,
+                    use_causal=is_causal)
         return output
 
     if use_fast_attention and can_use_fast_sdp:
@@ -68,6 +68,26 @@ def _itex_layer_norm_grad(op, *grad):
       data_format=data_format)
   return dx, dscale, doffset
 
+@ops.RegisterGradient("ItexRmsNorm")
+def _itex_rms_norm_grad(op, *grad):
+  use_scale = op.get_attr("use_scale")
+  use_center = op.get_attr("use_center")
+  dx, dscale, doffset = load_ops_library.itex_rms_norm_grad(
+      y_backprop=grad[0], x=op.inputs[0], scale=op.inputs[1],
+      epsilon=op.get_attr("epsilon"), use_scale=use_scale,
+      use_center=use_center)
+  return (dx, dscale if use_scale else None, doffset if use_center else None)
+
+@ops.RegisterGradient("ITEXGroupNorm")
+def _itex_group_norm_grad(op, *grad):
+  use_scale = op.get_attr("use_scale")
+  use_center = op.get_attr("use_center")
+  dx, dscale, doffset = load_ops_library.itex_group_norm_grad(
+      y_backprop=grad[0], x=op.inputs[0], scale=op.inputs[1],
+      num_groups=op.get_attr("num_groups"), epsilon=op.get_attr("epsilon"),
+      use_scale=use_scale, use_center=use_center)
+  return (dx, dscale if use_scale else None, doffset if use_center else None)
+
 @ops.RegisterGradient("ItexRnn")
 def _itex_rnn_grad(op, *grad):
   if not op.get_attr("is_training"):
@@ -120,11 +140,15 @@ def _flash_scaled_dot_product_attention_grad(op, *grad):
       dropout_mask=op.inputs[4],
       l=op.outputs[1],
       dropout_prob=op.get_attr("dropout_prob"),
-      use_mask=op.get_attr("use_mask"))
+      use_mask=op.get_attr("use_mask"),
+      use_causal=op.get_attr("use_causal"))
   return (dq, dk, dv, None, None)
 
 @ops.RegisterGradient("FusedDenseBiasAddGelu")
 def _itex_fused_dense_bias_add_gelu_grad(op, *grad):
+  if not op.get_attr("is_training"):
+    raise ValueError(
+        "To use FusedDenseBiasAddGelu in gradients, is_training must be True.")
   feature = op.inputs[0]
   weights = op.inputs[1]
   workspace = op.outputs[1]
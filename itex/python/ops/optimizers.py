@@ -21,6 +21,7 @@ from __future__ import print_function
 import re
 import warnings
 import tensorflow as tf
+from intel_extension_for_tensorflow.python.device import get_backend
 from intel_extension_for_tensorflow.python.ops.load_ops_library import load_ops_library
 from keras.src.optimizers import optimizer as kerasoptimizer
 from keras.src.optimizers import utils as optimizer_utils
@@ -259,6 +260,56 @@ class AdamWithWeightDecayLegacyOptimizer(optimizer.Optimizer): # pylint: disable
     return super(AdamWithWeightDecayLegacyOptimizer, self).apply_gradients(
         converted_grads_and_vars, global_step, name)
 
+def _use_multi_tensor_apply(optimizer, grads_and_vars):
+    """Whether all the variables can be updated by one multi-tensor op.
+
+    The multi-tensor ops are CPU kernels for dense gradients of one dtype,
+    without distribution strategy or EMA, which are handled per variable.
+    """
+    return (
+        get_backend() == b"CPU"
+        and not tf.distribute.has_strategy()
+        and not optimizer.use_ema
+        and not any(isinstance(g, tf.IndexedSlices) for g, _ in grads_and_vars)
+        and len({v.dtype for _, v in grads_and_vars}) == 1
+    )
+
+
+def _multi_tensor_apply_inputs(optimizer, grads_and_vars):
+    """Returns the inputs of the multi-tensor AdamW and LAMB ops."""
+    grads, variables = zip(*grads_and_vars)
+    dtype = variables[0].dtype
+    lr = tf.cast(optimizer.learning_rate, dtype)
+    local_step = tf.cast(optimizer.iterations + 1, dtype)
+    beta_1_power = tf.pow(tf.cast(optimizer.beta_1, dtype), local_step)
+    beta_2_power = tf.pow(tf.cast(optimizer.beta_2, dtype), local_step)
+
+    indices = [optimizer._index_dict[optimizer._var_key(v)] for v in variables] # pylint: disable=protected-access
+    m = [optimizer._momentums[i].handle for i in indices] # pylint: disable=protected-access
+    v = [optimizer._velocities[i].handle for i in indices] # pylint: disable=protected-access
+    if optimizer.amsgrad:
+        v_hat = [optimizer._velocity_hats[i].handle for i in indices] # pylint: disable=protected-access
+    else:
+        v_hat = v  # just a placeholder
+    weight_decay = [
+        optimizer.weight_decay if optimizer._use_weight_decay(var) else 0.0 # pylint: disable=protected-access
+        for var in variables
+    ]
+    return [
+        [var.handle for var in variables],
+        m,
+        v,
+        beta_1_power,
+        beta_2_power,
+        lr,
+        math_ops.cast(optimizer.beta_1, dtype),
+        math_ops.cast(optimizer.beta_2, dtype),
+        math_ops.cast(optimizer.epsilon, dtype),
+        math_ops.cast(weight_decay, dtype),
+        v_hat,
+        list(grads),
+    ]
+
 class AdamWithWeightDecayOptimizer(kerasoptimizer.Optimizer):
     r"""Optimizer that implements the AdamW algorithm.
 
@@ -461,6 +512,16 @@ class AdamWithWeightDecayOptimizer(kerasoptimizer.Optimizer):
                 use_locking=False,
                 use_amsgrad=self.amsgrad)
 
+    def _internal_apply_gradients(self, grads_and_vars):
+        """Updates all the variables in one op on CPU, see `update_step`."""
+        if not _use_multi_tensor_apply(self, grads_and_vars):
+            return super()._internal_apply_gradients(grads_and_vars)
+        load_ops_library.itex_resource_multi_tensor_apply_adam_with_weight_decay(
+            *_multi_tensor_apply_inputs(self, grads_and_vars),
+            use_locking=False,
+            use_amsgrad=self.amsgrad)
+        return self.iterations.assign_add(1)
+
     def apply_gradients(self, grads_and_vars, name=None):
         """Apply gradients to variables.
 
@@ -729,6 +790,21 @@ class LAMBOptimizer(kerasoptimizer.Optimizer):
                 use_amsgrad=self.amsgrad,
                 use_lamb=self._use_layer_adaptation(variable))
 
+    def _internal_apply_gradients(self, grads_and_vars):
+        """Updates all the variables in one op on CPU, see `update_step`.
+
+        The norms of each variable for layer adaptation are computed in the
+        same pass as the moments.
+        """
+        if not _use_multi_tensor_apply(self, grads_and_vars):
+            return super()._internal_apply_gradients(grads_and_vars)
+        load_ops_library.itex_resource_multi_tensor_apply_lamb(
+            *_multi_tensor_apply_inputs(self, grads_and_vars),
+            use_locking=False,
+            use_amsgrad=self.amsgrad,
+            use_lamb=[self._use_layer_adaptation(v) for _, v in grads_and_vars])
+        return self.iterations.assign_add(1)
+
     def exclude_from_layer_adaptation(self, var_list=None, var_names=None):
         """Exclude variables from layer adaptation.
 
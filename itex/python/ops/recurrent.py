@@ -19,6 +19,7 @@
 
 #import uuid
 
+from intel_extension_for_tensorflow.python.device import get_backend
 from intel_extension_for_tensorflow.python.ops.load_ops_library import load_ops_library
 #from tensorflow.python.eager import context
 from tensorflow.python.framework import config
@@ -32,7 +33,7 @@ from tensorflow.python.ops import state_ops
 from tensorflow.python.ops import variables
 from tensorflow.python.platform import tf_logging as logging
 
-from tensorflow.python import keras
+from intel_extension_for_tensorflow.python.ops.keras_serializable import register_keras_serializable
 from keras import activations
 try:
   from keras.src import backend
@@ -48,11 +49,10 @@ except ImportError:
   from keras.src.engine.input_spec import InputSpec
   from keras.src.layers import LSTMV1
 
-_ITEX_AVAILABLE_MSG = 'Layer %s will use ITEX kernels when running on GPU.'
+_ITEX_AVAILABLE_MSG = 'Layer %s will use ITEX kernels.'
 _ITEX_NOT_AVAILABLE_MSG = ('Layer %s will not use ITEX kernels since it '
                            'doesn\'t meet the criteria. It will '
-                           'use a generic GPU kernel as fallback when running '
-                           'on GPU.')
+                           'use a generic kernel as fallback.')
 
 def _canonical_to_params(weights, biases, shape, transpose_weights=False):
   """Utility function convert variable to Itex compatible parameter.
@@ -146,7 +146,7 @@ def has_fully_masked_sequence(mask):
           axis=1))
 
 # add Itex prefix to avoid name conflicting with keras LSTM
-@keras.utils.generic_utils.register_keras_serializable(package="Itex")
+@register_keras_serializable
 class ItexLSTM(LSTMV1):
   """Long Short-Term Memory layer - Hochreiter 1997.
 
@@ -155,7 +155,7 @@ class ItexLSTM(LSTMV1):
 
   Based on available runtime hardware and constraints, this layer
   will choose different implementations (ITEX-based or pure-TensorFlow)
-  to maximize the performance. If a GPU is available and all
+  to maximize the performance. If all
   the arguments to the layer meet the requirement of the ITEX kernel
   (see below for details), the layer will use a fast ITEX implementation.
 
@@ -320,12 +320,10 @@ class ItexLSTM(LSTMV1):
         self.recurrent_activation in (activations.sigmoid, nn.sigmoid) and
         use_bias)
 
-    if config.list_logical_devices('XPU'):
-      # Only show the message when there is GPU available, itex LSTM only support GPU currently
-      if self._could_use_itex_kernel:
-        logging.debug(_ITEX_AVAILABLE_MSG % self.name)
-      else:
-        logging.warning(_ITEX_NOT_AVAILABLE_MSG % self.name)
+    if self._could_use_itex_kernel:
+      logging.debug(_ITEX_AVAILABLE_MSG % self.name)
+    else:
+      logging.warning(_ITEX_NOT_AVAILABLE_MSG % self.name)
 
   def call(self, inputs, mask=None, training=None, initial_state=None):
     """A dummy docstring."""
@@ -365,10 +363,11 @@ class ItexLSTM(LSTMV1):
         'zero_output_for_mask': self.zero_output_for_mask,
     })
 
-    can_use_gpu = ((config.list_logical_devices('XPU')) and
-                   (mask is None or is_itex_supported_inputs\
-                   (mask, self.time_major)))
-    if self._could_use_itex_kernel and can_use_gpu:
+    # ItexRnn has CPU kernels only in the CPU build.
+    can_use_itex = (
+        (config.list_logical_devices('XPU') or get_backend() == b"CPU") and
+        (mask is None or is_itex_supported_inputs(mask, self.time_major)))
+    if self._could_use_itex_kernel and can_use_itex:
       last_output, outputs, new_h, new_c = gpu_lstm(
           **gpu_lstm_kwargs)
     else:
@@ -500,7 +499,7 @@ def standard_lstm(cell, inputs, mask, training, initial_state, sequence_lengths,
 
 def gpu_lstm(cell, inputs, mask, training, initial_state, sequence_lengths,
              go_backwards, time_major):
-  """LSTM with ITEX implementation which is only available for GPU.
+  """LSTM with ITEX implementation, which is available for CPU and GPU.
 
   Note that currently only right padded data is supported, or the result will be
   polluted by the unmasked data which should be filtered.
@@ -26,7 +26,8 @@ from __future__ import print_function
 
 import tensorflow as tf
 from intel_extension_for_tensorflow.python.ops.load_ops_library import load_ops_library
-from tensorflow.python import keras
+from intel_extension_for_tensorflow.python.ops.keras_serializable import register_keras_serializable
+from intel_extension_for_tensorflow.python.device import get_backend
 from tensorflow.python.framework import dtypes
 from tensorflow.python.ops import array_ops
 from tensorflow.python.ops import math_ops
@@ -37,7 +38,7 @@ from keras import initializers
 from keras import regularizers
 from keras.layers import Layer
 
-@keras.utils.generic_utils.register_keras_serializable(package="Itex")
+@register_keras_serializable
 class RMSNormalization(Layer):
   """Root Mean Square Layer Normalization (B.Zhang et al., 2019).
 
@@ -239,8 +240,10 @@ class RMSNormalization(Layer):
       self._beta_const = K.constant(
           0.0, dtype=self._param_dtype, shape=param_shape)
 
-    # fused_rms_norm only support XPU backend currently
-    self.use_fused_rms_norm = tf.config.list_logical_devices('XPU')
+    # fused_rms_norm supports inference on XPU, and both inference and
+    # training on CPU. The GPU build has no CPU kernel for it.
+    self.use_xpu = tf.config.list_logical_devices('XPU')
+    self.use_fused_rms_norm = bool(self.use_xpu) or get_backend() == b"CPU"
     self.built = True
 
   def call(self, inputs, training=False): # pylint: disable=arguments-differ
@@ -264,8 +267,8 @@ class RMSNormalization(Layer):
     squeezed_shape = [pre_dim, in_dim]
     inputs = array_ops.reshape(inputs, squeezed_shape)
     # Compute RMS normalization.
-    if self.use_fused_rms_norm and not training:
-        # fused kernel only support inference on xpu.
+    if self.use_fused_rms_norm and (not training or not self.use_xpu):
+        # fused kernel doesn't support training on xpu.
         outputs = load_ops_library.itex_rms_norm(
                                     inputs,
                                     gamma,
@@ -18,11 +18,12 @@
 # pylint: disable=missing-module-docstring
 import numpy as np
 import tensorflow as tf
-from tensorflow.python import keras
+from intel_extension_for_tensorflow.python.ops.keras_serializable import register_keras_serializable
 from tensorflow.python.framework import ops
 from typing import List, Optional, Union
 from intel_extension_for_tensorflow.python.ops.load_ops_library import load_ops_library
 from tensorflow.python.framework import config
+from intel_extension_for_tensorflow.python.device import get_backend
 
 def shape_list(tensor: Union[tf.Tensor, np.ndarray]) -> List[int]:
     """
@@ -55,16 +56,7 @@ def rotate_every_two(x: tf.Tensor) -> tf.Tensor:
 def apply_rotary_pos_emb(tensor,sin,cos):
     return (tensor * cos) + (rotate_every_two(tensor) * sin)
 
-@keras.utils.generic_utils.register_keras_serializable(package="Itex")
-def qk_rotary_positional_embedding(q,k,sin,cos, rotary_dim=64,num_attention_heads=16,head_dim=256, name=None):
-  if config.list_logical_devices('XPU'):
-    with ops.name_scope(name, "qk_rotary_positional_embedding", [q,k,sin,cos]):
-      q = ops.convert_to_tensor(q, name="query")
-      k = ops.convert_to_tensor(k, name="key")
-      sin = ops.convert_to_tensor(sin, name="sin")
-      cos = ops.convert_to_tensor(cos, name="cos")
-      return load_ops_library.qk_rotary_positional_embedding(q,k,sin,cos,rotary_dim=rotary_dim,num_attention_heads=num_attention_heads,head_dim=head_dim)
-  else:
+def qk_rotary_positional_embedding_fallback(q,k,sin,cos, rotary_dim=64):
     k_rot = k[:, :, :, : rotary_dim]
     k_pass = k[:, :, :, rotary_dim :]
 
@@ -77,3 +69,15 @@ def qk_rotary_positional_embedding(q,k,sin,cos, rotary_dim=64,num_attention_head
     result_k = tf.concat((k_rot, k_pass), axis=-1)
     result_q = tf.concat((q_rot, q_pass), axis=-1)
     return (result_q,result_k)
+
+@register_keras_serializable
+def qk_rotary_positional_embedding(q,k,sin,cos, rotary_dim=64,num_attention_heads=16,head_dim=256, name=None):
+  if config.list_logical_devices('XPU') or get_backend() == b"CPU":
+    with ops.name_scope(name, "qk_rotary_positional_embedding", [q,k,sin,cos]):
+      q = ops.convert_to_tensor(q, name="query")
+      k = ops.convert_to_tensor(k, name="key")
+      sin = ops.convert_to_tensor(sin, name="sin")
+      cos = ops.convert_to_tensor(cos, name="cos")
+      return load_ops_library.qk_rotary_positional_embedding(q,k,sin,cos,rotary_dim=rotary_dim,num_attention_heads=num_attention_heads,head_dim=head_dim)
+  else:
+    return qk_rotary_positional_embedding_fallback(q,k,sin,cos,rotary_dim=rotary_dim)
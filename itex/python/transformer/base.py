@@ -1,10 +1,12 @@
 import tensorflow as tf
 from intel_extension_for_tensorflow.python.fp8.autocast import (
   is_fp8_enabled,
+  is_fp8_batched_update,
   get_fp8_recipe,
-  amax_and_scale_update,
+  batched_amax_and_scale_update,
   get_default_fp8_recipe,
-  record_fp8_out_in_global_buffer,
+  register_fp8_module,
+  record_fp8_out_scale_inv,
   get_fp8_out_scale_inv,
 )
 
@@ -67,6 +69,9 @@ class BaseModule:
         initial_value=tf.zeros(
           [self.fp8_meta["recipe"].amax_history_len, num_fp8_gemm_tensors]),
         trainable=False)
+      gemm_meta_tensors["amax_history_index"] = tf.Variable(
+        initial_value=tf.zeros([], dtype=tf.int64),
+        trainable=False)
 
     num_fp8_out_tensors = (
       fp8_meta["num_fp8_outs_fwd"] if fwd else fp8_meta["num_fp8_outs_bwd"]
@@ -84,6 +89,9 @@ class BaseModule:
         initial_value=tf.zeros(
           [fp8_meta["recipe"].amax_history_len, 1]),
         trainable=False)
+      out_meta_tensors["amax_history_index"] = tf.Variable(
+        initial_value=tf.zeros([], dtype=tf.int64),
+        trainable=False)
 
   def init_fp8_meta_tensors(self):
     """Init scales and amaxes."""
@@ -92,6 +100,7 @@ class BaseModule:
 
     self.set_fp8_meta_tensors(fwd=True)
     self.set_fp8_meta_tensors(fwd=False)
+    register_fp8_module(self)
 
   def record_fp8_out(self, *outs, fwd=True):
     """Record fp8 out and its scale inverse factor."""
@@ -103,30 +112,32 @@ class BaseModule:
         out_meta_tensors = (
           self.fp8_meta[fp8_meta_tensor_key]["out" + str(fp8_index)]
         )
-        record_fp8_out_in_global_buffer(out, out_meta_tensors["scale_inv"])
+        record_fp8_out_scale_inv(out, out_meta_tensors["scale_inv"])
         fp8_index = fp8_index + 1
 
-  def update_fp8_meta_tensors(self, fwd=True):
-    """Update fp8 meta tensor for gemms and fp8 outs."""
+  def get_fp8_meta_tensors_to_update(self, fwd=True):
+    """Get fp8 meta tensors of gemms and fp8 outs, and their fp8 max."""
     fp8_meta_tensor_key = "scaling_fwd" if fwd else "scaling_bwd"
     fp8_max_key = "fp8_max_fwd" if fwd else "fp8_max_bwd"
 
     fp8_meta = self.fp8_meta
-    fp8_max = fp8_meta[fp8_max_key]
-    recipe = fp8_meta["recipe"]
-
     num_fp8_out_tensors = (
       fp8_meta["num_fp8_outs_fwd"] if fwd else fp8_meta["num_fp8_outs_bwd"]
     )
-    for ind in range(0, num_fp8_out_tensors):
-      amax_and_scale_update(
-        fp8_meta[fp8_meta_tensor_key]["out" + str(ind)],
-        recipe, fp8_max)
-
+    fp8_meta_tensors_list = [
+      fp8_meta[fp8_meta_tensor_key]["out" + str(ind)]
+      for ind in range(0, num_fp8_out_tensors)
+    ]
     if fp8_meta["num_gemms"] > 0:
-      amax_and_scale_update(
-        fp8_meta[fp8_meta_tensor_key]["gemm"],
-        recipe, fp8_max)
+      fp8_meta_tensors_list.append(fp8_meta[fp8_meta_tensor_key]["gemm"])
+    return fp8_meta_tensors_list, fp8_meta[fp8_max_key]
+
+  def update_fp8_meta_tensors(self, fwd=True):
+    """Update fp8 meta tensor for gemms and fp8 outs."""
+    fp8_meta_tensors_list, fp8_max = self.get_fp8_meta_tensors_to_update(fwd)
+    batched_amax_and_scale_update(
+      fp8_meta_tensors_list, [fp8_max] * len(fp8_meta_tensors_list),
+      self.fp8_meta["recipe"])
 
   """
   Currently, we only support fp8 as intermediate gemm in/out or transformer core op in/out.
@@ -196,7 +207,9 @@ class BaseModule:
 
   def pre_forward(self, training):
     """Update fp8 meta data before forward."""
-    if self.fp8 and training:
+    # Backward follows the forward, even if it runs out of fp8_autocast.
+    self.fp8_meta["batched_update"] = is_fp8_batched_update()
+    if self.fp8 and training and not self.fp8_meta["batched_update"]:
       self.update_fp8_meta_tensors(fwd=True)
 
   def post_forward(self, *outs):
@@ -205,7 +218,8 @@ class BaseModule:
 
   def pre_backward(self):
     """Update fp8 meta data before backward."""
-    self.update_fp8_meta_tensors(fwd=False)
+    if not self.fp8_meta.get("batched_update", False):
+      self.update_fp8_meta_tensors(fwd=False)
 
   def post_backward(self, *outs):
     """Record backward fp8 outputs."""
@@ -0,0 +1,64 @@
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.python.framework import dtypes
+from tensorflow.python.framework import constant_op
+from utils import multi_run, add_profiling, flush_cache
+from intel_extension_for_tensorflow.python.test_func import test
+from intel_extension_for_tensorflow.python.ops.load_ops_library import load_ops_library
+
+FLOAT_COMPUTE_TYPE = [dtypes.float32, dtypes.bfloat16]
+
+ITERATION = 5
+
+NUM_GROUPS = 32
+# Stable Diffusion UNet feature maps in NHWC at 512x512, batch 2.
+group_norm_size = [[2, 64, 64, 320], [2, 32, 32, 640], [2, 16, 16, 1280], [2, 8, 8, 1280],
+                   [2, 64, 64, 960]]
+
+class ITEXGroupNormTest(test.TestCase):
+    def _inputs(self, size, dtype):
+        x = constant_op.constant(np.random.normal(size=size), dtype=dtype)
+        gamma = constant_op.constant(np.random.normal(size=size[-1:]), dtype=dtype)
+        beta = constant_op.constant(np.random.normal(size=size[-1:]), dtype=dtype)
+        return x, gamma, beta
+
+    @add_profiling
+    @multi_run(ITERATION)
+    def testITEXGroupNorm(self):
+        for dtype in FLOAT_COMPUTE_TYPE:
+            for in_size in group_norm_size:
+                x, gamma, beta = self._inputs(in_size, dtype)
+                flush_cache()
+                out = load_ops_library.itex_group_norm(x, gamma, beta, num_groups=NUM_GROUPS,
+                                                       epsilon=1e-5)
+
+    @add_profiling
+    @multi_run(ITERATION)
+    def testITEXGroupNormGrad(self):
+        for dtype in FLOAT_COMPUTE_TYPE:
+            for in_size in group_norm_size:
+                x, gamma, _ = self._inputs(in_size, dtype)
+                dy = constant_op.constant(np.random.normal(size=in_size), dtype=dtype)
+                flush_cache()
+                dx, dgamma, dbeta = load_ops_library.itex_group_norm_grad(
+                    dy, x, gamma, num_groups=NUM_GROUPS, epsilon=1e-5)
+
+if __name__ == '__main__':
+    test.main()
@@ -0,0 +1,63 @@
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.python.framework import dtypes
+from tensorflow.python.framework import constant_op
+from utils import multi_run, add_profiling, flush_cache
+from intel_extension_for_tensorflow.python.test_func import test
+from intel_extension_for_tensorflow.python.ops.load_ops_library import load_ops_library
+
+FLOAT_COMPUTE_TYPE = [dtypes.float32, dtypes.bfloat16]
+
+ITERATION = 5
+
+# LLaMA-7B and LLaMA-13B hidden sizes, [tokens, hidden] of the first token and
+# the next tokens.
+rms_norm_size = [[2048, 4096], [1, 4096], [32, 4096], [2048, 5120], [32, 5120]]
+
+class ItexRmsNormTest(test.TestCase):
+    def _inputs(self, size, dtype):
+        x = constant_op.constant(np.random.normal(size=size), dtype=dtype)
+        gamma = constant_op.constant(np.random.normal(size=size[-1:]), dtype=dtypes.float32)
+        beta = constant_op.constant(np.zeros(size[-1:]), dtype=dtypes.float32)
+        return x, gamma, beta
+
+    @add_profiling
+    @multi_run(ITERATION)
+    def testItexRmsNorm(self):
+        for dtype in FLOAT_COMPUTE_TYPE:
+            for in_size in rms_norm_size:
+                x, gamma, beta = self._inputs(in_size, dtype)
+                flush_cache()
+                out = load_ops_library.itex_rms_norm(x, gamma, beta, epsilon=1e-6,
+                                                     use_scale=True, use_center=False)
+
+    @add_profiling
+    @multi_run(ITERATION)
+    def testItexRmsNormGrad(self):
+        for dtype in FLOAT_COMPUTE_TYPE:
+            for in_size in rms_norm_size:
+                x, gamma, _ = self._inputs(in_size, dtype)
+                dy = constant_op.constant(np.random.normal(size=in_size), dtype=dtype)
+                flush_cache()
+                dx, dgamma, dbeta = load_ops_library.itex_rms_norm_grad(
+                    dy, x, gamma, epsilon=1e-6, use_scale=True, use_center=False)
+
+if __name__ == '__main__':
+    test.main()
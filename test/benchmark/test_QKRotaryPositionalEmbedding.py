@@ -0,0 +1,67 @@
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.python.framework import dtypes
+from tensorflow.python.framework import constant_op
+from utils import multi_run, add_profiling, flush_cache
+from intel_extension_for_tensorflow.python.test_func import test
+from intel_extension_for_tensorflow.python.ops.rotary_embedding import qk_rotary_positional_embedding
+from intel_extension_for_tensorflow.python.ops.rotary_embedding import qk_rotary_positional_embedding_fallback
+
+FLOAT_COMPUTE_TYPE = [dtypes.float32, dtypes.bfloat16]
+
+ITERATION = 5
+
+# GPT-J 6B: 16 heads of 256 elements, rotary on the first 64 elements.
+NUM_HEADS = 16
+HEAD_DIM = 256
+ROTARY_DIM = 64
+# [batch * beam, length] of the first token and the next tokens.
+rotary_size = [[1, 32], [1, 1024], [4, 1], [16, 1], [64, 1]]
+
+class QKRotaryPositionalEmbeddingTest(test.TestCase):
+    def _test_impl(self, size, dtype, fn, **kwargs):
+        q = np.random.normal(size=size + [NUM_HEADS, HEAD_DIM])
+        k = np.random.normal(size=size + [NUM_HEADS, HEAD_DIM])
+        sin = np.random.normal(size=[1, size[1], 1, ROTARY_DIM])
+        cos = np.random.normal(size=[1, size[1], 1, ROTARY_DIM])
+        q = constant_op.constant(q, dtype=dtype)
+        k = constant_op.constant(k, dtype=dtype)
+        sin = constant_op.constant(sin, dtype=dtype)
+        cos = constant_op.constant(cos, dtype=dtype)
+        flush_cache()
+        out = fn(q, k, sin, cos, rotary_dim=ROTARY_DIM, **kwargs)
+
+    @add_profiling
+    @multi_run(ITERATION)
+    def testQKRotaryPositionalEmbedding(self):
+        for dtype in FLOAT_COMPUTE_TYPE:
+            for in_size in rotary_size:
+                self._test_impl(in_size, dtype, qk_rotary_positional_embedding,
+                                num_attention_heads=NUM_HEADS, head_dim=HEAD_DIM)
+
+    @add_profiling
+    @multi_run(ITERATION)
+    def testQKRotaryPositionalEmbeddingFallback(self):
+        for dtype in FLOAT_COMPUTE_TYPE:
+            for in_size in rotary_size:
+                self._test_impl(in_size, dtype, qk_rotary_positional_embedding_fallback)
+
+if __name__ == '__main__':
+    test.main()
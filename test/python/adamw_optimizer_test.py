@@ -55,6 +55,12 @@ def adamw_update_numpy(
 
 class AdamWeightDecayOptimizerTest(test_util.TensorFlowTestCase):
 
+    def setUp(self):
+        super().setUp()
+        # The GPU build has no CPU kernels of the optimizer ops.
+        if itex.get_backend() != b"CPU" and not test.is_gpu_available():
+            self.skipTest("No GPU available")
+
     def doTestBasic(self, use_callable_params=False, do_sparse=False, do_amsgrad=False):
         for dtype in DATA_TYPES:
             # Initialize variables for numpy implementation.
@@ -108,44 +114,19 @@ class AdamWeightDecayOptimizerTest(test_util.TensorFlowTestCase):
                 self.assertAllCloseAccordingToType(itex_var1.numpy(), var1_np)
 
     def testBasicAdamW(self):
-        '''ResourceApplyAdamWithWeightDecay is a DPCPP op, don't have cpu registration 
-            TODO: waiting for CPU registration of ResourceApplyAdamWithWeightDecay then enable
-            this test case on CPU'''
-        if not test.is_gpu_available():
-            self.skipTest("No GPU available")
         self.doTestBasic()
 
     def testCallableParamsAdamW(self):
-        '''ResourceApplyAdamWithWeightDecay is a DPCPP op, don't have cpu registration 
-            TODO: waiting for CPU registration of ResourceApplyAdamWithWeightDecay then enable
-            this test case on CPU'''
-        if not test.is_gpu_available():
-            self.skipTest("No GPU available")
         self.doTestBasic(use_callable_params=True)
 
     def testAmsgradAdamW(self):
-        '''ResourceApplyAdamWithWeightDecay is a DPCPP op, don't have cpu registration 
-            TODO: waiting for CPU registration of ResourceApplyAdamWithWeightDecay then enable
-            this test case on CPU'''
-        if not test.is_gpu_available():
-            self.skipTest("No GPU available")
         self.doTestBasic(do_amsgrad=True)
 
     def testSparseAdamW(self):
-        '''ResourceApplyAdamWithWeightDecay is a DPCPP op, don't have cpu registration 
-            TODO: waiting for CPU registration of ResourceApplyAdamWithWeightDecay then enable
-            this test case on CPU'''
-        if not test.is_gpu_available():
-            self.skipTest("No GPU available")
         self.doTestBasic(do_sparse=True)
         self.doTestBasic(do_sparse=True, do_amsgrad=False)
 
     def testExcludeWeightDecayAdamW(self):
-        '''ResourceApplyAdamWithWeightDecay is a DPCPP op, don't have cpu registration 
-            TODO: waiting for CPU registration of ResourceApplyAdamWithWeightDecay then enable
-            this test case on CPU'''
-        if not test.is_gpu_available():
-            self.skipTest("No GPU available")
         grads, var1, var2, var3 = (
             tf.Variable(tf.zeros(())),
             tf.Variable(2.0),
@@ -168,11 +149,6 @@ class AdamWeightDecayOptimizerTest(test_util.TensorFlowTestCase):
         self.assertAllCloseAccordingToType(var3.numpy(), 2.0)
 
     def testKerasFit(self):
-        '''ResourceApplyAdamWithWeightDecay is a DPCPP op, don't have cpu registration 
-            TODO: waiting for CPU registration of ResourceApplyAdamWithWeightDecay then enable
-            this test case on CPU'''
-        if not test.is_gpu_available():
-            self.skipTest("No GPU available")
         """Check if calling model.fit works."""
         model = tf.keras.models.Sequential([tf.keras.layers.Dense(2)])
         loss = tf.keras.losses.SparseCategoricalCrossentropy(from_logits=True)
@@ -182,11 +158,6 @@ class AdamWeightDecayOptimizerTest(test_util.TensorFlowTestCase):
         model.fit(x, y, epochs=1)
 
     def test_clip_norm(self):
-        '''ResourceApplyAdamWithWeightDecay is a DPCPP op, don't have cpu registration 
-            TODO: waiting for CPU registration of ResourceApplyAdamWithWeightDecay then enable
-            this test case on CPU'''
-        if not test.is_gpu_available():
-            self.skipTest("No GPU available")
         for dtype in DATA_TYPES:
             optimizer = itex_AdamW(clipnorm=1)
             grad = [np.array([100.0, 100.0], dtype=dtype.as_numpy_dtype)]
@@ -194,11 +165,6 @@ class AdamWeightDecayOptimizerTest(test_util.TensorFlowTestCase):
             self.assertAllClose(clipped_grad[0], [2**0.5 / 2, 2**0.5 / 2])
 
     def test_clip_value(self):
-        '''ResourceApplyAdamWithWeightDecay is a DPCPP op, don't have cpu registration 
-            TODO: waiting for CPU registration of ResourceApplyAdamWithWeightDecay then enable
-            this test case on CPU'''
-        if not test.is_gpu_available():
-            self.skipTest("No GPU available")
         for dtype in DATA_TYPES:    
             optimizer = itex_AdamW(clipvalue=1)
             grad = [np.array([100.0, 100.0], dtype=dtype.as_numpy_dtype)]
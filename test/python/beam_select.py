@@ -44,6 +44,27 @@ class BeamSelectTest(test_util.TensorFlowTestCase):
             self._testForwardPass((2,1,16,1024,256), (2,4,16,1,256),d,t)
             self._testForwardPass((2,1,16,1024,256), (2,4,16,4,256),d,t)
 
+    def testKVCache(self):
+        batch, beam, heads, head_dim = 2, 4, 3, 8
+        cache = itex.ops.KVCache(batch, beam, heads, 16, head_dim)
+        prompt = tf.random.uniform((batch, 1, heads, 5, head_dim))
+        cache.prefill(prompt, 2 * prompt)
+        expected = tf.concat([prompt] * beam, axis=1)
+        for beam_indices in [[[3,1,2,0],[0,3,2,1]], [[1,1,0,2],[3,3,3,3]]]:
+            tokens = tf.random.uniform((batch, beam, heads, 2, head_dim))
+            cache.append(tokens, 2 * tokens)
+            expected = tf.concat([expected, tokens], axis=3)
+            # The value read before reorder shares the buffer of the variable,
+            # which must be copied before it's updated in place.
+            snapshot = cache.key.read_value()
+            cache.reorder(beam_indices)
+            self.assertAllEqual(snapshot[:, :, :, :expected.shape[3], :], expected)
+            expected = tf.gather(params=expected, indices=beam_indices, axis=1, batch_dims=1)
+            key, value = cache.get()
+            self.assertAllEqual(key, expected)
+            self.assertAllEqual(value, 2 * expected)
+        self.assertEqual(int(cache.length), 9)
+
 
 if __name__ == "__main__":
     test.main()
@@ -0,0 +1,89 @@
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Import time benchmark of ITEX, to catch startup regressions."""
+
+import subprocess
+import sys
+
+from intel_extension_for_tensorflow.python.test_func import test_util
+from tensorflow.python.platform import test
+from tensorflow.python.platform import tf_logging
+
+_PACKAGE = "intel_extension_for_tensorflow"
+
+# Modules which must not be imported by `import intel_extension_for_tensorflow`.
+_LAZY_MODULES = [
+    _PACKAGE + ".python.test_func",
+    _PACKAGE + ".python.distribute",
+    _PACKAGE + ".python.experimental_ops_override",
+    _PACKAGE + ".python.ops.layer_norm",
+    _PACKAGE + ".python.ops.recurrent",
+    _PACKAGE + ".python.ops.optimizers",
+    _PACKAGE + ".python.ops.multi_head_attention",
+]
+
+
+def _import_time(statement):
+  """Runs `statement` with `python -X importtime` in a fresh interpreter.
+
+  Returns:
+    A dict from the name of each imported module to its cumulative import
+    time in microseconds.
+  """
+  result = subprocess.run(
+      [sys.executable, "-X", "importtime", "-c", statement],
+      stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True,
+      universal_newlines=True)
+  modules = {}
+  # import time: self [us] | cumulative | imported package
+  for line in result.stderr.splitlines():
+    if not line.startswith("import time:"):
+      continue
+    fields = line[len("import time:"):].split("|")
+    if len(fields) != 3 or not fields[1].strip().isdigit():
+      continue
+    modules[fields[2].strip()] = int(fields[1])
+  return modules
+
+
+class ImportTimeTest(test_util.TensorFlowTestCase):
+
+  def testImportTime(self):
+    modules = _import_time("import " + _PACKAGE)
+    self.assertIn(_PACKAGE, modules)
+
+    itex_modules = sorted(
+        ((us, name) for name, us in modules.items()
+         if name.startswith(_PACKAGE)), reverse=True)
+    tf_logging.info(
+        "Import time of %s: %.1f ms, slowest modules:\n%s", _PACKAGE,
+        modules[_PACKAGE] / 1000, "\n".join(
+            "%10d us  %s" % item for item in itex_modules[:20]))
+
+    for name in _LAZY_MODULES:
+      self.assertNotIn(name, modules,
+                       "%s is imported eagerly by %s" % (name, _PACKAGE))
+
+  def testLazyAttributes(self):
+    modules = _import_time(
+        "import {0} as itex; itex.ops.LayerNormalization; "
+        "itex.experimental_ops_override".format(_PACKAGE))
+    self.assertIn(_PACKAGE + ".python.ops.layer_norm", modules)
+    self.assertIn(_PACKAGE + ".python.experimental_ops_override", modules)
+    self.assertNotIn(_PACKAGE + ".python.test_func", modules)
+
+
+if __name__ == "__main__":
+  test.main()
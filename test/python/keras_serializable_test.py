@@ -0,0 +1,109 @@
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests of the Keras serializable objects of ITEX in fresh interpreters."""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from intel_extension_for_tensorflow.python.test_func import test_util
+from tensorflow.python.platform import test
+
+_PACKAGE = "intel_extension_for_tensorflow"
+
+_SERIALIZABLES = [
+    "Itex>FusedDenseBiasAddGelu",
+    "Itex>ItexLSTM",
+    "Itex>LayerNormalization",
+    "Itex>RMSNormalization",
+    "Itex>beam_select_kv_cache",
+    "Itex>gelu",
+    "Itex>qk_rotary_positional_embedding",
+]
+
+_SAVE_MODEL = """
+import numpy as np
+import tensorflow as tf
+import {package} as itex
+
+inputs = tf.keras.Input(shape=(16,))
+outputs = itex.ops.LayerNormalization()(inputs)
+outputs = itex.ops.RMSNormalization(center=True)(outputs)
+model = tf.keras.Model(inputs, outputs)
+x = np.random.RandomState(0).uniform(size=(4, 16)).astype(np.float32)
+model.save({model_path!r})
+np.save({x_path!r}, x)
+np.save({y_path!r}, model.predict(x))
+"""
+
+_LOAD_MODEL = """
+import numpy as np
+import tensorflow as tf
+import {package}
+
+model = tf.keras.models.load_model({model_path!r})
+for layer in model.layers[1:]:
+  print(type(layer).__module__, type(layer).__name__)
+np.save({y_path!r}, model.predict(np.load({x_path!r})))
+"""
+
+
+def _run(statement):
+  """Runs `statement` in a fresh interpreter and returns its stdout."""
+  result = subprocess.run(
+      [sys.executable, "-c", statement], stdout=subprocess.PIPE,
+      stderr=subprocess.PIPE, check=False, universal_newlines=True)
+  if result.returncode != 0:
+    raise RuntimeError("Failed to run:\n%s\n%s" % (statement, result.stderr))
+  return result.stdout
+
+
+class KerasSerializableTest(test_util.TensorFlowTestCase):
+
+  def testRegisteredAtImport(self):
+    output = _run(
+        "import sys\n"
+        "from tensorflow.python import keras\n"
+        "import {0}\n"
+        "custom_objects = keras.utils.generic_utils.get_custom_objects()\n"
+        "print(sorted(name for name in custom_objects "
+        "if name.startswith('Itex>')))\n"
+        "print('{0}.python.ops.layer_norm' in sys.modules)\n".format(_PACKAGE))
+    self.assertEqual(output.splitlines(), [str(_SERIALIZABLES), "False"])
+
+  def testLoadModelInFreshInterpreter(self):
+    temp_dir = self.get_temp_dir()
+    paths = {
+        "package": _PACKAGE,
+        "model_path": os.path.join(temp_dir, "model"),
+        "x_path": os.path.join(temp_dir, "x.npy"),
+        "y_path": os.path.join(temp_dir, "expected.npy"),
+    }
+    _run(_SAVE_MODEL.format(**paths))
+    expected = np.load(paths["y_path"])
+
+    paths["y_path"] = os.path.join(temp_dir, "actual.npy")
+    output = _run(_LOAD_MODEL.format(**paths))
+    self.assertEqual(output.splitlines()[-2:], [
+        _PACKAGE + ".python.ops.layer_norm LayerNormalization",
+        _PACKAGE + ".python.ops.rms_norm RMSNormalization",
+    ])
+    self.assertAllClose(expected, np.load(paths["y_path"]))
+
+
+if __name__ == "__main__":
+  test.main()
@@ -23,6 +23,7 @@ from intel_extension_for_tensorflow.python.test_func import test_util
 import intel_extension_for_tensorflow as itex
 from tensorflow.python.framework import dtypes
 from intel_extension_for_tensorflow.python.ops import LAMBOptimizer as itex_LAMB
+from intel_extension_for_tensorflow.python.ops.load_ops_library import load_ops_library
 from tensorflow.python.framework import constant_op
 
 DATA_TYPES = [
@@ -65,9 +66,13 @@ def LAMB_update_numpy(
 
 class LAMBOptimizerTest(test_util.TensorFlowTestCase):
 
-    def doTestBasic(self, use_callable_params=False, do_sparse=False, do_amsgrad=False):
-        if not test.is_gpu_available():
+    def setUp(self):
+        super().setUp()
+        # The GPU build has no CPU kernels of the optimizer ops.
+        if itex.get_backend() != b"CPU" and not test.is_gpu_available():
             self.skipTest("No GPU available")
+
+    def doTestBasic(self, use_callable_params=False, do_sparse=False, do_amsgrad=False):
         for dtype in DATA_TYPES:
             # Initialize variables for numpy implementation.
             np_slot_vars0, np_slot_vars1 = {}, {}
@@ -122,44 +127,19 @@ class LAMBOptimizerTest(test_util.TensorFlowTestCase):
                 self.assertAllCloseAccordingToType(itex_var1.numpy(), var1_np)
 
     def testBasicLAMB(self):
-        '''ResourceApplyLAMB is a DPCPP op, don't have cpu registration 
-            TODO: waiting for CPU registration of ResourceApplyLAMB then enable
-            this test case on CPU'''
-        if not test.is_gpu_available():
-            self.skipTest("No GPU available")
         self.doTestBasic()
 
     def testCallableParamsLAMB(self):
-        '''ResourceApplyLAMB is a DPCPP op, don't have cpu registration 
-            TODO: waiting for CPU registration of ResourceApplyLAMB then enable
-            this test case on CPU'''
-        if not test.is_gpu_available():
-            self.skipTest("No GPU available")
         self.doTestBasic(use_callable_params=True)
 
     def testAmsgradLAMB(self):
-        '''ResourceApplyLAMB is a DPCPP op, don't have cpu registration 
-            TODO: waiting for CPU registration of ResourceApplyLAMB then enable
-            this test case on CPU'''
-        if not test.is_gpu_available():
-            self.skipTest("No GPU available")
         self.doTestBasic(do_amsgrad=True)
 
     def testSparseLAMB(self):
-        '''ResourceApplyLAMB is a DPCPP op, don't have cpu registration 
-            TODO: waiting for CPU registration of ResourceApplyLAMB then enable
-            this test case on CPU'''
-        if not test.is_gpu_available():
-            self.skipTest("No GPU available")
         self.doTestBasic(do_sparse=True)
         self.doTestBasic(do_sparse=True, do_amsgrad=True)
 
     def testExcludeWeightDecayAdamW(self):
-        '''ResourceApplyLAMB is a DPCPP op, don't have cpu registration 
-            TODO: waiting for CPU registration of ResourceApplyLAMB then enable
-            this test case on CPU'''
-        if not test.is_gpu_available():
-            self.skipTest("No GPU available")
         grads, var1, var2, var3 = (
             tf.Variable(tf.zeros(())),
             tf.Variable(2.0),
@@ -182,11 +162,6 @@ class LAMBOptimizerTest(test_util.TensorFlowTestCase):
         self.assertAllCloseAccordingToType(var3.numpy(), 2.0)
     
     def testExcludeLayerAdaptationLAMB(self):
-        '''ResourceApplyLAMB is a DPCPP op, don't have cpu registration 
-            TODO: waiting for CPU registration of ResourceApplyLAMB then enable
-            this test case on CPU'''
-        if not test.is_gpu_available():
-            self.skipTest("No GPU available")
         grads, var1, var2, var3 = (
             tf.Variable(tf.zeros(())),
             tf.Variable(2.0),
@@ -210,11 +185,6 @@ class LAMBOptimizerTest(test_util.TensorFlowTestCase):
         self.assertAllCloseAccordingToType(var3.numpy(), 1.9992)
 
     def testKerasFit(self):
-        '''ResourceApplyLAMB is a DPCPP op, don't have cpu registration 
-            TODO: waiting for CPU registration of ResourceApplyLAMB then enable
-            this test case on CPU'''
-        if not test.is_gpu_available():
-            self.skipTest("No GPU available")
         """Check if calling model.fit works."""
         model = tf.keras.models.Sequential([tf.keras.layers.Dense(2)])
         loss = tf.keras.losses.SparseCategoricalCrossentropy(from_logits=True)
@@ -223,12 +193,42 @@ class LAMBOptimizerTest(test_util.TensorFlowTestCase):
         x, y = np.random.uniform(size=(2, 4, 1))
         model.fit(x, y, epochs=1)
 
+    def testMultiTensorApplyLAMB(self):
+        """Check the multi-tensor op against the per variable op."""
+        if itex.get_backend() != b"CPU":
+            self.skipTest("Multi-tensor apply is a CPU op")
+        # The first variable spans several chunks of the CPU kernel.
+        shapes = [(200, 300), (3,), (128,)]
+        use_lamb = [True, True, False]
+        np.random.seed(0)
+        values = [np.random.normal(size=s).astype(np.float32) for s in shapes]
+        grads = [tf.constant(np.random.normal(size=s).astype(np.float32))
+                 for s in shapes]
+        def make_slots():
+            return [[tf.Variable(x) for x in values]] + [
+                [tf.Variable(tf.zeros(s)) for s in shapes] for _ in range(3)]
+        hyper_params = [tf.constant(x) for x in
+                        (0.9, 0.999, 0.01, 0.9, 0.999, 1e-7)]
+        weight_decay = [0.01, 0.0, 0.01]
+
+        var, m, v, vhat = make_slots()
+        for i, g in enumerate(grads):
+            load_ops_library.itex_resource_apply_lamb(
+                var[i].handle, m[i].handle, v[i].handle, *hyper_params,
+                tf.constant(weight_decay[i]), vhat[i].handle, g,
+                use_amsgrad=True, use_lamb=use_lamb[i])
+
+        multi_var, multi_m, multi_v, multi_vhat = make_slots()
+        load_ops_library.itex_resource_multi_tensor_apply_lamb(
+            [x.handle for x in multi_var], [x.handle for x in multi_m],
+            [x.handle for x in multi_v], *hyper_params,
+            tf.constant(weight_decay), [x.handle for x in multi_vhat], grads,
+            use_amsgrad=True, use_lamb=use_lamb)
+        for expected, actual in zip(var + m + v + vhat,
+                                    multi_var + multi_m + multi_v + multi_vhat):
+            self.assertAllClose(expected.numpy(), actual.numpy())
+
     def test_clip_norm(self):
-        '''ResourceApplyLAMB is a DPCPP op, don't have cpu registration 
-            TODO: waiting for CPU registration of ResourceApplyLAMB then enable
-            this test case on CPU'''
-        if not test.is_gpu_available():
-            self.skipTest("No GPU available")
         for dtype in DATA_TYPES:
             optimizer = itex_LAMB(clipnorm=1)
             grad = [np.array([100.0, 100.0], dtype=dtype.as_numpy_dtype)]
@@ -236,11 +236,6 @@ class LAMBOptimizerTest(test_util.TensorFlowTestCase):
             self.assertAllClose(clipped_grad[0], [2**0.5 / 2, 2**0.5 / 2])
 
     def test_clip_value(self):
-        '''ResourceApplyLAMB is a DPCPP op, don't have cpu registration 
-            TODO: waiting for CPU registration of ResourceApplyLAMB then enable
-            this test case on CPU'''
-        if not test.is_gpu_available():
-            self.skipTest("No GPU available")
         for dtype in DATA_TYPES: 
             optimizer = itex_LAMB(clipvalue=1)
             grad = [np.array([100.0, 100.0], dtype=dtype.as_numpy_dtype)]
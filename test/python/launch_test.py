@@ -0,0 +1,133 @@
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for the core assignment and autotune of the multi-instance launcher."""
+
+import json
+import os
+import tempfile
+
+from intel_extension_for_tensorflow.python import launch
+from intel_extension_for_tensorflow.python.test_func import test_util
+from intel_extension_for_tensorflow.python.test_func import test
+
+
+def _fake_cpuinfo():
+  # 2 NUMA nodes with 4 physical cores each, hyper threading is on.
+  cpuinfo = []
+  for thread in range(2):
+    for core in range(8):
+      cpuinfo.append([str(thread * 8 + core), str(core), str(core // 4),
+                      str(core // 4)])
+  return launch.CPUinfo(cpuinfo)
+
+
+class LaunchTest(test_util.TensorFlowTestCase):
+
+  def _plan(self, argv):
+    args = launch.build_parser().parse_args(argv + ["infer.py"])
+    return launch.MultiInstanceLauncher(_fake_cpuinfo()).plan(args)
+
+  def testParseCpuList(self):
+    self.assertEqual(launch.parse_cpu_list("0-3,8,10-11\n"),
+                     [0, 1, 2, 3, 8, 10, 11])
+
+  def testCPUinfo(self):
+    cpuinfo = _fake_cpuinfo()
+    self.assertEqual(cpuinfo.node_nums(), 2)
+    self.assertEqual(cpuinfo.get_node_physical_cores(1), [4, 5, 6, 7])
+    self.assertEqual(cpuinfo.get_node_logical_cores(0),
+                     [0, 1, 2, 3, 8, 9, 10, 11])
+
+  def testPlanInstances(self):
+    instances = self._plan(["--ninstances", "4"])
+    self.assertEqual([i["cores"] for i in instances],
+                     [[0, 1], [2, 3], [4, 5], [6, 7]])
+    self.assertEqual([i["numa_nodes"] for i in instances],
+                     [[0], [0], [1], [1]])
+
+  def testPlanSkipCrossNodeCores(self):
+    instances = self._plan(["--ncore_per_instance", "3",
+                            "--skip_cross_node_cores"])
+    self.assertEqual([i["cores"] for i in instances], [[0, 1, 2], [4, 5, 6]])
+
+  def testPlanInstanceIdx(self):
+    instances = self._plan(["--ncore_per_instance", "2",
+                            "--instance_idx", "2"])
+    self.assertEqual(instances,
+                     [{"instance_idx": 2, "cores": [4, 5], "numa_nodes": [1]}])
+
+  def testDryRun(self):
+    instances = launch.launch("infer.py", dry_run=True, ninstances=1)
+    self.assertEqual(len(instances), 1)
+    self.assertNotIn("command", instances[0])
+    with self.assertRaises(TypeError):
+      launch.launch("infer.py", dry_run=True, num_instances=1)
+
+  def _tuner(self, argv):
+    args = launch.build_parser().parse_args(argv + ["--autotune", "infer.py"])
+    return launch.AutoTuner(args, _fake_cpuinfo())
+
+  def _write_log(self, content):
+    fd, path = tempfile.mkstemp(dir=self.get_temp_dir(), suffix=".log")
+    with os.fdopen(fd, "w") as f:
+      f.write(content)
+    return path
+
+  def testAutotuneCandidates(self):
+    tuner = self._tuner([])
+    self.assertEqual(tuner.ncore_candidates(), [4, 8])
+    self.assertEqual(tuner.interop_candidates(4), ["1", "2", "4"])
+    self.assertEqual(tuner.interop_candidates(6), ["1", "2"])
+    self.assertEqual(tuner.allocator_candidates()[-1], "default")
+    tuner = self._tuner(["--ncore_per_instance", "2", "--enable_jemalloc"])
+    self.assertEqual(tuner.ncore_candidates(), [2])
+    self.assertEqual(tuner.allocator_candidates(), ["jemalloc"])
+
+  def testAutotuneParseMetric(self):
+    logs = [self._write_log("Throughput: 10 img/s\nThroughput: 12.5 img/s\n"),
+            self._write_log("warmup\nthroughput = 20 img/s\n")]
+    self.assertEqual(self._tuner([]).parse_metric(logs), 32.5)
+
+    tuner = self._tuner(["--autotune_metric_mode", "latency",
+                         "--autotune_metric_regex", r"latency: (\d+) ms"])
+    logs = [self._write_log("latency: 10 ms\n"),
+            self._write_log("latency: 20 ms\n")]
+    self.assertEqual(tuner.parse_metric(logs), 15)
+    logs.append(self._write_log("Traceback\n"))
+    self.assertIsNone(tuner.parse_metric(logs))
+
+  def testAutotuneBest(self):
+    tuner = self._tuner(["--autotune_metric_mode", "latency"])
+    tuner.results = [{"status": "ok", "metric": 20.0},
+                     {"status": "pruned", "metric": None},
+                     {"status": "ok", "metric": 10.0}]
+    self.assertEqual(tuner.best(), tuner.results[2])
+
+  def testReplayLaunchConfig(self):
+    path = self._write_log(json.dumps({"knobs": {
+        "ncore_per_instance": 2, "ninstances": 4,
+        "tf_num_interop_threads": "2", "enable_jemalloc": True}}))
+    args = launch.build_parser().parse_args(
+        ["--launch_config", path, "infer.py"])
+    launch.load_launch_config(args)
+    self.assertEqual(args.ncore_per_instance, 2)
+    self.assertEqual(args.tf_num_interop_threads, "2")
+    self.assertTrue(args.enable_jemalloc)
+    instances = launch.MultiInstanceLauncher(_fake_cpuinfo()).plan(args)
+    self.assertEqual(len(instances), 4)
+
+
+if __name__ == "__main__":
+  test.main()
@@ -0,0 +1,60 @@
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for the lazy, cached op wrappers of ITEX."""
+
+import os
+import tempfile
+
+# The cache directory is read when the wrappers are first loaded.
+_CACHE_DIR = tempfile.mkdtemp(prefix="itex_op_wrappers_")
+os.environ["ITEX_OP_WRAPPER_CACHE_DIR"] = _CACHE_DIR
+
+import intel_extension_for_tensorflow as itex  # pylint: disable=unused-import
+
+from intel_extension_for_tensorflow.python._pywrap_itex import ITEX_GetRegisteredOpList
+from intel_extension_for_tensorflow.python.ops import load_ops_library as lib
+from intel_extension_for_tensorflow.python.test_func import test_util
+from tensorflow.core.framework import op_def_pb2
+from tensorflow.python.platform import test
+
+
+class LoadOpsLibraryTest(test_util.TensorFlowTestCase):
+
+  def testRegisteredOpsOnly(self):
+    op_list = op_def_pb2.OpList()
+    op_list.ParseFromString(ITEX_GetRegisteredOpList())
+    names = [op.name for op in op_list.op]
+    self.assertIn("ItexRmsNorm", names)
+    self.assertNotIn("MatMul", names)
+
+  def testLazyLoadAndCache(self):
+    self.assertNotIn("itex_rms_norm", lib.load_ops_library.__dict__)
+    self.assertTrue(callable(lib.load_ops_library.itex_rms_norm))
+    self.assertIn("itex_rms_norm", lib.load_ops_library.__dict__)
+    self.assertTrue(
+        any(f.endswith(".bin") for f in os.listdir(_CACHE_DIR)))
+
+    # The cached code object generates the same wrappers.
+    module_name, code = lib._compile_op_wrappers(ITEX_GetRegisteredOpList())
+    namespace = {"__name__": module_name}
+    exec(code, namespace)  # pylint: disable=exec-used
+    self.assertIn("itex_rms_norm", namespace)
+
+  def testFallbackToAllOps(self):
+    self.assertTrue(callable(lib.load_ops_library._MklLayerNorm))  # pylint: disable=protected-access
+
+
+if __name__ == "__main__":
+  test.main()
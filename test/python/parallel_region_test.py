@@ -0,0 +1,163 @@
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for the CPU thread pool backend and parallel region counters."""
+
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import tensorflow as tf
+import intel_extension_for_tensorflow as itex
+
+from intel_extension_for_tensorflow.python.ops.multi_head_attention import scaled_dot_product_attention
+from intel_extension_for_tensorflow.python.test_func import test_util
+from tensorflow.python.platform import test
+
+# Runs attention in a fresh interpreter with ITEX_HYBRID_THREADPOOL=1, and
+# prints the hybrid thread pool stats of each step as JSON.
+_HYBRID_THREADPOOL = """
+import json
+import numpy as np
+import tensorflow as tf
+import intel_extension_for_tensorflow as itex
+from intel_extension_for_tensorflow.python.ops.multi_head_attention import scaled_dot_product_attention
+
+def inputs(shape):
+  np.random.seed(0)
+  return [tf.constant(np.random.rand(*shape).astype(np.float32))
+          for _ in range(3)]
+
+def attention(q, k, v):
+  return scaled_dot_product_attention(q, k, v, is_training=False)
+
+def run(f):
+  itex.reset_parallel_region_stats()
+  f()
+  return itex.get_hybrid_threadpool_stats()
+
+small = inputs((2, 4, 8, 16))
+large = inputs((4, 8, 64, 64))
+
+@tf.function
+def concurrent_attention():
+  q, k, v = large
+  return [attention(q * (i + 1), k, v) for i in range(8)]
+
+stats = {"small": run(lambda: attention(*small)),
+         "large": run(lambda: attention(*large))}
+outputs = concurrent_attention()
+for _ in range(20):
+  stats["concurrent"] = run(concurrent_attention)
+  if stats["concurrent"]["partitioned"] > 0:
+    break
+
+config = itex.ConfigProto()
+config.runtime_options.hybrid_threadpool = itex.OFF
+itex.set_config(config)
+stats["off"] = run(lambda: attention(*small))
+expected = [o.numpy() for o in concurrent_attention()]
+for output, reference in zip(outputs, expected):
+  np.testing.assert_allclose(output, reference, rtol=1e-5, atol=1e-5)
+
+config.runtime_options.hybrid_threadpool = itex.ON
+itex.set_config(config)
+stats["on"] = run(lambda: attention(*small))
+print(json.dumps(stats))
+"""
+
+
+class ParallelRegionTest(test_util.TensorFlowTestCase):
+  """Test parallel region counters and switching the thread pool."""
+
+  def setUp(self):
+    super().setUp()
+    if itex.get_backend() != b"CPU":
+      self.skipTest("Parallel regions are only counted on CPU.")
+    self._config = itex.get_config()
+
+  def tearDown(self):
+    itex.set_config(self._config)
+    super().tearDown()
+
+  def _attention(self):
+    np.random.seed(0)
+    q, k, v = [tf.constant(np.random.rand(2, 4, 8, 16).astype(np.float32))
+               for _ in range(3)]
+    return scaled_dot_product_attention(q, k, v, is_training=False)
+
+  def testResetStats(self):
+    self._attention()
+    itex.reset_parallel_region_stats()
+    self.assertEqual(itex.get_parallel_region_stats(), {})
+
+  def testCountPerOpType(self):
+    itex.reset_parallel_region_stats()
+    self._attention()
+    stats = itex.get_parallel_region_stats()
+    self.assertGreater(stats.get("ScaledDotProductAttentionInference", 0), 0)
+
+  def testSwitchThreadPoolAtRuntime(self):
+    expected = self._attention()
+    for omp_threadpool in [itex.OFF, itex.ON]:
+      config = itex.ConfigProto()
+      config.runtime_options.omp_threadpool = omp_threadpool
+      itex.set_config(config)
+      itex.reset_parallel_region_stats()
+      self.assertAllClose(self._attention(), expected)
+      self.assertIn("ScaledDotProductAttentionInference",
+                    itex.get_parallel_region_stats())
+
+  def testHybridThreadPoolNeedsEnv(self):
+    if os.environ.get("ITEX_HYBRID_THREADPOOL") == "1":
+      self.skipTest("ITEX_HYBRID_THREADPOOL is set.")
+    # The inter-op threads were pinned when ITEX was loaded, so the runtime
+    # option falls back to OpenMP.
+    expected = self._attention()
+    config = itex.ConfigProto()
+    config.runtime_options.hybrid_threadpool = itex.ON
+    itex.set_config(config)
+    itex.reset_parallel_region_stats()
+    self.assertAllClose(self._attention(), expected)
+    self.assertEqual(itex.get_hybrid_threadpool_stats(),
+                     {"omp": 0, "eigen": 0, "partitioned": 0})
+
+  def testHybridThreadPool(self):
+    env = dict(os.environ, ITEX_HYBRID_THREADPOOL="1")
+    env.pop("ITEX_HYBRID_OMP_MIN_COST", None)
+    result = subprocess.run(
+        [sys.executable, "-c", _HYBRID_THREADPOOL], env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False,
+        universal_newlines=True)
+    self.assertEqual(result.returncode, 0, result.stderr)
+    stats = json.loads(result.stdout.splitlines()[-1])
+
+    # Cheap regions run on Eigen, expensive ones on OpenMP with all the
+    # threads when alone.
+    self.assertGreater(stats["small"]["eigen"], 0)
+    self.assertEqual(stats["small"]["omp"], 0)
+    self.assertGreater(stats["large"]["omp"], 0)
+    self.assertEqual(stats["large"]["partitioned"], 0)
+    # Concurrent expensive regions share the OpenMP threads.
+    if (os.cpu_count() or 1) > 1:
+      self.assertGreater(stats["concurrent"]["partitioned"], 0)
+    # The runtime option switches back and forth.
+    self.assertEqual(stats["off"], {"omp": 0, "eigen": 0, "partitioned": 0})
+    self.assertGreater(stats["on"]["eigen"], 0)
+
+
+if __name__ == "__main__":
+  test.main()
@@ -0,0 +1,112 @@
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for the multi-shape oneDNN primitive cache."""
+
+import numpy as np
+import tensorflow as tf
+import intel_extension_for_tensorflow as itex
+
+from intel_extension_for_tensorflow.python.ops.load_ops_library import load_ops_library
+from intel_extension_for_tensorflow.python.test_func import test_util
+from tensorflow.python.framework import dtypes
+from tensorflow.python.ops import array_ops
+from tensorflow.python.platform import test
+
+
+class PrimitiveCacheTest(test_util.TensorFlowTestCase):
+  """Test primitive cache counters exposed to Python."""
+
+  def testStatsKeys(self):
+    stats = itex.get_primitive_cache_stats()
+    for key in ["hits", "misses", "evictions", "capacity"]:
+      self.assertIn(key, stats)
+      self.assertGreaterEqual(stats[key], 0)
+
+  def testAlternatingShapesHitCache(self):
+    if itex.get_primitive_cache_stats()["capacity"] < 2:
+      self.skipTest("Primitive cache capacity is less than 2.")
+
+    weights = tf.constant(np.random.rand(16, 8).astype(np.float32))
+
+    # One trace for all the batch sizes, so a single kernel sees both shapes.
+    @tf.function(input_signature=[tf.TensorSpec([None, 16], tf.float32)])
+    def matmul(x):
+      return tf.matmul(x, weights)
+
+    inputs = [np.random.rand(batch, 16).astype(np.float32)
+              for batch in [1, 4]]
+    # Warm up both shapes, then alternate between them.
+    for x in inputs:
+      matmul(tf.constant(x))
+    itex.reset_primitive_cache_stats()
+    for _ in range(3):
+      for x in inputs:
+        self.assertAllClose(matmul(tf.constant(x)), np.matmul(x, weights))
+
+    stats = itex.get_primitive_cache_stats()
+    self.assertGreaterEqual(stats["hits"], 6)
+    self.assertEqual(stats["evictions"], 0)
+
+  def testQuantizedConvScalesChange(self):
+    """Output scales are execution arguments, not part of the primitive."""
+    if itex.get_primitive_cache_stats()["capacity"] < 1:
+      self.skipTest("Primitive cache is disabled.")
+
+    x = tf.constant(
+        np.random.uniform(-5.0, 5.0, size=(1, 6, 6, 4)).astype(np.float32))
+    bias = tf.constant(np.random.uniform(-1.0, 1.0, size=4).astype(np.float32))
+
+    @tf.function(input_signature=[tf.TensorSpec([3, 3, 4, 4], tf.float32)])
+    def conv(y):
+      x_int8, x_min, x_max = array_ops.quantize(
+          x, tf.math.reduce_min(x), tf.math.reduce_max(x), T=dtypes.qint8,
+          mode="SCALED", round_mode="HALF_TO_EVEN", narrow_range=True)
+      # The filter range, so the output scales, change with `y`.
+      y_int8, y_min, y_max = array_ops.quantize(
+          y, tf.math.reduce_min(y, axis=(0, 1, 2)),
+          tf.math.reduce_max(y, axis=(0, 1, 2)), T=dtypes.qint8,
+          mode="SCALED", round_mode="HALF_TO_EVEN", narrow_range=True, axis=3)
+      expected = tf.nn.bias_add(
+          tf.nn.conv2d(x, y, [1, 1, 1, 1], padding="SAME"), bias)
+      z_int8, z_min, z_max = (
+          load_ops_library.QuantizedConv2DWithBiasAndRequantize(
+              input=x_int8, filter=y_int8, bias=bias, min_input=x_min,
+              max_input=x_max, min_filter=y_min, max_filter=y_max,
+              min_freezed_output=tf.math.reduce_min(expected),
+              max_freezed_output=tf.math.reduce_max(expected),
+              strides=[1, 1, 1, 1], padding="SAME", out_type=dtypes.qint8))
+      actual = array_ops.dequantize(z_int8, z_min, z_max, mode="SCALED",
+                                    narrow_range=True)
+      return actual, expected
+
+    y = np.random.uniform(-2.0, 2.0, size=(3, 3, 4, 4)).astype(np.float32)
+    conv(tf.constant(y))
+    itex.reset_primitive_cache_stats()
+    for factor in [0.25, 4.0]:
+      actual, expected = conv(tf.constant(y * factor))
+      # int8 test tolerate larger difference
+      self.assertAllClose(actual, expected, rtol=0.3, atol=0.3 * factor)
+    self.assertGreaterEqual(itex.get_primitive_cache_stats()["hits"], 2)
+
+  def testResetStats(self):
+    itex.reset_primitive_cache_stats()
+    stats = itex.get_primitive_cache_stats()
+    self.assertEqual(stats["hits"], 0)
+    self.assertEqual(stats["misses"], 0)
+    self.assertEqual(stats["evictions"], 0)
+
+
+if __name__ == "__main__":
+  test.main()
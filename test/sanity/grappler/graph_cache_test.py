@@ -0,0 +1,142 @@
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for the on-disk cache of optimized graphs."""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# ITEX_GRAPH_CACHE_DIR is read when the first graph is optimized. The graph
+# reports tell whether a graph was loaded from the cache.
+_CACHE_DIR = tempfile.mkdtemp(prefix="itex_graph_cache_")
+os.environ["ITEX_GRAPH_CACHE_DIR"] = _CACHE_DIR
+_REPORT_DIR = tempfile.mkdtemp(prefix="itex_graph_report_")
+os.environ["ITEX_GRAPH_REPORT_DIR"] = _REPORT_DIR
+
+import numpy as np
+
+from intel_extension_for_tensorflow.python.test_func import test_util
+from intel_extension_for_tensorflow.python.test_func import test
+
+from tensorflow.python.eager import def_function
+from tensorflow.python.framework import constant_op
+from tensorflow.python.framework import dtypes
+from tensorflow.python.ops import math_ops
+from tensorflow.python.ops import nn
+
+# Runs a MatMul with oneDNN Graph in a fresh process, and prints its result
+# and the number of graphs loaded from the cache.
+_ONEDNN_GRAPH_MODEL = """
+import json
+import os
+import numpy as np
+import tensorflow as tf
+import intel_extension_for_tensorflow
+
+rng = np.random.RandomState(0)
+x = tf.constant(rng.rand(4, 8).astype(np.float32))
+w = tf.constant(rng.rand(8, 16).astype(np.float32))
+b = tf.constant(rng.rand(16).astype(np.float32))
+
+@tf.function
+def model(x):
+  return tf.nn.relu(tf.nn.bias_add(tf.matmul(x, w), b))
+
+y = model(x).numpy()
+report_dir = os.environ["ITEX_GRAPH_REPORT_DIR"]
+hits = 0
+for name in os.listdir(report_dir):
+  with open(os.path.join(report_dir, name)) as f:
+    hits += json.load(f)["cache_hit"]
+print(json.dumps({"y": y.tolist(), "hits": hits}))
+"""
+
+
+class GraphCacheTest(test_util.TensorFlowTestCase):
+
+  def _cached_graphs(self):
+    return [f for f in os.listdir(_CACHE_DIR) if f.endswith(".pb")]
+
+  def _run_and_count_hits(self, fn, x, expected):
+    """Runs `fn` and returns the number of graphs loaded from the cache."""
+    before = set(os.listdir(_REPORT_DIR))
+    self.assertAllClose(expected, self.evaluate(fn(x)), rtol=1e-5)
+    hits = 0
+    for name in set(os.listdir(_REPORT_DIR)) - before:
+      with open(os.path.join(_REPORT_DIR, name)) as f:
+        hits += json.load(f)["cache_hit"]
+    return hits
+
+  def testOptimizedGraphIsCached(self):
+    x = np.random.rand(4, 8).astype(np.float32)
+    w = np.random.rand(8, 16).astype(np.float32)
+    b = np.random.rand(16).astype(np.float32)
+
+    def model(x):
+      y = math_ops.matmul(x, constant_op.constant(w))
+      y = nn.bias_add(y, constant_op.constant(b))
+      return nn.relu(y)
+
+    expected = np.maximum(np.matmul(x, w) + b, 0)
+
+    x = constant_op.constant(x, dtype=dtypes.float32)
+    first = def_function.function(model)
+    self.assertEqual(
+        0, self._run_and_count_hits(first, x, expected))
+    self.assertNotEmpty(self._cached_graphs())
+
+    # The same graph traced again is loaded from the cache.
+    second = def_function.function(model)
+    self.assertGreater(self._run_and_count_hits(second, x, expected), 0)
+    self.assertEqual(
+        [f for f in os.listdir(_CACHE_DIR) if ".tmp." in f], [])
+
+    # An environment variable changing the optimization changes the key.
+    os.environ["ITEX_AUTO_MIXED_PRECISION_DATA_TYPE"] = "FLOAT16"
+    try:
+      third = def_function.function(model)
+      self.assertEqual(0, self._run_and_count_hits(third, x, expected))
+    finally:
+      del os.environ["ITEX_AUTO_MIXED_PRECISION_DATA_TYPE"]
+
+  def testOneDnnGraphIsNotCached(self):
+    # OneDnnGraph nodes refer to partitions kept in the memory of the process
+    # which optimized the graph, so a second process must optimize it again.
+    cache_dir = tempfile.mkdtemp(prefix="itex_onednn_graph_cache_")
+    results = []
+    for _ in range(2):
+      env = dict(os.environ,
+                 ITEX_GRAPH_CACHE_DIR=cache_dir,
+                 ITEX_GRAPH_REPORT_DIR=tempfile.mkdtemp(
+                     prefix="itex_graph_report_"),
+                 ITEX_ONEDNN_GRAPH="1",
+                 _ITEX_ONEDNN_GRAPH_ALL_TYPE="1")
+      process = subprocess.run(
+          [sys.executable, "-c", _ONEDNN_GRAPH_MODEL], env=env,
+          stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False,
+          universal_newlines=True)
+      self.assertEqual(process.returncode, 0, process.stderr)
+      results.append(json.loads(process.stdout.splitlines()[-1]))
+
+    self.assertEqual([r["hits"] for r in results], [0, 0])
+    self.assertAllClose(results[0]["y"], results[1]["y"])
+    self.assertEqual(
+        [f for f in os.listdir(cache_dir) if f.endswith(".pb")], [])
+
+
+if __name__ == "__main__":
+  test.main()
@@ -0,0 +1,77 @@
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for the graph optimization report."""
+
+import json
+import os
+import tempfile
+
+# ITEX_GRAPH_REPORT_DIR is read when the first graph is optimized.
+_REPORT_DIR = tempfile.mkdtemp(prefix="itex_graph_report_")
+os.environ["ITEX_GRAPH_REPORT_DIR"] = _REPORT_DIR
+
+import numpy as np
+
+from intel_extension_for_tensorflow.python.test_func import test_util
+from intel_extension_for_tensorflow.python.test_func import test
+
+from tensorflow.python.eager import def_function
+from tensorflow.python.framework import constant_op
+from tensorflow.python.framework import dtypes
+from tensorflow.python.ops import math_ops
+from tensorflow.python.ops import nn
+
+
+class GraphReportTest(test_util.TensorFlowTestCase):
+
+  def _reports(self):
+    reports = []
+    for name in sorted(os.listdir(_REPORT_DIR)):
+      with open(os.path.join(_REPORT_DIR, name)) as f:
+        reports.append(json.load(f))
+    return reports
+
+  def testReportPassesAndFusions(self):
+    x = np.random.rand(4, 8).astype(np.float32)
+    w = np.random.rand(8, 16).astype(np.float32)
+    b = np.random.rand(16).astype(np.float32)
+
+    def model(x):
+      y = math_ops.matmul(x, constant_op.constant(w))
+      y = nn.bias_add(y, constant_op.constant(b))
+      return nn.relu(y)
+
+    expected = np.maximum(np.matmul(x, w) + b, 0)
+    x = constant_op.constant(x, dtype=dtypes.float32)
+    self.assertAllClose(expected, self.evaluate(def_function.function(model)(x)),
+                        rtol=1e-5)
+
+    reports = [r for r in self._reports()
+               if any(p["name"].startswith("remapper") for p in r["passes"])]
+    self.assertNotEmpty(reports)
+    report = reports[-1]
+    pass_names = [p["name"] for p in report["passes"]]
+    for name in ["generic_layout", "native_layout", "memory_opt"]:
+      self.assertIn(name, pass_names)
+    for p in report["passes"]:
+      self.assertGreaterEqual(p["time_us"], 0)
+    self.assertEqual(report["nodes_after"], report["passes"][-1]["nodes_after"])
+    # MatMul + BiasAdd + Relu is fused, so nothing is left on the MatMul.
+    self.assertGreater(sum(f["hits"] for f in report["fusions"]), 0)
+    self.assertEqual(report["unfused_ops"], [])
+
+
+if __name__ == "__main__":
+  test.main()
@@ -0,0 +1,129 @@
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for the dispatch of remapper fusions by root op."""
+
+import json
+import os
+import tempfile
+
+# ITEX_GRAPH_REPORT_DIR is read when the first graph is optimized. The report
+# has the calls and hits of every fusion tried by the remapper.
+_REPORT_DIR = tempfile.mkdtemp(prefix="itex_remapper_dispatch_")
+os.environ["ITEX_GRAPH_REPORT_DIR"] = _REPORT_DIR
+
+import numpy as np
+
+from intel_extension_for_tensorflow.python.test_func import test_util
+from intel_extension_for_tensorflow.python.test_func import test
+
+from tensorflow.core.protobuf import config_pb2
+from tensorflow.core.protobuf import rewriter_config_pb2
+from tensorflow.python.client import session
+from tensorflow.python.framework import constant_op
+from tensorflow.python.framework import dtypes
+from tensorflow.python.ops import array_ops
+from tensorflow.python.ops import math_ops
+from tensorflow.python.ops import nn
+
+# Legacy fusions whose root op isn't in the graph of the test, so their
+# matchers are never called.
+_UNDISPATCHED_FUSIONS = [
+    "Dropout",
+    "FusedTrainingOp",
+    "PadWithTransposeConv",
+    "ResNeXtGroupConv2DBlock",
+    "StridedSliceGrad",
+]
+
+
+def _get_config():
+  rewrite_config = rewriter_config_pb2.RewriterConfig()
+  rewrite_config.min_graph_nodes = -1
+  graph_options = config_pb2.GraphOptions(rewrite_options=rewrite_config)
+  return config_pb2.ConfigProto(graph_options=graph_options)
+
+
+class RemapperDispatchTest(test_util.TensorFlowTestCase):
+
+  def _fusion_stats(self, fusion):
+    """Returns the fusions of the last report in which `fusion` matched."""
+    reports = []
+    for name in sorted(os.listdir(_REPORT_DIR)):
+      with open(os.path.join(_REPORT_DIR, name)) as f:
+        reports.append(json.load(f))
+    stats = [{f["name"]: f for f in r["fusions"]} for r in reports]
+    stats = [s for s in stats if s.get(fusion, {}).get("hits", 0) > 0]
+    self.assertNotEmpty(stats, "no graph is fused by " + fusion)
+    return stats[-1]
+
+  def _find_fused_node(self, graph, op, fused_ops):
+    for node in graph.node:
+      if op in node.op:
+        self.assertEqual(
+            [s.decode("utf-8") for s in node.attr["fused_ops"].list.s],
+            fused_ops)
+        return
+    self.fail("can not find " + op)
+
+  @test_util.run_deprecated_v1
+  def testDispatchContractionFusions(self):
+    x_np = np.random.rand(1, 8, 8, 4).astype(np.float32)
+    filter_np = np.random.rand(3, 3, 4, 8).astype(np.float32)
+    conv_bias_np = np.random.rand(8).astype(np.float32)
+    y_np = np.random.rand(4, 16).astype(np.float32)
+    weight_np = np.random.rand(16, 32).astype(np.float32)
+    matmul_bias_np = np.random.rand(32).astype(np.float32)
+
+    expected_conv = self.evaluate(nn.relu(nn.bias_add(
+        nn.conv2d(x_np, filter_np, [1, 1, 1, 1], padding="SAME"),
+        conv_bias_np)))
+
+    x = array_ops.placeholder(dtypes.float32, shape=x_np.shape)
+    conv = nn.conv2d(x, constant_op.constant(filter_np), [1, 1, 1, 1],
+                     padding="SAME")
+    conv = nn.relu(nn.bias_add(conv, constant_op.constant(conv_bias_np)))
+    conv = array_ops.identity(conv)
+
+    y = array_ops.placeholder(dtypes.float32, shape=y_np.shape)
+    matmul = math_ops.matmul(y, constant_op.constant(weight_np))
+    matmul = nn.bias_add(matmul, constant_op.constant(matmul_bias_np))
+    matmul = array_ops.identity(matmul)
+
+    run_options = config_pb2.RunOptions(output_partition_graphs=True)
+    metadata = config_pb2.RunMetadata()
+    with session.Session(config=_get_config()) as sess:
+      conv_val, matmul_val = sess.run(
+          [conv, matmul], feed_dict={x: x_np, y: y_np}, options=run_options,
+          run_metadata=metadata)
+
+    expected_matmul = np.matmul(y_np, weight_np) + matmul_bias_np
+    self.assertAllClose(expected_conv, conv_val, rtol=1e-5, atol=1e-5)
+    self.assertAllClose(expected_matmul, matmul_val, rtol=1e-5, atol=1e-5)
+
+    # Same fusions as before the dispatcher.
+    graph = metadata.partition_graphs[0]
+    self._find_fused_node(graph, "FusedConv2D", ["BiasAdd", "Relu"])
+    self._find_fused_node(graph, "FusedMatMul", ["BiasAdd"])
+
+    # The dispatcher picks the expected fusion for each root op, and doesn't
+    # call the matchers of root ops the graph doesn't have.
+    stats = self._fusion_stats("ContractionWithBiasAndActivation")
+    self.assertGreaterEqual(stats["ContractionWithBias"]["hits"], 1)
+    for fusion in _UNDISPATCHED_FUSIONS:
+      self.assertNotIn(fusion, stats)
+
+
+if __name__ == "__main__":
+  test.main()
@@ -0,0 +1,121 @@
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for the RMSNorm fusion of the remapper."""
+
+import numpy as np
+
+from intel_extension_for_tensorflow.python.test_func import test_util
+from intel_extension_for_tensorflow.python.test_func import test
+
+from tensorflow.core.protobuf import config_pb2
+from tensorflow.python.framework import dtypes
+from tensorflow.python.ops import array_ops
+from tensorflow.python.ops import math_ops
+from tensorflow.python.ops import variables
+
+_EPSILON = 1e-6
+
+
+def _rms_norm_numpy(x, gamma):
+  variance = np.mean(np.square(x), axis=-1, keepdims=True)
+  return x / np.sqrt(variance + _EPSILON) * gamma
+
+
+class RmsNormPatternTest(test_util.TensorFlowTestCase):
+
+  def _run(self, model, dtype):
+    run_options = config_pb2.RunOptions(output_partition_graphs=True)
+    metadata = config_pb2.RunMetadata()
+    x_np = np.random.uniform(-1, 1, (4, 3, 64)).astype(np.float32)
+    gamma_np = np.random.uniform(0.5, 1.5, (64,)).astype(np.float32)
+    x = math_ops.cast(variables.Variable(x_np), dtype)
+    gamma = variables.Variable(gamma_np)
+    output = array_ops.identity(model(x, gamma))
+
+    with self.session() as sess:
+      sess.run(variables.global_variables_initializer())
+      output_val, x_val = sess.run([output, x], options=run_options,
+                                   run_metadata=metadata)
+
+    expected = _rms_norm_numpy(np.asarray(x_val, np.float32), gamma_np)
+    tol = 1e-5 if dtype == dtypes.float32 else 2e-2
+    self.assertAllClose(expected, np.asarray(output_val, np.float32),
+                        rtol=tol, atol=tol)
+    return [node.op for node in metadata.partition_graphs[0].node]
+
+  @test_util.run_deprecated_v1
+  @test_util.disable_xla('This test does not pass with XLA')
+  def testRmsNorm(self):
+    def model(x, gamma):
+      variance = math_ops.reduce_mean(math_ops.square(x), axis=-1,
+                                      keepdims=True)
+      return x * math_ops.rsqrt(variance + _EPSILON) * gamma
+
+    ops = self._run(model, dtypes.float32)
+    self.assertIn("ItexRmsNorm", ops)
+    self.assertNotIn("Rsqrt", ops)
+
+  @test_util.run_deprecated_v1
+  @test_util.disable_xla('This test does not pass with XLA')
+  def testRmsNormWithCast(self):
+    # HF LLaMA: computes in float and casts back before the scale.
+    def model(x, gamma):
+      x_f = math_ops.cast(x, dtypes.float32)
+      variance = math_ops.reduce_mean(math_ops.square(x_f), axis=-1,
+                                      keepdims=True)
+      normalized = x_f * math_ops.rsqrt(variance + _EPSILON)
+      return math_ops.cast(gamma, x.dtype) * math_ops.cast(normalized, x.dtype)
+
+    ops = self._run(model, dtypes.bfloat16)
+    self.assertIn("ItexRmsNorm", ops)
+    self.assertNotIn("Rsqrt", ops)
+
+  @test_util.run_deprecated_v1
+  @test_util.disable_xla('This test does not pass with XLA')
+  def testRmsNormWithCastAfterScale(self):
+    def model(x, gamma):
+      x_f = math_ops.cast(x, dtypes.float32)
+      variance = math_ops.reduce_mean(math_ops.square(x_f), axis=-1,
+                                      keepdims=True)
+      normalized = x_f * math_ops.rsqrt(variance + _EPSILON)
+      return math_ops.cast(normalized * gamma, x.dtype)
+
+    ops = self._run(model, dtypes.bfloat16)
+    self.assertIn("ItexRmsNorm", ops)
+    self.assertNotIn("Rsqrt", ops)
+
+  @test_util.run_deprecated_v1
+  @test_util.disable_xla('This test does not pass with XLA')
+  def testNotLastAxis(self):
+    def model(x, gamma):
+      variance = math_ops.reduce_mean(math_ops.square(x), axis=1,
+                                      keepdims=True)
+      return x * math_ops.rsqrt(variance + _EPSILON) * gamma
+
+    run_options = config_pb2.RunOptions(output_partition_graphs=True)
+    metadata = config_pb2.RunMetadata()
+    x = variables.Variable(np.random.uniform(-1, 1, (4, 3, 64)),
+                           dtype=dtypes.float32)
+    gamma = variables.Variable(np.ones((64,)), dtype=dtypes.float32)
+    output = array_ops.identity(model(x, gamma))
+    with self.session() as sess:
+      sess.run(variables.global_variables_initializer())
+      sess.run(output, options=run_options, run_metadata=metadata)
+    ops = [node.op for node in metadata.partition_graphs[0].node]
+    self.assertNotIn("ItexRmsNorm", ops)
+
+
+if __name__ == "__main__":
+  test.main()
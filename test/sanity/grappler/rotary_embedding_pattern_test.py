@@ -0,0 +1,76 @@
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for the rotary embedding fusion of the remapper."""
+
+import numpy as np
+
+from intel_extension_for_tensorflow.python.ops.rotary_embedding import apply_rotary_pos_emb
+from intel_extension_for_tensorflow.python.test_func import test_util
+from intel_extension_for_tensorflow.python.test_func import test
+
+from tensorflow.core.protobuf import config_pb2
+from tensorflow.python.framework import constant_op
+from tensorflow.python.ops import array_ops
+from tensorflow.python.ops import variables
+
+
+def _rotary_numpy(x, sin, cos):
+  rotated = np.stack((-x[..., 1::2], x[..., ::2]), axis=-1).reshape(x.shape)
+  return x * cos + rotated * sin
+
+
+class RotaryEmbeddingPatternTest(test_util.TensorFlowTestCase):
+
+  def _testRotaryEmbedding(self, x_shape, sin_batch):
+    run_options = config_pb2.RunOptions(output_partition_graphs=True)
+    metadata = config_pb2.RunMetadata()
+    # x is [batch, length, num_heads, rotary_dim], sin and cos are
+    # [batch or 1, length, 1, rotary_dim].
+    x_np = np.random.uniform(-1, 1, x_shape).astype(np.float32)
+    angle = np.random.uniform(
+        0, np.pi, (sin_batch, x_shape[1], 1, x_shape[3])).astype(np.float32)
+    x = variables.Variable(x_np)
+    sin = constant_op.constant(np.sin(angle))
+    cos = constant_op.constant(np.cos(angle))
+    output = array_ops.identity(apply_rotary_pos_emb(x, sin, cos))
+
+    expected = _rotary_numpy(x_np, np.sin(angle), np.cos(angle))
+    with self.session() as sess:
+      sess.run(variables.global_variables_initializer())
+      # The second run fails if the first one rotated the variable in place.
+      for _ in range(2):
+        output_val = sess.run(output, options=run_options,
+                              run_metadata=metadata)
+        self.assertAllClose(expected, output_val, rtol=1e-5, atol=1e-5)
+      self.assertAllEqual(x_np, sess.run(x))
+
+    ops = [node.op for node in metadata.partition_graphs[0].node]
+    self.assertIn("QKRotaryPositionalEmbedding", ops)
+    self.assertNotIn("StridedSlice", ops)
+
+  @test_util.run_deprecated_v1
+  @test_util.disable_xla('This test does not pass with XLA')
+  def testRotaryEmbedding(self):
+    self._testRotaryEmbedding((2, 5, 4, 8), sin_batch=2)
+
+  @test_util.run_deprecated_v1
+  @test_util.disable_xla('This test does not pass with XLA')
+  def testRotaryEmbeddingBroadcastSinCos(self):
+    # sin and cos are shared by the batch, so the kernel indexes them by the
+    # position within the sequence.
+    self._testRotaryEmbedding((3, 5, 4, 8), sin_batch=1)
+
+if __name__ == "__main__":
+  test.main()
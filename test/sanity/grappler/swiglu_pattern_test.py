@@ -0,0 +1,88 @@
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for the SwiGLU fusion of the remapper."""
+
+import numpy as np
+from tensorflow import keras
+
+from intel_extension_for_tensorflow.python.test_func import test_util
+from intel_extension_for_tensorflow.python.test_func import test
+
+from tensorflow.core.protobuf import config_pb2
+from tensorflow.python.ops import array_ops
+from tensorflow.python.ops import math_ops
+from tensorflow.python.ops import variables
+
+
+class SwiGluPatternTest(test_util.TensorFlowTestCase):
+
+  def _checkFused(self, output, expected, metadata):
+    graph = metadata.partition_graphs[0]
+    fused_ops = [list(node.attr["fused_ops"].list.s) for node in graph.node
+                 if "BatchMatMulV2" in node.op]
+    self.assertIn([b"_ITEXSwish", b"BinaryMul"], fused_ops)
+    self.assertNotIn("Sigmoid", [node.op for node in graph.node])
+    self.assertAllClose(expected, output, rtol=1e-4, atol=1e-4)
+
+  @test_util.run_deprecated_v1
+  @test_util.disable_xla('This test does not pass with XLA')
+  def testSwiGlu(self):
+    run_options = config_pb2.RunOptions(output_partition_graphs=True)
+    metadata = config_pb2.RunMetadata()
+    x_np = np.random.uniform(-1, 1, (2, 3, 16)).astype(np.float32)
+    w_np = np.random.uniform(-1, 1, (16, 32)).astype(np.float32)
+    v_np = np.random.uniform(-1, 1, (16, 32)).astype(np.float32)
+    x = variables.Variable(x_np)
+    w = variables.Variable(w_np)
+    v = variables.Variable(v_np)
+    hidden = math_ops.matmul(x, w)
+    output = array_ops.identity(
+        hidden * math_ops.sigmoid(hidden) * math_ops.matmul(x, v))
+
+    with self.session() as sess:
+      sess.run(variables.global_variables_initializer())
+      output_val = sess.run(output, options=run_options,
+                            run_metadata=metadata)
+
+    hidden_np = np.matmul(x_np, w_np)
+    expected = hidden_np / (1 + np.exp(-hidden_np)) * np.matmul(x_np, v_np)
+    self._checkFused(output_val, expected, metadata)
+
+  @test_util.run_deprecated_v1
+  @test_util.disable_xla('This test does not pass with XLA')
+  def testSwiGluDense(self):
+    # Dense on 2-D inputs is a 2-D MatMul.
+    run_options = config_pb2.RunOptions(output_partition_graphs=True)
+    metadata = config_pb2.RunMetadata()
+    x_np = np.random.uniform(-1, 1, (6, 16)).astype(np.float32)
+    x = variables.Variable(x_np)
+    w = keras.layers.Dense(32, use_bias=False)
+    v = keras.layers.Dense(32, use_bias=False)
+    hidden = w(x)
+    output = array_ops.identity(hidden * math_ops.sigmoid(hidden) * v(x))
+
+    with self.session() as sess:
+      sess.run(variables.global_variables_initializer())
+      output_val = sess.run(output, options=run_options,
+                            run_metadata=metadata)
+      w_np, v_np = sess.run([w.kernel, v.kernel])
+
+    hidden_np = np.matmul(x_np, w_np)
+    expected = hidden_np / (1 + np.exp(-hidden_np)) * np.matmul(x_np, v_np)
+    self.assertEqual(output_val.shape, (6, 32))
+    self._checkFused(output_val, expected, metadata)
+
+if __name__ == "__main__":
+  test.main()
@@ -0,0 +1,147 @@
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for the fusions registered from Python."""
+
+import json
+
+import numpy as np
+
+import intel_extension_for_tensorflow as itex
+
+from intel_extension_for_tensorflow.python.test_func import test_util
+from intel_extension_for_tensorflow.python.test_func import test
+
+from tensorflow.core.protobuf import config_pb2
+from tensorflow.python.ops import array_ops
+from tensorflow.python.ops import math_ops
+from tensorflow.python.ops import random_ops
+from tensorflow.python.ops import variables
+
+# Mul(x, x) -> Square(x)
+_SQUARE_PATTERN = {
+    "name": "mul-to-square",
+    "nodes": [
+        {"label": "mul", "op": "Mul", "inputs": ["x", "x"]},
+        {"label": "x", "op": "*"},
+    ],
+    "replacement": {
+        "op": "Square",
+        "inputs": ["x"],
+        "attrs": {"T": {"copy_from": "mul:T"}},
+    },
+}
+
+
+class UserDefinedFusionTest(test_util.TensorFlowTestCase):
+
+  def tearDown(self):
+    itex.unregister_fusion_pattern(_SQUARE_PATTERN["name"])
+    super(UserDefinedFusionTest, self).tearDown()
+
+  def _run(self):
+    run_options = config_pb2.RunOptions(output_partition_graphs=True)
+    metadata = config_pb2.RunMetadata()
+    x = variables.Variable(random_ops.truncated_normal((4, 8), seed=0))
+    y = array_ops.identity(math_ops.exp(x) * math_ops.exp(x))
+    with self.session() as sess:
+      sess.run(variables.global_variables_initializer())
+      output, x_val = sess.run([y, x], options=run_options,
+                               run_metadata=metadata)
+    self.assertAllClose(np.exp(x_val) ** 2, output, rtol=1e-5)
+    return [node.op for node in metadata.partition_graphs[0].node]
+
+  @test_util.run_deprecated_v1
+  @test_util.disable_xla('This test does not pass with XLA')
+  def testGraphStructure(self):
+    itex.register_fusion_pattern(json.dumps(_SQUARE_PATTERN))
+    self.assertEqual([_SQUARE_PATTERN["name"]],
+                     [p["name"] for p in itex.get_fusion_patterns()])
+    ops = self._run()
+    self.assertIn("Square", ops)
+    self.assertNotIn("Mul", ops)
+
+  @test_util.run_deprecated_v1
+  @test_util.disable_xla('This test does not pass with XLA')
+  def testUnregister(self):
+    itex.register_fusion_pattern(_SQUARE_PATTERN)
+    # Registering the same name replaces the pattern.
+    itex.register_fusion_pattern(_SQUARE_PATTERN)
+    self.assertLen(itex.get_fusion_patterns(), 1)
+    itex.unregister_fusion_pattern(_SQUARE_PATTERN["name"])
+    self.assertEmpty(itex.get_fusion_patterns())
+    self.assertNotIn("Square", self._run())
+
+  def testInvalidPattern(self):
+    pattern = dict(_SQUARE_PATTERN, replacement={"op": "NotAnOp"})
+    with self.assertRaisesRegex(ValueError, "not registered"):
+      itex.register_fusion_pattern(pattern)
+
+    pattern = dict(_SQUARE_PATTERN, replacement={"op": "Square",
+                                                 "inputs": ["mul"]})
+    with self.assertRaisesRegex(ValueError, "must be a node"):
+      itex.register_fusion_pattern(pattern)
+
+    pattern = dict(_SQUARE_PATTERN, nodes=[
+        {"label": "mul", "op": "Mul", "inputs": ["x", "y"]},
+        {"label": "x", "op": "*"},
+    ])
+    with self.assertRaisesRegex(ValueError, "unknown input"):
+      itex.register_fusion_pattern(pattern)
+    self.assertEmpty(itex.get_fusion_patterns())
+
+  def testCyclicPattern(self):
+    pattern = dict(_SQUARE_PATTERN, nodes=[
+        {"label": "mul", "op": "Mul", "inputs": ["add", "x"]},
+        {"label": "add", "op": "AddV2", "inputs": ["mul", "x"]},
+        {"label": "x", "op": "*"},
+    ])
+    with self.assertRaisesRegex(ValueError, "cycle at node mul"):
+      itex.register_fusion_pattern(pattern)
+    self.assertEmpty(itex.get_fusion_patterns())
+
+  def testUnreachableNode(self):
+    pattern = dict(_SQUARE_PATTERN, nodes=[
+        {"label": "mul", "op": "Mul", "inputs": ["x", "x"]},
+        {"label": "x", "op": "*"},
+        {"label": "neg", "op": "Neg", "inputs": ["x"]},
+    ])
+    with self.assertRaisesRegex(ValueError,
+                                "neg .* is not an input of the output node"):
+      itex.register_fusion_pattern(pattern)
+    self.assertEmpty(itex.get_fusion_patterns())
+
+  def testVariadicLabel(self):
+    pattern = dict(_SQUARE_PATTERN, nodes=[
+        {"label": "mul", "op": "Mul", "inputs": ["x*", "x*"]},
+        {"label": "x*", "op": "*"},
+    ], replacement=dict(_SQUARE_PATTERN["replacement"], inputs=["x*"]))
+    with self.assertRaisesRegex(ValueError, "invalid label 'x\\*'"):
+      itex.register_fusion_pattern(pattern)
+    self.assertEmpty(itex.get_fusion_patterns())
+
+  def testUnknownType(self):
+    pattern = dict(_SQUARE_PATTERN, replacement=dict(
+        _SQUARE_PATTERN["replacement"], attrs={"T": {"type": "float33"}}))
+    with self.assertRaisesRegex(ValueError, "unknown type 'float33'"):
+      itex.register_fusion_pattern(pattern)
+    self.assertEmpty(itex.get_fusion_patterns())
+
+    for dtype in ["float", "bfloat16", "half"]:
+      pattern["replacement"]["attrs"]["T"]["type"] = dtype
+      itex.register_fusion_pattern(pattern)
+
+
+if __name__ == "__main__":
+  test.main()
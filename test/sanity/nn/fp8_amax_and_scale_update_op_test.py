@@ -0,0 +1,108 @@
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for the batched fp8 amax and scale update."""
+
+import numpy as np
+import tensorflow as tf
+
+from intel_extension_for_tensorflow.python.fp8 import DelayedScaling
+from intel_extension_for_tensorflow.python.fp8.autocast import (
+  amax_and_scale_update,
+  batched_amax_and_scale_update,
+)
+from intel_extension_for_tensorflow.python.test_func import test_util
+from intel_extension_for_tensorflow.python.test_func import test
+
+
+def _fp8_meta_tensors(history_len, num):
+  return {
+      "amax_history": tf.Variable(tf.zeros([history_len, num])),
+      "amax_history_index": tf.Variable(tf.zeros([], dtype=tf.int64)),
+      "scale": tf.Variable(tf.ones([num])),
+      "scale_inv": tf.Variable(tf.ones([num])),
+  }
+
+
+class Fp8AmaxAndScaleUpdateTest(test_util.TensorFlowTestCase):
+
+  def _write_amax(self, fp8_meta_tensors, amax):
+    # The current amax is written to the first row by fp8 kernels.
+    fp8_meta_tensors["amax_history"][0].assign(amax)
+
+  def _check_update(self, recipe, sizes, fp8_maxes, steps):
+    batched = [_fp8_meta_tensors(recipe.amax_history_len, size)
+               for size in sizes]
+    expected = [_fp8_meta_tensors(recipe.amax_history_len, size)
+                for size in sizes]
+    for _ in range(steps):
+      for size, m, e in zip(sizes, batched, expected):
+        amax = np.random.uniform(0.0, 1000.0, [size]).astype(np.float32)
+        # Zero amax and non-finite amax keep the old scale.
+        amax[0] = 0.0 if np.random.rand() < 0.5 else np.inf
+        self._write_amax(m, amax)
+        self._write_amax(e, amax)
+      with tf.device("/cpu:0"):
+        batched_amax_and_scale_update(batched, fp8_maxes, recipe)
+      for fp8_max, e in zip(fp8_maxes, expected):
+        amax_and_scale_update(e, recipe, fp8_max)
+      for m, e in zip(batched, expected):
+        for key in ("amax_history", "amax_history_index", "scale"):
+          self.assertAllEqual(m[key], e[key])
+        self.assertAllClose(m["scale_inv"], e["scale_inv"])
+
+  def testMaxAlgo(self):
+    recipe = DelayedScaling(amax_history_len=4, margin=1)
+    # More steps than the history length to wrap around the ring buffer.
+    self._check_update(recipe, [3, 1, 2], [448.0, 57344.0, 448.0], steps=7)
+
+  def testMostRecentAlgo(self):
+    recipe = DelayedScaling(amax_history_len=4,
+                            amax_compute_algo="most_recent")
+    self._check_update(recipe, [3, 1], [448.0, 57344.0], steps=7)
+
+  def testHistoryLenOne(self):
+    recipe = DelayedScaling(amax_history_len=1)
+    self._check_update(recipe, [2], [448.0], steps=3)
+
+  def testRingBuffer(self):
+    recipe = DelayedScaling(amax_history_len=3)
+    fp8_meta_tensors = _fp8_meta_tensors(3, 1)
+    for amax in (4.0, 2.0, 1.0):
+      self._write_amax(fp8_meta_tensors, [amax])
+      batched_amax_and_scale_update([fp8_meta_tensors], [448.0], recipe)
+    # The first row is zeroed, and the ring keeps the last 2 amaxes.
+    self.assertAllEqual(fp8_meta_tensors["amax_history"], [[0.0], [1.0], [2.0]])
+    self.assertEqual(self.evaluate(fp8_meta_tensors["amax_history_index"]), 1)
+    # The last scale is from max([1.0, 4.0, 2.0]) = 4.0, which is
+    # 2 ^ floor(log2(448 / 4)) = 64.
+    self.assertAllEqual(fp8_meta_tensors["scale"], [64.0])
+
+  def testValueReadBeforeUpdate(self):
+    recipe = DelayedScaling(amax_history_len=2)
+    fp8_meta_tensors = _fp8_meta_tensors(2, 1)
+    self._write_amax(fp8_meta_tensors, [4.0])
+    # The values read before the update share the buffers of the variables,
+    # which must be copied before they are updated in place.
+    history = fp8_meta_tensors["amax_history"].read_value()
+    scale = fp8_meta_tensors["scale"].read_value()
+    batched_amax_and_scale_update([fp8_meta_tensors], [448.0], recipe)
+    self.assertAllEqual(history, [[4.0], [0.0]])
+    self.assertAllEqual(scale, [1.0])
+    self.assertAllEqual(fp8_meta_tensors["amax_history"], [[0.0], [4.0]])
+    self.assertAllEqual(fp8_meta_tensors["scale"], [64.0])
+
+
+if __name__ == "__main__":
+  test.main()
@@ -0,0 +1,54 @@
+# Copyright (c) 2023 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for the registry of fp8 out scale inv factors."""
+
+import gc
+
+from intel_extension_for_tensorflow.python.fp8.autocast import (
+    fp8_autocast, get_fp8_out_scale_inv, get_fp8_out_scale_registry_size,
+    record_fp8_out_scale_inv)
+from intel_extension_for_tensorflow.python.test_func import test_util
+from intel_extension_for_tensorflow.python.test_func import test
+
+from tensorflow.python.framework import constant_op
+
+
+class Fp8OutScaleRegistryTest(test_util.TensorFlowTestCase):
+
+  def testRecordAndLookup(self):
+    size = get_fp8_out_scale_registry_size()
+    with fp8_autocast(enabled=True):
+      fp8_out = constant_op.constant([1, 2], dtype="int8")
+      scale_inv = constant_op.constant([0.5])
+      record_fp8_out_scale_inv(fp8_out, scale_inv)
+      # The first recorded scale inv wins.
+      record_fp8_out_scale_inv(fp8_out, constant_op.constant([2.0]))
+      self.assertIs(get_fp8_out_scale_inv(fp8_out), scale_inv)
+      self.assertEqual(get_fp8_out_scale_registry_size(), size + 1)
+    self.assertEqual(get_fp8_out_scale_registry_size(), size)
+
+  def testSizeStaysFlat(self):
+    size = get_fp8_out_scale_registry_size()
+    with fp8_autocast(enabled=True):
+      for _ in range(100):
+        fp8_out = constant_op.constant([1, 2], dtype="int8")
+        record_fp8_out_scale_inv(fp8_out, constant_op.constant([0.5]))
+        del fp8_out
+        gc.collect()
+        self.assertEqual(get_fp8_out_scale_registry_size(), size)
+
+
+if __name__ == "__main__":
+  test.main()
@@ -323,6 +323,36 @@ class GroupNormalizationTest(test_combinations.TestCase):
         x_shape = [1, 6, 6, 6]
         self._runtests(x_shape)
 
+    def testGradient(self):
+        if tf.config.list_logical_devices('XPU'):
+            self.skipTest("GroupNormGrad is only supported on CPU.")
+        np.random.seed(1)
+        x_shape = [2, 8, 8, 64]
+        x = tf.constant(np.random.normal(size=x_shape), dtype=tf.float32)
+        dy = tf.constant(np.random.normal(size=x_shape), dtype=tf.float32)
+        layer = itex.ops.GroupNormalization(
+            groups=16, axis=-1, epsilon=1e-3,
+            gamma_initializer=Constant(np.random.normal(size=[64])),
+            beta_initializer=Constant(np.random.normal(size=[64])))
+        layer.build(x_shape)
+        weights = [x, layer.gamma, layer.beta]
+
+        def reference(x):
+            groups = tf.reshape(x, [2, 8, 8, 16, 4])
+            mean, var = tf.nn.moments(groups, [1, 2, 4], keepdims=True)
+            groups = (groups - mean) * tf.math.rsqrt(var + 1e-3)
+            return tf.reshape(groups, x_shape) * layer.gamma + layer.beta
+
+        with tf.GradientTape(persistent=True) as tape:
+            tape.watch(x)
+            y = layer(x, training=True)
+            ref_y = reference(x)
+        grads = tape.gradient(y, weights, output_gradients=dy)
+        ref_grads = tape.gradient(ref_y, weights, output_gradients=dy)
+        self.assertAllClose(y, ref_y, atol=1e-4, rtol=1e-4)
+        for grad, ref_grad in zip(grads, ref_grads):
+            self.assertAllClose(grad, ref_grad, atol=1e-3, rtol=1e-3)
+
     
 if __name__ == "__main__":
     tf.test.main()
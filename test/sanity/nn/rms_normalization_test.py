@@ -115,13 +115,19 @@ class RMSNormalizationTest(test_combinations.TestCase):
             atol=1e-3,
         )
 
+    def _ref_rms_norm(self, x, gamma, epsilon):
+        ms = tf.reduce_mean(tf.square(x), -1, keepdims=True)
+        return x * tf.math.rsqrt(ms + epsilon) * gamma
+
     def _test_rms_norm(self, shape, dtype):
         np.random.seed(1)
         x_val = np.random.random_sample(shape).astype(np.float32)
         layer = itex.ops.RMSNormalization()
         inputs = tf.constant(x_val, shape=shape, dtype=dtype)
         outputs = layer(inputs, training=False)
-        ref_outputs = layer(inputs, training=True)
+        ref_outputs = self._ref_rms_norm(
+            tf.cast(inputs, tf.float32), layer.gamma, layer.epsilon)
+        outputs = tf.cast(outputs, tf.float32)
         if dtype == tf.float32:
             self.assertAllClose(outputs, ref_outputs, atol=1e-5, rtol=1e-5)
         else:
@@ -149,6 +155,24 @@ class RMSNormalizationTest(test_combinations.TestCase):
         for shape in shapes:
             self._runtests(shape)
 
+    def testGradient(self):
+        np.random.seed(1)
+        x = tf.constant(np.random.normal(size=[64, 256]), dtype=tf.float32)
+        layer = itex.ops.RMSNormalization(
+            gamma_initializer=Constant(np.random.normal(size=[256])))
+        layer.build(x.shape)
+        dy = tf.constant(np.random.normal(size=[64, 256]), dtype=tf.float32)
+        with tf.GradientTape(persistent=True) as tape:
+            tape.watch(x)
+            y = layer(x, training=True)
+            ref_y = self._ref_rms_norm(x, layer.gamma, layer.epsilon)
+        dx, dgamma = tape.gradient(y, [x, layer.gamma], output_gradients=dy)
+        ref_dx, ref_dgamma = tape.gradient(ref_y, [x, layer.gamma],
+                                           output_gradients=dy)
+        self.assertAllClose(y, ref_y, atol=1e-5, rtol=1e-5)
+        self.assertAllClose(dx, ref_dx, atol=1e-4, rtol=1e-4)
+        self.assertAllClose(dgamma, ref_dgamma, atol=1e-4, rtol=1e-4)
+
 
 if __name__ == "__main__":
     tf.test.main()
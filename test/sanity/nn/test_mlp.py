@@ -133,6 +133,42 @@ class FusedDenseBiasAddGeluTest(keras_parameterized.TestCase):
         self.assert_allclose(gradients["dwei"][0], gradients_itex["dwei"][0], dtype)
         self.assert_allclose(gradients["dwei"][1], gradients_itex["dwei"][1], dtype)
 
+    @parameterized.named_parameters(
+        *testing_utils.generate_combinations_with_testcase_name(
+            training=[True, False], dtype=[tf.float32, tf.bfloat16]
+        )
+    )
+    def test_fused_dense_bias_add_gelu_cpu(self, training, dtype):
+        if itex.get_backend() != b"CPU":
+            self.skipTest("Only test the CPU kernel.")
+        np.random.seed(0)
+        units = 64
+        inputs = np.random.uniform(-1, 1, (2, 16, 32))
+
+        layer = keras.layers.Dense(units, activation=self.gelu, dtype=dtype)
+        itex_layer = itex.ops.FusedDenseBiasAddGelu(units, dtype=dtype)
+        layer.build(inputs.shape)
+        itex_layer.build(inputs.shape)
+        layer.set_weights([np.random.uniform(-1, 1, (32, units)),
+                           np.random.uniform(-1, 1, (units,))])
+        itex_layer.set_weights(layer.get_weights())
+
+        x = tf.constant(inputs, dtype=dtype)
+        results = []
+        for dense in [layer, itex_layer]:
+            with tf.GradientTape() as tape:
+                tape.watch(x)
+                outputs = dense(x, training=training)
+                loss = tf.reduce_sum(outputs * outputs)
+            results.append([outputs])
+            if training:
+                results[-1] += tape.gradient(
+                    loss, [x] + dense.trainable_variables)
+
+        self.assertEqual(results[0][0].shape, results[1][0].shape)
+        for expected, actual in zip(*results):
+            self.assert_allclose(expected, actual, dtype)
+
     def _make_nested_model(self, input_shape, layer, dtype, level=1):
         # example: make_nested_seq_model((1,), Dense(10), level=2).summary()
         def make_nested_seq_model(input_shape, layer, dtype, level=1):
@@ -211,6 +211,40 @@ class LSTMTest(keras_parameterized.TestCase):
                     signatures=None,  # applicable to 'tf' SavedModel format only
                     )
 
+    @parameterized.named_parameters(
+        ('forward', False, 0.), ('backward', True, 0.),
+        ('forward_dropout', False, 1e-6), ('backward_dropout', True, 1e-6))
+    def test_masked_lstm_gradients(self, go_backwards, dropout):
+        # Right padded sequences of length 5, 3 and 1 run with
+        # var_seq_length, which the ITEX kernels handle on both CPU and GPU.
+        # A tiny dropout runs the dropout masks through the kernels, while
+        # keeping almost every unit so the results match Keras.
+        np.random.seed(0)
+        x = tf.constant(np.random.random((3, 5, 4)).astype(np.float32))
+        mask = tf.constant([[True] * 5,
+                            [True] * 3 + [False] * 2,
+                            [True] + [False] * 4])
+        itex_layer = itex.ops.ItexLSTM(6, return_state=True,
+                                       go_backwards=go_backwards,
+                                       dropout=dropout,
+                                       recurrent_dropout=dropout)
+        keras_layer = LSTM(6, return_state=True, go_backwards=go_backwards,
+                           dropout=dropout, recurrent_dropout=dropout)
+        itex_layer.build(x.shape)
+        keras_layer.build(x.shape)
+        keras_layer.set_weights(itex_layer.get_weights())
+
+        results = []
+        for layer in [keras_layer, itex_layer]:
+            with tf.GradientTape() as tape:
+                tape.watch(x)
+                _, h, c = layer(x, mask=mask, training=True)
+                loss = tf.reduce_sum(h * h) + tf.reduce_sum(c)
+            grads = tape.gradient(loss, [x] + layer.trainable_weights)
+            results.append([h, c] + grads)
+        for expected, actual in zip(*results):
+            self.assert_allclose(expected, actual, tf.float32)
+
      
 
 if __name__ == '__main__':